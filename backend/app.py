@@ -3,6 +3,7 @@ import logging
 from flask import Flask, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from flask_migrate import Migrate
 from flask_cors import CORS
 from datetime import timedelta
 
@@ -57,6 +58,8 @@ def create_app(config_name=None):
     # ✅ FIXED: Initialize database with proper error handling
     try:
         db.init_app(app)
+        # Schema changes to existing tables ship as Alembic revisions: flask --app app db upgrade
+        Migrate(app, db)
         app.logger.info("✓ Database initialized successfully")
     except Exception as db_init_error:
         app.logger.error(f"❌ Database initialization failed: {db_init_error}")
@@ -79,9 +82,10 @@ def create_app(config_name=None):
                  'Origin',
                  'Access-Control-Request-Method',
                  'Access-Control-Request-Headers',
-                 'Cache-Control'
+                 'Cache-Control',
+                 'If-None-Match'
              ],
-             expose_headers=['Content-Type', 'Authorization'],
+             expose_headers=['Content-Type', 'Authorization', 'ETag'],
              max_age=86400  # Cache preflight for 24 hours
         )
         app.logger.info(f"✓ CORS configured with {len(cors_origins)} allowed origins")
@@ -167,6 +171,8 @@ def create_app(config_name=None):
         ('routes.line_items', 'line_items_bp', '/api/line-items'),
         ('routes.door', 'doors_bp', '/api/doors'),
         ('routes.dispatch', 'dispatch_bp', '/api/dispatch'),
+        ('routes.price_book', 'price_book_bp', '/api/price-book'),
+        ('routes.parts', 'parts_bp', '/api/parts'),
         ('routes.health', 'health_bp', '/api'),  # Health check endpoint
     ]
     
@@ -210,7 +216,14 @@ def create_app(config_name=None):
     app.logger.info(f"Blueprint registration complete: {len(registered_blueprints)} successful, {len(failed_blueprints)} failed")
     if failed_blueprints:
         app.logger.error(f"Failed blueprints: {failed_blueprints}")
-    
+
+    # Maintenance CLI commands (flask rebuild-job-progress, ...)
+    try:
+        from commands import register_commands
+        register_commands(app)
+    except Exception as e:
+        app.logger.error(f"❌ Failed to register CLI commands: {e}")
+
     # ✅ ENHANCED: Root endpoint with detailed API information
     @app.route('/')
     def index():
@@ -287,11 +300,11 @@ def create_app(config_name=None):
         
         # Add other CORS headers
         response.headers.add('Access-Control-Allow-Headers', 
-                           'Content-Type,Authorization,X-Requested-With,Accept,Origin,Access-Control-Request-Method,Access-Control-Request-Headers,Cache-Control')
+                           'Content-Type,Authorization,X-Requested-With,Accept,Origin,Access-Control-Request-Method,Access-Control-Request-Headers,Cache-Control,If-None-Match')
         response.headers.add('Access-Control-Allow-Methods', 
                            'GET,PUT,POST,DELETE,OPTIONS,PATCH')
         response.headers.add('Access-Control-Expose-Headers', 
-                           'Content-Type,Authorization')
+                           'Content-Type,Authorization,ETag')
         response.headers.add('Access-Control-Max-Age', '86400')
         
         # Handle preflight requests
@@ -0,0 +1,128 @@
+# backend/benchmarks/bench_auto_dispatch.py
+"""
+services.auto_dispatch.solve on random dispatch days.
+
+Run from the backend directory:
+    python benchmarks/bench_auto_dispatch.py [--sizes 30x5 100x15 300x30] [--days 50] [--budget-ms 200]
+
+Each size (jobs x trucks) is run in three scenarios:
+    normal     jobs fill about 75% of the trucks' hours, regions spread evenly
+    tight      jobs ask for 120% of the hours, so some cannot be placed
+    skewed     half the jobs are in one region that only a fifth of the trucks work
+Trucks get 8 hours, a random home region and up to 3 hours of existing work; jobs take 1
+to 6 hours. The solver is compared with plain first fit decreasing (no regions, no
+balancing). Reported per row: median and 99th percentile solve time, share of job hours
+placed, share of placed jobs on a truck of another region, and the spread between the
+fullest and emptiest truck (load / capacity). Exits with status 1 when the 99th percentile
+for 100 jobs x 15 trucks exceeds --budget-ms. No database is involved.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import auto_dispatch  # noqa: E402
+
+REGIONS = ('OC', 'LA', 'IE', 'SD', 'SB')
+CAPACITY = 8.0
+SCENARIOS = ('normal', 'tight', 'skewed')
+
+
+def random_day(generator, job_count, truck_count, scenario):
+    trucks = [(f'truck{number}', CAPACITY, float(generator.choice((0, 0, 1, 2, 3))), generator.choice(REGIONS))
+              for number in range(truck_count)]
+    if scenario == 'skewed':
+        trucks = [(name, capacity, existing, 'OC' if number < max(1, truck_count // 5) else region)
+                  for number, (name, capacity, existing, region) in enumerate(trucks)]
+    free = sum(capacity - existing for _, capacity, existing, _ in trucks)
+    target = free * (1.2 if scenario == 'tight' else 0.75)
+    weights = [generator.uniform(1, 6) for _ in range(job_count)]
+    scale = target / sum(weights)
+    jobs = []
+    for number, weight in enumerate(weights):
+        if scenario == 'skewed' and number % 2 == 0:
+            region = 'OC'
+        else:
+            region = generator.choice(REGIONS)
+        jobs.append((number, round(min(8.0, max(0.5, weight * scale)) * 2) / 2, region))
+    return jobs, trucks
+
+
+def first_fit_decreasing(jobs, trucks):
+    load = {name: existing for name, _, existing, _ in trucks}
+    capacity = {name: cap for name, cap, _, _ in trucks}
+    assignment = {}
+    unplaced = []
+    for job_id, hours, _ in sorted(jobs, key=lambda job: (-job[1], job[0])):
+        for name in load:
+            if load[name] + hours <= capacity[name] + auto_dispatch.EPSILON:
+                assignment[job_id] = name
+                load[name] += hours
+                break
+        else:
+            unplaced.append(job_id)
+    return assignment, unplaced
+
+
+def quality(jobs, trucks, assignment):
+    hours = {job_id: job_hours for job_id, job_hours, _ in jobs}
+    job_region = {job_id: region for job_id, _, region in jobs}
+    truck_region = {name: region for name, _, _, region in trucks}
+    load = {name: existing for name, _, existing, _ in trucks}
+    for job_id, name in assignment.items():
+        load[name] += hours[job_id]
+    utilization = [load[name] / capacity for name, capacity, _, _ in trucks]
+    mismatched = sum(1 for job_id, name in assignment.items() if job_region[job_id] != truck_region[name])
+    return (
+        sum(hours[job_id] for job_id in assignment) / sum(hours.values()),
+        mismatched / len(assignment) if assignment else 0.0,
+        max(utilization) - min(utilization),
+    )
+
+
+def parse_size(value):
+    jobs, _, trucks = value.partition('x')
+    return int(jobs), int(trucks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_size, nargs='+', default=[(30, 5), (100, 15), (300, 30)],
+                        help='JOBSxTRUCKS')
+    parser.add_argument('--days', type=int, default=50, help='random days per size and scenario')
+    parser.add_argument('--budget-ms', type=float, default=200.0)
+    args = parser.parse_args()
+
+    generator = random.Random(25)
+    failed = False
+    print(f"{'size':>8}{'scenario':>9}{'solver':>8}{'median ms':>11}{'p99 ms':>9}"
+          f"{'placed':>9}{'off-region':>12}{'spread':>8}")
+    for job_count, truck_count in args.sizes:
+        for scenario in SCENARIOS:
+            days = [random_day(generator, job_count, truck_count, scenario) for _ in range(args.days)]
+            for label, solver in (('FFD', first_fit_decreasing), ('auto', auto_dispatch.solve)):
+                timings = []
+                results = []
+                for jobs, trucks in days:
+                    started = time.perf_counter()
+                    assignment, _ = solver(jobs, trucks)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    results.append(quality(jobs, trucks, assignment))
+                timings.sort()
+                p99 = timings[max(0, int(len(timings) * 0.99) - 1)]
+                placed, off_region, spread = (statistics.mean(column) for column in zip(*results))
+                print(f"{job_count:>4}x{truck_count:<3}{scenario:>9}{label:>8}{statistics.median(timings):>11.2f}"
+                      f"{p99:>9.2f}{placed:>9.1%}{off_region:>12.1%}{spread:>8.2f}")
+                if label == 'auto' and (job_count, truck_count) == (100, 15) and p99 > args.budget_ms:
+                    print(f"  over the {args.budget_ms:.0f} ms budget")
+                    failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+# backend/benchmarks/bench_dispatch_board.py
+"""
+GET /api/dispatch/<date>: previous per-job lazy-loading handler vs the joined projection,
+and week and month views: one legacy request per day vs one GET /api/dispatch?start=&end=.
+
+Run from the backend directory:
+    python benchmarks/bench_dispatch_board.py [--sizes 20 80 200] [--trucks 6] [--repeat 5]
+                                              [--jobs-per-day 30] [--max-statements 2]
+                                              [--database-url URL]
+
+Each size schedules that many jobs (each with its own bid, estimate, customer and site) on
+one date, most of them spread over the trucks, and loads the board through both handlers.
+Reported: the median latency and the SQL statements per request; both boards are checked to
+be identical. Exits with status 1 when the current handler issues more than
+--max-statements statements for any size or range, so the script doubles as a query-count
+check. The range part seeds --jobs-per-day jobs on each day of a week and of a five-week month
+grid and also reports the response size of the full and compact encodings.
+The default database is a temporary SQLite file; pass a PostgreSQL URL to include network
+round trips.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, Blueprint, jsonify  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+from models import db, User, Customer, Site, Estimate, Bid, Job  # noqa: E402
+from routes.dispatch import dispatch_bp  # noqa: E402
+import logging  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+BOARD_DATE = date(2025, 6, 2)
+
+legacy_bp = Blueprint('legacy_dispatch', __name__)
+
+
+def serialize_job_for_dispatch(job):
+    """
+    The per-job serializer before the joined projection, kept as it was for comparison.
+    Safely serializes a Job object for the Dispatch Calendar.
+    Gets the region directly from the Job model.
+    """
+    customer_name = 'N/A'
+    address = 'N/A'
+    contact_name = None
+    phone = None
+    estimated_hours = None
+
+    if job.bid and job.bid.estimate:
+        if job.bid.estimate.customer_direct_link:
+            customer_name = job.bid.estimate.customer_direct_link.name
+        
+        site = job.bid.estimate.site
+        if site:
+            # Get site-specific info
+            address = getattr(site, 'address', address)
+            contact_name = getattr(site, 'contact_name', contact_name)
+            phone = getattr(site, 'phone', phone)
+
+        # Get estimate-specific info
+        estimated_hours = getattr(job.bid.estimate, 'estimated_hours', None)
+
+    return {
+        'id': job.id,
+        'job_number': job.job_number,
+        'customer_name': customer_name,
+        'address': address,
+        'contact_name': contact_name,
+        'phone': phone,
+        'job_scope': job.job_scope,
+        'estimated_hours': estimated_hours,
+        'material_ready': job.material_ready,
+        'material_location': job.material_location,
+        
+        # *** THE FIX IS HERE: Get region directly from the job object ***
+        'region': job.region,
+        
+        'status': job.status,
+        'scheduled_date': job.scheduled_date.isoformat() if job.scheduled_date else None,
+        'is_visible': job.is_visible,
+        'job_order': job.job_order
+    }
+@legacy_bp.route('/<string:date_str>', methods=['GET'])
+def legacy_get_dispatch_for_date(date_str):
+    """
+    The handler before the joined projection, kept as it was for comparison.
+    Get dispatch assignments for a specific date by reading directly from the Job model.
+    This ensures consistency with the save logic.
+    """
+    try:
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        
+        # 1. Get all field users to prepare the truck columns.
+        field_users = User.query.filter_by(role='field').all()
+        
+        # 2. Initialize the response structure.
+        unassigned_jobs = []
+        truck_assignments = {user.username: [] for user in field_users}
+        
+        # 3. Fetch all jobs scheduled for the target date. The Job model is our single source of truth.
+        all_jobs_on_date = Job.query.filter(
+            Job.scheduled_date == target_date
+        ).order_by(Job.job_order).all()
+        
+        # 4. Process the jobs and place them in the correct column.
+        for job in all_jobs_on_date:
+            job_data = serialize_job_for_dispatch(job)
+            
+            # Check if the job has a truck assignment.
+            if job.truck_assignment and job.truck_assignment in truck_assignments:
+                # Job is assigned to a valid truck, add it to that truck's list.
+                truck_assignments[job.truck_assignment].append(job_data)
+            else:
+                # Job has no assignment or an invalid one, it's unassigned.
+                unassigned_jobs.append(job_data)
+        
+        # Sort jobs within each truck column by their order (already done by query, but good practice).
+        for truck in truck_assignments:
+            truck_assignments[truck].sort(key=lambda j: j.get('job_order', 999))
+
+        logger.info(f"Dispatch data for {date_str} fetched. Unassigned: {len(unassigned_jobs)}. Trucks: { {k: len(v) for k, v in truck_assignments.items()} }")
+
+        return jsonify({
+            'unassigned': unassigned_jobs,
+            'trucks': truck_assignments
+        }), 200
+
+    except ValueError:
+        logger.error(f"Invalid date format for dispatch: {date_str}")
+        return jsonify({'error': 'Invalid date format. Expected YYYY-MM-DD.'}), 400
+    except Exception as e:
+        logger.exception(f"Error fetching dispatch data for {date_str}")
+        return jsonify({'error': f'Failed to retrieve dispatch data: {str(e)}'}), 500
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        LOGIN_DISABLED=True,
+        TESTING=True,
+    )
+    db.init_app(app)
+    app.register_blueprint(dispatch_bp, url_prefix='/api/dispatch')
+    app.register_blueprint(legacy_bp, url_prefix='/legacy/dispatch')
+    return app
+
+
+def seed(job_count, truck_count, days=1):
+    """Field users, then one customer, site, estimate, bid and job per card, with Core inserts."""
+    db.session.execute(insert(User.__table__), [
+        {'username': f'truck{number}', 'email': f'truck{number}@example.com', 'password_hash': 'x', 'role': 'field'}
+        for number in range(truck_count)
+    ])
+    customer_ids = db.session.execute(insert(Customer).returning(Customer.id), [
+        {'name': f'Customer {number}'} for number in range(job_count)
+    ]).scalars().all()
+    site_ids = db.session.execute(insert(Site).returning(Site.id), [
+        {'customer_id': customer_id, 'address': f'{number} Dispatch Road', 'contact_name': f'Contact {number}',
+         'phone': '555-0100'}
+        for number, customer_id in enumerate(customer_ids)
+    ]).scalars().all()
+    estimate_ids = db.session.execute(insert(Estimate).returning(Estimate.id), [
+        {'customer_id': customer_id, 'site_id': site_id, 'estimated_hours': 4.0}
+        for customer_id, site_id in zip(customer_ids, site_ids)
+    ]).scalars().all()
+    bid_ids = db.session.execute(insert(Bid).returning(Bid.id), [
+        {'estimate_id': estimate_id, 'status': 'approved'} for estimate_id in estimate_ids
+    ]).scalars().all()
+    now = datetime.utcnow()
+    db.session.execute(insert(Job.__table__), [
+        {'job_number': f'J{number:05d}', 'bid_id': bid_id, 'status': 'scheduled',
+         'scheduled_date': BOARD_DATE + timedelta(days=number % days),
+         'truck_assignment': f'truck{number % truck_count}' if number % 5 else None,
+         'job_order': number // days // truck_count, 'is_visible': bool(number % 2), 'region': 'NE',
+         'material_ready': False, 'created_at': now, 'updated_at': now}
+        for number, bid_id in enumerate(bid_ids)
+    ])
+    db.session.commit()
+
+
+def measure(app, client, engine, urls, repeat):
+    """Median time and statements of requesting all of `urls`, and the last response bodies and size."""
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    timings = []
+    counts = []
+    bodies = []
+    size = 0
+    for _ in range(repeat):
+        bodies = []
+        size = 0
+        statements.clear()
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            started = time.perf_counter()
+            for url in urls:
+                with app.app_context():
+                    db.session.remove()  # each request starts with an empty identity map
+                response = client.get(url)
+                assert response.status_code == 200, response.get_json()
+                bodies.append(response.get_json())
+                size += len(response.data)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        counts.append(len(statements))
+    return statistics.median(timings), max(counts), bodies, size
+
+
+def reset(app, job_count, truck_count, days=1):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        seed(job_count, truck_count, days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 80, 200], help='jobs on the board date')
+    parser.add_argument('--trucks', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--jobs-per-day', type=int, default=30, help='jobs on each day of the range views')
+    parser.add_argument('--max-statements', type=int, default=2)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app(args.database_url or f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        client = app.test_client()
+        with app.app_context():
+            engine = db.engine
+        print(f"{'jobs':>6}  {'handler':<10}{'median ms':>10}{'statements':>12}")
+        for size in args.sizes:
+            reset(app, size, args.trucks)
+            path = BOARD_DATE.isoformat()
+            legacy_ms, legacy_statements, legacy_bodies, _ = measure(
+                app, client, engine, [f'/legacy/dispatch/{path}'], args.repeat)
+            current_ms, current_statements, current_bodies, _ = measure(
+                app, client, engine, [f'/api/dispatch/{path}'], args.repeat)
+            current_bodies[0].pop('version')  # the legacy board had no version token
+            assert current_bodies == legacy_bodies, 'the boards differ'
+            print(f"{size:>6}  {'legacy':<10}{legacy_ms:>10.1f}{legacy_statements:>12}")
+            print(f"{size:>6}  {'joined':<10}{current_ms:>10.1f}{current_statements:>12}")
+            if current_statements > args.max_statements:
+                print(f"  more than {args.max_statements} statements for {size} jobs")
+                failed = True
+
+        print()
+        print(f"{'view':<7}{'jobs':>6}  {'requests':<22}{'median ms':>10}{'statements':>12}{'KB':>8}")
+        for view, days in (('week', 7), ('month', 35)):
+            reset(app, args.jobs_per_day * days, args.trucks, days)
+            dates = [(BOARD_DATE + timedelta(days=offset)).isoformat() for offset in range(days)]
+            end = dates[-1]
+            variants = (
+                ('legacy, one per day', [f'/legacy/dispatch/{day}' for day in dates]),
+                ('range', [f'/api/dispatch?start={dates[0]}&end={end}']),
+                ('range, compact', [f'/api/dispatch?start={dates[0]}&end={end}&format=compact']),
+            )
+            results = {}
+            for label, urls in variants:
+                results[label] = measure(app, client, engine, urls, args.repeat)
+                elapsed, statements, _, size = results[label]
+                print(f"{view:<7}{args.jobs_per_day * days:>6}  {label:<22}{elapsed:>10.1f}{statements:>12}{size / 1024:>8.1f}")
+                if label != variants[0][0] and statements > args.max_statements:
+                    print(f"  more than {args.max_statements} statements for the {view} range")
+                    failed = True
+            per_day = results['legacy, one per day'][2]
+            by_range = results['range'][2][0]['days']
+            assert [by_range[day] for day in dates] == per_day, 'the range boards differ from the daily ones'
+
+        with app.app_context():
+            db.session.remove()
+        engine.dispose()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# backend/benchmarks/bench_duplicate_door.py
+"""
+POST /api/doors/<id>/duplicate: previous door-by-door implementation vs the set-based one.
+
+Run from the backend directory:
+    python benchmarks/bench_duplicate_door.py [--targets 10 60 200] [--items 12] [--repeat 5] [--database-url URL]
+
+Each run copies a door with --items line items to the given number of new door numbers in
+a fresh bid, and reports the median latency and the number of SQL statements per request.
+The default database is a temporary SQLite file; pass a PostgreSQL URL to include network
+round trips.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, Blueprint, request, jsonify  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from models import db, Customer, Site, Estimate, Bid, Door, LineItem  # noqa: E402
+from routes.door import doors_bp  # noqa: E402
+from services.progress_service import adjust_total_doors  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+legacy_bp = Blueprint('legacy_doors', __name__)
+
+
+@legacy_bp.route('/<int:door_id>/duplicate', methods=['POST'])
+def legacy_duplicate_door_config(door_id):
+    """The handler before the set-based rewrite, kept as it was for comparison."""
+    source_door = Door.query.get(door_id)
+    if not source_door:
+        return jsonify({"error": "Source door not found"}), 404
+
+    data = request.get_json()
+    if not data or 'target_door_numbers' not in data:
+        return jsonify({"error": "Missing 'target_door_numbers' in request body"}), 400
+    
+    target_door_numbers = data.get('target_door_numbers', [])
+    if not isinstance(target_door_numbers, list) or not target_door_numbers:
+        return jsonify({"error": "'target_door_numbers' must be a non-empty list of integers"}), 400
+
+    source_line_items = source_door.line_items
+    if not source_line_items:
+        return jsonify({
+            "message": "Source door has no line items to duplicate.",
+            "created_doors": [],
+            "not_found": []
+        }), 200
+
+    updated_or_created_doors_info = []
+    created_count = 0
+
+    try:
+        for door_num in target_door_numbers:
+            # --- LOGIC CHANGE: FIND OR CREATE THE TARGET DOOR ---
+            target_door = Door.query.filter_by(
+                bid_id=source_door.bid_id, 
+                door_number=door_num
+            ).first()
+
+            if not target_door:
+                # If the door doesn't exist, create it.
+                target_door = Door(
+                    bid_id=source_door.bid_id,
+                    door_number=door_num,
+                    # You can copy other default fields from the source door if you wish
+                    location=source_door.location, 
+                    door_type=source_door.door_type
+                )
+                db.session.add(target_door)
+                # We need to flush to ensure the door is in the session before adding line items
+                db.session.flush()
+                created_count += 1
+
+            # --- END LOGIC CHANGE ---
+
+            # Now, proceed with the copy. First, clear any existing line items.
+            LineItem.query.filter_by(door_id=target_door.id).delete(synchronize_session=False)
+
+            # Copy line items from source to the (found or new) target door
+            for source_item in source_line_items:
+                new_item = LineItem(
+                    door_id=target_door.id,
+                    description=source_item.description,
+                    quantity=source_item.quantity,
+                    price=source_item.price,
+                    part_number=source_item.part_number,
+                    labor_hours=source_item.labor_hours,
+                    hardware=source_item.hardware
+                )
+                db.session.add(new_item)
+            
+            updated_or_created_doors_info.append({
+                "id": target_door.id,
+                "door_number": target_door.door_number
+            })
+            
+        adjust_total_doors(source_door.bid_id, created_count)
+        db.session.commit()
+
+        # A more accurate success message
+        return jsonify({
+            "message": f"Configuration from door {source_door.door_number} duplicated to {len(updated_or_created_doors_info)} doors.",
+            "created_doors": updated_or_created_doors_info,
+            "not_found": [] # This should always be empty now
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error during door duplication from source door {door_id}: {e}", exc_info=True)
+        return jsonify({"error": "An internal server error occurred during duplication."}), 500
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        LOGIN_DISABLED=True,
+        TESTING=True,
+    )
+    db.init_app(app)
+    app.register_blueprint(doors_bp, url_prefix='/api/doors')
+    app.register_blueprint(legacy_bp, url_prefix='/legacy/doors')
+    return app
+
+
+def seed_source_door(item_count):
+    customer = Customer(name='Benchmark Customer')
+    db.session.add(customer)
+    db.session.flush()
+    site = Site(customer_id=customer.id, address='1 Benchmark Way')
+    db.session.add(site)
+    db.session.flush()
+    estimate = Estimate(customer_id=customer.id, site_id=site.id)
+    db.session.add(estimate)
+    db.session.flush()
+    bid = Bid(estimate_id=estimate.id, status='draft', total_cost=0.0)
+    db.session.add(bid)
+    db.session.flush()
+    door = Door(bid_id=bid.id, door_number=1, location='Dock', door_type='Sectional')
+    db.session.add(door)
+    db.session.flush()
+    db.session.add_all([
+        LineItem(door_id=door.id, part_number=f'P{index}', description=f'Item {index}',
+                 quantity=1, price=10.0, labor_hours=1.0, hardware=2.0)
+        for index in range(item_count)
+    ])
+    db.session.commit()
+    return door.id
+
+
+def measure(app, client, engine, prefix, target_count, item_count, repeat):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    timings = []
+    counts = []
+    payload = {'target_door_numbers': list(range(2, target_count + 2))}
+    for _ in range(repeat):
+        with app.app_context():
+            door_id = seed_source_door(item_count)
+        statements.clear()
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            started = time.perf_counter()
+            response = client.post(f'{prefix}/{door_id}/duplicate', json=payload)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        assert response.status_code == 200, response.get_json()
+        counts.append(len(statements))
+    return statistics.median(timings), statistics.median(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', type=int, nargs='+', default=[10, 60, 200], help='target doors per request')
+    parser.add_argument('--items', type=int, default=12, help='line items on the source door')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app(args.database_url or f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            engine = db.engine
+
+        print(f"{'targets':>8}  {'variant':<15}{'median ms':>11}{'statements':>12}")
+        for target_count in args.targets:
+            legacy = measure(app, client, engine, '/legacy/doors', target_count, args.items, args.repeat)
+            current = measure(app, client, engine, '/api/doors', target_count, args.items, args.repeat)
+            print(f"{target_count:>8}  {'door-by-door':<15}{legacy[0]:>11.1f}{legacy[1]:>12.0f}")
+            print(f"{target_count:>8}  {'set-based':<15}{current[0]:>11.1f}{current[1]:>12.0f}")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# backend/benchmarks/bench_mobile_job_doors.py
+"""
+GET /api/mobile/field-jobs/<job_id>: SQL statements and latency by job size.
+
+Run from the backend directory:
+    python benchmarks/bench_mobile_job_doors.py [--sizes 1x1 20x10] [--repeat 5]
+                                                [--max-statements 17] [--database-url URL]
+
+Each size (doors x line items per door) gets its own job. Every other line item is marked
+complete, and every other door has a photo, a video and a completion signature, so each
+grouped query in services.mobile_service.load_mobile_job_doors has rows to return.
+Reported: the median latency and the SQL statements per request, counted from the request
+through the response (the login user lookup included). Exits with status 1 unless every
+size issues the same number of statements, at most --max-statements, so the script doubles
+as the query-count check for the mobile job view.
+The default database is a temporary SQLite file; pass a PostgreSQL URL to include network
+round trips.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask  # noqa: E402
+from flask_login import LoginManager  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from models import (db, User, Customer, Site, Estimate, Bid, Door, LineItem, Job,  # noqa: E402
+                    MobileJobLineItem, JobSignature, DoorMedia)
+from routes.mobile import mobile_bp  # noqa: E402
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SECRET_KEY='bench',
+        TESTING=True,
+    )
+    db.init_app(app)
+    login_manager = LoginManager(app)
+
+    @login_manager.request_loader
+    def load_admin(request):
+        return db.session.get(User, 1)
+
+    app.register_blueprint(mobile_bp, url_prefix='/api/mobile')
+    return app
+
+
+def seed_job(number, door_count, item_count):
+    """One job of `door_count` doors with `item_count` line items each; returns its id."""
+    customer = Customer(name=f'Customer {number}')
+    db.session.add(customer)
+    db.session.flush()
+    site = Site(customer_id=customer.id, address=f'{number} Mobile Road', contact_name='Contact', phone='555-0100')
+    db.session.add(site)
+    db.session.flush()
+    estimate = Estimate(customer_id=customer.id, site_id=site.id, estimated_hours=4.0)
+    db.session.add(estimate)
+    db.session.flush()
+    bid = Bid(estimate_id=estimate.id, status='approved')
+    db.session.add(bid)
+    db.session.flush()
+    job = Job(job_number=f'J{number:05d}', bid_id=bid.id, status='scheduled', scheduled_date=date.today(),
+              truck_assignment='truck0', is_visible=True, region='NE')
+    db.session.add(job)
+    db.session.flush()
+    for door_number in range(1, door_count + 1):
+        door = Door(bid_id=bid.id, door_number=door_number)
+        db.session.add(door)
+        db.session.flush()
+        items = [LineItem(door_id=door.id, part_number=f'P{index}', description=f'Item {index}', quantity=1,
+                          price=10.0, labor_hours=0.5, hardware=1.0) for index in range(item_count)]
+        db.session.add_all(items)
+        db.session.flush()
+        db.session.add_all(MobileJobLineItem(job_id=job.id, line_item_id=item.id, completed=True)
+                           for item in items[::2])
+        if door_number % 2:
+            db.session.add_all([
+                DoorMedia(door_id=door.id, job_id=job.id, media_type=media_type, file_path=f'{door.id}.{media_type}')
+                for media_type in ('photo', 'video')
+            ])
+            db.session.add(JobSignature(job_id=job.id, door_id=door.id, user_id=1, signature_type='door_complete',
+                                        signature_data='data:image/png;base64,'))
+    db.session.commit()
+    return job.id
+
+
+def measure(app, client, engine, url, repeat):
+    """Median time and the most statements of requesting `url`, and the last response body."""
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    timings = []
+    counts = []
+    body = None
+    for _ in range(repeat):
+        statements.clear()
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            with app.app_context():
+                db.session.remove()  # each request starts with an empty identity map
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        counts.append(len(statements))
+    return statistics.median(timings), max(counts), body
+
+
+def parse_size(value):
+    doors, _, items = value.partition('x')
+    return int(doors), int(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_size, nargs='+', default=[(1, 1), (20, 10)], help='DOORSxITEMS')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-statements', type=int, default=17)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_mobile_job_')
+    app = create_app(args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username='admin', email='admin@example.com', password_hash='x', role='admin'))
+        db.session.commit()
+        job_ids = [seed_job(number, doors, items) for number, (doors, items) in enumerate(args.sizes)]
+        engine = db.engine
+
+    client = app.test_client()
+    counts = []
+    print(f"{'doors x items':>14}{'median ms':>11}{'statements':>12}")
+    for (doors, items), job_id in zip(args.sizes, job_ids):
+        median, statements, body = measure(app, client, engine, f'/api/mobile/field-jobs/{job_id}', args.repeat)
+        assert len(body['doors']) == doors and all(len(door['line_items']) == items for door in body['doors'])
+        counts.append(statements)
+        print(f"{f'{doors} x {items}':>14}{median:>11.2f}{statements:>12}")
+
+    failed = False
+    if len(set(counts)) > 1:
+        print(f"statement count grows with the job: {counts}")
+        failed = True
+    if max(counts) > args.max_statements:
+        print(f"more than {args.max_statements} statements per request")
+        failed = True
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# backend/benchmarks/bench_part_suggest.py
+"""
+GET /api/parts/suggest over a large parts catalog.
+
+Run from the backend directory:
+    python benchmarks/bench_part_suggest.py [--parts 50000] [--requests 500] [--database-url URL]
+
+Seeds --parts catalog rows with door-hardware-like part numbers and descriptions, then
+reports: the time to load the in-memory index, an incremental refresh that merges 100
+changed rows, and the median / 99th percentile latency of suggestion requests through the
+real route for one-letter, short, part number, two-word and database-fallback queries.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import insert, update  # noqa: E402
+from models import db, CatalogPart  # noqa: E402
+from routes.parts import parts_bp  # noqa: E402
+from services import part_catalog  # noqa: E402
+
+PREFIXES = ['SPR', 'OPN', 'CBL', 'RLR', 'HNG', 'TRK', 'SEAL', 'PNL', 'LCK', 'MTR', 'BRK', 'DRM']
+WORDS = ['torsion', 'spring', 'extension', 'opener', 'jackshaft', 'cable', 'roller', 'nylon', 'hinge',
+         'track', 'vertical', 'horizontal', 'bottom', 'seal', 'weather', 'panel', 'section', 'lock',
+         'motor', 'bracket', 'drum', 'shaft', 'bearing', 'galvanized', 'steel', 'heavy', 'duty', 'commercial']
+QUERIES = {
+    'one letter': ['s', 'o', 'c', 'r', 'h'],
+    'word prefix': ['tors', 'jack', 'galv', 'weat', 'brack'],
+    'part number': ['SPR-1', 'OPN-25', 'TRK-40', 'SEAL-9', 'DRM-7'],
+    'two words': ['torsion spr', 'nylon roll', 'heavy hinge', 'steel track', 'commercial opener'],
+    'db fallback': ['xqzt', 'orsio', 'ackshaf', 'alvaniz', 'eather'],
+}
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        LOGIN_DISABLED=True,
+        PART_CATALOG_REFRESH_SECONDS=3600,
+    )
+    db.init_app(app)
+    app.register_blueprint(parts_bp, url_prefix='/api/parts')
+    return app
+
+
+def seed(part_count):
+    generator = random.Random(7)
+    loaded_at = datetime.utcnow() - timedelta(hours=1)  # outside the refresh overlap, like an established catalog
+    db.session.execute(insert(CatalogPart.__table__), [
+        {
+            'part_number': f"{PREFIXES[index % len(PREFIXES)]}-{index}",
+            'description': ' '.join(generator.sample(WORDS, 4)),
+            'price': round(generator.uniform(5, 900), 2),
+            'use_count': generator.randint(0, 200),
+            'updated_at': loaded_at,
+        }
+        for index in range(part_count)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=500, help='requests per query kind')
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app(args.database_url or f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            seed(args.parts)
+
+            started = time.perf_counter()
+            part_catalog.current_index()
+            load_ms = (time.perf_counter() - started) * 1000
+
+            changed = [f"{PREFIXES[index % len(PREFIXES)]}-{index}" for index in range(0, args.parts, args.parts // 100)]
+            db.session.execute(
+                update(CatalogPart).where(CatalogPart.part_number.in_(changed)).values(
+                    description='replacement torsion spring kit', updated_at=datetime.utcnow()
+                )
+            )
+            db.session.commit()
+            part_catalog._state['checked_at'] = None
+            started = time.perf_counter()
+            part_catalog.current_index()
+            refresh_ms = (time.perf_counter() - started) * 1000
+            index = part_catalog.current_index()
+            print(f"{args.parts} parts, {len(index.keys)} index tokens")
+            print(f"index load {load_ms:.0f} ms, incremental refresh of {len(changed)} rows {refresh_ms:.1f} ms")
+
+        print(f"{'query kind':<14}{'median ms':>10}{'p99 ms':>9}{'results':>9}  source")
+        for kind, queries in QUERIES.items():
+            timings = []
+            for number in range(args.requests):
+                query = queries[number % len(queries)]
+                started = time.perf_counter()
+                response = client.get('/api/parts/suggest', query_string={'q': query})
+                timings.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.get_json()
+            body = response.get_json()
+            timings.sort()
+            print(f"{kind:<14}{statistics.median(timings):>10.2f}{timings[int(len(timings) * 0.99) - 1]:>9.2f}"
+                  f"{len(body['parts']):>9}  {body['source']}")
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
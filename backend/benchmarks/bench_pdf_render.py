@@ -0,0 +1,244 @@
+# backend/benchmarks/bench_pdf_render.py
+"""
+Bid PDF build time and peak memory for a large bid: the report as it was built before
+services/pdf_templates.py vs the current report and proposal.
+
+Run from the backend directory:
+    python benchmarks/bench_pdf_render.py [--doors 200] [--items 12] [--repeat 3]
+
+The bid is a synthetic load_document_data snapshot, so no database is needed. Each variant
+runs in a fresh process so ru_maxrss reflects only that variant's peak resident memory.
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import statistics
+import multiprocessing
+from io import BytesIO
+from types import SimpleNamespace
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab.lib.pagesizes import letter  # noqa: E402
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle  # noqa: E402
+from reportlab.lib.styles import getSampleStyleSheet  # noqa: E402
+from reportlab.lib.units import inch  # noqa: E402
+from reportlab.lib import colors  # noqa: E402
+from services import pricing  # noqa: E402
+from services.file_utils import build_bid_report, build_bid_proposal, logger  # noqa: E402
+
+
+def make_document(door_count, items_per_door):
+    """A load_document_data-shaped snapshot of a bid with door_count doors."""
+    doors = [SimpleNamespace(id=door_id, door_number=door_id) for door_id in range(1, door_count + 1)]
+    line_items = {}
+    door_totals = {}
+    for door in doors:
+        items = [
+            SimpleNamespace(part_number=f'P-{door.id}-{index}', description=f'Torsion spring assembly {index}',
+                            quantity=1 + index % 3, price=12.5 + index, labor_hours=0.5, hardware=3.25)
+            for index in range(items_per_door)
+        ]
+        line_items[door.id] = items
+        parts = sum(pricing.line_item_total(item) for item in items)
+        labor = sum(item.labor_hours for item in items) * pricing.LABOR_RATE
+        hardware = sum(item.hardware for item in items)
+        door_totals[door.id] = pricing.door_summary(parts, labor, hardware)
+    totals = pricing.bid_summary(
+        sum(summary['parts_cost'] for summary in door_totals.values()),
+        sum(summary['labor_cost'] for summary in door_totals.values()),
+        sum(summary['hardware_cost'] for summary in door_totals.values())
+    )
+    customer = SimpleNamespace(name='Benchmark Customer', address='1 Benchmark Way', contact_name='Pat',
+                               phone='555-0100', email='pat@example.com')
+    return {'bid_id': 1, 'customer': customer, 'doors': doors, 'line_items': line_items,
+            'door_totals': door_totals, 'totals': totals}
+
+
+# --- Previous implementation, kept verbatim for comparison ---
+
+def legacy_build_bid_report(document):
+    """build_bid_report before the shared template layer, kept as it was for comparison."""
+    try:
+        bid_id = document['bid_id']
+        customer = document['customer']
+        doors = document['doors']
+        
+        totals = document['totals']
+        total_parts_cost = totals['total_parts_cost']
+        total_labor_cost = totals['total_labor_cost']
+        total_hardware_cost = totals['total_hardware_cost']
+        tax_amount = totals['tax_amount']
+        total_cost = totals['total_cost']
+        
+        # Create a PDF buffer
+        buffer = BytesIO()
+        
+        # Create the PDF document
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=letter,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=72
+        )
+        
+        # Container for the 'Flowable' objects
+        elements = []
+        
+        # Define styles
+        styles = getSampleStyleSheet()
+        title_style = styles['Heading1']
+        heading2_style = styles['Heading2']
+        heading3_style = styles['Heading3']
+        normal_style = styles['Normal']
+        
+        # Add the report title
+        elements.append(Paragraph(f"Bid Report #{bid_id}", title_style))
+        elements.append(Spacer(1, 0.25*inch))
+        
+        # Add the date
+        current_date = datetime.now().strftime("%B %d, %Y")
+        elements.append(Paragraph(f"Date: {current_date}", normal_style))
+        elements.append(Spacer(1, 0.25*inch))
+        
+        # Add company info
+        elements.append(Paragraph("Scott Overhead Doors", heading2_style))
+        elements.append(Paragraph("123 Main Street", normal_style))
+        elements.append(Paragraph("Anytown, CA 92000", normal_style))
+        elements.append(Paragraph("Phone: (555) 555-5555", normal_style))
+        elements.append(Spacer(1, 0.25*inch))
+        
+        # Add customer info
+        elements.append(Paragraph("Customer Information", heading2_style))
+        elements.append(Paragraph(f"Name: {customer.name}", normal_style))
+        elements.append(Paragraph(f"Address: {customer.address or 'N/A'}", normal_style))
+        elements.append(Paragraph(f"Contact: {customer.contact_name or 'N/A'}", normal_style))
+        elements.append(Paragraph(f"Phone: {customer.phone or 'N/A'}", normal_style))
+        elements.append(Paragraph(f"Email: {customer.email or 'N/A'}", normal_style))
+        elements.append(Spacer(1, 0.25*inch))
+        
+        # Add cost summary
+        elements.append(Paragraph("Cost Summary", heading2_style))
+        
+        summary_data = [
+            ["Description", "Amount"],
+            ["Total Parts Cost", f"${total_parts_cost:.2f}"],
+            ["Total Labor Cost", f"${total_labor_cost:.2f}"],
+            ["Total Hardware Cost", f"${total_hardware_cost:.2f}"],
+            [f"Tax ({pricing.TAX_RATE * 100:g}%)", f"${tax_amount:.2f}"],
+            ["Total Cost", f"${total_cost:.2f}"]
+        ]
+        
+        summary_table = Table(summary_data)
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (1, 0), colors.black),
+            ('ALIGN', (0, 0), (1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (1, 0), 12),
+            ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
+            ('FONTNAME', (0, -1), (1, -1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        
+        elements.append(summary_table)
+        elements.append(Spacer(1, 0.25*inch))
+        
+        # Add door details
+        elements.append(Paragraph("Door Details", heading2_style))
+        
+        for door in doors:
+            elements.append(Paragraph(f"Door #{door.door_number}", heading3_style))
+            
+            door_data = [["Part Number", "Description", "Quantity", "Price", "Labor Hours", "Hardware", "Total"]]
+            
+            for item in document['line_items'][door.id]:
+                door_data.append([
+                    item.part_number or 'N/A',
+                    item.description or 'N/A',
+                    str(item.quantity),
+                    f"${item.price:.2f}",
+                    str(item.labor_hours),
+                    f"${item.hardware:.2f}",
+                    f"${pricing.line_item_total(item):.2f}"
+                ])
+            
+            door_total = document['door_totals'][door.id]['total']
+            door_data.append(["", "", "", "", "", "Door Total:", f"${door_total:.2f}"])
+            
+            door_table = Table(door_data)
+            door_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            
+            elements.append(door_table)
+            elements.append(Spacer(1, 0.25*inch))
+        
+        # Add footer
+        elements.append(Paragraph(f"Report generated on {current_date}", normal_style))
+        elements.append(Paragraph("Scott Overhead Doors - Confidential", normal_style))
+        
+        # Build the PDF
+        doc.build(elements)
+        
+        return buffer.getvalue()
+        
+    except Exception as e:
+        logger.error(f"Error generating bid report: {str(e)}")
+        raise
+
+
+VARIANTS = {
+    'report (before)': legacy_build_bid_report,
+    'report': build_bid_report,
+    'proposal': build_bid_proposal,
+}
+
+
+def run_variant(name, door_count, items_per_door, repeat, queue):
+    document = make_document(door_count, items_per_door)
+    build = VARIANTS[name]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(build(document))
+        timings.append((time.perf_counter() - started) * 1000)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((name, statistics.median(timings), min(timings), (peak - baseline) / 1024, size / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--doors', type=int, default=200)
+    parser.add_argument('--items', type=int, default=12, help='line items per door')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.doors} doors x {args.items} line items, {args.repeat} builds per variant\n")
+    print(f"{'variant':<18}{'median ms':>12}{'best ms':>10}{'peak RSS +MB':>15}{'PDF KB':>10}")
+    context = multiprocessing.get_context('spawn')
+    for name in VARIANTS:
+        queue = context.Queue()
+        process = context.Process(target=run_variant, args=(name, args.doors, args.items, args.repeat, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        print(f"{result[0]:<18}{result[1]:>12.1f}{result[2]:>10.1f}{result[3]:>15.1f}{result[4]:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
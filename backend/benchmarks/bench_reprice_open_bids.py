@@ -0,0 +1,135 @@
+# backend/benchmarks/bench_reprice_open_bids.py
+"""
+Repricing open bids from the price book: an ORM loop over the line items vs the set-based
+services.price_book.reprice_open_bids.
+
+Run from the backend directory:
+    python benchmarks/bench_reprice_open_bids.py [--sizes 1000 10000 50000] [--database-url URL]
+
+Each size seeds that many line items on draft bids (ten doors of ten items per bid, a
+quarter of them on approved bids that must be left alone), puts every part in the price
+book at a new price and reprices. Reported: the dry-run diff time, the apply time
+including the total refresh and commit, and the SQL statements of the apply. The default
+database is a temporary SQLite file; pass a PostgreSQL URL to include network round trips.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+from models import db, Customer, Site, Estimate, Bid, Door, LineItem, PriceBookEntry  # noqa: E402
+from services import price_book  # noqa: E402
+
+ITEMS_PER_DOOR = 10
+DOORS_PER_BID = 10
+PART_COUNT = 200
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=database_url, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    return app
+
+
+def seed(item_count):
+    """Bids, doors and line items written with Core inserts; the listeners are not under test here."""
+    customer = Customer(name='Benchmark Customer')
+    db.session.add(customer)
+    db.session.flush()
+    site = Site(customer_id=customer.id, address='1 Benchmark Way')
+    db.session.add(site)
+    db.session.flush()
+    estimate = Estimate(customer_id=customer.id, site_id=site.id)
+    db.session.add(estimate)
+    db.session.flush()
+
+    bid_count = max(1, item_count // (ITEMS_PER_DOOR * DOORS_PER_BID))
+    bid_ids = db.session.execute(insert(Bid).returning(Bid.id), [
+        {'estimate_id': estimate.id, 'status': 'approved' if number % 4 == 3 else 'draft'}
+        for number in range(bid_count)
+    ]).scalars().all()
+    door_ids = db.session.execute(insert(Door).returning(Door.id), [
+        {'bid_id': bid_id, 'door_number': number + 1} for bid_id in bid_ids for number in range(DOORS_PER_BID)
+    ]).scalars().all()
+    db.session.execute(insert(LineItem.__table__), [
+        {'door_id': door_id, 'part_number': f'PART-{(door_id * ITEMS_PER_DOOR + index) % PART_COUNT}',
+         'description': 'Benchmark part', 'quantity': 2, 'price': 10.0, 'labor_hours': 1.0, 'hardware': 1.0}
+        for door_id in door_ids for index in range(ITEMS_PER_DOOR)
+    ])
+    db.session.execute(insert(PriceBookEntry.__table__), [
+        {'part_number': f'PART-{index}', 'price': 11.0 + index % 7} for index in range(PART_COUNT)
+    ])
+    db.session.commit()
+
+
+def reset(item_count):
+    db.drop_all()
+    db.create_all()
+    seed(item_count)
+
+
+def orm_loop():
+    """What repricing costs without the set-based path: load, assign and flush item by item."""
+    prices = dict(db.session.query(PriceBookEntry.part_number, PriceBookEntry.price))
+    items = LineItem.query.join(Door).join(Bid).filter(Bid.status.in_(price_book.OPEN_BID_STATUSES)).all()
+    for item in items:
+        if item.part_number in prices and item.price != prices[item.part_number]:
+            item.price = prices[item.part_number]
+    db.session.commit()
+
+
+def timed(engine, action):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        started = time.perf_counter()
+        action()
+        return (time.perf_counter() - started) * 1000, len(statements)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help='line items seeded')
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app(args.database_url or f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        with app.app_context():
+            engine = db.engine
+            print(f"{'line items':>10}  {'variant':<10}{'dry run ms':>12}{'apply ms':>10}{'statements':>12}{'repriced':>10}")
+            for size in args.sizes:
+                reset(size)
+                loop_ms, loop_statements = timed(engine, orm_loop)
+
+                reset(size)
+                report = {}
+                dry_ms, _ = timed(engine, lambda: report.update(price_book.reprice_open_bids(dry_run=True)))
+
+                def apply():
+                    report.update(price_book.reprice_open_bids(dry_run=False))
+                    db.session.commit()
+
+                apply_ms, apply_statements = timed(engine, apply)
+                print(f"{size:>10}  {'ORM loop':<10}{'':>12}{loop_ms:>10.0f}{loop_statements:>12}{'':>10}")
+                print(f"{size:>10}  {'set-based':<10}{dry_ms:>12.0f}{apply_ms:>10.0f}{apply_statements:>12}"
+                      f"{report['line_item_count']:>10}")
+            db.session.remove()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# backend/benchmarks/bench_route_optimizer.py
+"""
+services.route_optimizer on random truck days.
+
+Run from the backend directory:
+    python benchmarks/bench_route_optimizer.py [--sizes 10 25 40] [--routes 200] [--budget-ms 50]
+
+Each route scatters its stops over a 40 km square around a depot, with the first stop
+pinned on half of them. Reported per size: the median and 99th percentile solve time, and
+the mean route length of the hand order (random), of nearest neighbour alone and of the
+full optimizer. Fifty seven-stop routes are also compared with the exact optimum found by
+brute force. Exits with status 1 when the 99th percentile for 25 stops exceeds --budget-ms.
+No database is involved.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import itertools
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import route_optimizer  # noqa: E402
+
+DEPOT = (33.70, -117.85)
+SPAN_DEGREES = 0.36  # about 40 km
+
+
+def random_stops(generator, count):
+    return [(number, (DEPOT[0] + (generator.random() - 0.5) * SPAN_DEGREES,
+                      DEPOT[1] + (generator.random() - 0.5) * SPAN_DEGREES)) for number in range(count)]
+
+
+def nearest_neighbour_km(stops, first):
+    points = dict(stops)
+    path = [first] if first is not None else []
+    remaining = set(points) - set(path)
+    position = points[first] if first is not None else DEPOT
+    while remaining:
+        nearest = min(remaining, key=lambda key: route_optimizer.haversine_km(position, points[key]))
+        path.append(nearest)
+        remaining.remove(nearest)
+        position = points[nearest]
+    return route_optimizer.route_km([points[key] for key in path], DEPOT)
+
+
+def optimum_km(stops, first):
+    points = dict(stops)
+    return min(
+        route_optimizer.route_km([points[key] for key in order], DEPOT)
+        for order in itertools.permutations(points) if first is None or order[0] == first
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 25, 40], help='stops per route')
+    parser.add_argument('--routes', type=int, default=200, help='random routes per size')
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    generator = random.Random(11)
+    failed = False
+    print(f"{'stops':>6}{'median ms':>11}{'p99 ms':>9}{'hand km':>10}{'NN km':>9}{'optimized km':>14}")
+    for size in args.sizes:
+        timings = []
+        hand = []
+        nearest = []
+        optimized = []
+        for number in range(args.routes):
+            stops = random_stops(generator, size)
+            first = 0 if number % 2 else None
+            started = time.perf_counter()
+            _, distance = route_optimizer.optimize_route(stops, first=first, depot=DEPOT)
+            timings.append((time.perf_counter() - started) * 1000)
+            hand.append(route_optimizer.route_km([point for _, point in stops], DEPOT))
+            nearest.append(nearest_neighbour_km(stops, first))
+            optimized.append(distance)
+        timings.sort()
+        p99 = timings[max(0, int(len(timings) * 0.99) - 1)]
+        print(f"{size:>6}{statistics.median(timings):>11.2f}{p99:>9.2f}{statistics.mean(hand):>10.1f}"
+              f"{statistics.mean(nearest):>9.1f}{statistics.mean(optimized):>14.1f}")
+        if size == 25 and p99 > args.budget_ms:
+            print(f"  over the {args.budget_ms:.0f} ms budget")
+            failed = True
+
+    gaps = []
+    for number in range(50):
+        stops = random_stops(generator, 7)
+        first = 0 if number % 2 else None
+        _, distance = route_optimizer.optimize_route(stops, first=first, depot=DEPOT)
+        gaps.append(distance / optimum_km(stops, first) - 1)
+    print(f"7 stops vs brute force: mean gap {statistics.mean(gaps) * 100:.2f}%, worst {max(gaps) * 100:.2f}%, "
+          f"optimal in {sum(gap < 1e-9 for gap in gaps)} of {len(gaps)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+# backend/benchmarks/bench_save_bid_changes.py
+"""
+PUT /api/bids/<id>/save-changes: previous row-by-row implementation vs the set-based one.
+
+Run from the backend directory:
+    python benchmarks/bench_save_bid_changes.py [--sizes 10 100 1000] [--repeat 5] [--database-url URL]
+
+Each size edits every line item of a bid (price, quantity, labor, hardware and description,
+ten items per door) through the real route, and reports the median latency and the number
+of SQL statements per request. The default database is a temporary SQLite file; pass a
+PostgreSQL URL to include network round trips.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, Blueprint, request, jsonify  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from models import db, Customer, Site, Estimate, Bid, Door, LineItem  # noqa: E402
+from routes.bids import bids_bp  # noqa: E402
+from services import pricing  # noqa: E402
+
+ITEMS_PER_DOOR = 10
+
+legacy_bp = Blueprint('legacy_bids', __name__)
+
+
+@legacy_bp.route('/<int:bid_id>/save-changes', methods=['PUT'])
+def legacy_save_bid_changes(bid_id):
+    """The handler before the set-based rewrite, kept as it was for comparison."""
+    try:
+        bid = Bid.query.get_or_404(bid_id)
+        data = request.json
+        doors_data = data.get('doors', [])
+        updated_items = []
+        errors = []
+
+        for door_change in doors_data:
+            door_id = door_change.get('door_id')
+            line_items_data = door_change.get('line_items', [])
+            door = Door.query.get(door_id)
+            if not door:
+                errors.append(f'Door {door_id} not found')
+                continue
+            if door.bid_id != bid_id:
+                errors.append(f'Door {door_id} does not belong to bid {bid_id}')
+                continue
+
+            for item_data in line_items_data:
+                item_id = item_data.get('id')
+                line_item = LineItem.query.get(item_id)
+                if not line_item:
+                    errors.append(f'Line item {item_id} not found')
+                    continue
+                if line_item.door_id != door_id:
+                    errors.append(f'Line item {item_id} does not belong to door {door_id}')
+                    continue
+                try:
+                    if 'description' in item_data:
+                        line_item.description = str(item_data['description']).strip()
+                    if 'quantity' in item_data:
+                        quantity = float(item_data['quantity'])
+                        if quantity <= 0:
+                            errors.append(f'Invalid quantity {quantity} for item {item_id}')
+                            continue
+                        line_item.quantity = quantity
+                    if 'price' in item_data:
+                        price = float(item_data['price'])
+                        if price < 0:
+                            errors.append(f'Invalid price {price} for item {item_id}')
+                            continue
+                        line_item.price = price
+                    if 'labor_hours' in item_data:
+                        labor_hours = float(item_data['labor_hours'])
+                        if labor_hours < 0:
+                            errors.append(f'Invalid labor_hours {labor_hours} for item {item_id}')
+                            continue
+                        line_item.labor_hours = labor_hours
+                    if 'hardware' in item_data:
+                        hardware = float(item_data['hardware'])
+                        if hardware < 0:
+                            errors.append(f'Invalid hardware cost {hardware} for item {item_id}')
+                            continue
+                        line_item.hardware = hardware
+                    updated_items.append({'item_id': item_id, 'door_id': door_id, 'description': line_item.description})
+                except (ValueError, TypeError) as e:
+                    errors.append(f'Invalid data for item {item_id}: {str(e)}')
+                    continue
+
+        if errors:
+            return jsonify({'success': False, 'errors': errors}), 400
+
+        db.session.commit()
+
+        total_parts_cost = 0
+        total_labor_cost = 0
+        total_hardware_cost = 0
+        for door in bid.doors:
+            for item in door.line_items:
+                total_parts_cost += item.price * item.quantity
+                total_labor_cost += item.labor_hours * 47.02
+                total_hardware_cost += item.hardware
+        tax_amount = (total_parts_cost + total_hardware_cost) * 0.0875
+        bid.total_cost = total_parts_cost + total_labor_cost + total_hardware_cost + tax_amount
+        db.session.commit()
+        return jsonify({'success': True, 'updated_items': updated_items}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        LOGIN_DISABLED=True,
+        TESTING=True,
+    )
+    db.init_app(app)
+    app.register_blueprint(bids_bp, url_prefix='/api/bids')
+    app.register_blueprint(legacy_bp, url_prefix='/legacy/bids')
+    return app
+
+
+def seed_bid(item_count):
+    customer = Customer(name='Benchmark Customer')
+    db.session.add(customer)
+    db.session.flush()
+    site = Site(customer_id=customer.id, address='1 Benchmark Way')
+    db.session.add(site)
+    db.session.flush()
+    estimate = Estimate(customer_id=customer.id, site_id=site.id)
+    db.session.add(estimate)
+    db.session.flush()
+    bid = Bid(estimate_id=estimate.id, status='draft', total_cost=0.0)
+    db.session.add(bid)
+    db.session.flush()
+
+    door_count = max(1, item_count // ITEMS_PER_DOOR)
+    doors = [Door(bid_id=bid.id, door_number=number + 1) for number in range(door_count)]
+    db.session.add_all(doors)
+    db.session.flush()
+    db.session.add_all([
+        LineItem(door_id=doors[index % door_count].id, part_number=f'P{index}', description=f'Item {index}',
+                 quantity=1, price=10.0, labor_hours=1.0, hardware=2.0)
+        for index in range(item_count)
+    ])
+    db.session.commit()
+    return bid.id
+
+
+def edit_payload(bid_id, round_number):
+    doors = {}
+    for item_id, door_id in db.session.query(LineItem.id, LineItem.door_id).join(Door).filter(Door.bid_id == bid_id):
+        doors.setdefault(door_id, []).append({
+            'id': item_id,
+            'description': f'Edited {round_number}',
+            'quantity': 1 + round_number % 3,
+            'price': 10.0 + round_number,
+            'labor_hours': 1.5,
+            'hardware': 2.5,
+        })
+    return {'doors': [{'door_id': door_id, 'line_items': items} for door_id, items in doors.items()]}
+
+
+def measure(app, client, engine, url, bid_id, repeat):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    timings = []
+    counts = []
+    for round_number in range(repeat):
+        with app.app_context():
+            payload = edit_payload(bid_id, round_number)
+        statements.clear()
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            started = time.perf_counter()
+            response = client.put(url, json=payload)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        assert response.status_code == 200, response.get_json()
+        counts.append(len(statements))
+    return statistics.median(timings), statistics.median(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='line items per bid')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app(args.database_url or f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            engine = db.engine
+
+        print(f"{'line items':>10}  {'variant':<12}{'median ms':>11}{'statements':>12}")
+        for size in args.sizes:
+            with app.app_context():
+                legacy_bid = seed_bid(size)
+                new_bid = seed_bid(size)
+
+            # The old handler predates the pricing listener; measure it without one
+            event.remove(db.session, 'after_flush', pricing.refresh_priced_totals)
+            try:
+                legacy = measure(app, client, engine, f'/legacy/bids/{legacy_bid}/save-changes', legacy_bid, args.repeat)
+            finally:
+                event.listen(db.session, 'after_flush', pricing.refresh_priced_totals)
+            current = measure(app, client, engine, f'/api/bids/{new_bid}/save-changes', new_bid, args.repeat)
+
+            print(f"{size:>10}  {'row-by-row':<12}{legacy[0]:>11.1f}{legacy[1]:>12.0f}")
+            print(f"{size:>10}  {'set-based':<12}{current[0]:>11.1f}{current[1]:>12.0f}")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
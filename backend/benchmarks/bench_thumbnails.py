@@ -0,0 +1,134 @@
+# backend/benchmarks/bench_thumbnails.py
+"""
+Thumbnail latency and peak memory: previous code paths vs the shared thumbnail engine.
+
+Run from the backend directory:
+    python benchmarks/bench_thumbnails.py [--photos 12] [--width 4032 --height 3024] [--webp]
+
+A synthetic phone-sized JPEG with EXIF orientation 6 is generated, then each variant runs
+in a fresh process so ru_maxrss reflects only that variant's peak resident memory.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import resource
+import statistics
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PIL import Image, ImageOps  # noqa: E402
+from services import thumbnails  # noqa: E402
+
+
+def make_photo(path, width, height):
+    """A noisy 12MP-class JPEG tagged as rotated (EXIF orientation 6), like a portrait phone shot."""
+    noise = Image.effect_noise((width // 4, height // 4), 64).resize((width, height))
+    gradient = Image.linear_gradient('L').resize((width, height))
+    img = Image.merge('RGB', (noise, gradient, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    img.save(path, 'JPEG', quality=92, exif=exif)
+
+
+# --- Previous implementations, kept verbatim for comparison ---
+
+def legacy_generate_thumbnail(original_path, thumbnail_path, size=(300, 300)):
+    with Image.open(original_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        img.save(thumbnail_path, 'JPEG', quality=85, optimize=True, progressive=True)
+
+
+def legacy_azure_thumbnail(image_content, size=(150, 150)):
+    with Image.open(io.BytesIO(image_content)) as img:
+        if img.mode in ('RGBA', 'P'):
+            img = img.convert('RGB')
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        img.save(output, format='JPEG', quality=85, optimize=True)
+        return output.getvalue()
+
+
+def legacy_three_sizes(path, out_dir):
+    """What producing 150/300/1024 took before: one full decode per size."""
+    for size in (150, 300, 1024):
+        legacy_generate_thumbnail(path, os.path.join(out_dir, f'legacy_{size}.jpg'), (size, size))
+
+
+# --- Variants ---
+
+def run_variant(name, path, out_dir, photos, fmt, queue):
+    with open(path, 'rb') as source:
+        content = source.read()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(photos):
+        started = time.perf_counter()
+        if name == 'legacy generate_thumbnail (300)':
+            legacy_generate_thumbnail(path, os.path.join(out_dir, 'legacy_300.jpg'))
+        elif name == 'legacy azure _create_thumbnail (150)':
+            legacy_azure_thumbnail(content)
+        elif name == 'legacy 150/300/1024 (3 decodes)':
+            legacy_three_sizes(path, out_dir)
+        elif name == 'engine 300':
+            thumbnails.write(path, {300: os.path.join(out_dir, 'engine_300.jpg')})
+        elif name == 'engine 150 from bytes':
+            thumbnails.render(content, [150])
+        elif name == 'engine 150/300/1024 (1 decode)':
+            extension = thumbnails.file_extension(fmt)
+            thumbnails.write(path, {size: os.path.join(out_dir, f'engine_{size}.{extension}') for size in (150, 300, 1024)}, fmt)
+        timings.append((time.perf_counter() - started) * 1000)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((name, statistics.median(timings), min(timings), (peak - baseline) / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--photos', type=int, default=12, help='photos processed per variant')
+    parser.add_argument('--width', type=int, default=4032)
+    parser.add_argument('--height', type=int, default=3024)
+    parser.add_argument('--webp', action='store_true', help='encode the multi-size engine run as WebP')
+    args = parser.parse_args()
+
+    variants = [
+        'legacy generate_thumbnail (300)',
+        'engine 300',
+        'legacy azure _create_thumbnail (150)',
+        'engine 150 from bytes',
+        'legacy 150/300/1024 (3 decodes)',
+        'engine 150/300/1024 (1 decode)',
+    ]
+    fmt = 'WEBP' if args.webp else 'JPEG'
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, 'photo.jpg')
+        make_photo(path, args.width, args.height)
+        print(f"Source: {args.width}x{args.height} JPEG, {os.path.getsize(path) / 1e6:.1f} MB, "
+              f"{args.photos} photos per variant, multi-size format {thumbnails.output_format(fmt)}\n")
+        print(f"{'variant':<40}{'median ms':>12}{'best ms':>10}{'peak RSS +MB':>15}")
+
+        context = multiprocessing.get_context('spawn')
+        for name in variants:
+            queue = context.Queue()
+            process = context.Process(target=run_variant, args=(name, path, out_dir, args.photos, fmt, queue))
+            process.start()
+            result = queue.get()
+            process.join()
+            print(f"{result[0]:<40}{result[1]:>12.1f}{result[2]:>10.1f}{result[3]:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+# backend/commands.py
+"""
+Maintenance commands for the Flask CLI.
+Run from the backend directory, e.g.: flask --app app rebuild-job-progress
+"""
+
+import click
+from models import db
+
+
+def register_commands(app):
+    """Attach the maintenance commands to the Flask application."""
+
+    @app.cli.command('rebuild-job-progress')
+    @click.option('--job-id', 'job_ids', multiple=True, type=int,
+                  help='Only reconcile these jobs (repeatable). Defaults to every job.')
+    def rebuild_job_progress_command(job_ids):
+        """Rebuild the job progress rollup from signatures, time tracking and line item completions."""
+        from services.progress_service import rebuild_job_progress
+
+        rebuilt = rebuild_job_progress(list(job_ids) or None)
+        db.session.commit()
+        click.echo(f"✓ Rebuilt progress rollup for {len(rebuilt)} jobs")
+
+    @app.cli.command('rebuild-pricing')
+    @click.option('--bid-id', 'bid_ids', multiple=True, type=int,
+                  help='Only reprice these bids (repeatable). Defaults to every bid.')
+    def rebuild_pricing_command(bid_ids):
+        """Recompute the stored door and bid totals from the line items."""
+        from services.pricing import rebuild_pricing
+
+        repriced = rebuild_pricing(list(bid_ids) or None)
+        db.session.commit()
+        click.echo(f"✓ Repriced {repriced} bids")
+
+    @app.cli.command('import-price-book')
+    @click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+    def import_price_book_command(csv_path):
+        """Add or update price book entries from a CSV with part_number and price columns (description and supplier optional)."""
+        import csv
+        from services.price_book import parse_entries, upsert_entries
+
+        with open(csv_path, newline='', encoding='utf-8-sig') as price_list:
+            entries, errors = parse_entries(csv.DictReader(price_list))
+        if errors:
+            for error in errors:
+                click.echo(f"❌ {error}")
+            raise click.ClickException('Nothing was imported')
+        created, updated = upsert_entries(entries)
+        db.session.commit()
+        click.echo(f"✓ Price book: {created} parts added, {updated} updated")
+
+    @app.cli.command('reprice-open-bids')
+    @click.option('--apply', 'apply_changes', is_flag=True,
+                  help='Write the new prices. Without it only the diff is printed.')
+    @click.option('--part-number', 'part_numbers', multiple=True,
+                  help='Only reprice these parts (repeatable). Defaults to the whole price book.')
+    def reprice_open_bids_command(apply_changes, part_numbers):
+        """Update line item prices on draft and pending bids from the price book."""
+        from services.price_book import reprice_open_bids
+
+        report = reprice_open_bids(dry_run=not apply_changes, part_numbers=list(part_numbers) or None)
+        for bid in report['bids']:
+            click.echo(f"Bid {bid['bid_id']}: {len(bid['line_items'])} line items, "
+                       f"${bid['old_total']:.2f} -> ${bid['new_total']:.2f} ({bid['change']:+.2f})")
+        if apply_changes:
+            db.session.commit()
+            click.echo(f"✓ Repriced {report['line_item_count']} line items on {report['bid_count']} bids")
+        else:
+            click.echo(f"Dry run: {report['line_item_count']} line items on {report['bid_count']} bids would change "
+                       f"({report['total_change']:+.2f}); rerun with --apply to write them")
+
+    @app.cli.command('rebuild-part-catalog')
+    def rebuild_part_catalog_command():
+        """Recompute the parts catalog (typeahead) from all line items and the price book."""
+        from services.part_catalog import rebuild_catalog
+
+        count = rebuild_catalog()
+        db.session.commit()
+        click.echo(f"✓ Parts catalog holds {count} parts")
+
+    @app.cli.command('import-site-coordinates')
+    @click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+    def import_site_coordinates_command(csv_path):
+        """Cache site coordinates for route ordering from a CSV with site_id, latitude and longitude columns."""
+        import csv
+        from sqlalchemy import update, bindparam
+        from models import Site
+        from services.route_optimizer import parse_point
+
+        rows = []
+        errors = []
+        with open(csv_path, newline='', encoding='utf-8-sig') as coordinates:
+            for number, row in enumerate(csv.DictReader(coordinates), start=1):
+                try:
+                    point = parse_point(row.get('latitude'), row.get('longitude'))
+                    rows.append({'_id': int(row.get('site_id')), 'latitude': point[0] if point else None,
+                                 'longitude': point[1] if point else None})
+                except (TypeError, ValueError) as e:
+                    errors.append(f"Row {number}: {e}")
+        if errors:
+            for error in errors:
+                click.echo(f"❌ {error}")
+            raise click.ClickException('Nothing was imported')
+        if rows:
+            table = Site.__table__
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('_id')).values(
+                    latitude=bindparam('latitude'), longitude=bindparam('longitude')
+                ),
+                rows
+            )
+        db.session.commit()
+        click.echo(f"✓ Coordinates cached for {len(rows)} sites")
+
+    @app.cli.command('prune-sync-changes')
+    @click.option('--days', type=int, default=None,
+                  help='Keep this many days of changes. Defaults to SYNC_CHANGE_RETENTION_DAYS.')
+    def prune_sync_changes_command(days):
+        """Drop mobile sync change log rows older than the retention window."""
+        from services.sync_service import prune_sync_changes
+
+        removed = prune_sync_changes(days or app.config.get('SYNC_CHANGE_RETENTION_DAYS', 30))
+        db.session.commit()
+        click.echo(f"✓ Pruned {removed} sync changes")
+
+    @app.cli.command('expire-upload-sessions')
+    @click.option('--hours', type=int, default=None,
+                  help='Abort sessions idle this long. Defaults to UPLOAD_SESSION_MAX_AGE_HOURS.')
+    def expire_upload_sessions_command(hours):
+        """Abort resumable uploads that were never finished and delete their staging files."""
+        from services.upload_service import expire_stale_sessions
+
+        expired = expire_stale_sessions(
+            hours or app.config.get('UPLOAD_SESSION_MAX_AGE_HOURS', 48),
+            app.config['UPLOAD_FOLDER']
+        )
+        db.session.commit()
+        click.echo(f"✓ Expired {expired} upload sessions")
+
+    @app.cli.command('gc-media-blobs')
+    @click.option('--grace-hours', type=int, default=None,
+                  help='Keep blobs released more recently than this. Defaults to MEDIA_BLOB_GC_GRACE_HOURS.')
+    def gc_media_blobs_command(grace_hours):
+        """Delete stored media files (and their renditions) no DoorMedia references any more."""
+        from services.media_store import collect_garbage
+
+        removed = collect_garbage(
+            app.config['UPLOAD_FOLDER'],
+            grace_hours if grace_hours is not None else app.config.get('MEDIA_BLOB_GC_GRACE_HOURS', 24)
+        )
+        click.echo(f"✓ Removed {removed} unreferenced media blobs")
+
+    @app.cli.command('media-worker')
+    @click.option('--processes', type=int, default=None,
+                  help='Size of the processing pool. Defaults to MEDIA_WORKER_PROCESSES or one per CPU.')
+    @click.option('--once', is_flag=True, help='Exit when the queue is empty instead of polling.')
+    def media_worker_command(processes, once):
+        """Generate thumbnails, previews and metadata for uploaded door media."""
+        from services.media_queue import run_worker
+
+        run_worker(app, processes=processes, once=once)
+
+    @app.cli.command('pdf-worker')
+    @click.option('--processes', type=int, default=None,
+                  help='Size of the rendering pool. Defaults to PDF_WORKER_PROCESSES or one per CPU.')
+    @click.option('--once', is_flag=True, help='Exit when the queue is empty instead of polling.')
+    def pdf_worker_command(processes, once):
+        """Render queued bid reports, proposals and batch ZIPs."""
+        from services.pdf_jobs import run_worker
+
+        run_worker(app, processes=processes, once=once)
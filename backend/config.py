@@ -63,6 +63,58 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
     
+    # Resumable media uploads
+    UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024  # must stay below MAX_CONTENT_LENGTH
+    UPLOAD_SESSION_MAX_AGE_HOURS = int(os.environ.get('UPLOAD_SESSION_MAX_AGE_HOURS', 48))
+    MEDIA_BLOB_GC_GRACE_HOURS = int(os.environ.get('MEDIA_BLOB_GC_GRACE_HOURS', 24))  # flask gc-media-blobs
+    
+    # Thumbnails: every size is rendered from one reduced-size decode
+    THUMBNAIL_SIZES = (150, 300, 1024)
+    MEDIA_THUMBNAIL_SIZE = 300  # the size stored as DoorMedia.thumbnail_path; the largest is the preview
+    THUMBNAIL_FORMAT = os.environ.get('THUMBNAIL_FORMAT', 'JPEG')  # or WEBP
+    
+    # Media post-processing worker (flask media-worker)
+    MEDIA_WORKER_PROCESSES = int(os.environ.get('MEDIA_WORKER_PROCESSES', 0)) or None  # None = one per CPU
+    MEDIA_WORKER_POLL_SECONDS = int(os.environ.get('MEDIA_WORKER_POLL_SECONDS', 5))
+    MEDIA_TASK_TIMEOUT_MINUTES = int(os.environ.get('MEDIA_TASK_TIMEOUT_MINUTES', 10))
+    
+    # Media serving: files are immutable once written. Set MEDIA_SENDFILE_BACKEND to 'x-accel'
+    # (nginx, internal location MEDIA_ACCEL_PREFIX aliased to UPLOAD_FOLDER) or 'x-sendfile'
+    # to let the web server stream bodies and byte ranges
+    MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', 31536000))
+    MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND')
+    MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+    
+    # Rendered bid reports and proposals, keyed by a fingerprint of their data (least recently used evicted)
+    PDF_CACHE_FOLDER = os.environ.get('PDF_CACHE_FOLDER', os.path.join(UPLOAD_FOLDER, '_pdf_cache'))
+    PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    
+    # Background PDF rendering (flask pdf-worker)
+    PDF_WORKER_PROCESSES = int(os.environ.get('PDF_WORKER_PROCESSES', 0)) or None  # None = one per CPU
+    PDF_WORKER_POLL_SECONDS = int(os.environ.get('PDF_WORKER_POLL_SECONDS', 2))
+    PDF_JOB_TIMEOUT_MINUTES = int(os.environ.get('PDF_JOB_TIMEOUT_MINUTES', 15))
+    PDF_BATCH_MAX_BIDS = int(os.environ.get('PDF_BATCH_MAX_BIDS', 500))
+    
+    # Part typeahead: each worker's in-memory index picks up catalog changes this often
+    PART_CATALOG_REFRESH_SECONDS = int(os.environ.get('PART_CATALOG_REFRESH_SECONDS', 10))
+    
+    # Dispatch calendar: longest range GET /api/dispatch?start=&end= serves in one request
+    DISPATCH_RANGE_MAX_DAYS = int(os.environ.get('DISPATCH_RANGE_MAX_DAYS', 62))
+    # Where trucks start the day, for route ordering ("latitude,longitude"); unset = start at the first job
+    DISPATCH_DEPOT = os.environ.get('DISPATCH_DEPOT')
+    # Auto-assign: hours a truck works per day, hours assumed for a job without an estimate,
+    # and home regions of trucks ("truck1:NE,truck2:SW"; others take the region of their jobs)
+    DISPATCH_TRUCK_CAPACITY_HOURS = float(os.environ.get('DISPATCH_TRUCK_CAPACITY_HOURS', 8.0))
+    DISPATCH_DEFAULT_JOB_HOURS = float(os.environ.get('DISPATCH_DEFAULT_JOB_HOURS', 2.0))
+    DISPATCH_TRUCK_REGIONS = os.environ.get('DISPATCH_TRUCK_REGIONS')
+    
+    # Mobile delta sync
+    SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', 500))
+    SYNC_CHANGE_RETENTION_DAYS = int(os.environ.get('SYNC_CHANGE_RETENTION_DAYS', 30))
+    # Change log rows written this long before a sync read are read again by the next one, in
+    # case their transaction committed after it; must exceed the longest write transaction
+    SYNC_CURSOR_OVERLAP_SECONDS = int(os.environ.get('SYNC_CURSOR_OVERLAP_SECONDS', 120))
+    
     # Security and Performance
     WTF_CSRF_ENABLED = False
     RATELIMIT_STORAGE_URL = "memory://"
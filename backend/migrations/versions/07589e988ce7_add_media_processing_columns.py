@@ -0,0 +1,33 @@
+"""Add media processing columns to door_media
+
+Revision ID: 07589e988ce7
+Revises: f4fb461f3e9f
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '07589e988ce7'
+down_revision = 'f4fb461f3e9f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows uploaded before the worker existed keep processing_status NULL and are served as-is
+    with op.batch_alter_table('door_media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('preview_path', sa.String(length=512), nullable=True))
+        batch_op.add_column(sa.Column('processing_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('processing_error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('media_metadata', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('door_media', schema=None) as batch_op:
+        batch_op.drop_column('media_metadata')
+        batch_op.drop_column('processing_error')
+        batch_op.drop_column('processing_status')
+        batch_op.drop_column('preview_path')
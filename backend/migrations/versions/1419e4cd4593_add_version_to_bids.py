@@ -0,0 +1,27 @@
+"""Add version to bids
+
+Revision ID: 1419e4cd4593
+Revises: 6b229588baf4
+Create Date: 2026-10-16 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1419e4cd4593'
+down_revision = '6b229588baf4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL reads as version 0 and the first bump makes it 1 (coalesce in services.bid_versions)
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,38 @@
+"""Add indexes for price book repricing
+
+Revision ID: 5adf5bb20042
+Revises: 1419e4cd4593
+Create Date: 2026-10-16 09:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5adf5bb20042'
+down_revision = '1419e4cd4593'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.create_index('ix_bids_status', ['status'], unique=False)
+
+    with op.batch_alter_table('doors', schema=None) as batch_op:
+        batch_op.create_index('ix_doors_bid_id', ['bid_id'], unique=False)
+
+    with op.batch_alter_table('line_items', schema=None) as batch_op:
+        batch_op.create_index('ix_line_items_door_id', ['door_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('line_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_line_items_door_id')
+
+    with op.batch_alter_table('doors', schema=None) as batch_op:
+        batch_op.drop_index('ix_doors_bid_id')
+
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.drop_index('ix_bids_status')
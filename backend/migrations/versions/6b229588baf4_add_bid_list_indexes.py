@@ -0,0 +1,28 @@
+"""Add bid list keyset indexes
+
+Revision ID: 6b229588baf4
+Revises: b8a5be4d63c3
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b229588baf4'
+down_revision = 'b8a5be4d63c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.create_index('ix_bids_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_bids_estimate_id', ['estimate_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.drop_index('ix_bids_estimate_id')
+        batch_op.drop_index('ix_bids_created_at_id')
@@ -0,0 +1,26 @@
+"""Add jobs scheduled_date index for dispatch ranges
+
+Revision ID: 80165c175b0e
+Revises: 5adf5bb20042
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '80165c175b0e'
+down_revision = '5adf5bb20042'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_jobs_scheduled_date_order', ['scheduled_date', 'job_order'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_scheduled_date_order')
@@ -0,0 +1,44 @@
+"""Add stored pricing totals to bids and doors
+
+Revision ID: b8a5be4d63c3
+Revises: 07589e988ce7
+Create Date: 2026-10-16 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8a5be4d63c3'
+down_revision = '07589e988ce7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Left NULL on existing rows: services.pricing prices unpriced doors and bids on first
+    # read, or run `flask --app app rebuild-pricing` to fill them all at once
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_parts_cost', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('total_labor_cost', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('total_hardware_cost', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('tax_amount', sa.Float(), nullable=True))
+
+    with op.batch_alter_table('doors', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('parts_cost', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('labor_cost', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('hardware_cost', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('doors', schema=None) as batch_op:
+        batch_op.drop_column('hardware_cost')
+        batch_op.drop_column('labor_cost')
+        batch_op.drop_column('parts_cost')
+
+    with op.batch_alter_table('bids', schema=None) as batch_op:
+        batch_op.drop_column('tax_amount')
+        batch_op.drop_column('total_hardware_cost')
+        batch_op.drop_column('total_labor_cost')
+        batch_op.drop_column('total_parts_cost')
@@ -0,0 +1,26 @@
+"""Add content_hash to door_media
+
+Revision ID: f4fb461f3e9f
+Revises: 552f72e64de3
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4fb461f3e9f'
+down_revision = '552f72e64de3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('door_media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('door_media', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
@@ -11,15 +11,18 @@ from .customer import Customer, Site
 
 # 2. Core Business Logic Models
 from .estimate import Estimate
-from .bid import Bid
+from .bid import Bid, PdfJob
 from .door import Door
 from .line_item import LineItem
+from .price_book import PriceBookEntry
+from .part_catalog import CatalogPart
 from .job import Job
 from .audio import AudioRecording  # Correctly imported from audio.py
 
 # 3. Dependent and Association Models
-from .door_media import DoorMedia
-from .job import JobTimeTracking, JobSignature, DispatchAssignment, MobileJobLineItem, CompletedDoor
+from .door_media import DoorMedia, UploadSession, MediaTask, MediaBlob
+from .job import JobTimeTracking, JobSignature, DispatchAssignment, MobileJobLineItem, CompletedDoor, JobProgress
+from .sync import SyncChange, MobileActionReceipt
 
 # The __all__ list is good practice for managing the namespace.
 __all__ = [
@@ -30,13 +33,22 @@ __all__ = [
     'Estimate',
     'AudioRecording', # Added to the list
     'Bid',
+    'PdfJob',
     'Door',
     'LineItem',
+    'PriceBookEntry',
+    'CatalogPart',
     'Job',
     'JobTimeTracking',
     'JobSignature',
     'DispatchAssignment',
     'DoorMedia',
+    'UploadSession',
+    'MediaTask',
+    'MediaBlob',
     'MobileJobLineItem',
     'CompletedDoor',
+    'JobProgress',
+    'SyncChange',
+    'MobileActionReceipt',
 ]
\ No newline at end of file
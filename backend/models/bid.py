@@ -10,8 +10,47 @@ class Bid(db.Model):
     estimate_id = db.Column(db.Integer, db.ForeignKey('estimates.id'), nullable=False)
     status = db.Column(db.String(20), default='draft')
     total_cost = db.Column(db.Float, default=0.0)
+    # Stored roll-up of the doors' totals, maintained by services/pricing.py
+    total_parts_cost = db.Column(db.Float, default=0.0)
+    total_labor_cost = db.Column(db.Float, default=0.0)
+    total_hardware_cost = db.Column(db.Float, default=0.0)
+    tax_amount = db.Column(db.Float, default=0.0)
+    # Bumped whenever a door or line item of the bid changes, see services/bid_versions.py
+    version = db.Column(db.Integer, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     doors = db.relationship('Door', backref='bid', lazy='dynamic', cascade="all, delete-orphan")
-    estimate = db.relationship('Estimate', backref=db.backref('bid', uselist=False))
\ No newline at end of file
+    estimate = db.relationship('Estimate', backref=db.backref('bid', uselist=False))
+
+    __table_args__ = (
+        # Keyset pagination of the bid list (newest first)
+        db.Index('ix_bids_created_at_id', 'created_at', 'id'),
+        db.Index('ix_bids_estimate_id', 'estimate_id'),
+        # Open bids repriced from the price book
+        db.Index('ix_bids_status', 'status'),
+    )
+
+class PdfJob(db.Model):
+    """
+    A queued report or proposal render for one bid, or a batch of bids delivered as one ZIP.
+    Claimed and run by the `flask pdf-worker` process pool; web requests only poll it.
+    """
+    __tablename__ = 'pdf_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # report, proposal
+    bid_ids = db.Column(db.Text, nullable=False)  # JSON list
+    batch = db.Column(db.Boolean, default=False, nullable=False)
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, ready, failed
+    result_path = db.Column(db.String(500), nullable=True)  # relative to PDF_CACHE_FOLDER
+    last_error = db.Column(db.Text, nullable=True)
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_pdf_jobs_status_id', 'status', 'id'),
+    )
@@ -29,5 +29,8 @@ class Site(db.Model):
     phone = db.Column(db.String(20))
     email = db.Column(db.String(100))
     lockbox_location = db.Column(db.String(255))
+    # Cached coordinates of the address for route ordering; never looked up at request time
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -19,8 +19,17 @@ class Door(db.Model):
     dimension_unit = db.Column(db.String(10), nullable=True)
     labor_description = db.Column(db.Text, nullable=True)
     notes = db.Column(db.Text, nullable=True)
+
+    # Stored totals of the door's line items, maintained by services/pricing.py
+    parts_cost = db.Column(db.Float, default=0.0)
+    labor_cost = db.Column(db.Float, default=0.0)
+    hardware_cost = db.Column(db.Float, default=0.0)
     
     # Relationships
     line_items = db.relationship('LineItem', backref='door', lazy='dynamic', cascade="all, delete-orphan")
     media = db.relationship('DoorMedia', backref='door', lazy='dynamic', cascade="all, delete-orphan")
-    signatures = db.relationship('JobSignature', backref='door', lazy='dynamic', cascade="all, delete-orphan")
\ No newline at end of file
+    signatures = db.relationship('JobSignature', backref='door', lazy='dynamic', cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.Index('ix_doors_bid_id', 'bid_id'),
+    )
\ No newline at end of file
@@ -1,8 +1,12 @@
 # backend/models/door_media.py
 
 from datetime import datetime
+from sqlalchemy import event, update
 from .base import db
 
+# Content-addressed files live under UPLOAD_FOLDER/blobs/<aa>/<bb>/<sha256>.<ext>
+BLOB_SUBFOLDER = 'blobs'
+
 class DoorMedia(db.Model):
     __tablename__ = 'door_media' # Explicit table name
 
@@ -13,8 +17,99 @@ class DoorMedia(db.Model):
     file_path = db.Column(db.String(512), nullable=False)
     thumbnail_path = db.Column(db.String(512), nullable=True) # Essential for thumbnails
     file_size = db.Column(db.Integer, nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True)  # sha256 hex, set by resumable uploads
+    preview_path = db.Column(db.String(512), nullable=True)  # screen-sized rendition / video poster
+    processing_status = db.Column(db.String(20), nullable=True)  # pending, processing, ready, failed
+    processing_error = db.Column(db.Text, nullable=True)
+    media_metadata = db.Column(db.Text, nullable=True)  # JSON: dimensions, duration, codec, taken_at...
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'))
 
     # Relationships
-    uploader = db.relationship('User')
\ No newline at end of file
+    uploader = db.relationship('User')
+
+
+class MediaBlob(db.Model):
+    """
+    One stored file per distinct content (sha256). DoorMedia rows whose file_path points
+    into the blob store share it; ref_count is kept in step by the flush listener below and
+    unreferenced blobs are removed by `flask gc-media-blobs`.
+    """
+    __tablename__ = 'media_blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    relative_path = db.Column(db.String(512), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UploadSession(db.Model):
+    """
+    A resumable upload in progress. Chunks are appended to a staging file until
+    received_bytes reaches total_size, then the session is finalized into a DoorMedia row.
+    """
+    __tablename__ = 'upload_sessions'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, handed to the client
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    door_id = db.Column(db.Integer, db.ForeignKey('doors.id'), nullable=False)
+    media_type = db.Column(db.String(10), nullable=False)  # 'photo', 'video'
+    file_extension = db.Column(db.String(10), nullable=False)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    received_bytes = db.Column(db.BigInteger, default=0, nullable=False)
+    status = db.Column(db.String(20), default='open', nullable=False)  # open, completed, aborted
+    media_id = db.Column(db.Integer, db.ForeignKey('door_media.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+
+class MediaTask(db.Model):
+    """
+    Queued post-processing work for an uploaded file (thumbnail, preview, metadata).
+    Claimed and run by the `flask media-worker` process pool, never by web requests.
+    """
+    __tablename__ = 'media_tasks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    media_id = db.Column(db.Integer, db.ForeignKey('door_media.id', ondelete='CASCADE'), nullable=False, index=True)
+    task_type = db.Column(db.String(30), default='process_media', nullable=False)
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, done, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_media_tasks_status_available', 'status', 'available_at'),
+    )
+
+
+@event.listens_for(db.session, 'after_flush')
+def count_blob_references(session, flush_context):
+    """Adjust MediaBlob.ref_count for DoorMedia rows added or deleted in this flush."""
+    deltas = {}
+    for obj in session.new:
+        if isinstance(obj, DoorMedia) and obj.content_hash and obj.file_path.startswith(BLOB_SUBFOLDER + '/'):
+            deltas[obj.content_hash] = deltas.get(obj.content_hash, 0) + 1
+    for obj in session.deleted:
+        if isinstance(obj, DoorMedia) and obj.content_hash and obj.file_path.startswith(BLOB_SUBFOLDER + '/'):
+            deltas[obj.content_hash] = deltas.get(obj.content_hash, 0) - 1
+    if not deltas:
+        return
+
+    connection = session.connection()
+    now = datetime.utcnow()
+    for sha256, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(MediaBlob)
+                .where(MediaBlob.sha256 == sha256)
+                .values(ref_count=MediaBlob.ref_count + delta, updated_at=now)
+            )
@@ -32,6 +32,12 @@ class Job(db.Model):
     signatures = db.relationship('JobSignature', backref='job', lazy='dynamic', cascade="all, delete-orphan")
     time_tracking = db.relationship('JobTimeTracking', backref='job', lazy='dynamic', cascade="all, delete-orphan")
     mobile_line_items = db.relationship('MobileJobLineItem', backref='job', lazy='dynamic', cascade="all, delete-orphan")
+    progress = db.relationship('JobProgress', backref='job', uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Dispatch boards and calendars read jobs by date range, in board order
+        db.Index('ix_jobs_scheduled_date_order', 'scheduled_date', 'job_order'),
+    )
 
 # =========================================================================
 # === ADD THIS CLASS DEFINITION BACK INTO THE FILE ===
@@ -110,4 +116,22 @@ class MobileJobLineItem(db.Model):
     completed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     notes = db.Column(db.Text, nullable=True)
     
-    user = db.relationship('User', backref=db.backref('completed_items', lazy=True))
\ No newline at end of file
+    user = db.relationship('User', backref=db.backref('completed_items', lazy=True))
+
+
+class JobProgress(db.Model):
+    """
+    Per-job progress rollup maintained in the same transaction as the mobile
+    actions that change it, so mobile reads are a single-row lookup.
+    Rebuild from the source tables with `flask rebuild-job-progress`.
+    """
+    __tablename__ = 'job_progress'
+
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), primary_key=True)
+    total_doors = db.Column(db.Integer, default=0, nullable=False)
+    completed_doors = db.Column(db.Integer, default=0, nullable=False)
+    completed_line_items = db.Column(db.Integer, default=0, nullable=False)
+    accumulated_minutes = db.Column(db.Integer, default=0, nullable=False)  # Closed time segments only
+    active_since = db.Column(db.DateTime, nullable=True)  # Earliest start of the currently active sessions
+    mobile_status = db.Column(db.String(20), default='not_started', nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
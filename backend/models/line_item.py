@@ -15,4 +15,8 @@ class LineItem(db.Model):
     hardware = db.Column(db.Float, default=0.0)
 
     # Relationship back to mobile completion status
-    mobile_completions = db.relationship('MobileJobLineItem', backref='line_item', lazy='dynamic')
\ No newline at end of file
+    mobile_completions = db.relationship('MobileJobLineItem', backref='line_item', lazy='dynamic')
+
+    __table_args__ = (
+        db.Index('ix_line_items_door_id', 'door_id'),
+    )
\ No newline at end of file
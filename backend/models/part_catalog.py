@@ -0,0 +1,38 @@
+# backend/models/part_catalog.py
+
+from datetime import datetime
+from sqlalchemy import event, DDL
+from .base import db
+
+class CatalogPart(db.Model):
+    """
+    One known part for line item entry: every part number typed on a line item or imported
+    into the price book. Kept up to date by services/part_catalog.py and served as typeahead
+    suggestions from an in-memory index that reloads rows by updated_at.
+    """
+    __tablename__ = 'parts_catalog'
+
+    id = db.Column(db.Integer, primary_key=True)
+    part_number = db.Column(db.String(50), nullable=False, unique=True)
+    description = db.Column(db.String(200))
+    price = db.Column(db.Float)  # price book price, else the most recent line item price
+    use_count = db.Column(db.Integer, default=0, nullable=False)  # line items using the part at the last rebuild
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        # PostgreSQL only (SQLite has the unique index): LIKE 'prefix%' whatever the collation
+        db.Index('ix_parts_catalog_part_number_prefix', 'part_number',
+                 postgresql_ops={'part_number': 'text_pattern_ops'}).ddl_if(dialect='postgresql'),
+        # Substring and fuzzy search (ILIKE '%term%', similarity) for the database fallback
+        db.Index('ix_parts_catalog_part_number_trgm', 'part_number',
+                 postgresql_using='gin', postgresql_ops={'part_number': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_parts_catalog_description_trgm', 'description',
+                 postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
+
+# The trigram operator classes come from pg_trgm
+event.listen(
+    CatalogPart.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
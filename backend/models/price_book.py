@@ -0,0 +1,18 @@
+# backend/models/price_book.py
+
+from datetime import datetime
+from .base import db
+
+class PriceBookEntry(db.Model):
+    """
+    Current supplier price of a part. Open bids are repriced from this table by
+    services/price_book.py, matching LineItem.part_number.
+    """
+    __tablename__ = 'price_book'
+
+    id = db.Column(db.Integer, primary_key=True)
+    part_number = db.Column(db.String(50), nullable=False, unique=True)
+    description = db.Column(db.String(200))
+    price = db.Column(db.Float, nullable=False)
+    supplier = db.Column(db.String(100))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
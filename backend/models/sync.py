@@ -0,0 +1,206 @@
+# backend/models/sync.py
+
+from datetime import datetime
+from sqlalchemy import event, select, inspect
+from .base import db
+from .door import Door
+from .line_item import LineItem
+from .door_media import DoorMedia
+from .job import Job, JobSignature, JobTimeTracking, MobileJobLineItem
+
+
+class SyncChange(db.Model):
+    """
+    Append-only change log read by the mobile delta sync endpoint.
+
+    Every flush that touches a job or something hanging off it writes one row per changed
+    entity, tagged with the truck the job is assigned to. The autoincrement id is the sync
+    sequence: a device polls with the last id it has seen and reads the rows after it, plus
+    recent rows below it that may have committed late (see sync_service.read_changes).
+    """
+    __tablename__ = 'sync_changes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    truck = db.Column(db.String(100), nullable=False)
+    job_id = db.Column(db.Integer, nullable=False)
+    door_id = db.Column(db.Integer, nullable=True)
+    entity_type = db.Column(db.String(30), nullable=False)  # job, door, line_item, line_item_completion, signature, media, time_tracking
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # upsert, delete, assign
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('ix_sync_changes_truck_id', 'truck', 'id'),
+    )
+
+
+class MobileActionReceipt(db.Model):
+    """
+    Outcome of an offline action replayed through the batch endpoint, keyed by the
+    idempotency key the device generated when it queued the action. A replay of the same
+    key returns the stored response instead of applying the action again.
+    """
+    __tablename__ = 'mobile_action_receipts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    idempotency_key = db.Column(db.String(100), nullable=False)
+    action_type = db.Column(db.String(30), nullable=False)
+    status_code = db.Column(db.Integer, nullable=False)
+    response = db.Column(db.Text, nullable=False)  # JSON body returned for the action
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_mobile_action_receipt_key'),
+    )
+
+
+def _changed_objects(session):
+    """Yield (obj, operation) for every object written by the current flush."""
+    for obj in session.new:
+        yield obj, 'upsert'
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            yield obj, 'upsert'
+    for obj in session.deleted:
+        yield obj, 'delete'
+
+
+@event.listens_for(db.session, 'after_flush')
+def record_sync_changes(session, flush_context):
+    """
+    Translate the flushed objects into sync_changes rows.
+
+    Jobs are resolved directly, doors through their bid and line items through their door,
+    with one lookup query per kind for the whole flush. Changes on jobs without a truck
+    assignment are not recorded since no device can ask for them.
+    """
+    now = datetime.utcnow()
+    entries = []        # (entity_type, entity_id, operation, job_id, door_id)
+    job_entries = []    # (entity_id, operation, truck) for Job rows themselves
+    door_bids = {}
+    line_item_doors = {}
+
+    for obj, operation in _changed_objects(session):
+        if isinstance(obj, Job):
+            if operation == 'delete':
+                job_entries.append((obj.id, 'delete', obj.truck_assignment))
+                continue
+            history = inspect(obj).attrs.truck_assignment.history
+            previous_truck = history.deleted[0] if history.deleted else None
+            if previous_truck and previous_truck != obj.truck_assignment:
+                job_entries.append((obj.id, 'delete', previous_truck))
+            # A job new to a truck, or shown again after devices dropped it, is sent in full;
+            # other job edits only refresh the job row
+            assigned = obj in session.new or (history.added and history.added[0] != previous_truck)
+            shown = _was_shown(obj)
+            job_entries.append((obj.id, 'assign' if assigned or shown else 'upsert', obj.truck_assignment))
+        elif isinstance(obj, Door):
+            door_bids[obj.id] = obj.bid_id
+            entries.append(('door', obj.id, operation, None, obj.id))
+        elif isinstance(obj, LineItem):
+            line_item_doors[obj.id] = obj.door_id
+            entries.append(('line_item', obj.id, operation, None, obj.door_id))
+        elif isinstance(obj, MobileJobLineItem):
+            entries.append(('line_item_completion', obj.id, operation, obj.job_id, obj.line_item_id))
+        elif isinstance(obj, JobSignature):
+            entries.append(('signature', obj.id, operation, obj.job_id, obj.door_id))
+        elif isinstance(obj, DoorMedia):
+            entries.append(('media', obj.id, operation, obj.job_id, obj.door_id))
+        elif isinstance(obj, JobTimeTracking):
+            entries.append(('time_tracking', obj.id, operation, obj.job_id, None))
+
+    _write_changes(session, entries, job_entries, door_bids, line_item_doors, now)
+
+
+def record_bulk_changes(session, entries):
+    """
+    Log doors and line items written with Core or bulk statements, which never reach the
+    flush listener. `entries` are (entity_type, entity_id, operation, door_id) tuples.
+    """
+    _write_changes(session, [
+        (entity_type, entity_id, operation, None, door_id)
+        for entity_type, entity_id, operation, door_id in entries
+    ], [], {}, {}, datetime.utcnow())
+
+
+def _was_shown(job):
+    """True when this flush makes a hidden job visible."""
+    history = inspect(job).attrs.is_visible.history
+    return bool(history.added and history.added[0] and history.deleted and not history.deleted[0])
+
+
+def record_bulk_job_changes(session, changes):
+    """
+    Log jobs updated with Core or bulk statements. `changes` are (job_id, previous_truck, truck,
+    shown) tuples; as in the flush listener, a job moved off a truck is deleted from that
+    truck's devices, and a job new to a truck or `shown` again after being hidden is sent in full.
+    """
+    job_entries = []
+    for job_id, previous_truck, truck, shown in changes:
+        if previous_truck and previous_truck != truck:
+            job_entries.append((job_id, 'delete', previous_truck))
+        job_entries.append((job_id, 'assign' if truck != previous_truck or shown else 'upsert', truck))
+    _write_changes(session, [], job_entries, {}, {}, datetime.utcnow())
+
+
+def _write_changes(session, entries, job_entries, door_bids, line_item_doors, now):
+    """Resolve each entry to the jobs (and their trucks) it belongs to and insert the rows."""
+    if not entries and not job_entries:
+        return
+
+    connection = session.connection()
+
+    # Completions point at a line item, not a door; resolve the door through the line item
+    completion_items = {door_id for entity_type, _, _, _, door_id in entries if entity_type == 'line_item_completion'}
+    missing_items = completion_items - set(line_item_doors)
+    if missing_items:
+        line_item_doors.update(connection.execute(
+            select(LineItem.id, LineItem.door_id).where(LineItem.id.in_(missing_items))
+        ).all())
+    entries = [
+        (entity_type, entity_id, operation, job_id,
+         line_item_doors.get(door_id) if entity_type == 'line_item_completion' else door_id)
+        for entity_type, entity_id, operation, job_id, door_id in entries
+    ]
+
+    # Doors and line items belong to a bid; find the bid of every door involved
+    missing_doors = {door_id for entity_type, _, _, job_id, door_id in entries
+                     if job_id is None and door_id is not None} - set(door_bids)
+    if missing_doors:
+        door_bids.update(connection.execute(
+            select(Door.id, Door.bid_id).where(Door.id.in_(missing_doors))
+        ).all())
+
+    job_ids = {job_id for _, _, _, job_id, _ in entries if job_id is not None}
+    bid_ids = {door_bids.get(door_id) for _, _, _, job_id, door_id in entries if job_id is None} - {None}
+    trucks = {}
+    jobs_by_bid = {}
+    if job_ids or bid_ids:
+        conditions = []
+        if job_ids:
+            conditions.append(Job.id.in_(job_ids))
+        if bid_ids:
+            conditions.append(Job.bid_id.in_(bid_ids))
+        for job_id, bid_id, truck in connection.execute(
+            select(Job.id, Job.bid_id, Job.truck_assignment).where(db.or_(*conditions))
+        ):
+            trucks[job_id] = truck
+            jobs_by_bid.setdefault(bid_id, []).append(job_id)
+
+    rows = [
+        {'truck': truck, 'job_id': job_id, 'door_id': None, 'entity_type': 'job',
+         'entity_id': job_id, 'operation': operation, 'changed_at': now}
+        for job_id, operation, truck in job_entries if truck
+    ]
+    for entity_type, entity_id, operation, job_id, door_id in entries:
+        target_jobs = [job_id] if job_id is not None else jobs_by_bid.get(door_bids.get(door_id), [])
+        for target_job_id in target_jobs:
+            truck = trucks.get(target_job_id)
+            if truck:
+                rows.append({'truck': truck, 'job_id': target_job_id, 'door_id': door_id,
+                             'entity_type': entity_type, 'entity_id': entity_id,
+                             'operation': operation, 'changed_at': now})
+
+    if rows:
+        connection.execute(SyncChange.__table__.insert(), rows)
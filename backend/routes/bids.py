@@ -1,10 +1,14 @@
 # backend/routes/bids.py
-from flask import Blueprint, request, jsonify, make_response
-from flask_login import login_required
+from flask import Blueprint, Response, request, jsonify, make_response, current_app, send_file
+from flask_login import login_required, current_user
 from datetime import datetime
-from models import db, Bid, Estimate, Door, LineItem, Job
-from services.file_utils import generate_bid_report, generate_bid_proposal
+from models import db, Bid, Estimate, Customer, Site, Door, LineItem, Job, PdfJob
+from models.sync import record_bulk_changes
+from sqlalchemy import or_, update
 from services.date_utils import generate_job_number
+from services.progress_service import adjust_total_doors, rebuild_bid_progress
+from services import pricing, pdf_cache, pdf_jobs, bid_versions
+from services.pagination import PageCursorError, page_size, seek_descending, split_page
 import logging
 import json
 
@@ -14,25 +18,76 @@ logger = logging.getLogger(__name__)
 @bids_bp.route('', methods=['GET'])
 @login_required
 def get_bids():
-    """Get all bids with customer information and site details"""
+    """
+    Get bids with customer information and site details, newest first.
+
+    Optional filters: status (comma separated), customer_id, q (bid number, customer or site).
+    With ?limit= or ?cursor= the response is one keyset page:
+    {'bids': [...], 'next_cursor': ..., 'total_count': ... (only with ?include_total=1)}.
+    Without them the full filtered list is returned as an array.
+    """
     try:
-        bids = Bid.query.all()
-        result = []
-        
-        for bid in bids:
-            bid_data = {
-                'id': bid.id,
-                'estimate_id': bid.estimate_id,
-                'customer_name': bid.estimate.customer_direct_link.name,
-                'site_address': bid.estimate.site.address if bid.estimate.site else None,
-                'site_name': bid.estimate.site.name if bid.estimate.site else None,
-                'status': bid.status,
-                'total_cost': bid.total_cost,
-                'created_at': bid.created_at
-            }
-            result.append(bid_data)
-        
-        return jsonify(result)
+        query = db.session.query(
+            Bid.id,
+            Bid.estimate_id,
+            Bid.status,
+            Bid.total_cost,
+            Bid.created_at,
+            Customer.name.label('customer_name'),
+            Site.address.label('site_address'),
+            Site.name.label('site_name')
+        ).join(Estimate, Bid.estimate_id == Estimate.id) \
+         .join(Customer, Estimate.customer_id == Customer.id) \
+         .outerjoin(Site, Estimate.site_id == Site.id)
+
+        statuses = [status for status in request.args.get('status', '').split(',') if status]
+        if statuses:
+            query = query.filter(Bid.status.in_(statuses))
+        customer_id = request.args.get('customer_id', type=int)
+        if customer_id:
+            query = query.filter(Estimate.customer_id == customer_id)
+        search = request.args.get('q', '').strip()
+        if search:
+            pattern = f"%{search}%"
+            conditions = [Customer.name.ilike(pattern), Site.name.ilike(pattern)]
+            bid_number = search.upper().removeprefix('BID-')
+            if bid_number.isdigit():
+                conditions.append(Bid.id == int(bid_number))
+            query = query.filter(or_(*conditions))
+
+        paginated = 'limit' in request.args or 'cursor' in request.args
+        total_count = query.order_by(None).count() if paginated and request.args.get('include_total') else None
+
+        query = seek_descending(query, Bid.created_at, Bid.id, request.args.get('cursor'))
+        next_cursor = None
+        if paginated:
+            limit = page_size(request.args.get('limit'))
+            rows, next_cursor = split_page(
+                query.limit(limit + 1).all(), limit, lambda row: row.created_at, lambda row: row.id
+            )
+        else:
+            rows = query.all()
+
+        result = [{
+            'id': row.id,
+            'estimate_id': row.estimate_id,
+            'customer_name': row.customer_name,
+            'site_address': row.site_address,
+            'site_name': row.site_name,
+            'status': row.status,
+            'total_cost': row.total_cost,
+            'created_at': row.created_at
+        } for row in rows]
+
+        if not paginated:
+            return jsonify(result)
+
+        page = {'bids': result, 'next_cursor': next_cursor}
+        if total_count is not None:
+            page['total_count'] = total_count
+        return jsonify(page)
+    except PageCursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error retrieving bids: {str(e)}")
         return jsonify({'error': 'Failed to retrieve bids'}), 500
@@ -40,37 +95,31 @@ def get_bids():
 @bids_bp.route('/<int:bid_id>', methods=['GET'])
 @login_required
 def get_bid(bid_id):
-    """Get a specific bid with all details"""
+    """
+    Get a specific bid with all details.
+
+    The response carries an ETag built from the bid's version counter; a request whose
+    If-None-Match still matches gets a 304 after one narrow query, without loading the doors.
+    """
     try:
-        bid = Bid.query.get_or_404(bid_id)
+        etag = bid_versions.bid_etag(bid_id)
+        if etag is None:
+            return jsonify({'error': 'Bid not found'}), 404
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
 
-        # ==========================================================
-        # === FIX #1: REFRESH THE OBJECT FROM THE DATABASE       ===
-        # ==========================================================
-        # This forces SQLAlchemy to reload the bid and all its related
-        # doors and line items, ensuring we have the latest data
-        # after the duplication operation.
-        db.session.refresh(bid)
-        # ==========================================================
-        
+        bid = db.session.get(Bid, bid_id)
+        priced = pricing.load_priced_bid(bid)
         doors_data = []
-        total_parts_cost = 0
-        total_labor_cost = 0
-        total_hardware_cost = 0
-        
-        # Now, this loop will iterate over the fresh, up-to-date data
-        for door in bid.doors:
+
+        for door in priced['doors']:
             line_items = []
-            door_parts_cost = 0
-            door_labor_cost = 0
-            door_hardware_cost = 0
-            
-            for item in door.line_items:
-                item_total = item.price * item.quantity
-                door_parts_cost += item_total
-                door_labor_cost += item.labor_hours * 47.02
-                door_hardware_cost += item.hardware
-                
+            door_totals = priced['door_totals'][door.id]
+
+            for item in priced['line_items'][door.id]:
                 line_items.append({
                     'id': item.id,
                     'part_number': item.part_number,
@@ -79,11 +128,9 @@ def get_bid(bid_id):
                     'price': item.price,
                     'labor_hours': item.labor_hours,
                     'hardware': item.hardware,
-                    'total': item_total
+                    'total': pricing.line_item_total(item)
                 })
             
-            door_total = door_parts_cost + door_labor_cost + door_hardware_cost
-            
             door_display_name = f"Door #{door.door_number}"
             if door.location:
                 door_display_name = f"Door #{door.door_number} ({door.location})"
@@ -111,31 +158,16 @@ def get_bid(bid_id):
                 'notes': door.notes,
                 'door_info': door_info,
                 'line_items': line_items,
-                'parts_cost': door_parts_cost,
-                'labor_cost': door_labor_cost,
-                'hardware_cost': door_hardware_cost,
-                'total': door_total
+                'parts_cost': door_totals['parts_cost'],
+                'labor_cost': door_totals['labor_cost'],
+                'hardware_cost': door_totals['hardware_cost'],
+                'total': door_totals['total']
             })
-            
-            total_parts_cost += door_parts_cost
-            total_labor_cost += door_labor_cost
-            total_hardware_cost += door_hardware_cost
         
-        tax_rate = 0.0875
-        tax_amount = (total_parts_cost + total_hardware_cost) * tax_rate
-        total_cost_val = total_parts_cost + total_labor_cost + total_hardware_cost + tax_amount
+        # Totals are maintained by services/pricing.py whenever line items change
+        totals = priced['totals']
         
-        # ==========================================================
-        # === FIX #2: REMOVE THE DATABASE WRITE FROM A GET REQUEST ===
-        # ==========================================================
-        # A GET request should only read data, not change it.
-        # Removing these lines prevents unnecessary database writes.
-        # The calculated total is still returned in the JSON below.
-        # bid.total_cost = total_cost_val
-        # db.session.commit()
-        # ==========================================================
-        
-        return jsonify({
+        response = jsonify({
             'id': bid.id,
             'estimate_id': bid.estimate_id,
             'customer_name': bid.estimate.customer_direct_link.name,
@@ -144,13 +176,17 @@ def get_bid(bid_id):
             'customer_phone': bid.estimate.site.phone if bid.estimate.site else None,
             'status': bid.status,
             'doors': doors_data,
-            'total_parts_cost': total_parts_cost,
-            'total_labor_cost': total_labor_cost,
-            'total_hardware_cost': total_hardware_cost,
-            'tax': tax_amount,
-            'total_cost': total_cost_val,
-            'created_at': bid.created_at
+            'total_parts_cost': totals['total_parts_cost'],
+            'total_labor_cost': totals['total_labor_cost'],
+            'total_hardware_cost': totals['total_hardware_cost'],
+            'tax': totals['tax_amount'],
+            'total_cost': totals['total_cost'],
+            'created_at': bid.created_at,
+            'version': bid.version or 0
         })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as e:
         logger.error(f"Error retrieving bid {bid_id}: {str(e)}")
         return jsonify({'error': 'Failed to retrieve bid'}), 500
@@ -226,6 +262,7 @@ def add_door(bid_id):
             notes=data.get('notes')
         )
         db.session.add(door)
+        adjust_total_doors(bid_id, 1)
         db.session.commit()
         
         return jsonify({
@@ -263,6 +300,8 @@ def delete_door(bid_id, door_id):
             
         LineItem.query.filter_by(door_id=door_id).delete()
         db.session.delete(door)
+        # The door's completion signatures go with it, so rebuild rather than decrement
+        rebuild_bid_progress(bid_id)
         db.session.commit()
         
         return jsonify({
@@ -275,10 +314,44 @@ def delete_door(bid_id, door_id):
         logger.error(f"Error deleting door: {str(e)}")
         return jsonify({'error': f'Failed to delete door: {str(e)}'}), 500
 
+# (field, error label, test that rejects a value) for the numeric line item edits
+LINE_ITEM_NUMERIC_FIELDS = (
+    ('quantity', 'quantity', lambda value: value <= 0),
+    ('price', 'price', lambda value: value < 0),
+    ('labor_hours', 'labor_hours', lambda value: value < 0),
+    ('hardware', 'hardware cost', lambda value: value < 0),
+)
+
+
+def _parse_line_item_changes(item_id, item_data, errors):
+    """Validate one line item's edits. Returns the column values to write, or None if invalid."""
+    values = {}
+    try:
+        if 'description' in item_data:
+            values['description'] = str(item_data['description']).strip()
+        for field, label, rejected in LINE_ITEM_NUMERIC_FIELDS:
+            if field in item_data:
+                value = float(item_data[field])
+                if rejected(value):
+                    errors.append(f'Invalid {label} {value} for item {item_id}')
+                    return None
+                values[field] = value
+    except (ValueError, TypeError) as e:
+        errors.append(f'Invalid data for item {item_id}: {str(e)}')
+        return None
+    return values
+
+
 @bids_bp.route('/<int:bid_id>/save-changes', methods=['PUT'])
 @login_required
 def save_bid_changes(bid_id):
-    """Save bulk changes to a bid including multiple doors and their line items"""
+    """
+    Save bulk changes to a bid including multiple doors and their line items.
+
+    All referenced doors and line items are loaded with one IN query each and validated in
+    memory; the edits are then written with a single executemany UPDATE and the door and bid
+    totals refreshed in the same transaction. Any validation error saves nothing.
+    """
     try:
         bid = Bid.query.get_or_404(bid_id)
         data = request.json
@@ -289,8 +362,24 @@ def save_bid_changes(bid_id):
         doors_data = data.get('doors', [])
         if not doors_data:
             return jsonify({'error': 'No doors data provided'}), 400
+
+        door_ids = {door_change.get('door_id') for door_change in doors_data if door_change.get('door_id')}
+        item_ids = {
+            item_data.get('id')
+            for door_change in doors_data
+            for item_data in door_change.get('line_items', [])
+            if item_data.get('id')
+        }
+        door_bids = dict(db.session.query(Door.id, Door.bid_id).filter(Door.id.in_(door_ids))) if door_ids else {}
+        items = {
+            item_id: (door_id, description) for item_id, door_id, description in db.session.query(
+                LineItem.id, LineItem.door_id, LineItem.description
+            ).filter(LineItem.id.in_(item_ids))
+        } if item_ids else {}
             
         updated_items = []
+        updates = []
+        priced_door_ids = set()
         errors = []
         
         for door_change in doors_data:
@@ -301,12 +390,11 @@ def save_bid_changes(bid_id):
                 errors.append('Missing door_id in door data')
                 continue
                 
-            door = Door.query.get(door_id)
-            if not door:
+            if door_id not in door_bids:
                 errors.append(f'Door {door_id} not found')
                 continue
                 
-            if door.bid_id != bid_id:
+            if door_bids[door_id] != bid_id:
                 errors.append(f'Door {door_id} does not belong to bid {bid_id}')
                 continue
                 
@@ -316,56 +404,28 @@ def save_bid_changes(bid_id):
                     errors.append('Missing line item ID')
                     continue
                     
-                line_item = LineItem.query.get(item_id)
-                if not line_item:
+                if item_id not in items:
                     errors.append(f'Line item {item_id} not found')
                     continue
                     
-                if line_item.door_id != door_id:
+                item_door_id, description = items[item_id]
+                if item_door_id != door_id:
                     errors.append(f'Line item {item_id} does not belong to door {door_id}')
                     continue
                     
-                try:
-                    if 'description' in item_data:
-                        line_item.description = str(item_data['description']).strip()
-                        
-                    if 'quantity' in item_data:
-                        quantity = float(item_data['quantity'])
-                        if quantity <= 0:
-                            errors.append(f'Invalid quantity {quantity} for item {item_id}')
-                            continue
-                        line_item.quantity = quantity
-                        
-                    if 'price' in item_data:
-                        price = float(item_data['price'])
-                        if price < 0:
-                            errors.append(f'Invalid price {price} for item {item_id}')
-                            continue
-                        line_item.price = price
-                        
-                    if 'labor_hours' in item_data:
-                        labor_hours = float(item_data['labor_hours'])
-                        if labor_hours < 0:
-                            errors.append(f'Invalid labor_hours {labor_hours} for item {item_id}')
-                            continue
-                        line_item.labor_hours = labor_hours
-                        
-                    if 'hardware' in item_data:
-                        hardware = float(item_data['hardware'])
-                        if hardware < 0:
-                            errors.append(f'Invalid hardware cost {hardware} for item {item_id}')
-                            continue
-                        line_item.hardware = hardware
-                        
-                    updated_items.append({
-                        'item_id': item_id,
-                        'door_id': door_id,
-                        'description': line_item.description
-                    })
-                    
-                except (ValueError, TypeError) as e:
-                    errors.append(f'Invalid data for item {item_id}: {str(e)}')
+                values = _parse_line_item_changes(item_id, item_data, errors)
+                if values is None:
                     continue
+                if values:
+                    updates.append({'id': item_id, **values})
+                    if any(field in values for field, _, _ in LINE_ITEM_NUMERIC_FIELDS):
+                        priced_door_ids.add(door_id)
+                        
+                updated_items.append({
+                    'item_id': item_id,
+                    'door_id': door_id,
+                    'description': values.get('description', description)
+                })
         
         if errors:
             return jsonify({
@@ -374,38 +434,24 @@ def save_bid_changes(bid_id):
                 'message': 'Validation errors occurred. No changes were saved.'
             }), 400
             
+        if updates:
+            # ORM bulk UPDATE by primary key: one executemany per set of edited columns
+            db.session.execute(update(LineItem), updates)
+            record_bulk_changes(db.session, [
+                ('line_item', values['id'], 'upsert', items[values['id']][0]) for values in updates
+            ])
+            bid_versions.bump([bid_id])
+        if priced_door_ids:
+            # Bulk statements skip the flush listener, so refresh the stored totals here
+            pricing.refresh_totals(priced_door_ids)
         db.session.commit()
-        
-        # Recalculate bid totals
-        total_parts_cost = 0
-        total_labor_cost = 0
-        total_hardware_cost = 0
-        
-        for door in bid.doors:
-            for item in door.line_items:
-                item_total = item.price * item.quantity
-                total_parts_cost += item_total
-                total_labor_cost += item.labor_hours * 47.02
-                total_hardware_cost += item.hardware
-        
-        tax_rate = 0.0875
-        tax_amount = (total_parts_cost + total_hardware_cost) * tax_rate
-        total_cost = total_parts_cost + total_labor_cost + total_hardware_cost + tax_amount
-        
-        bid.total_cost = total_cost
-        db.session.commit()
+        totals = pricing.bid_totals(bid)
         
         return jsonify({
             'success': True,
             'message': f'Successfully updated {len(updated_items)} line items',
             'updated_items': updated_items,
-            'bid_totals': {
-                'total_parts_cost': total_parts_cost,
-                'total_labor_cost': total_labor_cost,
-                'total_hardware_cost': total_hardware_cost,
-                'tax_amount': tax_amount,
-                'total_cost': total_cost
-            }
+            'bid_totals': totals
         }), 200
         
     except Exception as e:
@@ -452,11 +498,10 @@ def approve_bid(bid_id):
 @bids_bp.route('/<int:bid_id>/report', methods=['GET'])
 @login_required
 def get_bid_report(bid_id):
-    """Generate a PDF report for a bid"""
+    """PDF report for a bid, cached on disk until the bid changes"""
     try:
         bid = Bid.query.get_or_404(bid_id)
-        response = generate_bid_report(bid)
-        return response
+        return pdf_cache.serve_bid_pdf(bid, 'report')
     except Exception as e:
         logger.error(f"Error generating bid report: {str(e)}")
         return jsonify({'error': 'Failed to generate report'}), 500
@@ -464,11 +509,82 @@ def get_bid_report(bid_id):
 @bids_bp.route('/<int:bid_id>/proposal', methods=['GET'])
 @login_required
 def get_bid_proposal(bid_id):
-    """Generate a PDF proposal for a bid"""
+    """PDF proposal for a bid, cached on disk until the bid changes"""
     try:
         bid = Bid.query.get_or_404(bid_id)
-        response = generate_bid_proposal(bid)
-        return response
+        return pdf_cache.serve_bid_pdf(bid, 'proposal')
     except Exception as e:
         logger.error(f"Error generating bid proposal: {str(e)}")
-        return jsonify({'error': 'Failed to generate proposal'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to generate proposal'}), 500
+
+@bids_bp.route('/pdf-jobs', methods=['POST'])
+@login_required
+def create_pdf_job():
+    """
+    Queue report or proposal rendering for the background PDF worker.
+
+    Body: {"kind": "report"|"proposal", "bid_ids": [...]} or {"kind": ..., "approved_month": "YYYY-MM"}.
+    One bid gives a PDF; several bids (or a month) give a ZIP. Poll GET /pdf-jobs/<id>.
+    """
+    try:
+        data = request.json or {}
+        kind = data.get('kind', 'proposal')
+        if kind not in pdf_cache.PDF_KINDS:
+            return jsonify({'error': f'Unknown document kind: {kind}'}), 400
+
+        if data.get('approved_month'):
+            try:
+                month_start = datetime.strptime(data['approved_month'], '%Y-%m')
+            except (TypeError, ValueError):
+                return jsonify({'error': 'approved_month must be YYYY-MM'}), 400
+            bid_ids = pdf_jobs.approved_bid_ids(month_start)
+            batch = True
+        else:
+            try:
+                bid_ids = sorted({int(bid_id) for bid_id in data.get('bid_ids') or []})
+            except (TypeError, ValueError):
+                return jsonify({'error': 'bid_ids must be a list of bid ids'}), 400
+            batch = len(bid_ids) > 1 or bool(data.get('batch'))
+
+        if not bid_ids:
+            return jsonify({'error': 'No bids selected'}), 400
+        max_bids = current_app.config.get('PDF_BATCH_MAX_BIDS', 500)
+        if len(bid_ids) > max_bids:
+            return jsonify({'error': f'At most {max_bids} bids can be rendered in one batch'}), 400
+        if not batch and db.session.get(Bid, bid_ids[0]) is None:
+            return jsonify({'error': 'Bid not found'}), 404
+
+        job = pdf_jobs.enqueue_pdf_job(kind, bid_ids, batch, current_user.id)
+        db.session.commit()
+        status = pdf_jobs.job_status(job)
+        return jsonify(status), 200 if job.status == 'ready' else 202
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error queueing PDF job: {str(e)}")
+        return jsonify({'error': 'Failed to queue PDF job'}), 500
+
+@bids_bp.route('/pdf-jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_pdf_job(job_id):
+    """Status of a queued render; includes download_url once ready"""
+    job = PdfJob.query.get_or_404(job_id)
+    return jsonify(pdf_jobs.job_status(job)), 200
+
+@bids_bp.route('/pdf-jobs/<int:job_id>/download', methods=['GET'])
+@login_required
+def download_pdf_job(job_id):
+    """The rendered PDF, or the ZIP of a batch, streamed from disk"""
+    job = PdfJob.query.get_or_404(job_id)
+    if job.status != 'ready':
+        return jsonify({'error': f'PDF job is {job.status}', 'status': job.status}), 409
+    download = pdf_jobs.job_download(job)
+    if download is None:
+        return jsonify({'error': 'The rendered file has expired; queue the job again'}), 410
+    path, download_name = download
+    return send_file(
+        path,
+        mimetype='application/zip' if job.batch else 'application/pdf',
+        as_attachment=True,
+        download_name=download_name,
+        conditional=True
+    )
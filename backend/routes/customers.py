@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required
 from models import db, Customer, Site
+from services.route_optimizer import parse_point
 import logging
 import re
 
@@ -187,6 +188,8 @@ def get_customer_sites(customer_id):
             'contact_name': site.contact_name,
             'phone': site.phone,
             'email': site.email,
+            'latitude': site.latitude,
+            'longitude': site.longitude,
             'created_at': site.created_at.isoformat() if site.created_at else None
         })
     return jsonify(result)
@@ -200,6 +203,10 @@ def create_site(customer_id):
     name = data.get('name')
     if not name:
         return jsonify({'error': 'Site name is required'}), 400
+    try:
+        point = parse_point(data.get('latitude'), data.get('longitude'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     site = Site(
         customer_id=customer_id,
@@ -208,7 +215,9 @@ def create_site(customer_id):
         lockbox_location=data.get('lockbox_location', ''),
         contact_name=data.get('contact_name', ''),
         phone=data.get('phone', ''),
-        email=data.get('email', '')
+        email=data.get('email', ''),
+        latitude=point[0] if point else None,
+        longitude=point[1] if point else None
     )
     db.session.add(site)
     db.session.commit()
@@ -222,5 +231,7 @@ def create_site(customer_id):
         'contact_name': site.contact_name,
         'phone': site.phone,
         'email': site.email,
+        'latitude': site.latitude,
+        'longitude': site.longitude,
         'created_at': site.created_at.isoformat() if site.created_at else None
     }), 201
\ No newline at end of file
@@ -1,101 +1,29 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required
 from datetime import datetime, date
-from models import db, Job, User  # We only need Job and User now for this logic
+from models import db
+from services import dispatch_board, auto_dispatch
+from services.route_optimizer import parse_point
 import logging
 
 dispatch_bp = Blueprint('dispatch', __name__)
 logger = logging.getLogger(__name__)
 
-def serialize_job_for_dispatch(job):
-    """
-    Safely serializes a Job object for the Dispatch Calendar.
-    Gets the region directly from the Job model.
-    """
-    customer_name = 'N/A'
-    address = 'N/A'
-    contact_name = None
-    phone = None
-    estimated_hours = None
-
-    if job.bid and job.bid.estimate:
-        if job.bid.estimate.customer_direct_link:
-            customer_name = job.bid.estimate.customer_direct_link.name
-        
-        site = job.bid.estimate.site
-        if site:
-            # Get site-specific info
-            address = getattr(site, 'address', address)
-            contact_name = getattr(site, 'contact_name', contact_name)
-            phone = getattr(site, 'phone', phone)
-
-        # Get estimate-specific info
-        estimated_hours = getattr(job.bid.estimate, 'estimated_hours', None)
-
-    return {
-        'id': job.id,
-        'job_number': job.job_number,
-        'customer_name': customer_name,
-        'address': address,
-        'contact_name': contact_name,
-        'phone': phone,
-        'job_scope': job.job_scope,
-        'estimated_hours': estimated_hours,
-        'material_ready': job.material_ready,
-        'material_location': job.material_location,
-        
-        # *** THE FIX IS HERE: Get region directly from the job object ***
-        'region': job.region,
-        
-        'status': job.status,
-        'scheduled_date': job.scheduled_date.isoformat() if job.scheduled_date else None,
-        'is_visible': job.is_visible,
-        'job_order': job.job_order
-    }
 @dispatch_bp.route('/<string:date_str>', methods=['GET'])
 @login_required
 def get_dispatch_for_date(date_str):
     """
     Get dispatch assignments for a specific date by reading directly from the Job model.
-    This ensures consistency with the save logic.
+    This ensures consistency with the save logic. The board is one joined query plus the
+    field user list, however many jobs the day has (see services/dispatch_board).
     """
     try:
         target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        
-        # 1. Get all field users to prepare the truck columns.
-        field_users = User.query.filter_by(role='field').all()
-        
-        # 2. Initialize the response structure.
-        unassigned_jobs = []
-        truck_assignments = {user.username: [] for user in field_users}
-        
-        # 3. Fetch all jobs scheduled for the target date. The Job model is our single source of truth.
-        all_jobs_on_date = Job.query.filter(
-            Job.scheduled_date == target_date
-        ).order_by(Job.job_order).all()
-        
-        # 4. Process the jobs and place them in the correct column.
-        for job in all_jobs_on_date:
-            job_data = serialize_job_for_dispatch(job)
-            
-            # Check if the job has a truck assignment.
-            if job.truck_assignment and job.truck_assignment in truck_assignments:
-                # Job is assigned to a valid truck, add it to that truck's list.
-                truck_assignments[job.truck_assignment].append(job_data)
-            else:
-                # Job has no assignment or an invalid one, it's unassigned.
-                unassigned_jobs.append(job_data)
-        
-        # Sort jobs within each truck column by their order (already done by query, but good practice).
-        for truck in truck_assignments:
-            truck_assignments[truck].sort(key=lambda j: j.get('job_order', 999))
-
-        logger.info(f"Dispatch data for {date_str} fetched. Unassigned: {len(unassigned_jobs)}. Trucks: { {k: len(v) for k, v in truck_assignments.items()} }")
+        board = dispatch_board.load_board(target_date)
 
-        return jsonify({
-            'unassigned': unassigned_jobs,
-            'trucks': truck_assignments
-        }), 200
+        logger.info(f"Dispatch data for {date_str} fetched. Unassigned: {len(board['unassigned'])}. Trucks: { {k: len(v) for k, v in board['trucks'].items()} }")
+
+        return jsonify(board), 200
 
     except ValueError:
         logger.error(f"Invalid date format for dispatch: {date_str}")
@@ -105,12 +33,146 @@ def get_dispatch_for_date(date_str):
         return jsonify({'error': f'Failed to retrieve dispatch data: {str(e)}'}), 500
 
 
+@dispatch_bp.route('', methods=['GET'])
+@login_required
+def get_dispatch_for_range():
+    """
+    Get the dispatch boards of every day from ?start= to ?end= (YYYY-MM-DD, inclusive) for
+    week and month views, in the same two queries as a single day.
+    ?format=compact returns cards as value lists under a shared field list and skips empty days.
+    """
+    start_str = request.args.get('start')
+    end_str = request.args.get('end')
+    if not start_str or not end_str:
+        return jsonify({'error': 'start and end dates are required'}), 400
+    try:
+        start = datetime.strptime(start_str, '%Y-%m-%d').date()
+        end = datetime.strptime(end_str, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Expected YYYY-MM-DD.'}), 400
+    if end < start:
+        return jsonify({'error': 'end must not be before start'}), 400
+    max_days = current_app.config.get('DISPATCH_RANGE_MAX_DAYS', 62)
+    if (end - start).days + 1 > max_days:
+        return jsonify({'error': f'A dispatch range can cover at most {max_days} days'}), 400
+
+    try:
+        if request.args.get('format') == 'compact':
+            result = dispatch_board.load_range_compact(start, end)
+        else:
+            result = dispatch_board.load_range(start, end)
+        return jsonify(result), 200
+    except Exception as e:
+        logger.exception(f"Error fetching dispatch data for {start_str} to {end_str}")
+        return jsonify({'error': f'Failed to retrieve dispatch data: {str(e)}'}), 500
+
+
+def _route_depot(data):
+    """Start point of a route: the request's "depot" if given (null for none), else DISPATCH_DEPOT."""
+    if 'depot' in data:
+        depot = data['depot']
+        if depot is None:
+            return None
+        if not isinstance(depot, dict):
+            raise ValueError('depot must be an object with latitude and longitude')
+        return parse_point(depot.get('latitude'), depot.get('longitude'))
+    configured = current_app.config.get('DISPATCH_DEPOT')
+    if not configured:
+        return None
+    parts = configured.split(',')
+    if len(parts) != 2:
+        raise ValueError('DISPATCH_DEPOT must be "latitude,longitude"')
+    return parse_point(*parts)
+
+
+@dispatch_bp.route('/optimize-route', methods=['POST'])
+@login_required
+def optimize_route():
+    """
+    Suggest a driving order for one truck's jobs on a date. Nothing is saved; apply it by
+    saving the board with the suggested job_order.
+    Expects: { "date": "YYYY-MM-DD", "truck": "username", "first_job_id": optional,
+               "last_job_id": optional, "depot": optional {"latitude": .., "longitude": ..} }
+    Without "depot" in the body the DISPATCH_DEPOT setting is used, if set.
+    """
+    data = request.get_json(silent=True) or {}
+    truck = data.get('truck')
+    if not data.get('date') or not truck:
+        return jsonify({'error': 'date and truck are required'}), 400
+    try:
+        target_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date format. Expected YYYY-MM-DD.'}), 400
+
+    try:
+        depot = _route_depot(data)
+        pins = {}
+        for key in ('first_job_id', 'last_job_id'):
+            value = data.get(key)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                return jsonify({'error': f'{key} must be a job id'}), 400
+            pins[key] = value
+        suggestion = dispatch_board.suggest_route(target_date, truck, depot=depot, **pins)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.exception(f"Error optimizing the route of {truck} on {data.get('date')}")
+        return jsonify({'error': f'Failed to optimize route: {str(e)}'}), 500
+
+    logger.info(f"Route for {truck} on {data['date']}: {suggestion['current_distance_km']} km -> "
+                f"{suggestion['distance_km']} km ({len(suggestion['unlocated_job_ids'])} jobs without coordinates)")
+    return jsonify(suggestion), 200
+
+
+@dispatch_bp.route('/auto-assign', methods=['POST'])
+@login_required
+def auto_assign():
+    """
+    Propose trucks for a date's unassigned jobs within each truck's daily hours, preferring
+    trucks working the job's region. Nothing is saved; accept the proposal by posting its
+    "assignments" and "version" to POST /api/dispatch.
+    Expects: { "date": "YYYY-MM-DD", "capacities": optional {"truck": hours},
+               "regions": optional {"truck": "region"}, "include_unready": optional bool }
+    """
+    data = request.get_json(silent=True) or {}
+    if not data.get('date'):
+        return jsonify({'error': 'date is required'}), 400
+    try:
+        target_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date format. Expected YYYY-MM-DD.'}), 400
+    for key in ('capacities', 'regions'):
+        if data.get(key) is not None and not isinstance(data[key], dict):
+            return jsonify({'error': f'{key} must be an object keyed by truck'}), 400
+
+    try:
+        proposal = auto_dispatch.propose(
+            target_date,
+            capacities=data.get('capacities'),
+            regions=data.get('regions'),
+            include_unready=bool(data.get('include_unready'))
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.exception(f"Error auto-assigning jobs on {data.get('date')}")
+        return jsonify({'error': f'Failed to auto-assign jobs: {str(e)}'}), 500
+
+    placed = sum(len(truck['new_job_ids']) for truck in proposal['trucks'])
+    logger.info(f"Auto-assign for {data['date']}: {placed} jobs proposed, {len(proposal['unassigned'])} left unassigned")
+    return jsonify(proposal), 200
+
+
 @dispatch_bp.route('', methods=['POST'])
 @login_required
 def save_dispatch_assignments():
     """
     Saves dispatch assignments for a specific date by directly updating the Job model.
     This provides a single source of truth for the mobile/field interface.
+
+    Send the board's "version" (from GET /api/dispatch/<date>) to have the save refused with
+    409 and the current board when someone else changed it meanwhile. Only jobs whose truck,
+    order or visibility change are written; they come back as "changes" with the new version.
     """
     data = request.get_json()
     if not data:
@@ -124,52 +186,30 @@ def save_dispatch_assignments():
 
     try:
         dispatch_date = datetime.strptime(dispatch_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Please use YYYY-MM-DD.'}), 400
 
-        # 1. Get all jobs that are currently scheduled for the target date.
-        jobs_for_day = Job.query.filter(Job.scheduled_date == dispatch_date).all()
-        job_map = {job.id: job for job in jobs_for_day}
-
-        # 2. Reset all jobs for this day to a default "unassigned" state.
-        for job in jobs_for_day:
-            job.truck_assignment = None
-            job.job_order = 0
-            job.is_visible = False
-
-        assignments_saved_count = 0
-        # 3. Iterate through the assignments from the frontend and apply them.
-        for assignment in assignments_list:
-            job_id = assignment.get('job_id')
-            
-            job_to_update = job_map.get(job_id)
-
-            if job_to_update:
-                job_to_update.truck_assignment = assignment.get('truck_assignment')
-                job_to_update.job_order = assignment.get('job_order', 0)
-                job_to_update.is_visible = assignment.get('is_visible', False)
-
-                if job_to_update.status in ['unscheduled', 'unassigned', None]:
-                    job_to_update.status = 'scheduled'
-                
-                assignments_saved_count += 1
-            else:
-                logger.warning(
-                    f"Dispatch Save: Job ID {job_id} was in the assignment list "
-                    f"but is not scheduled for {dispatch_date_str}. Ignoring this assignment."
-                )
-
-        # 4. Commit all changes to the database in a single transaction.
+    try:
+        result = dispatch_board.save_assignments(dispatch_date, assignments_list, version=data.get('version'))
         db.session.commit()
 
-        logger.info(f"Successfully saved {assignments_saved_count} dispatch assignments for {dispatch_date_str}.")
+        if result['ignored_job_ids']:
+            logger.warning(
+                f"Dispatch Save: Job IDs {result['ignored_job_ids']} were in the assignment list "
+                f"but are not scheduled for {dispatch_date_str}. Ignoring these assignments."
+            )
+        logger.info(f"Successfully saved {result['count']} dispatch assignments for {dispatch_date_str} "
+                    f"({len(result['changes'])} jobs changed).")
         return jsonify({
             'success': True,
             'message': f'Dispatch for {dispatch_date_str} saved successfully.',
-            'count': assignments_saved_count
+            **result
         }), 200
 
-    except ValueError:
-        return jsonify({'error': 'Invalid date format. Please use YYYY-MM-DD.'}), 400
+    except dispatch_board.DispatchSaveError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.exception(f"Fatal error saving dispatch for {dispatch_date_str}")
-        return jsonify({'error': f'An internal server error occurred: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'An internal server error occurred: {str(e)}'}), 500
@@ -3,6 +3,7 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required
 from models import db, Door, LineItem, DoorMedia, MobileJobLineItem, JobSignature, User
+from services.door_duplication import parse_door_numbers, duplicate_line_items
 import logging
 import os
 
@@ -181,7 +182,7 @@ def get_door_actions(door_id):
 def duplicate_door_config(door_id):
     """
     Duplicates the line items from a source door to one or more target doors.
-    If a target door does not exist, it will be created.
+    If a target door does not exist, it will be created; an existing one has its line items replaced.
     Expects a JSON body: { "target_door_numbers": [2, 3, 4] }
     """
     source_door = Door.query.get(door_id)
@@ -195,68 +196,29 @@ def duplicate_door_config(door_id):
     target_door_numbers = data.get('target_door_numbers', [])
     if not isinstance(target_door_numbers, list) or not target_door_numbers:
         return jsonify({"error": "'target_door_numbers' must be a non-empty list of integers"}), 400
+    try:
+        target_door_numbers = parse_door_numbers(target_door_numbers)
+    except (TypeError, ValueError):
+        return jsonify({"error": "'target_door_numbers' must be a non-empty list of integers"}), 400
 
-    source_line_items = source_door.line_items
-    if not source_line_items:
+    if not source_door.line_items.first():
         return jsonify({
             "message": "Source door has no line items to duplicate.",
             "created_doors": [],
             "not_found": []
         }), 200
 
-    updated_or_created_doors_info = []
-
     try:
-        for door_num in target_door_numbers:
-            # --- LOGIC CHANGE: FIND OR CREATE THE TARGET DOOR ---
-            target_door = Door.query.filter_by(
-                bid_id=source_door.bid_id, 
-                door_number=door_num
-            ).first()
-
-            if not target_door:
-                # If the door doesn't exist, create it.
-                target_door = Door(
-                    bid_id=source_door.bid_id,
-                    door_number=door_num,
-                    # You can copy other default fields from the source door if you wish
-                    location=source_door.location, 
-                    door_type=source_door.door_type
-                )
-                db.session.add(target_door)
-                # We need to flush to ensure the door is in the session before adding line items
-                db.session.flush()
-
-            # --- END LOGIC CHANGE ---
-
-            # Now, proceed with the copy. First, clear any existing line items.
-            LineItem.query.filter_by(door_id=target_door.id).delete(synchronize_session=False)
-
-            # Copy line items from source to the (found or new) target door
-            for source_item in source_line_items:
-                new_item = LineItem(
-                    door_id=target_door.id,
-                    description=source_item.description,
-                    quantity=source_item.quantity,
-                    price=source_item.price,
-                    part_number=source_item.part_number,
-                    labor_hours=source_item.labor_hours,
-                    hardware=source_item.hardware
-                )
-                db.session.add(new_item)
-            
-            updated_or_created_doors_info.append({
-                "id": target_door.id,
-                "door_number": target_door.door_number
-            })
-            
+        result = duplicate_line_items(source_door, target_door_numbers, replace_existing=True)
         db.session.commit()
 
-        # A more accurate success message
         return jsonify({
-            "message": f"Configuration from door {source_door.door_number} duplicated to {len(updated_or_created_doors_info)} doors.",
-            "created_doors": updated_or_created_doors_info,
-            "not_found": [] # This should always be empty now
+            "message": f"Configuration from door {source_door.door_number} duplicated to {len(result['targets'])} doors.",
+            "created_doors": [
+                {"id": target['id'], "door_number": target['door_number']} for target in result['targets']
+            ],
+            "new_door_ids": result['created_ids'],
+            "not_found": []
         }), 200
 
     except Exception as e:
@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required
 from models import db, LineItem, Door
+from services.door_duplication import parse_door_numbers, duplicate_line_items
 import logging
 
 line_items_bp = Blueprint('line_items', __name__)
@@ -118,35 +119,24 @@ def delete_line_item(door_id, line_item_id):
 @line_items_bp.route('/doors/<int:door_id>/duplicate', methods=['POST'])
 @login_required
 def duplicate_door(door_id):
-    """Duplicate a door and its line items to other door numbers"""
+    """Duplicate a door and its line items to other door numbers; numbers already in the bid are skipped"""
     try:
         data = request.json
         source_door = Door.query.get_or_404(door_id)
-        target_door_numbers = data.get('target_door_numbers', [])
-        
-        created_doors = []
-        
-        for door_number in target_door_numbers:
-            new_door = Door(bid_id=source_door.bid_id, door_number=door_number)
-            db.session.add(new_door)
-            db.session.flush()
-            
-            for item in source_door.line_items:
-                new_item = LineItem(
-                    door_id=new_door.id,
-                    part_number=item.part_number,
-                    description=item.description,
-                    quantity=item.quantity,
-                    price=item.price,
-                    labor_hours=item.labor_hours,
-                    hardware=item.hardware
-                )
-                db.session.add(new_item)
-            
-            created_doors.append({'id': new_door.id, 'door_number': new_door.door_number})
+        try:
+            target_door_numbers = parse_door_numbers(data.get('target_door_numbers', []))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'target_door_numbers must be a list of integers'}), 400
         
+        result = duplicate_line_items(source_door, target_door_numbers, replace_existing=False)
         db.session.commit()
-        return jsonify({'source_door_id': door_id, 'created_doors': created_doors}), 201
+        return jsonify({
+            'source_door_id': door_id,
+            'created_doors': [
+                {'id': target['id'], 'door_number': target['door_number']} for target in result['targets']
+            ],
+            'existing_door_numbers': result['skipped_numbers']
+        }), 201
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error duplicating door: {str(e)}")
@@ -1,10 +1,13 @@
 from flask import Blueprint, jsonify, request, send_from_directory, abort, current_app
 from flask_login import login_required, current_user
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from models import (db, Job, JobTimeTracking, JobSignature, DoorMedia,
-                   MobileJobLineItem, LineItem, Door, User)
-from services.mobile_service import (get_job_mobile_status, get_job_progress_and_time,
-                                   create_upload_folder, allowed_file, generate_thumbnail)
+                   Door, User, Bid, Estimate, UploadSession)
+from sqlalchemy.orm import joinedload
+from werkzeug.exceptions import HTTPException
+from services.mobile_service import create_upload_folder, allowed_file, load_mobile_job_doors
+from services.media_queue import enqueue_media_processing
+from services import progress_service, sync_service, mobile_actions, upload_service, media_delivery, media_store
 import logging
 import os
 
@@ -18,9 +21,11 @@ ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'webm', 'mov', 'avi'}
 MAX_PHOTO_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 
-def serialize_job_for_mobile(job):
+def serialize_job_for_mobile(job, mobile_status=None, progress_data=None):
     """
     Serializes a Job object into a dictionary suitable for the mobile interface.
+    List endpoints pass in mobile_status and progress_data read in bulk from the
+    job progress rollup so that serializing N jobs does not cost N rounds of queries.
     """
     customer_name = 'N/A'
     address = 'N/A'
@@ -41,8 +46,9 @@ def serialize_job_for_mobile(job):
             if hasattr(site, 'region') and site.region:
                 region = site.region
 
-    mobile_status = get_job_mobile_status(job)
-    progress_data = get_job_progress_and_time(job)
+    if mobile_status is None or progress_data is None:
+        progress_data = progress_service.get_jobs_rollup([job])[job.id]
+        mobile_status = progress_data['mobile_status']
 
     total_doors = progress_data.get('total_doors', 0)
     completed_doors = progress_data.get('completed_doors', 0)
@@ -75,6 +81,13 @@ def serialize_job_for_mobile(job):
         }
     }
 
+def _mobile_job_load_options():
+    """Eager-load the bid, estimate, customer and site used by serialize_job_for_mobile."""
+    return (
+        joinedload(Job.bid).joinedload(Bid.estimate).joinedload(Estimate.customer_direct_link),
+        joinedload(Job.bid).joinedload(Bid.estimate).joinedload(Estimate.site),
+    )
+
 @mobile_bp.route('/config', methods=['GET'])
 def get_mobile_api_config():
     """Provide API configuration for mobile job worker offline functionality"""
@@ -84,9 +97,10 @@ def get_mobile_api_config():
             'authentication': {'type': 'session', 'login_endpoint': '/api/auth/login', 'logout_endpoint': '/api/auth/logout', 'session_check_endpoint': '/api/auth/me'},
             'endpoints': {
                 'jobs': {'get_jobs_list': '/api/mobile/field-jobs', 'get_job': '/api/mobile/jobs/{job_id}', 'start_job': '/api/mobile/jobs/{job_id}/start', 'complete_job': '/api/mobile/jobs/{job_id}/complete', 'pause_job': '/api/mobile/jobs/{job_id}/pause', 'resume_job': '/api/mobile/jobs/{job_id}/resume'},
-                'doors': {'complete_door': '/api/mobile/doors/{door_id}/complete', 'upload_media': '/api/mobile/doors/{door_id}/media/upload', 'toggle_line_item': '/api/mobile/jobs/{job_id}/line-items/{line_item_id}/toggle'}
+                'doors': {'complete_door': '/api/mobile/doors/{door_id}/complete', 'upload_media': '/api/mobile/doors/{door_id}/media/upload', 'resumable_upload': '/api/mobile/uploads', 'toggle_line_item': '/api/mobile/jobs/{job_id}/line-items/{line_item_id}/toggle'},
+                'sync': {'delta_sync': '/api/mobile/sync', 'replay_actions': '/api/mobile/actions/batch'}
             },
-            'offline': {'supported': True, 'cache_duration': 24 * 60 * 60 * 1000, 'sync_interval': 5 * 60 * 1000},
+            'offline': {'supported': True, 'cache_duration': 24 * 60 * 60 * 1000, 'sync_interval': 5 * 60 * 1000, 'delta_sync': True},
             'media': {'max_photo_size': MAX_PHOTO_SIZE, 'max_video_size': MAX_VIDEO_SIZE, 'allowed_photo_types': list(ALLOWED_PHOTO_EXTENSIONS), 'allowed_video_types': list(ALLOWED_VIDEO_EXTENSIONS)}
         }
         if current_user.is_authenticated:
@@ -108,54 +122,9 @@ def get_mobile_job_data(job_id):
         if current_user.role == 'field' and hasattr(job, 'truck_assignment') and job.truck_assignment != current_user.username:
             return jsonify({'error': 'Forbidden: You are not assigned to this job.'}), 403
 
-        mobile_status = get_job_mobile_status(job)
-        progress_data = get_job_progress_and_time(job)
-
-        doors_details = []
-        job_doors = job.bid.doors if job.bid and hasattr(job.bid, 'doors') else []
-
-        for door_model in job_doors:
-            line_items_details = []
-            if hasattr(door_model, 'line_items') and door_model.line_items:
-                for line_item in door_model.line_items:
-                    mobile_line_completion = MobileJobLineItem.query.filter_by(
-                        job_id=job.id, line_item_id=line_item.id
-                    ).first()
-                    is_completed = mobile_line_completion.completed if mobile_line_completion else False
-
-                    line_items_details.append({
-                        'id': line_item.id,
-                        'description': line_item.description or f'Work item {line_item.id}',
-                        'part_number': line_item.part_number or '',
-                        'quantity': line_item.quantity or 1,
-                        'completed': is_completed
-                    })
-
-            latest_photo = DoorMedia.query.filter_by(
-                job_id=job.id, door_id=door_model.id, media_type='photo'
-            ).order_by(DoorMedia.uploaded_at.desc()).first()
-
-            latest_video = DoorMedia.query.filter_by(
-                job_id=job.id, door_id=door_model.id, media_type='video'
-            ).order_by(DoorMedia.uploaded_at.desc()).first()
-
-            door_completion_signature = JobSignature.query.filter_by(
-                job_id=job.id, door_id=door_model.id, signature_type='door_complete'
-            ).first()
-            is_door_completed = door_completion_signature is not None
-
-            door_detail = {
-                'id': door_model.id,
-                'door_number': door_model.door_number or (job_doors.index(door_model) + 1),
-                'location': door_model.location or f'Door #{door_model.door_number or (job_doors.index(door_model) + 1)}',
-                'labor_description': door_model.labor_description or 'Standard door work',
-                'line_items': line_items_details,
-                'completed': is_door_completed,
-                'has_photo': bool(latest_photo),
-                'has_video': bool(latest_video),
-                'has_signature': is_door_completed
-            }
-            doors_details.append(door_detail)
+        # Doors, line items, completions, media and signatures are loaded in a
+        # fixed number of grouped queries regardless of the job size.
+        doors_details = load_mobile_job_doors(job)
 
         response_data = serialize_job_for_mobile(job)
         response_data['doors'] = doors_details
@@ -171,60 +140,13 @@ def get_mobile_job_data(job_id):
 def start_mobile_job(job_id):
     """Start a job with signature for mobile workers"""
     try:
-        job = Job.query.get_or_404(job_id)
-        data = request.json
-
-        if current_user.role == 'field' and hasattr(job, 'truck_assignment') and job.truck_assignment != current_user.username:
-            return jsonify({'error': 'Forbidden: You cannot start a job not assigned to you.'}), 403
-
-        existing_time_tracking = JobTimeTracking.query.filter_by(
-            job_id=job_id,
-            user_id=current_user.id,
-            end_time=None
-        ).first()
-
-        if existing_time_tracking:
-            return jsonify({'error': 'Job is already started by this user. Use resume if paused.'}), 400
-
-        time_tracking = JobTimeTracking(
-            job_id=job_id,
-            user_id=current_user.id,
-            start_time=datetime.utcnow(),
-            status='active'
-        )
-        db.session.add(time_tracking)
-
-        signature_data = data.get('signature', '')
-        signer_name = data.get('signer_name', current_user.get_full_name())
-        signer_title = data.get('signer_title', current_user.role)
-
-        if signature_data:
-            job_signature = JobSignature(
-                job_id=job_id,
-                user_id=current_user.id,
-                signature_type='start',
-                signature_data=signature_data,
-                signer_name=signer_name,
-                signer_title=signer_title
-            )
-            db.session.add(job_signature)
-
-        if job.status == 'scheduled':
-            job.status = 'in_progress'
-
-        if hasattr(job, 'mobile_status') and job.mobile_status not in ['started', 'completed']:
-             job.mobile_status = 'started'
-
+        body, status_code = mobile_actions.start_job(job_id, current_user, request.json or {})
         db.session.commit()
+        return jsonify(body), status_code
 
-        return jsonify({
-            'success': True,
-            'message': 'Job started successfully',
-            'job_id': job_id,
-            'time_tracking_id': time_tracking.id,
-            'current_mobile_status': job.mobile_status if hasattr(job, 'mobile_status') else None
-        }), 200
-
+    except mobile_actions.MobileActionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error starting mobile job {job_id}: {str(e)}")
@@ -235,47 +157,13 @@ def start_mobile_job(job_id):
 def pause_mobile_job(job_id):
     """Pause an active job timer for the current user."""
     try:
-        job = Job.query.get_or_404(job_id)
-        data = request.json or {}
-
-        active_tracking = JobTimeTracking.query.filter_by(
-            job_id=job.id,
-            user_id=current_user.id,
-            status='active'
-        ).first()
-
-        if not active_tracking:
-            return jsonify({'error': 'Job is not currently active for this user. Cannot pause.'}), 400
-
-        active_tracking.end_time = datetime.utcnow()
-        active_tracking.status = 'paused'
-        duration = (active_tracking.end_time - active_tracking.start_time).total_seconds()
-        active_tracking.duration_seconds = duration
-
-        if hasattr(job, 'mobile_status'):
-            job.mobile_status = 'paused'
-
-        if data.get('signature'):
-            job_signature = JobSignature(
-                job_id=job.id,
-                user_id=current_user.id,
-                signature_type='pause',
-                signature_data=data['signature'],
-                signer_name=data.get('signer_name', current_user.get_full_name()),
-                signer_title=data.get('signer_title', 'Site Contact')
-            )
-            db.session.add(job_signature)
-
+        body, status_code = mobile_actions.pause_job(job_id, current_user, request.json or {})
         db.session.commit()
-        logger.info(f"User {current_user.id} paused job {job_id}.")
-
-        return jsonify({
-            'success': True,
-            'message': 'Job paused successfully.',
-            'job_id': job_id,
-            'current_mobile_status': 'paused'
-        }), 200
+        return jsonify(body), status_code
 
+    except mobile_actions.MobileActionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error pausing job {job_id}: {str(e)}")
@@ -286,50 +174,13 @@ def pause_mobile_job(job_id):
 def resume_mobile_job(job_id):
     """Resume a paused job timer for the current user."""
     try:
-        job = Job.query.get_or_404(job_id)
-        data = request.json or {}
-
-        last_tracking = JobTimeTracking.query.filter_by(
-            job_id=job.id,
-            user_id=current_user.id,
-        ).order_by(JobTimeTracking.start_time.desc()).first()
-
-        if last_tracking and last_tracking.status == 'active':
-             return jsonify({'error': 'Job is already active. Cannot resume.'}), 400
-
-        new_tracking = JobTimeTracking(
-            job_id=job.id,
-            user_id=current_user.id,
-            start_time=datetime.utcnow(),
-            status='active'
-        )
-        db.session.add(new_tracking)
-
-        if hasattr(job, 'mobile_status'):
-            job.mobile_status = 'started'
-
-        if data.get('signature'):
-            job_signature = JobSignature(
-                job_id=job.id,
-                user_id=current_user.id,
-                signature_type='resume',
-                signature_data=data['signature'],
-                signer_name=data.get('signer_name', current_user.get_full_name()),
-                signer_title=data.get('signer_title', 'Site Contact')
-            )
-            db.session.add(job_signature)
-
+        body, status_code = mobile_actions.resume_job(job_id, current_user, request.json or {})
         db.session.commit()
-        logger.info(f"User {current_user.id} resumed job {job_id}.")
-
-        return jsonify({
-            'success': True,
-            'message': 'Job resumed successfully.',
-            'job_id': job_id,
-            'time_tracking_id': new_tracking.id,
-            'current_mobile_status': 'started'
-        }), 200
+        return jsonify(body), status_code
 
+    except mobile_actions.MobileActionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error resuming job {job_id}: {str(e)}")
@@ -340,40 +191,13 @@ def resume_mobile_job(job_id):
 def complete_mobile_job(job_id):
     """Marks a job as complete from the mobile interface."""
     try:
-        job = Job.query.get_or_404(job_id)
-        data = request.json or {}
-
-        active_tracking = JobTimeTracking.query.filter_by(job_id=job.id, user_id=current_user.id, status='active').first()
-        if active_tracking:
-            active_tracking.end_time = datetime.utcnow()
-            active_tracking.status = 'completed'
-            duration = (active_tracking.end_time - active_tracking.start_time).total_seconds()
-            active_tracking.duration_seconds = duration
-
-        job.status = 'completed'
-        if hasattr(job, 'mobile_status'):
-            job.mobile_status = 'completed'
-
-        if data.get('signature'):
-            job_signature = JobSignature(
-                job_id=job.id,
-                user_id=current_user.id,
-                signature_type='final_completion',
-                signature_data=data['signature'],
-                signer_name=data.get('signer_name', current_user.get_full_name()),
-                signer_title=data.get('signer_title', 'Site Contact')
-            )
-            db.session.add(job_signature)
-
+        body, status_code = mobile_actions.complete_job(job_id, current_user, request.json or {})
         db.session.commit()
-        logger.info(f"User {current_user.id} completed job {job_id}.")
-
-        return jsonify({
-            'success': True,
-            'message': 'Job completed successfully.',
-            'job_id': job_id
-        }), 200
+        return jsonify(body), status_code
 
+    except mobile_actions.MobileActionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error completing job {job_id}: {str(e)}")
@@ -382,71 +206,72 @@ def complete_mobile_job(job_id):
 @mobile_bp.route('/jobs/<int:job_id>/line-items/<int:line_item_id>/toggle', methods=['PUT'])
 @login_required
 def toggle_mobile_line_item(job_id, line_item_id):
-    """Toggle completion status of a line item for mobile workers"""
+    """
+    Toggle completion status of a line item for mobile workers.
+    An optional {"completed": true|false} body sets the state instead of flipping it.
+    """
     try:
-        job = Job.query.get_or_404(job_id)
-        line_item = LineItem.query.get_or_404(line_item_id)
-
-        is_valid_line_item = False
-        if job.bid and hasattr(job.bid, 'doors'):
-            for door in job.bid.doors:
-                if line_item.door_id == door.id:
-                    is_valid_line_item = True
-                    break
-
-        if not is_valid_line_item:
-            return jsonify({'error': 'Line item does not belong to this job or its associated bid doors.'}), 400
-
-        mobile_completion = MobileJobLineItem.query.filter_by(
-            job_id=job_id,
-            line_item_id=line_item_id
-        ).first()
-
-        previous_completed = False
-        if mobile_completion:
-            previous_completed = mobile_completion.completed
-
-        new_completed = not previous_completed
-
-        if not mobile_completion:
-            mobile_completion = MobileJobLineItem(
-                job_id=job_id,
-                line_item_id=line_item_id,
-                completed=new_completed,
-                completed_at=datetime.utcnow() if new_completed else None,
-                completed_by=current_user.id if new_completed else None
-            )
-            db.session.add(mobile_completion)
-        else:
-            mobile_completion.completed = new_completed
-            if new_completed:
-                mobile_completion.completed_at = datetime.utcnow()
-                mobile_completion.completed_by = current_user.id
-            else:
-                mobile_completion.completed_at = None
-                mobile_completion.completed_by = None
-
+        body, status_code = mobile_actions.toggle_line_item(
+            job_id, line_item_id, current_user, (request.get_json(silent=True) or {}).get('completed')
+        )
         db.session.commit()
+        return jsonify(body), status_code
 
-        return jsonify({
-            'success': True,
-            'line_item_id': line_item_id,
-            'completed': new_completed,
-            'previous_completed': previous_completed
-        }), 200
-
+    except mobile_actions.MobileActionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error toggling line item {line_item_id} for job {job_id}: {str(e)}")
         return jsonify({'error': 'Failed to toggle line item completion status'}), 500
 
+@mobile_bp.route('/actions/batch', methods=['POST'])
+@login_required
+def replay_mobile_actions():
+    """
+    Replay a device's queued offline actions in one round trip.
+
+    Body: {"actions": [{"idempotency_key": "...", "type": "job_start", "payload": {...}}, ...]}
+    Types are job_start, job_pause, job_resume, job_complete, line_item_toggle and
+    door_complete; payloads take the same fields as the single-action endpoints plus
+    job_id / door_id / line_item_id. Actions are applied in order and committed together;
+    each gets its own status and body in `results`. Keys seen before are not re-applied.
+    """
+    data = request.get_json(silent=True) or {}
+    actions = data.get('actions')
+    if not isinstance(actions, list) or not actions:
+        return jsonify({'error': 'actions must be a non-empty list.'}), 400
+    if len(actions) > mobile_actions.MAX_BATCH_ACTIONS:
+        return jsonify({'error': f'At most {mobile_actions.MAX_BATCH_ACTIONS} actions per batch.'}), 400
+    if not all(isinstance(action, dict) for action in actions):
+        return jsonify({'error': 'Each action must be an object.'}), 400
+
+    try:
+        results = mobile_actions.apply_batch(actions, current_user)
+        db.session.commit()
+
+        summary = {
+            'applied': len([r for r in results if not r['replayed'] and r['status'] < 400]),
+            'replayed': len([r for r in results if r['replayed']]),
+            'failed': len([r for r in results if r['status'] >= 400])
+        }
+        logger.info(f"User {current_user.username} replayed {len(actions)} offline actions: {summary}")
+        return jsonify({'results': results, **summary}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error replaying offline actions for user {current_user.id}: {e}", exc_info=True)
+        return jsonify({'error': 'Failed to apply offline actions'}), 500
+
 @mobile_bp.route('/doors/<int:door_id>/media/upload', methods=['POST'])
 @login_required
 def upload_door_media(door_id):
     """
-    Saves uploaded media to the correct subfolder (photos/videos)
-    and stores the correct relative path in the database.
+    Saves uploaded media in the content-addressed store and records it for the door.
+    Re-sending a file already uploaded for the door returns the existing record.
     """
+    incoming_path = None
+    stored_blob = None  # (relative_path, sha256) of a blob this request added, removed on failure
     try:
         door = Door.query.get_or_404(door_id)
         if 'file' not in request.files:
@@ -465,56 +290,224 @@ def upload_door_media(door_id):
         if not job.bid or door.bid_id != job.bid_id:
             return jsonify({'error': 'Door does not belong to the specified job'}), 400
 
-        media_subfolder = f"{media_type}s"
-
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')[:-3]
         file_extension = file.filename.rsplit('.', 1)[1].lower()
-        filename = f"door_{door_id}_{media_type}_{timestamp}.{file_extension}"
-        relative_path_for_db = os.path.join(f'job_{job_id}', media_subfolder, filename)
-
         upload_folder = current_app.config['UPLOAD_FOLDER']
-        full_save_path = os.path.join(upload_folder, relative_path_for_db)
-
-        os.makedirs(os.path.dirname(full_save_path), exist_ok=True)
-        file.save(full_save_path)
-
-        file_size = os.path.getsize(full_save_path)
 
-        thumbnail_relative_path = None
-        if media_type == 'photo':
-            try:
-                thumb_dir = os.path.join(upload_folder, f'job_{job_id}', 'thumbnails')
-                os.makedirs(thumb_dir, exist_ok=True)
-                full_thumb_path = generate_thumbnail(full_save_path, os.path.join(thumb_dir, f"thumb_{filename}"))
-                if full_thumb_path:
-                    thumbnail_relative_path = os.path.relpath(full_thumb_path, upload_folder)
-            except Exception as e:
-                logger.warning(f"Could not generate thumbnail for {filename}: {e}")
+        # Stored once per distinct content; a retried upload of the same file is not saved again
+        incoming_path, content_hash, file_size = media_store.save_stream(file.stream, upload_folder)
+        duplicate = media_store.find_duplicate(door_id, int(job_id), media_type, content_hash)
+        if duplicate:
+            os.remove(incoming_path)
+            return jsonify({
+                'success': True,
+                'message': 'Media was already uploaded.',
+                'media_id': duplicate.id,
+                'processing_status': duplicate.processing_status,
+                'duplicate': True
+            }), 200
+
+        blob, created = media_store.ingest_file(upload_folder, incoming_path, content_hash, file_size, file_extension)
+        incoming_path = None
+        if created:
+            stored_blob = (blob.relative_path, content_hash)
 
         door_media = DoorMedia(
             door_id=door_id,
             job_id=int(job_id),
             media_type=media_type,
-            file_path=relative_path_for_db,
-            thumbnail_path=thumbnail_relative_path,
+            file_path=blob.relative_path,
             file_size=file_size,
+            content_hash=content_hash,
             uploaded_at=datetime.utcnow(),
             uploaded_by=current_user.id
         )
         db.session.add(door_media)
+        db.session.flush()
+        # Thumbnails, previews and metadata are produced by the media worker
+        enqueue_media_processing(door_media)
         db.session.commit()
 
         return jsonify({
             'success': True,
             'message': 'Media uploaded successfully.',
-            'media_id': door_media.id
+            'media_id': door_media.id,
+            'processing_status': door_media.processing_status
         }), 201
 
     except Exception as e:
         db.session.rollback()
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        if incoming_path and os.path.exists(incoming_path):
+            os.remove(incoming_path)
+        if stored_blob:
+            media_store.discard_blob_file(upload_folder, *stored_blob)
         logger.error(f"Fatal error in upload_door_media for door {door_id}: {str(e)}", exc_info=True)
         return jsonify({'error': 'An internal server error occurred during file upload.'}), 500
 
+# --- Resumable uploads ---
+# Large media (mostly door videos) is sent as a session: create it, PUT raw chunks at the
+# current offset, ask for the offset after a dropped connection, then finalize.
+
+@mobile_bp.route('/uploads', methods=['POST'])
+@login_required
+def create_upload_session():
+    """Open a resumable upload for a door photo or video."""
+    data = request.get_json(silent=True) or {}
+    job_id = data.get('job_id')
+    door_id = data.get('door_id')
+    media_type = data.get('media_type', 'video')
+    filename = data.get('filename', '')
+    total_size = data.get('total_size')
+
+    if not job_id or not door_id:
+        return jsonify({'error': 'job_id and door_id are required fields.'}), 400
+    if media_type not in ['photo', 'video']:
+        return jsonify({'error': "media_type must be 'photo' or 'video'."}), 400
+
+    allowed_extensions = ALLOWED_PHOTO_EXTENSIONS if media_type == 'photo' else ALLOWED_VIDEO_EXTENSIONS
+    if not allowed_file(filename, allowed_extensions):
+        return jsonify({'error': f'File type not allowed. Allowed: {", ".join(sorted(allowed_extensions))}'}), 400
+
+    max_size = MAX_PHOTO_SIZE if media_type == 'photo' else MAX_VIDEO_SIZE
+    if not isinstance(total_size, int) or total_size <= 0:
+        return jsonify({'error': 'total_size must be a positive number of bytes.'}), 400
+    if total_size > max_size:
+        return jsonify({'error': f'File too large. Maximum size is {max_size // (1024 * 1024)}MB.'}), 413
+
+    try:
+        job = db.session.get(Job, job_id)
+        door = db.session.get(Door, door_id)
+        if not job or not door:
+            return jsonify({'error': 'Job or door not found.'}), 404
+        if not job.bid or door.bid_id != job.bid_id:
+            return jsonify({'error': 'Door does not belong to the specified job'}), 400
+        if current_user.role == 'field' and job.truck_assignment != current_user.username:
+            return jsonify({'error': 'Forbidden: You are not assigned to this job.'}), 403
+
+        upload_session = upload_service.create_session(
+            current_user.id, job, door, media_type, filename.rsplit('.', 1)[1].lower(),
+            total_size, current_app.config['UPLOAD_FOLDER']
+        )
+        db.session.commit()
+
+        return jsonify({
+            'upload_id': upload_session.id,
+            'offset': 0,
+            'total_size': total_size,
+            'chunk_size': current_app.config.get('UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating upload session for door {door_id}: {e}", exc_info=True)
+        return jsonify({'error': 'Failed to create upload session.'}), 500
+
+@mobile_bp.route('/uploads/<string:upload_id>', methods=['PUT'])
+@login_required
+def upload_session_chunk(upload_id):
+    """
+    Append the raw request body at the offset given in the Upload-Offset header
+    (or ?offset=). Responds with the new offset; 409 carries the expected one.
+    """
+    offset = request.headers.get('Upload-Offset', request.args.get('offset'))
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Upload-Offset header is required.'}), 400
+
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    try:
+        upload_session = upload_service.get_session_for_update(upload_id, current_user.id)
+        written = upload_service.append_chunk(
+            upload_session, offset, request.stream, request.content_length, upload_folder
+        )
+        db.session.commit()
+        return jsonify({
+            'upload_id': upload_id,
+            'offset': upload_session.received_bytes,
+            'total_size': upload_session.total_size,
+            'received': written
+        }), 200
+
+    except upload_service.UploadSessionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error receiving chunk for upload {upload_id}: {e}", exc_info=True)
+        return jsonify({'error': 'Failed to store upload chunk.'}), 500
+
+@mobile_bp.route('/uploads/<string:upload_id>', methods=['GET'])
+@login_required
+def get_upload_session(upload_id):
+    """Report how many bytes were received so an interrupted upload can resume."""
+    upload_session = UploadSession.query.filter_by(id=upload_id, user_id=current_user.id).first()
+    if not upload_session:
+        return jsonify({'error': 'Upload session not found.'}), 404
+    return jsonify({
+        'upload_id': upload_session.id,
+        'offset': upload_session.received_bytes,
+        'total_size': upload_session.total_size,
+        'status': upload_session.status,
+        'media_id': upload_session.media_id
+    }), 200
+
+@mobile_bp.route('/uploads/<string:upload_id>/complete', methods=['POST'])
+@login_required
+def finalize_upload_session(upload_id):
+    """Verify the optional sha256 and turn the received file into a DoorMedia record."""
+    data = request.get_json(silent=True) or {}
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    final_path = None
+    try:
+        upload_session = upload_service.get_session_for_update(upload_id, current_user.id)
+        if upload_session.status == 'completed':
+            return jsonify({'success': True, 'message': 'Upload already finalized.', 'media_id': upload_session.media_id}), 200
+
+        door_media, final_path, created = upload_service.finalize_session(
+            upload_session, upload_folder, data.get('sha256'), current_user.id
+        )
+        if created:
+            enqueue_media_processing(door_media)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Media uploaded successfully.' if created else 'Media was already uploaded.',
+            'media_id': door_media.id,
+            'sha256': door_media.content_hash,
+            'processing_status': door_media.processing_status,
+            'duplicate': not created
+        }), 201 if created else 200
+
+    except upload_service.UploadSessionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        upload_service.rollback_finalize(upload_id, final_path, upload_folder)
+        logger.error(f"Error finalizing upload {upload_id}: {e}", exc_info=True)
+        return jsonify({'error': 'Failed to finalize upload.'}), 500
+
+@mobile_bp.route('/uploads/<string:upload_id>', methods=['DELETE'])
+@login_required
+def abort_upload_session(upload_id):
+    """Cancel an unfinished upload and delete what was received."""
+    try:
+        upload_session = upload_service.get_session_for_update(upload_id, current_user.id)
+        if upload_session.status == 'open':
+            upload_service.abort_session(upload_session, current_app.config['UPLOAD_FOLDER'])
+        db.session.commit()
+        return jsonify({'success': True, 'upload_id': upload_id, 'status': upload_session.status}), 200
+
+    except upload_service.UploadSessionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error aborting upload {upload_id}: {e}", exc_info=True)
+        return jsonify({'error': 'Failed to abort upload.'}), 500
+
 # In backend/routes/mobile.py
 
 @mobile_bp.route('/field-jobs', methods=['GET'])
@@ -549,10 +542,14 @@ def get_field_jobs():
     )
 
     # Sort by the job_order set in the dispatch calendar.
-    jobs = jobs_query.order_by(Job.job_order).all()
+    jobs = jobs_query.options(*_mobile_job_load_options()).order_by(Job.job_order).all()
     # --- END OF MODIFICATION ---
-    
-    serialized_jobs = [serialize_job_for_mobile(job) for job in jobs]
+
+    # Status and progress for the whole list are read from the progress rollup in one query.
+    rollups = progress_service.get_jobs_rollup(jobs)
+    serialized_jobs = [
+        serialize_job_for_mobile(job, rollups[job.id]['mobile_status'], rollups[job.id]) for job in jobs
+    ]
 
     summary = {
         "date": target_date.isoformat(),
@@ -584,9 +581,10 @@ def get_field_summary():
         Job.is_visible == True # Also apply visibility filter here for consistency
     ).all()
 
-    completed_today = len([job for job in today_jobs if get_job_mobile_status(job) == 'completed'])
-    in_progress_today = len([job for job in today_jobs if get_job_mobile_status(job) == 'started'])
-    not_started_today = len([job for job in today_jobs if get_job_mobile_status(job) == 'not_started'])
+    statuses = [rollup['mobile_status'] for rollup in progress_service.get_jobs_rollup(today_jobs).values()]
+    completed_today = statuses.count('completed')
+    in_progress_today = statuses.count('started')
+    not_started_today = statuses.count('not_started')
 
     summary_data = {
         "truck_assignment": current_user.username,
@@ -599,6 +597,147 @@ def get_field_summary():
     logger.info(f"Field tech '{current_user.username}' requested field summary. Data: {summary_data}")
     return jsonify(summary_data), 200
 
+def _serialize_media_manifest(media):
+    """Metadata for one uploaded file; devices fetch the bytes from the url when needed."""
+    return {
+        'id': media.id,
+        'job_id': media.job_id,
+        'door_id': media.door_id,
+        'media_type': media.media_type,
+        'file_size': media.file_size,
+        'processing_status': media.processing_status or 'ready',
+        'uploaded_at': media.uploaded_at.isoformat() if media.uploaded_at else None,
+        'url': f'/api/mobile/media/{media.id}/{media.media_type}'
+    }
+
+def _serialize_signature_summary(signature):
+    """Signature metadata without the (large) signature image."""
+    return {
+        'id': signature.id,
+        'job_id': signature.job_id,
+        'door_id': signature.door_id,
+        'signature_type': signature.signature_type,
+        'signer_name': signature.signer_name,
+        'signed_at': signature.signed_at.isoformat() if signature.signed_at else None
+    }
+
+def _synced_job_filter(truck):
+    """The jobs a truck's devices hold: its visible jobs scheduled for today or later."""
+    return (
+        Job.scheduled_date.isnot(None),
+        db.func.date(Job.scheduled_date) >= date.today(),
+        Job.truck_assignment == truck,
+        Job.is_visible == True
+    )
+
+@mobile_bp.route('/sync', methods=['GET'])
+@login_required
+def sync_field_changes():
+    """
+    Delta sync for offline devices.
+
+    Without `since` the response is a full snapshot of the truck's upcoming visible jobs.
+    With `since` (the cursor from the previous response) only what changed after it is
+    returned: job rows, door details (each door carries its complete line item list and
+    completion state), media manifests, signature metadata and tombstones under `deleted`.
+    Changed jobs that are no longer upcoming and visible come back as job tombstones, and a
+    job shown again is sent in full.
+    When `has_more` is true the client should call again right away with the new cursor.
+    Entities changed just before the cursor may be sent again (see SYNC_CURSOR_OVERLAP_SECONDS);
+    clients apply them like any other update. A `reset` response means the cursor is too old and the client must resync from scratch.
+    """
+    if not hasattr(current_user, 'role') or current_user.role not in ['field', 'admin']:
+        return jsonify({"error": "Forbidden: Insufficient permissions to sync field jobs."}), 403
+
+    truck = current_user.username
+    if current_user.role == 'admin' and request.args.get('truck'):
+        truck = request.args.get('truck')
+
+    since = request.args.get('since')
+    page_size = current_app.config.get('SYNC_PAGE_SIZE', 500)
+    retention_days = current_app.config.get('SYNC_CHANGE_RETENTION_DAYS', 30)
+    overlap = timedelta(seconds=current_app.config.get('SYNC_CURSOR_OVERLAP_SECONDS', 120))
+    # The next cursor rechecks from here, so take it before anything is read
+    read_started = datetime.utcnow()
+
+    try:
+        if since:
+            try:
+                since_sequence, issued_at = sync_service.decode_cursor(since)
+            except sync_service.SyncCursorError as e:
+                return jsonify({'error': str(e)}), 400
+            if sync_service.cursor_expired(issued_at, retention_days):
+                return jsonify({'reset': True, 'cursor': None, 'has_more': False}), 200
+
+            changes, next_sequence, has_more = sync_service.read_changes(
+                truck, since_sequence, page_size, recheck_from=issued_at - overlap
+            )
+            job_ids = changes['full_jobs'] | changes['refresh_jobs']
+            jobs = []
+            if job_ids:
+                jobs = Job.query.options(*_mobile_job_load_options()).filter(
+                    Job.id.in_(job_ids),
+                    *_synced_job_filter(truck)
+                ).order_by(Job.id).all()
+                # Changed jobs the snapshot would leave out (hidden, past or moved) are dropped
+                dropped = job_ids - {job.id for job in jobs}
+                if dropped:
+                    changes['deleted'].setdefault('jobs', set()).update(dropped)
+        else:
+            # Read the sequence before the snapshot so nothing committed meanwhile is skipped
+            next_sequence = sync_service.current_sequence()
+            has_more = False
+            jobs = Job.query.options(*_mobile_job_load_options()).filter(
+                *_synced_job_filter(truck)
+            ).order_by(Job.scheduled_date, Job.job_order).all()
+            changes = {
+                'full_jobs': {job.id for job in jobs}, 'doors_by_job': {},
+                'media_ids': set(), 'signature_ids': set(), 'deleted': {}
+            }
+
+        rollups = progress_service.get_jobs_rollup(jobs)
+        serialized_jobs = []
+        door_updates = []
+        for job in jobs:
+            job_data = serialize_job_for_mobile(job, rollups[job.id]['mobile_status'], rollups[job.id])
+            if job.id in changes['full_jobs']:
+                job_data['doors'] = load_mobile_job_doors(job)
+            elif changes['doors_by_job'].get(job.id):
+                for door_data in load_mobile_job_doors(job, changes['doors_by_job'][job.id]):
+                    door_data['job_id'] = job.id
+                    door_updates.append(door_data)
+            serialized_jobs.append(job_data)
+
+        visible_job_ids = [job.id for job in jobs]
+        media = []
+        signatures = []
+        if changes['media_ids'] and visible_job_ids:
+            media = DoorMedia.query.filter(
+                DoorMedia.id.in_(changes['media_ids']),
+                DoorMedia.job_id.in_(visible_job_ids)
+            ).order_by(DoorMedia.id).all()
+        if changes['signature_ids'] and visible_job_ids:
+            signatures = JobSignature.query.filter(
+                JobSignature.id.in_(changes['signature_ids']),
+                JobSignature.job_id.in_(visible_job_ids)
+            ).order_by(JobSignature.id).all()
+
+        return jsonify({
+            'cursor': sync_service.encode_cursor(next_sequence, read_started),
+            'has_more': has_more,
+            'full': not since,
+            'jobs': serialized_jobs,
+            'doors': door_updates,
+            'media': [_serialize_media_manifest(item) for item in media],
+            'signatures': [_serialize_signature_summary(signature) for signature in signatures],
+            'deleted': {entity_type: sorted(ids) for entity_type, ids in changes['deleted'].items()},
+            'server_time': datetime.utcnow().isoformat()
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error building sync response for truck '{truck}': {e}", exc_info=True)
+        return jsonify({'error': 'Failed to build sync response'}), 500
+
 @mobile_bp.route('/test', methods=['GET'])
 def mobile_test_connection():
     """Simple endpoint to test mobile API connectivity."""
@@ -643,50 +782,13 @@ def complete_mobile_door(door_id):
         if not data:
             return jsonify({'error': 'Request body is required.'}), 400
 
-        job_id = data.get('job_id')
-        signature_data = data.get('signature')
-        signer_name = data.get('signer_name', current_user.get_full_name())
-        signer_title = data.get('signer_title', 'Site Contact')
-
-        if not job_id or not signature_data:
-            return jsonify({'error': 'job_id and signature are required fields.'}), 400
-
-        job = Job.query.get_or_404(job_id)
-        door = Door.query.get_or_404(door_id)
-
-        if door.bid_id != job.bid_id:
-            return jsonify({'error': 'This door does not belong to the specified job.'}), 400
-
-        existing_signature = JobSignature.query.filter_by(
-            job_id=job_id,
-            door_id=door_id,
-            signature_type='door_complete'
-        ).first()
-
-        if existing_signature:
-            logger.warning(f"Attempted to re-complete door {door_id} for job {job_id}.")
-            return jsonify({'success': True, 'message': 'Door was already marked as complete.'}), 200
-
-        new_signature = JobSignature(
-            job_id=job_id,
-            door_id=door_id,
-            user_id=current_user.id,
-            signature_type='door_complete',
-            signature_data=signature_data,
-            signer_name=signer_name,
-            signer_title=signer_title
-        )
-        db.session.add(new_signature)
+        body, status_code = mobile_actions.complete_door(door_id, current_user, data)
         db.session.commit()
+        return jsonify(body), status_code
 
-        logger.info(f"User {current_user.username} completed door {door_id} for job {job_id}.")
-
-        return jsonify({
-            'success': True,
-            'message': f'Door {door_id} marked as complete.',
-            'signature_id': new_signature.id
-        }), 201
-
+    except mobile_actions.MobileActionError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error completing door {door_id}: {e}", exc_info=True)
@@ -716,7 +818,10 @@ def get_door_media(door_id):
             # Create a clean dictionary. The frontend only needs the ID to build the URL.
             media_dict = {
                 'id': item.id,
-                'uploaded_at': item.uploaded_at.isoformat()
+                'uploaded_at': item.uploaded_at.isoformat(),
+                'processing_status': item.processing_status or 'ready',
+                'has_thumbnail': bool(item.thumbnail_path),
+                'has_preview': bool(item.preview_path)
             }
             
             # We don't need to build a 'file_url' here because the frontend does it correctly.
@@ -789,62 +894,25 @@ def get_media_file(media_id, media_type):
     """
     Serves a specific media file by looking up its path in the database
     and using the centrally configured UPLOAD_FOLDER.
+
+    ?variant=thumbnail|preview|<size> serves the worker-made renditions once they exist.
+    Responses carry a strong ETag and support If-None-Match and Range requests.
     """
     try:
-        media_record = DoorMedia.query.get(media_id)
-
-        if not media_record:
-            logger.error(f"DATABASE MISS: Media with ID {media_id} not found.")
-            abort(404)
+        media_record = db.session.get(DoorMedia, media_id)
 
-        if media_record.media_type != media_type:
-            logger.error(f"TYPE MISMATCH: Requested '{media_type}' for media ID {media_id}, but DB says it is a '{media_record.media_type}'.")
+        if not media_record or media_record.media_type != media_type:
             abort(404)
 
-        # Get the upload folder from config
         upload_directory = current_app.config.get('UPLOAD_FOLDER')
         if not upload_directory:
             logger.error("UPLOAD_FOLDER not configured in app config")
             abort(500)
 
-        relative_file_path = media_record.file_path
-        full_file_path = os.path.join(upload_directory, relative_file_path)
-
-        logger.info(f"Serving request for media ID {media_id}")
-        logger.info(f"Upload directory: {upload_directory}")
-        logger.info(f"Relative file path: {relative_file_path}")
-        logger.info(f"Full file path: {full_file_path}")
-        logger.info(f"File exists: {os.path.exists(full_file_path)}")
-
-        # Check if file exists
-        if not os.path.exists(full_file_path):
-            logger.error(f"PHYSICAL FILE NOT FOUND: {full_file_path}")
-            
-            # Try to find the file in alternative locations
-            alternative_paths = [
-                os.path.join(os.getcwd(), 'uploads', relative_file_path),
-                os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uploads', relative_file_path),
-                os.path.join('backend', 'uploads', relative_file_path)
-            ]
-            
-            for alt_path in alternative_paths:
-                logger.info(f"Trying alternative path: {alt_path}")
-                if os.path.exists(alt_path):
-                    logger.info(f"Found file at alternative path: {alt_path}")
-                    directory = os.path.dirname(alt_path)
-                    filename = os.path.basename(alt_path)
-                    return send_from_directory(directory, filename)
-            
-            abort(404)
-
-        # Use send_from_directory for security
-        directory = os.path.dirname(full_file_path)
-        filename = os.path.basename(full_file_path)
-        
-        logger.info(f"Serving from directory: {directory}, filename: {filename}")
-        
-        return send_from_directory(directory, filename)
+        return media_delivery.serve_media(media_record, request.args.get('variant'), upload_directory)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error serving media file {media_id}: {str(e)}", exc_info=True)
         abort(500)
@@ -0,0 +1,34 @@
+# backend/routes/parts.py
+from flask import Blueprint, request, jsonify
+from flask_login import login_required
+from services import part_catalog
+import logging
+
+parts_bp = Blueprint('parts', __name__)
+logger = logging.getLogger(__name__)
+
+
+@parts_bp.route('/suggest', methods=['GET'])
+@login_required
+def suggest_parts():
+    """Typeahead for line item entry: ?q=<part number or description words>&limit=10"""
+    query = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', part_catalog.DEFAULT_LIMIT))
+    except ValueError:
+        limit = part_catalog.DEFAULT_LIMIT
+    if not query.strip():
+        return jsonify({'query': query, 'parts': [], 'source': 'index'})
+    try:
+        parts, source = part_catalog.suggest(query, limit)
+        return jsonify({
+            'query': query,
+            'parts': [
+                {'part_number': part_number, 'description': description, 'price': price, 'use_count': use_count}
+                for part_number, description, price, use_count in parts
+            ],
+            'source': source
+        })
+    except Exception as e:
+        logger.error(f"Error suggesting parts for {query!r}: {str(e)}")
+        return jsonify({'error': 'Failed to suggest parts'}), 500
@@ -0,0 +1,87 @@
+# backend/routes/price_book.py
+from flask import Blueprint, request, jsonify
+from flask_login import login_required
+from middleware.auth import admin_required
+from models import db, PriceBookEntry
+from services import price_book
+import logging
+
+price_book_bp = Blueprint('price_book', __name__)
+logger = logging.getLogger(__name__)
+
+
+@price_book_bp.route('', methods=['GET'])
+@login_required
+def get_price_book():
+    """List the price book, optionally only part numbers starting with ?prefix="""
+    try:
+        query = PriceBookEntry.query
+        prefix = request.args.get('prefix', '').strip()
+        if prefix:
+            query = query.filter(PriceBookEntry.part_number.startswith(prefix, autoescape=True))
+        return jsonify([{
+            'part_number': entry.part_number,
+            'description': entry.description,
+            'price': entry.price,
+            'supplier': entry.supplier,
+            'updated_at': entry.updated_at.isoformat() if entry.updated_at else None
+        } for entry in query.order_by(PriceBookEntry.part_number)])
+    except Exception as e:
+        logger.error(f"Error listing price book: {str(e)}")
+        return jsonify({'error': 'Failed to retrieve price book'}), 500
+
+
+@price_book_bp.route('', methods=['PUT'])
+@login_required
+@admin_required
+def update_price_book():
+    """
+    Add or update price book entries.
+    Expects a JSON body: { "entries": [{"part_number": "SPR-250", "price": 84.5, "description": ..., "supplier": ...}] }
+    """
+    data = request.get_json() or {}
+    rows = data.get('entries')
+    if not isinstance(rows, list) or not rows:
+        return jsonify({'error': "'entries' must be a non-empty list"}), 400
+    if not all(isinstance(row, dict) for row in rows):
+        return jsonify({'error': "Every entry must be an object"}), 400
+
+    entries, errors = price_book.parse_entries(rows)
+    if errors:
+        return jsonify({'success': False, 'errors': errors, 'message': 'No entries were saved.'}), 400
+    try:
+        created, updated = price_book.upsert_entries(entries)
+        db.session.commit()
+        return jsonify({'success': True, 'created': created, 'updated': updated}), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating price book: {str(e)}")
+        return jsonify({'error': 'Failed to update price book'}), 500
+
+
+@price_book_bp.route('/reprice', methods=['POST'])
+@login_required
+@admin_required
+def reprice_open_bids():
+    """
+    Reprice the line items of open bids from the price book.
+    JSON body (all optional): { "dry_run": true, "part_numbers": [...], "statuses": ["draft", "pending"] }
+    With dry_run (the default) nothing is written and the response is the diff that would be applied.
+    """
+    data = request.get_json(silent=True) or {}
+    dry_run = data.get('dry_run', True) is not False
+    part_numbers = data.get('part_numbers') or None
+    statuses = data.get('statuses') or price_book.OPEN_BID_STATUSES
+    if part_numbers is not None and not isinstance(part_numbers, list):
+        return jsonify({'error': "'part_numbers' must be a list"}), 400
+    if not isinstance(statuses, (list, tuple)) or 'approved' in statuses:
+        return jsonify({'error': "'statuses' must be a list of open bid statuses"}), 400
+    try:
+        report = price_book.reprice_open_bids(dry_run=dry_run, part_numbers=part_numbers, statuses=statuses)
+        if not dry_run:
+            db.session.commit()
+        return jsonify(report), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error repricing open bids: {str(e)}")
+        return jsonify({'error': 'Failed to reprice open bids'}), 500
@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required
 from models import db, Site
+from services.route_optimizer import parse_point
 import logging
 
 sites_bp = Blueprint('sites', __name__)  # Fixed: was **name**
@@ -18,6 +19,8 @@ def serialize_site(site):
         'contact_name': site.contact_name or '',
         'phone': site.phone or '',
         'email': site.email or '',
+        'latitude': site.latitude,
+        'longitude': site.longitude,
         'created_at': site.created_at.isoformat() if site.created_at else None
     }
 
@@ -43,6 +46,9 @@ def update_site(site_id):
         if 'name' in data:
             site.name = data['name']
         if 'address' in data:
+            if data['address'] != site.address and 'latitude' not in data and 'longitude' not in data:
+                # Coordinates cached for the old address would misplace the site on routes
+                site.latitude = site.longitude = None
             site.address = data['address']
         if 'lockbox_location' in data:
             site.lockbox_location = data['lockbox_location']
@@ -52,6 +58,12 @@ def update_site(site_id):
             site.phone = data['phone']
         if 'email' in data:
             site.email = data['email']
+        if 'latitude' in data or 'longitude' in data:
+            try:
+                point = parse_point(data.get('latitude'), data.get('longitude'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            site.latitude, site.longitude = point if point else (None, None)
         
         db.session.commit()
         return jsonify(serialize_site(site))
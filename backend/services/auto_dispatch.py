@@ -0,0 +1,220 @@
+# backend/services/auto_dispatch.py
+"""
+Auto-assign proposals for the dispatch board.
+
+A date's unassigned jobs are spread over the field trucks so that each truck's estimated
+hours (Estimate.estimated_hours; DISPATCH_DEFAULT_JOB_HOURS when missing) stay within its
+daily capacity, jobs go to trucks working their region where possible, and the load is
+balanced. Jobs already on a truck stay where they are and count against its capacity. Jobs
+whose material is not ready are held back unless asked for.
+
+The solver is a bin packing heuristic: first fit decreasing by hours, where each job takes
+the feasible truck with the best region match and the most spare capacity, followed by a
+local search of single-job moves and pairwise swaps that lower
+
+    sum of region penalties + sum over trucks of (load / capacity) ** 2
+
+until no move helps, retrying held-over jobs after every round. A truck's region comes from
+the request, then DISPATCH_TRUCK_REGIONS, then the most common region of its jobs that day.
+
+Nothing is written: the proposal carries the full assignment list and board version that
+POST /api/dispatch takes, so accepting it is an ordinary, version-checked save.
+"""
+
+from collections import Counter
+from flask import current_app
+from models import Job
+from services import dispatch_board
+
+REGION_MATCH = 0.0
+REGION_UNKNOWN = 0.25  # the truck has no region yet
+REGION_MISMATCH = 1.0  # worth more than any balancing gain from one job
+MAX_SEARCH_ROUNDS = 50
+EPSILON = 1e-9
+
+
+def region_penalty(job_region, truck_region):
+    if not job_region:
+        return REGION_MATCH
+    if not truck_region:
+        return REGION_UNKNOWN
+    return REGION_MATCH if job_region == truck_region else REGION_MISMATCH
+
+
+def solve(jobs, trucks):
+    """
+    Assign `jobs`, a list of (job_id, hours, region), to `trucks`, a list of
+    (name, capacity_hours, existing_hours, region).
+    Returns ({job_id: truck name}, [job_ids that fit nowhere]).
+    """
+    capacity = {name: cap for name, cap, _, _ in trucks}
+    load = {name: existing for name, _, existing, _ in trucks}
+    names = [name for name, cap, _, _ in trucks if cap > 0]
+    hours = {job_id: job_hours for job_id, job_hours, _ in jobs}
+    # penalty[job_id][truck]: looked up a few million times on large days
+    penalty = {job_id: {name: region_penalty(job_region, truck_region) for name, _, _, truck_region in trucks}
+               for job_id, _, job_region in jobs}
+
+    def fits(name, extra):
+        return load[name] + extra <= capacity[name] + EPSILON
+
+    def balance(name, new_load):
+        return (new_load * new_load - load[name] * load[name]) / (capacity[name] * capacity[name])
+
+    def place(job_id):
+        feasible = [name for name in names if fits(name, hours[job_id])]
+        if not feasible:
+            return False
+        best = min(feasible, key=lambda name: (penalty[job_id][name], (load[name] + hours[job_id]) / capacity[name]))
+        assignment[job_id] = best
+        load[best] += hours[job_id]
+        return True
+
+    def move_pass():
+        """Move single jobs to another truck; True if any move helped."""
+        improved = False
+        for job_id, current in list(assignment.items()):
+            job_hours = hours[job_id]
+            job_penalty = penalty[job_id]
+            for name in names:
+                if name == current or not fits(name, job_hours):
+                    continue
+                delta = (job_penalty[name] - job_penalty[current]
+                         + balance(current, load[current] - job_hours) + balance(name, load[name] + job_hours))
+                if delta < -EPSILON:
+                    load[current] -= job_hours
+                    load[name] += job_hours
+                    assignment[job_id] = current = name
+                    improved = True
+        return improved
+
+    def swap_pass():
+        """Let two jobs on different trucks trade places; True if any swap helped."""
+        improved = False
+        placed = list(assignment)
+        for index, first in enumerate(placed):
+            first_penalty = penalty[first]
+            for second in placed[index + 1:]:
+                truck_a, truck_b = assignment[first], assignment[second]
+                if truck_a == truck_b:
+                    continue
+                second_penalty = penalty[second]
+                region_delta = (first_penalty[truck_b] + second_penalty[truck_a]
+                                - first_penalty[truck_a] - second_penalty[truck_b])
+                shift = hours[second] - hours[first]  # change of truck_a's load
+                if shift == 0:
+                    delta = region_delta
+                elif fits(truck_a, shift) and fits(truck_b, -shift):
+                    delta = region_delta + balance(truck_a, load[truck_a] + shift) + balance(truck_b, load[truck_b] - shift)
+                else:
+                    continue
+                if delta < -EPSILON:
+                    load[truck_a] += shift
+                    load[truck_b] -= shift
+                    assignment[first], assignment[second] = truck_b, truck_a
+                    improved = True
+        return improved
+
+    assignment = {}
+    unplaced = [job_id for job_id, _, _ in sorted(jobs, key=lambda job: (-job[1], job[0])) if not place(job_id)]
+
+    for _ in range(MAX_SEARCH_ROUNDS):
+        # Swaps cost a pass over every pair, so they only run once single moves stop helping
+        improved = move_pass() or swap_pass()
+        # Rebalancing may have opened a gap for a job that did not fit before
+        still_unplaced = [job_id for job_id in unplaced if not place(job_id)]
+        improved = improved or len(still_unplaced) < len(unplaced)
+        unplaced = still_unplaced
+        if not improved:
+            break
+    return assignment, unplaced
+
+
+def _parse_truck_regions(setting):
+    """'truck1:NE,truck2:SW' -> {'truck1': 'NE', 'truck2': 'SW'}"""
+    regions = {}
+    for pair in (setting or '').split(','):
+        if ':' in pair:
+            name, truck_region = pair.split(':', 1)
+            regions[name.strip()] = truck_region.strip() or None
+    return regions
+
+
+def propose(target_date, capacities=None, regions=None, include_unready=False):
+    """
+    Auto-assign proposal for the unassigned jobs of `target_date`. `capacities` and
+    `regions` ({truck: hours}, {truck: region}) override the configured ones.
+    Raises ValueError for invalid overrides.
+    """
+    config = current_app.config
+    default_capacity = float(config.get('DISPATCH_TRUCK_CAPACITY_HOURS', 8.0))
+    default_hours = float(config.get('DISPATCH_DEFAULT_JOB_HOURS', 2.0))
+    capacities = capacities or {}
+    truck_regions = {**_parse_truck_regions(config.get('DISPATCH_TRUCK_REGIONS')), **(regions or {})}
+    for name, value in capacities.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f'Invalid capacity {value!r} for {name}')
+
+    rows = dispatch_board.board_query().filter(Job.scheduled_date == target_date).all()
+    trucks = dispatch_board.field_usernames()
+    version = dispatch_board.board_version((row.id, row.truck_assignment, row.job_order, row.is_visible) for row in rows)
+
+    def job_hours(row):
+        return float(row.estimated_hours) if row.estimated_hours and row.estimated_hours > 0 else default_hours
+
+    on_truck = {name: [] for name in trucks}
+    waiting = []
+    for row in rows:
+        if row.truck_assignment in on_truck:
+            on_truck[row.truck_assignment].append(row)
+        else:
+            waiting.append(row)
+
+    truck_specs = []
+    for name in trucks:
+        seen_regions = Counter(row.region for row in on_truck[name] if row.region)
+        truck_region = truck_regions.get(name) or (seen_regions.most_common(1)[0][0] if seen_regions else None)
+        truck_specs.append((name, float(capacities.get(name, default_capacity)),
+                            sum(job_hours(row) for row in on_truck[name]), truck_region))
+
+    held = [row for row in waiting if not row.material_ready and not include_unready]
+    candidates = [row for row in waiting if row.material_ready or include_unready]
+    assignment, unplaced = solve([(row.id, job_hours(row), row.region) for row in candidates], truck_specs)
+
+    # Existing jobs keep their place; new ones follow in board order
+    assignments = []
+    proposed = {name: [] for name in trucks}
+    for name in trucks:
+        for row in on_truck[name]:
+            assignments.append({'job_id': row.id, 'truck_assignment': name, 'job_order': len(proposed[name]),
+                                'is_visible': row.is_visible})
+            proposed[name].append(row.id)
+    for row in candidates:
+        name = assignment.get(row.id)
+        if name:
+            assignments.append({'job_id': row.id, 'truck_assignment': name, 'job_order': len(proposed[name]),
+                                'is_visible': False})
+            proposed[name].append(row.id)
+
+    hours_by_job = {row.id: job_hours(row) for row in rows}
+    region_by_job = {row.id: row.region for row in candidates}
+    return {
+        'date': target_date.isoformat(),
+        'version': version,
+        'assignments': assignments,
+        'trucks': [{
+            'truck': name,
+            'region': truck_region,
+            'capacity_hours': capacity,
+            'existing_hours': round(existing, 2),
+            'proposed_hours': round(sum(hours_by_job[job_id] for job_id in proposed[name]), 2),
+            'new_job_ids': [job_id for job_id in proposed[name] if job_id in assignment],
+            'region_mismatches': sum(
+                1 for job_id in proposed[name] if job_id in assignment
+                and region_penalty(region_by_job[job_id], truck_region) == REGION_MISMATCH
+            ),
+        } for name, capacity, existing, truck_region in truck_specs],
+        'unassigned': [{'job_id': row.id, 'reason': 'material_not_ready'} for row in held]
+                      + [{'job_id': job_id, 'reason': 'over_capacity'} for job_id in unplaced],
+        'assumed_hours_job_ids': [row.id for row in candidates if not (row.estimated_hours and row.estimated_hours > 0)],
+    }
@@ -9,8 +9,7 @@ from datetime import datetime, timedelta
 from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
 from azure.core.exceptions import ResourceNotFoundError, AzureError
 from werkzeug.utils import secure_filename
-from PIL import Image
-import io
+from services import thumbnails
 
 logger = logging.getLogger(__name__)
 
@@ -181,21 +180,10 @@ class AzureStorageService:
     def _create_thumbnail(self, image_content: bytes, size: Tuple[int, int] = (150, 150)) -> Optional[bytes]:
         """Create a thumbnail from image content"""
         try:
-            with Image.open(io.BytesIO(image_content)) as img:
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Create thumbnail
-                img.thumbnail(size, Image.Resampling.LANCZOS)
-                
-                # Save to bytes
-                output = io.BytesIO()
-                img.save(output, format='JPEG', quality=85, optimize=True)
-                output.seek(0)
-                
-                return output.read()
-                
+            box = max(size)
+            data, _ = thumbnails.render(image_content, [box], 'JPEG')[box]
+            return data
+
         except Exception as e:
             logger.error(f"Thumbnail creation failed: {e}")
             return None
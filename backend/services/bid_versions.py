@@ -0,0 +1,97 @@
+# backend/services/bid_versions.py
+"""
+Version counter of a bid's door and line item tree, used as the bid detail ETag.
+
+Every flush that inserts, changes or deletes a door or line item bumps Bid.version of the
+bids involved with one UPDATE. Writes made with bulk or Core statements never reach the
+flush, so their callers call bump() directly. The ETag also covers the bid's own columns and
+its customer and site details, which GET /api/bids/<id> prints but which are not part of the
+tree; all of them come from one narrow query, so answering a 304 never loads the doors.
+"""
+
+import hashlib
+from sqlalchemy import event, select, update, func, inspect
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm.util import identity_key
+from models import db, Bid, Estimate, Customer, Site, Door, LineItem
+from services import pricing
+
+
+def _loaded_bids(session, bid_ids):
+    return [
+        instance for instance in (session.identity_map.get(identity_key(Bid, bid_id)) for bid_id in bid_ids)
+        if instance is not None
+    ]
+
+
+def bump(bid_ids=(), door_ids=(), session=None):
+    """Increment the version of the given bids and of the bids owning `door_ids`, in the caller's transaction."""
+    session = session or db.session
+    connection = session.connection()
+    bid_ids = set(bid_ids)
+    door_ids = set(door_ids)
+    if door_ids:
+        bid_ids.update(bid_id for (bid_id,) in connection.execute(
+            select(Door.bid_id).where(Door.id.in_(door_ids)).distinct()
+        ))
+    bid_ids.discard(None)
+    if not bid_ids:
+        return
+
+    connection.execute(
+        update(Bid.__table__).where(Bid.__table__.c.id.in_(bid_ids)).values(
+            version=func.coalesce(Bid.__table__.c.version, 0) + 1
+        )
+    )
+    # Loaded bids would otherwise keep serving the old number
+    loaded = _loaded_bids(session, bid_ids)
+    if loaded:
+        versions = dict(connection.execute(
+            select(Bid.id, Bid.version).where(Bid.id.in_([bid.id for bid in loaded]))
+        ).all())
+        for bid in loaded:
+            attributes.set_committed_value(bid, 'version', versions[bid.id])
+
+
+@event.listens_for(db.session, 'after_flush')
+def bump_changed_bids(session, flush_context):
+    """Bump the bids whose doors or line items this flush wrote."""
+    bid_ids = set()
+    door_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Door):
+            bid_ids.add(obj.bid_id)
+        elif isinstance(obj, LineItem):
+            door_ids.add(obj.door_id)
+    for obj in session.dirty:
+        if isinstance(obj, (Door, LineItem)) and session.is_modified(obj, include_collections=False):
+            if isinstance(obj, Door):
+                bid_ids.add(obj.bid_id)
+                bid_ids.update(inspect(obj).attrs.bid_id.history.deleted)
+            else:
+                door_ids.add(obj.door_id)
+                door_ids.update(inspect(obj).attrs.door_id.history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, Door):
+            bid_ids.add(obj.bid_id)
+        elif isinstance(obj, LineItem):
+            door_ids.add(obj.door_id)
+
+    door_ids.discard(None)
+    if bid_ids or door_ids:
+        bump(bid_ids, door_ids, session)
+
+
+def bid_etag(bid_id):
+    """The ETag of GET /api/bids/<bid_id>, or None when there is no such bid."""
+    row = db.session.query(
+        Bid.version, Bid.status, Bid.estimate_id, Bid.created_at,
+        *[getattr(Bid, field) for field in pricing.BID_TOTAL_FIELDS],
+        Customer.name, Site.address, Site.contact_name, Site.phone
+    ).select_from(Bid).join(Estimate, Bid.estimate_id == Estimate.id).outerjoin(
+        Customer, Estimate.customer_id == Customer.id
+    ).outerjoin(Site, Estimate.site_id == Site.id).filter(Bid.id == bid_id).first()
+    if row is None:
+        return None
+    header = hashlib.sha256(repr(tuple(row[1:])).encode('utf-8')).hexdigest()[:16]
+    return f"{bid_id}-{row.version or 0}-{header}"
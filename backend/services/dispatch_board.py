@@ -0,0 +1,302 @@
+# backend/services/dispatch_board.py
+"""
+Reading and saving the dispatch board.
+
+A board is one date's jobs split into truck columns (one per field user) and an unassigned
+list. It is built from two queries: the field usernames, and one joined projection of the
+jobs with the customer, site and estimate columns the cards show. No Job, Bid or Estimate
+objects are loaded, so the query count does not grow with the number of jobs. Rows arrive in
+board order (date, job_order, then id) from a range scan of ix_jobs_scheduled_date_order, and
+appending them keeps every column sorted.
+
+A date range (week and month views) is the same two queries with a BETWEEN on the date,
+grouped into one board per day in a single pass. Its compact form sends each card as a list
+of values under one shared field list, without the long text fields, and leaves out empty
+days.
+
+Every board carries a version: a hash of its jobs' (id, truck, order, visibility) tuples. A
+save names the version it was made from and is refused with the current board when the jobs
+have moved on since, so two dispatchers cannot silently overwrite each other. An accepted save
+writes only the jobs whose tuple actually changes, with one executemany UPDATE, and returns
+those changes and the new version.
+
+A truck's day can also be put in a suggested driving order (services/route_optimizer) from
+the coordinates cached on its sites; the suggestion is only returned, and the dispatcher
+saves it like any other board change.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from sqlalchemy import update, bindparam
+from models import db, Job, Bid, Estimate, Customer, Site, User
+from models.sync import record_bulk_job_changes
+from services import route_optimizer
+
+# (label, column) pairs of the board projection
+BOARD_COLUMNS = (
+    ('id', Job.id),
+    ('job_number', Job.job_number),
+    ('customer_name', Customer.name),
+    ('address', Site.address),
+    ('contact_name', Site.contact_name),
+    ('phone', Site.phone),
+    ('job_scope', Job.job_scope),
+    ('estimated_hours', Estimate.estimated_hours),
+    ('material_ready', Job.material_ready),
+    ('material_location', Job.material_location),
+    ('region', Job.region),
+    ('status', Job.status),
+    ('scheduled_date', Job.scheduled_date),
+    ('is_visible', Job.is_visible),
+    ('job_order', Job.job_order),
+    ('truck_assignment', Job.truck_assignment),
+    ('latitude', Site.latitude),
+    ('longitude', Site.longitude),
+)
+
+# What a dispatch save sets on a job; a job left off the submitted list gets UNASSIGNED
+UNASSIGNED = (None, 0, False)  # (truck_assignment, job_order, is_visible)
+# Statuses a job leaves for 'scheduled' once it is put on the board
+UNSCHEDULED_STATUSES = ('unscheduled', 'unassigned', None)
+
+# Card fields of the compact range encoding; 'truck' is an index into the range's trucks list
+COMPACT_FIELDS = ('id', 'job_number', 'customer_name', 'address', 'job_scope', 'status', 'region',
+                  'material_ready', 'is_visible', 'job_order', 'truck')
+
+
+def field_usernames():
+    """Usernames of the field users, i.e. the truck columns, in a stable order."""
+    return [username for (username,) in db.session.query(User.username).filter(User.role == 'field').order_by(User.id)]
+
+
+def board_query():
+    """Joined projection of the board cards; callers add the date filter."""
+    return db.session.query(*(column.label(label) for label, column in BOARD_COLUMNS)) \
+        .select_from(Job) \
+        .outerjoin(Bid, Bid.id == Job.bid_id) \
+        .outerjoin(Estimate, Estimate.id == Bid.estimate_id) \
+        .outerjoin(Customer, Customer.id == Estimate.customer_id) \
+        .outerjoin(Site, Site.id == Estimate.site_id) \
+        .order_by(Job.scheduled_date, Job.job_order.nullslast(), Job.id)
+
+
+def serialize_row(row):
+    """A board card from a board_query() row, in the shape the dispatch calendar expects."""
+    return {
+        'id': row.id,
+        'job_number': row.job_number,
+        'customer_name': row.customer_name or 'N/A',
+        'address': row.address or 'N/A',
+        'contact_name': row.contact_name,
+        'phone': row.phone,
+        'job_scope': row.job_scope,
+        'estimated_hours': row.estimated_hours,
+        'material_ready': row.material_ready,
+        'material_location': row.material_location,
+        'region': row.region,
+        'status': row.status,
+        'scheduled_date': row.scheduled_date.isoformat() if row.scheduled_date else None,
+        'is_visible': row.is_visible,
+        'job_order': row.job_order,
+    }
+
+
+def _empty_board(trucks):
+    return {'unassigned': [], 'trucks': {username: [] for username in trucks}}
+
+
+def _place(board, row):
+    column = board['trucks'].get(row.truck_assignment) if row.truck_assignment else None
+    # No assignment, or a truck that is no longer a field user: unassigned
+    (column if column is not None else board['unassigned']).append(serialize_row(row))
+
+
+def build_board(rows, trucks):
+    """Split board rows into {'unassigned': [...], 'trucks': {username: [...]}}."""
+    board = _empty_board(trucks)
+    for row in rows:
+        _place(board, row)
+    return board
+
+
+def board_version(states):
+    """Version token of a board from its (job_id, truck_assignment, job_order, is_visible) tuples."""
+    digest = hashlib.sha1()
+    for state in sorted(states, key=lambda state: state[0]):
+        digest.update(repr(state).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_board(target_date):
+    """The dispatch board of one date with its version, in two queries."""
+    rows = board_query().filter(Job.scheduled_date == target_date).all()
+    board = build_board(rows, field_usernames())
+    board['version'] = board_version((row.id, row.truck_assignment, row.job_order, row.is_visible) for row in rows)
+    return board
+
+
+def _range_rows(start, end):
+    return board_query().filter(Job.scheduled_date >= start, Job.scheduled_date <= end).all()
+
+
+def load_range(start, end):
+    """One board per day from start to end inclusive, empty days included, in two queries."""
+    trucks = field_usernames()
+    days = {}
+    day = start
+    while day <= end:
+        days[day.isoformat()] = _empty_board(trucks)
+        day += timedelta(days=1)
+    for row in _range_rows(start, end):
+        _place(days[row.scheduled_date.isoformat()], row)
+    return {'start': start.isoformat(), 'end': end.isoformat(), 'trucks': trucks, 'days': days}
+
+
+def load_range_compact(start, end):
+    """
+    The range as {'fields': COMPACT_FIELDS, 'trucks': [...], 'days': {date: [card, ...]}}, each
+    card a list of values in field order and every day's cards in board order. Days without
+    jobs are left out.
+    """
+    trucks = field_usernames()
+    truck_index = {username: index for index, username in enumerate(trucks)}
+    days = {}
+    for row in _range_rows(start, end):
+        days.setdefault(row.scheduled_date.isoformat(), []).append([
+            row.id, row.job_number, row.customer_name or 'N/A', row.address or 'N/A', row.job_scope, row.status,
+            row.region, row.material_ready, row.is_visible, row.job_order, truck_index.get(row.truck_assignment),
+        ])
+    return {'start': start.isoformat(), 'end': end.isoformat(), 'fields': list(COMPACT_FIELDS),
+            'trucks': trucks, 'days': days}
+
+
+# --- Saving ---
+
+class DispatchSaveError(Exception):
+    """A dispatch save was rejected; carries the HTTP status to return."""
+
+    def __init__(self, message, status_code=400, **details):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.details = details
+
+    def to_dict(self):
+        return {'error': self.message, **self.details}
+
+
+def parse_assignments(assignments):
+    """{job_id: (truck_assignment, job_order, is_visible)} from the submitted assignment list."""
+    wanted = {}
+    for assignment in assignments:
+        if not isinstance(assignment, dict):
+            raise DispatchSaveError('Every assignment must be an object')
+        job_id = assignment.get('job_id')
+        if not isinstance(job_id, int) or isinstance(job_id, bool):
+            raise DispatchSaveError(f'Invalid job_id {job_id!r}')
+        job_order = assignment.get('job_order')
+        try:
+            job_order = int(job_order) if job_order is not None else 0
+        except (TypeError, ValueError):
+            raise DispatchSaveError(f'Invalid job_order {job_order!r} for job {job_id}')
+        truck = assignment.get('truck_assignment') or None
+        wanted[job_id] = (str(truck) if truck is not None else None, job_order, bool(assignment.get('is_visible', False)))
+    return wanted
+
+
+def save_assignments(target_date, assignments, version=None):
+    """
+    Make the board of `target_date` match `assignments`; jobs of the date left off the list
+    become unassigned. Without a `version` (older clients) the save is not checked against
+    concurrent ones. Returns {'changes', 'version', 'count', 'ignored_job_ids'}; committed by
+    the caller.
+    """
+    wanted = parse_assignments(assignments)
+    # Lock the date's jobs (PostgreSQL) so the version check and the write see the same board
+    rows = db.session.query(
+        Job.id, Job.truck_assignment, Job.job_order, Job.is_visible, Job.status
+    ).filter(Job.scheduled_date == target_date).order_by(Job.id).with_for_update().all()
+
+    current_version = board_version((row.id, row.truck_assignment, row.job_order, row.is_visible) for row in rows)
+    if version is not None and version != current_version:
+        raise DispatchSaveError('The dispatch board was changed by someone else. Review it and save again.', 409,
+                                version=current_version, board=load_board(target_date))
+
+    changes = []
+    for row in rows:
+        truck, job_order, is_visible = wanted.get(row.id, UNASSIGNED)
+        status = 'scheduled' if row.id in wanted and row.status in UNSCHEDULED_STATUSES else row.status
+        if (truck, job_order, is_visible, status) != (row.truck_assignment, row.job_order, row.is_visible, row.status):
+            changes.append({'id': row.id, 'truck_assignment': truck, 'job_order': job_order,
+                            'is_visible': is_visible, 'status': status, 'previous_truck': row.truck_assignment,
+                            'shown': bool(is_visible and not row.is_visible)})
+
+    if changes:
+        table = Job.__table__
+        now = datetime.utcnow()
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('_id')).values(
+                truck_assignment=bindparam('truck_assignment'),
+                job_order=bindparam('job_order'),
+                is_visible=bindparam('is_visible'),
+                status=bindparam('status'),
+                updated_at=now
+            ),
+            [{'_id': change['id'], **{field: change[field] for field in
+                                      ('truck_assignment', 'job_order', 'is_visible', 'status')}}
+             for change in changes]
+        )
+        record_bulk_job_changes(db.session, [
+            (change['id'], change['previous_truck'], change['truck_assignment'], change['shown'])
+            for change in changes
+        ])
+
+    on_date = {row.id for row in rows}
+    for change in changes:
+        del change['previous_truck'], change['shown']
+    return {
+        'changes': changes,
+        'version': board_version((job_id, *wanted.get(job_id, UNASSIGNED)) for job_id in on_date),
+        'count': len(on_date.intersection(wanted)),
+        'ignored_job_ids': sorted(set(wanted) - on_date),
+    }
+
+
+# --- Route suggestions ---
+
+def suggest_route(target_date, truck, first_job_id=None, last_job_id=None, depot=None):
+    """
+    Suggested order of `truck`'s jobs on `target_date` for the shortest drive, from the
+    depot when given. Jobs whose site has no cached coordinates cannot be placed and keep
+    their current order after the others (before a job pinned last). Raises ValueError for pins that cannot be honoured.
+    """
+    rows = board_query().filter(Job.scheduled_date == target_date, Job.truck_assignment == truck).all()
+    points = {row.id: (row.latitude, row.longitude) for row in rows
+              if row.latitude is not None and row.longitude is not None}
+    current = [row.id for row in rows]
+    for label, job_id in (('first', first_job_id), ('last', last_job_id)):
+        if job_id is not None and job_id not in points:
+            raise ValueError(f'Job {job_id} pinned {label} is not on {truck} for {target_date.isoformat()}'
+                             if job_id not in current else f'Job {job_id} pinned {label} has no site coordinates')
+    if first_job_id is not None and first_job_id == last_job_id and len(points) > 1:
+        raise ValueError('The same job cannot be pinned first and last')
+
+    located = [job_id for job_id in current if job_id in points]
+    unlocated = [job_id for job_id in current if job_id not in points]
+    if located:
+        order, distance = route_optimizer.optimize_route(
+            [(job_id, points[job_id]) for job_id in located], first=first_job_id, last=last_job_id, depot=depot
+        )
+    else:
+        order, distance = [], 0.0
+    current_distance = route_optimizer.route_km([points[job_id] for job_id in located], depot)
+    return {
+        'date': target_date.isoformat(),
+        'truck': truck,
+        'order': order[:-1] + unlocated + order[-1:] if last_job_id is not None else order + unlocated,
+        'current_order': current,
+        'distance_km': round(distance, 2),
+        'current_distance_km': round(current_distance, 2),
+        'unlocated_job_ids': unlocated,
+        'from_depot': depot is not None,
+    }
@@ -0,0 +1,122 @@
+# backend/services/door_duplication.py
+"""
+Copy one door's line items to many doors of the same bid with a fixed number of statements.
+
+The target door numbers are matched against the bid in one query. Missing doors are inserted
+with one executemany that returns their ids, and the line items are copied with a single
+INSERT ... SELECT that crosses the source door's items with the target doors. These writes
+bypass the session flush, so the stored totals, the bid version and the sync log are brought
+up to date here.
+"""
+
+from sqlalchemy import select, insert, delete
+from models import db, Door, LineItem
+from models.sync import record_bulk_changes
+from services import pricing, bid_versions
+from services.progress_service import adjust_total_doors
+
+# Line item columns copied to the target doors
+COPIED_FIELDS = ('part_number', 'description', 'quantity', 'price', 'labor_hours', 'hardware')
+
+
+def parse_door_numbers(values):
+    """
+    Distinct door numbers in request order. Integers and strings of digits are accepted;
+    anything else (6.7, '6.7', True, ' 5') raises ValueError rather than being coerced.
+    """
+    numbers = []
+    for value in values:
+        if isinstance(value, int) and not isinstance(value, bool):
+            number = value
+        elif isinstance(value, str) and value.isascii() and value.isdigit():
+            number = int(value)
+        else:
+            raise ValueError(f'Invalid door number {value!r}')
+        if number not in numbers:
+            numbers.append(number)
+    return numbers
+
+
+def duplicate_line_items(source_door, door_numbers, replace_existing=True):
+    """
+    Copy the line items of `source_door` to the doors numbered `door_numbers` in its bid.
+
+    A number without a door gets a new one with the source's location and type. A number
+    that already has a door has its line items replaced when `replace_existing` is set and
+    is left alone otherwise. The source's own number is never a target. Runs in the caller's
+    transaction and returns a dict with `targets` ({'id', 'door_number', 'created'} per door
+    copied to, in request order), `created_ids` and `skipped_numbers`.
+    """
+    bid_id = source_door.bid_id
+    door_numbers = [number for number in door_numbers if number != source_door.door_number]
+    if not door_numbers:
+        return {'targets': [], 'created_ids': [], 'skipped_numbers': []}
+
+    existing = {}
+    for door_id, door_number in db.session.query(Door.id, Door.door_number).filter(
+        Door.bid_id == bid_id,
+        Door.door_number.in_(door_numbers)
+    ).order_by(Door.id):
+        existing.setdefault(door_number, door_id)  # the oldest door when a number is duplicated
+
+    new_numbers = [number for number in door_numbers if number not in existing]
+    created = {}
+    if new_numbers:
+        rows = db.session.execute(
+            insert(Door).returning(Door.id, Door.door_number),
+            [
+                {'bid_id': bid_id, 'door_number': number, 'location': source_door.location,
+                 'door_type': source_door.door_type}
+                for number in new_numbers
+            ]
+        )
+        created = {door_number: door_id for door_id, door_number in rows}  # numbers are distinct
+
+    targets = []
+    skipped_numbers = []
+    for number in door_numbers:
+        if number in created:
+            targets.append({'id': created[number], 'door_number': number, 'created': True})
+        elif replace_existing:
+            targets.append({'id': existing[number], 'door_number': number, 'created': False})
+        else:
+            skipped_numbers.append(number)
+    target_ids = [target['id'] for target in targets]
+    sync_entries = [('door', door_id, 'upsert', door_id) for door_id in created.values()]
+
+    replaced_ids = [target['id'] for target in targets if not target['created']]
+    if replaced_ids:
+        removed = db.session.query(LineItem.id, LineItem.door_id).filter(LineItem.door_id.in_(replaced_ids)).all()
+        if removed:
+            db.session.execute(
+                delete(LineItem).where(LineItem.door_id.in_(replaced_ids)),
+                execution_options={'synchronize_session': False}
+            )
+            sync_entries.extend(('line_item', item_id, 'delete', door_id) for item_id, door_id in removed)
+
+    if target_ids:
+        line_items = LineItem.__table__
+        doors = Door.__table__
+        db.session.execute(insert(line_items).from_select(
+            ['door_id', *COPIED_FIELDS],
+            select(doors.c.id, *[line_items.c[field] for field in COPIED_FIELDS])
+            .select_from(line_items.join(doors, doors.c.id.in_(target_ids)))
+            .where(line_items.c.door_id == source_door.id)
+            .order_by(doors.c.id, line_items.c.id)
+        ))
+        sync_entries.extend(
+            ('line_item', item_id, 'upsert', door_id) for item_id, door_id in db.session.query(
+                LineItem.id, LineItem.door_id
+            ).filter(LineItem.door_id.in_(target_ids))
+        )
+
+        pricing.refresh_totals(target_ids)
+        bid_versions.bump([bid_id])
+        record_bulk_changes(db.session, sync_entries)
+    adjust_total_doors(bid_id, len(created))
+
+    return {
+        'targets': targets,
+        'created_ids': [created[number] for number in new_numbers],
+        'skipped_numbers': skipped_numbers,
+    }
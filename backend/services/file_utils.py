@@ -1,48 +1,82 @@
 # backend/services/file_utils.py
 import os
 from io import BytesIO
+from types import SimpleNamespace
 from datetime import datetime
 from flask import make_response
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
 from reportlab.lib.units import inch
-from reportlab.lib import colors
+from services import pricing
+from services import pdf_templates as templates
+from services.pdf_templates import money
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when the layout of either document changes, so cached PDFs are not served again
+PDF_TEMPLATE_VERSION = 2
+
+
 def generate_bid_report(bid):
     """Generate a PDF report for a bid"""
+    response = make_response(render_bid_report(bid))
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = f'attachment; filename=bid_report_{bid.id}.pdf'
+    return response
+
+def load_document_data(bid, with_line_items=True):
+    """
+    Plain, picklable copy of everything the report and proposal print, so a document can be
+    built without a database session (e.g. in a render worker process).
+    """
+    customer = bid.estimate.customer_direct_link
+    priced = pricing.load_priced_bid(bid, with_line_items=with_line_items)
+    return {
+        'bid_id': bid.id,
+        'customer': SimpleNamespace(
+            name=customer.name,
+            address=customer.address,
+            contact_name=customer.contact_name,
+            phone=customer.phone,
+            email=customer.email
+        ),
+        'doors': [SimpleNamespace(id=door.id, door_number=door.door_number) for door in priced['doors']],
+        'line_items': {
+            door_id: [
+                SimpleNamespace(
+                    part_number=item.part_number,
+                    description=item.description,
+                    quantity=item.quantity,
+                    price=item.price,
+                    labor_hours=item.labor_hours,
+                    hardware=item.hardware
+                )
+                for item in items
+            ]
+            for door_id, items in priced['line_items'].items()
+        },
+        'door_totals': priced['door_totals'],
+        'totals': priced['totals'],
+    }
+
+def render_bid_report(bid):
+    """Bytes of the PDF report for a bid"""
+    return build_bid_report(load_document_data(bid))
+
+def build_bid_report(document):
+    """Bytes of the PDF report for the output of load_document_data"""
     try:
-        # Get all necessary data
-        customer = bid.estimate.customer_direct_link
-        doors = bid.doors
+        bid_id = document['bid_id']
+        customer = document['customer']
+        doors = document['doors']
         
-        # Calculate all the necessary values
-        total_parts_cost = 0
-        total_labor_cost = 0
-        total_hardware_cost = 0
-        
-        for door in doors:
-            door_parts_cost = 0
-            door_labor_cost = 0
-            door_hardware_cost = 0
-            
-            for item in door.line_items:
-                item_total = item.price * item.quantity
-                door_parts_cost += item_total
-                door_labor_cost += item.labor_hours * 47.02  # $47.02 per hour labor rate
-                door_hardware_cost += item.hardware
-                
-            total_parts_cost += door_parts_cost
-            total_labor_cost += door_labor_cost
-            total_hardware_cost += door_hardware_cost
-        
-        # Calculate tax (8.75%)
-        tax_rate = 0.0875
-        tax_amount = (total_parts_cost + total_hardware_cost) * tax_rate
-        total_cost = total_parts_cost + total_labor_cost + total_hardware_cost + tax_amount
+        totals = document['totals']
+        total_parts_cost = totals['total_parts_cost']
+        total_labor_cost = totals['total_labor_cost']
+        total_hardware_cost = totals['total_hardware_cost']
+        tax_amount = totals['tax_amount']
+        total_cost = totals['total_cost']
         
         # Create a PDF buffer
         buffer = BytesIO()
@@ -60,15 +94,13 @@ def generate_bid_report(bid):
         # Container for the 'Flowable' objects
         elements = []
         
-        # Define styles
-        styles = getSampleStyleSheet()
-        title_style = styles['Heading1']
-        heading2_style = styles['Heading2']
-        heading3_style = styles['Heading3']
-        normal_style = styles['Normal']
+        title_style = templates.TITLE_STYLE
+        heading2_style = templates.HEADING2_STYLE
+        heading3_style = templates.HEADING3_STYLE
+        normal_style = templates.NORMAL_STYLE
         
         # Add the report title
-        elements.append(Paragraph(f"Bid Report #{bid.id}", title_style))
+        elements.append(Paragraph(f"Bid Report #{bid_id}", title_style))
         elements.append(Spacer(1, 0.25*inch))
         
         # Add the date
@@ -97,24 +129,15 @@ def generate_bid_report(bid):
         
         summary_data = [
             ["Description", "Amount"],
-            ["Total Parts Cost", f"${total_parts_cost:.2f}"],
-            ["Total Labor Cost", f"${total_labor_cost:.2f}"],
-            ["Total Hardware Cost", f"${total_hardware_cost:.2f}"],
-            ["Tax (8.75%)", f"${tax_amount:.2f}"],
-            ["Total Cost", f"${total_cost:.2f}"]
+            ["Total Parts Cost", money(total_parts_cost)],
+            ["Total Labor Cost", money(total_labor_cost)],
+            ["Total Hardware Cost", money(total_hardware_cost)],
+            [f"Tax ({pricing.TAX_RATE * 100:g}%)", money(tax_amount)],
+            ["Total Cost", money(total_cost)]
         ]
         
         summary_table = Table(summary_data)
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (1, 0), colors.black),
-            ('ALIGN', (0, 0), (1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (1, 0), 12),
-            ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-            ('FONTNAME', (0, -1), (1, -1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        summary_table.setStyle(templates.SUMMARY_TABLE_STYLE)
         
         elements.append(summary_table)
         elements.append(Spacer(1, 0.25*inch))
@@ -124,46 +147,9 @@ def generate_bid_report(bid):
         
         for door in doors:
             elements.append(Paragraph(f"Door #{door.door_number}", heading3_style))
-            
-            # Calculate door totals
-            door_parts_cost = 0
-            door_labor_cost = 0
-            door_hardware_cost = 0
-            
-            door_data = [["Part Number", "Description", "Quantity", "Price", "Labor Hours", "Hardware", "Total"]]
-            
-            for item in door.line_items:
-                item_total = item.price * item.quantity
-                door_parts_cost += item_total
-                door_labor_cost += item.labor_hours * 47.02
-                door_hardware_cost += item.hardware
-                
-                door_data.append([
-                    item.part_number or 'N/A',
-                    item.description or 'N/A',
-                    str(item.quantity),
-                    f"${item.price:.2f}",
-                    str(item.labor_hours),
-                    f"${item.hardware:.2f}",
-                    f"${item_total:.2f}"
-                ])
-            
-            door_total = door_parts_cost + door_labor_cost + door_hardware_cost
-            door_data.append(["", "", "", "", "", "Door Total:", f"${door_total:.2f}"])
-            
-            door_table = Table(door_data)
-            door_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(door_table)
+            elements.append(templates.door_table(
+                document['line_items'][door.id], document['door_totals'][door.id]['total']
+            ))
             elements.append(Spacer(1, 0.25*inch))
         
         # Add footer
@@ -173,15 +159,7 @@ def generate_bid_report(bid):
         # Build the PDF
         doc.build(elements)
         
-        # Set the file pointer to the beginning of the buffer
-        buffer.seek(0)
-        
-        # Create a response with the PDF
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename=bid_report_{bid.id}.pdf'
-        
-        return response
+        return buffer.getvalue()
         
     except Exception as e:
         logger.error(f"Error generating bid report: {str(e)}")
@@ -189,35 +167,28 @@ def generate_bid_report(bid):
 
 def generate_bid_proposal(bid):
     """Generate a PDF proposal for a bid"""
+    response = make_response(render_bid_proposal(bid))
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = f'inline; filename=proposal_{bid.id}.pdf'
+    return response
+
+def render_bid_proposal(bid):
+    """Bytes of the PDF proposal for a bid"""
+    return build_bid_proposal(load_document_data(bid, with_line_items=False))
+
+def build_bid_proposal(document):
+    """Bytes of the PDF proposal for the output of load_document_data"""
     try:
-        # Get all necessary data
-        customer = bid.estimate.customer_direct_link
-        doors = bid.doors
+        bid_id = document['bid_id']
+        customer = document['customer']
+        doors = document['doors']
         
-        # Calculate all the necessary values
-        total_parts_cost = 0
-        total_labor_cost = 0
-        total_hardware_cost = 0
-        
-        for door in doors:
-            door_parts_cost = 0
-            door_labor_cost = 0
-            door_hardware_cost = 0
-            
-            for item in door.line_items:
-                item_total = item.price * item.quantity
-                door_parts_cost += item_total
-                door_labor_cost += item.labor_hours * 47.02
-                door_hardware_cost += item.hardware
-                
-            total_parts_cost += door_parts_cost
-            total_labor_cost += door_labor_cost
-            total_hardware_cost += door_hardware_cost
-        
-        # Calculate tax (8.75%)
-        tax_rate = 0.0875
-        tax_amount = (total_parts_cost + total_hardware_cost) * tax_rate
-        total_cost = total_parts_cost + total_labor_cost + total_hardware_cost + tax_amount
+        totals = document['totals']
+        total_parts_cost = totals['total_parts_cost']
+        total_labor_cost = totals['total_labor_cost']
+        total_hardware_cost = totals['total_hardware_cost']
+        tax_amount = totals['tax_amount']
+        total_cost = totals['total_cost']
         
         # Create a PDF buffer
         buffer = BytesIO()
@@ -235,42 +206,10 @@ def generate_bid_proposal(bid):
         # Container for the 'Flowable' objects
         elements = []
         
-        # Define styles
-        styles = getSampleStyleSheet()
-        
-        # Custom styles for a more professional look
-        title_style = ParagraphStyle(
-            'TitleStyle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            leading=30,
-            alignment=1,  # Center alignment
-            spaceAfter=24
-        )
-        
-        section_title_style = ParagraphStyle(
-            'SectionTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            leading=18,
-            spaceBefore=12,
-            spaceAfter=6,
-            textColor=colors.darkblue
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            leading=14,
-            spaceAfter=3
-        )
-        
-        bold_style = ParagraphStyle(
-            'BoldText',
-            parent=normal_style,
-            fontName='Helvetica-Bold'
-        )
+        title_style = templates.PROPOSAL_TITLE_STYLE
+        section_title_style = templates.SECTION_TITLE_STYLE
+        normal_style = templates.PROPOSAL_NORMAL_STYLE
+        bold_style = templates.BOLD_STYLE
         
         # Add the proposal title
         elements.append(Paragraph("PROPOSAL", title_style))
@@ -278,15 +217,12 @@ def generate_bid_proposal(bid):
         # Create a table for header information
         current_date = datetime.now().strftime("%B %d, %Y")
         header_data = [
-            [Paragraph(f"Proposal #: P-{bid.id}", normal_style)],
+            [Paragraph(f"Proposal #: P-{bid_id}", normal_style)],
             [Paragraph(f"Date: {current_date}", normal_style)]
         ]
         
         header_table = Table(header_data, colWidths=[450])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        header_table.setStyle(templates.HEADER_TABLE_STYLE)
         
         elements.append(header_table)
         elements.append(Spacer(1, 0.1*inch))
@@ -308,11 +244,7 @@ def generate_bid_proposal(bid):
         ]
         
         company_table = Table(company_data, colWidths=[225, 225])
-        company_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
+        company_table.setStyle(templates.COMPANY_TABLE_STYLE)
         
         elements.append(company_table)
         elements.append(Spacer(1, 0.3*inch))
@@ -325,50 +257,23 @@ def generate_bid_proposal(bid):
         ]
         
         for door in doors:
-            # Calculate door total
-            door_parts_cost = 0
-            door_labor_cost = 0
-            door_hardware_cost = 0
-            
-            for item in door.line_items:
-                item_total = item.price * item.quantity
-                door_parts_cost += item_total
-                door_labor_cost += item.labor_hours * 47.02
-                door_hardware_cost += item.hardware
-            
-            door_total = door_parts_cost + door_labor_cost + door_hardware_cost
+            door_total = document['door_totals'][door.id]['total']
             
             price_data.append([
                 f"Door #{door.door_number} - Complete installation and materials",
                 "1",
-                f"${door_total:.2f}"
+                money(door_total)
             ])
         
         subtotal = total_parts_cost + total_labor_cost + total_hardware_cost
         
         price_data.append(["", "", ""])  # Empty row for spacing
-        price_data.append(["Subtotal:", "", f"${subtotal:.2f}"])
-        price_data.append(["Tax (8.75%):", "", f"${tax_amount:.2f}"])
-        price_data.append(["Total Investment:", "", f"${total_cost:.2f}"])
+        price_data.append(["Subtotal:", "", money(subtotal)])
+        price_data.append([f"Tax ({pricing.TAX_RATE * 100:g}%):", "", money(tax_amount)])
+        price_data.append(["Total Investment:", "", money(total_cost)])
         
         price_table = Table(price_data, colWidths=[250, 75, 125])
-        price_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, 0), 1, colors.darkblue),
-            ('LINEBELOW', (0, 0), (-1, 0), 1, colors.darkblue),
-            ('LINEABOVE', (0, 1), (-1, 1), 1, colors.lightgrey),
-            ('LINEBELOW', (0, -4), (-1, -4), 1, colors.lightgrey),
-            ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-            ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-            ('LINEBELOW', (0, -2), (-1, -2), 1, colors.black),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('TEXTCOLOR', (0, -1), (-1, -1), colors.darkblue),
-        ]))
+        price_table.setStyle(templates.PRICE_TABLE_STYLE)
         
         elements.append(price_table)
         elements.append(Spacer(1, 0.3*inch))
@@ -376,12 +281,7 @@ def generate_bid_proposal(bid):
         # Add terms
         elements.append(Paragraph("Terms and Conditions", section_title_style))
         
-        terms_style = ParagraphStyle(
-            'TermsStyle',
-            parent=normal_style,
-            leftIndent=10,
-            firstLineIndent=-10
-        )
+        terms_style = templates.TERMS_STYLE
         
         elements.append(Paragraph("1. Payment Terms: 50% deposit required to schedule work. Remaining balance due upon completion.", terms_style))
         elements.append(Paragraph("2. Warranty: All work is guaranteed for one year from the date of installation.", terms_style))
@@ -397,26 +297,13 @@ def generate_bid_proposal(bid):
         ]
         
         signature_table = Table(signature_data, colWidths=[225, 225])
-        signature_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, 0), 'LEFT'),
-            ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-            ('LINEBELOW', (0, 1), (0, 1), 1, colors.black),
-            ('LINEBELOW', (1, 1), (1, 1), 1, colors.black),
-            ('TOPPADDING', (0, 1), (1, 1), 36),
-            ('BOTTOMPADDING', (0, 1), (1, 1), 6),
-        ]))
+        signature_table.setStyle(templates.SIGNATURE_TABLE_STYLE)
         
         elements.append(signature_table)
         elements.append(Spacer(1, 0.5*inch))
         
         # Add footer
-        footer_style = ParagraphStyle(
-            'FooterStyle',
-            parent=normal_style,
-            alignment=1,  # Center
-            textColor=colors.darkgrey,
-            fontSize=9
-        )
+        footer_style = templates.FOOTER_STYLE
         
         elements.append(Paragraph("Thank you for the opportunity to earn your business!", footer_style))
         elements.append(Paragraph("Scott Overhead Doors - Quality Service Since 1985", footer_style))
@@ -424,15 +311,7 @@ def generate_bid_proposal(bid):
         # Build the PDF
         doc.build(elements)
         
-        # Set the file pointer to the beginning of the buffer
-        buffer.seek(0)
-        
-        # Create a response with the PDF
-        response = make_response(buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'inline; filename=proposal_{bid.id}.pdf'
-        
-        return response
+        return buffer.getvalue()
         
     except Exception as e:
         logger.error(f"Error generating bid proposal: {str(e)}")
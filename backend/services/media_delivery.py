@@ -0,0 +1,156 @@
+# backend/services/media_delivery.py
+"""
+Serving stored door media files with validators, byte ranges and optional web-server offload.
+
+Uploaded files and their renditions are written once under unique, timestamped names, so a
+URL that resolves to the requested file can be cached as immutable. A variant that is not
+ready yet falls back to the original and is served revalidate-only, so a later request
+picks up the rendition once the worker has written it.
+"""
+
+import os
+import json
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+from flask import send_file, current_app, request, Response
+from werkzeug.exceptions import NotFound
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_PATHS = 4096
+
+# (media_id, relative_path) -> absolute path. Resolution tries several folders for legacy
+# records, so the answer is remembered per process; a stale entry is dropped when its file is gone.
+_resolved_paths = OrderedDict()
+_resolved_paths_lock = threading.Lock()
+
+
+def _cached_path(key):
+    with _resolved_paths_lock:
+        path = _resolved_paths.get(key)
+        if path is not None:
+            _resolved_paths.move_to_end(key)
+        return path
+
+
+def _remember_path(key, path):
+    with _resolved_paths_lock:
+        _resolved_paths[key] = path
+        _resolved_paths.move_to_end(key)
+        while len(_resolved_paths) > MAX_CACHED_PATHS:
+            _resolved_paths.popitem(last=False)
+
+
+def forget_media(media_id):
+    """Drop cached paths for a media record, e.g. after it is deleted or reprocessed."""
+    with _resolved_paths_lock:
+        for key in [key for key in _resolved_paths if key[0] == media_id]:
+            del _resolved_paths[key]
+
+
+def select_variant(media, variant):
+    """
+    Relative path for the requested variant (thumbnail, preview or a rendition size).
+    Returns (relative_path, exact): exact is False when falling back to the original.
+    """
+    if variant == 'thumbnail' and media.thumbnail_path:
+        return media.thumbnail_path, True
+    if variant == 'preview' and media.preview_path:
+        return media.preview_path, True
+    if variant and variant.isdigit() and media.media_metadata:
+        rendition = json.loads(media.media_metadata).get('renditions', {}).get(variant)
+        if rendition:
+            return rendition, True
+    return media.file_path, not variant
+
+
+def _candidate_paths(upload_folder, relative_path):
+    yield os.path.join(upload_folder, relative_path)
+    # Older deployments stored uploads relative to different working directories
+    yield os.path.join(os.getcwd(), 'uploads', relative_path)
+    yield os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uploads', relative_path)
+    yield os.path.join('backend', 'uploads', relative_path)
+
+
+def resolve_path(media_id, relative_path, upload_folder):
+    """Absolute path and os.stat result of a media file, using the per-media path cache."""
+    key = (media_id, relative_path)
+    path = _cached_path(key)
+    if path is not None:
+        try:
+            return path, os.stat(path)
+        except OSError:
+            forget_media(media_id)
+
+    for candidate in _candidate_paths(upload_folder, relative_path):
+        try:
+            stat = os.stat(candidate)
+        except OSError:
+            continue
+        path = os.path.abspath(candidate)
+        _remember_path(key, path)
+        return path, stat
+
+    logger.warning(f"Media {media_id} file not found on disk: {relative_path}")
+    raise NotFound()
+
+
+def media_etag(media, variant, stat):
+    """
+    Strong validator for the served bytes: the upload's sha256 for the original when known,
+    otherwise the record id, variant, size and modification time of the file.
+    """
+    if not variant and media.content_hash:
+        return media.content_hash
+    return f"{media.id}-{variant or 'original'}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def _cache_control(exact):
+    if not exact:
+        return 'private, no-cache'
+    max_age = current_app.config.get('MEDIA_CACHE_MAX_AGE', 31536000)
+    return f'private, max-age={max_age}, immutable'
+
+
+def _offload_response(path, upload_folder, mimetype, etag, stat):
+    """Hand the file body to nginx (X-Accel-Redirect) or Apache/lighttpd (X-Sendfile)."""
+    backend = current_app.config.get('MEDIA_SENDFILE_BACKEND')
+    response = Response(mimetype=mimetype)
+    response.set_etag(etag)
+    if backend == 'x-accel':
+        prefix = current_app.config.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+        relative_path = os.path.relpath(path, os.path.abspath(upload_folder)).replace(os.sep, '/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + relative_path
+    else:
+        response.headers['X-Sendfile'] = path
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.content_length = stat.st_size
+    # The web server streams the body and ranges; only revalidation is answered here
+    if etag in request.if_none_match:
+        response.status_code = 304
+        response.headers.pop('X-Accel-Redirect', None)
+        response.headers.pop('X-Sendfile', None)
+        response.content_length = None
+    return response
+
+
+def serve_media(media, variant, upload_folder):
+    """
+    Build the response for one media file.
+
+    Conditional requests get 304 and Range requests get 206, both from send_file. When
+    MEDIA_SENDFILE_BACKEND is 'x-accel' or 'x-sendfile' the body is left to the web server.
+    """
+    relative_path, exact = select_variant(media, variant)
+    path, stat = resolve_path(media.id, relative_path, upload_folder)
+    etag = media_etag(media, variant if exact else None, stat)
+
+    if current_app.config.get('MEDIA_SENDFILE_BACKEND') in ('x-accel', 'x-sendfile'):
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = _offload_response(path, upload_folder, mimetype, etag, stat)
+    else:
+        response = send_file(path, conditional=True, etag=etag, max_age=None, last_modified=stat.st_mtime)
+    response.headers['Cache-Control'] = _cache_control(exact)
+    return response
@@ -0,0 +1,152 @@
+# backend/services/media_processing.py
+"""
+CPU-bound post-processing of uploaded door media.
+
+Everything here works on files only (no database, no Flask app) so it can run inside the
+media worker's process pool. process_media_file is the entry point submitted to the pool.
+"""
+
+import os
+import json
+import shutil
+import logging
+import subprocess
+from services import thumbnails
+from models.door_media import BLOB_SUBFOLDER
+
+logger = logging.getLogger(__name__)
+
+# Defaults when the worker is not given rendition options from the app config
+DEFAULT_RENDITION_OPTIONS = {
+    'sizes': thumbnails.DEFAULT_SIZES,
+    'thumbnail_size': 300,
+    'format': 'JPEG',
+}
+VIDEO_POSTER_OFFSET_SECONDS = 1
+FFMPEG_TIMEOUT_SECONDS = 120
+
+EXIF_DATETIME_ORIGINAL = 36867
+
+
+def _rendition_relative_path(job_id, folder, prefix, relative_path, extension):
+    """
+    Path of a rendition relative to the upload folder. Blob-store files keep renditions in
+    their own fan-out directory (blobs/ab/cd/thumb_300_<sha>.jpg) so every copy of the same
+    content shares them; older files use job_4/thumbnails/thumb_300_x.jpg.
+    """
+    base_name = os.path.splitext(os.path.basename(relative_path))[0]
+    if relative_path.startswith(BLOB_SUBFOLDER + '/'):
+        return '/'.join([os.path.dirname(relative_path), f"{prefix}_{base_name}.{extension}"])
+    return os.path.join(f'job_{job_id}', folder, f"{prefix}_{base_name}.{extension}")
+
+
+def _write_renditions(upload_folder, job_id, source, relative_path, options, prefix='thumb'):
+    """
+    Write every configured size from one decode of `source`.
+
+    Returns (renditions, dimensions): renditions maps str(size) -> relative path, and
+    dimensions holds the oriented size of the source image.
+    """
+    extension = thumbnails.file_extension(options['format'])
+    relative_paths = {
+        int(size): _rendition_relative_path(job_id, 'thumbnails', f"{prefix}_{size}", relative_path, extension)
+        for size in options['sizes']
+    }
+    dimensions = thumbnails.write(
+        source,
+        {size: os.path.join(upload_folder, path) for size, path in relative_paths.items()},
+        options['format']
+    )
+    return {str(size): path for size, path in relative_paths.items()}, dimensions['original']
+
+
+def _pick_renditions(renditions, thumbnail_size):
+    """The configured thumbnail size (or the nearest larger one) and the largest size as preview."""
+    sizes = sorted(int(size) for size in renditions)
+    thumbnail = next((size for size in sizes if size >= thumbnail_size), sizes[-1])
+    return renditions[str(thumbnail)], renditions[str(sizes[-1])]
+
+
+def process_photo(upload_folder, job_id, relative_path, options):
+    """Create every rendition of a photo from a single reduced-size decode and read its metadata."""
+    if thumbnails.Image is None:
+        raise RuntimeError('Pillow is not installed')
+
+    source_path = os.path.join(upload_folder, relative_path)
+    metadata = {'file_size': os.path.getsize(source_path)}
+    with thumbnails.Image.open(source_path) as img:
+        metadata['format'] = img.format
+        exif = img.getexif()
+        if exif.get(EXIF_DATETIME_ORIGINAL):
+            metadata['taken_at'] = str(exif.get(EXIF_DATETIME_ORIGINAL))
+
+    renditions, (metadata['width'], metadata['height']) = _write_renditions(
+        upload_folder, job_id, source_path, relative_path, options
+    )
+    metadata['renditions'] = renditions
+    thumbnail_path, preview_path = _pick_renditions(renditions, options['thumbnail_size'])
+    return {'thumbnail_path': thumbnail_path, 'preview_path': preview_path, 'metadata': metadata}
+
+
+def _probe_video(source_path):
+    """Read duration, dimensions and codec with ffprobe; empty dict when ffprobe is unavailable."""
+    ffprobe = shutil.which('ffprobe')
+    if not ffprobe:
+        return {}
+    result = subprocess.run(
+        [ffprobe, '-v', 'error', '-select_streams', 'v:0',
+         '-show_entries', 'stream=width,height,codec_name:format=duration',
+         '-of', 'json', source_path],
+        capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SECONDS, check=True
+    )
+    probe = json.loads(result.stdout or '{}')
+    stream = (probe.get('streams') or [{}])[0]
+    metadata = {
+        'width': stream.get('width'),
+        'height': stream.get('height'),
+        'codec': stream.get('codec_name'),
+    }
+    duration = (probe.get('format') or {}).get('duration')
+    if duration:
+        metadata['duration_seconds'] = round(float(duration), 2)
+    return metadata
+
+
+def process_video(upload_folder, job_id, relative_path, options):
+    """Extract a poster frame and its renditions plus metadata from a video, if ffmpeg is installed."""
+    source_path = os.path.join(upload_folder, relative_path)
+    metadata = {'file_size': os.path.getsize(source_path)}
+    metadata.update(_probe_video(source_path))
+
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg or thumbnails.Image is None:
+        logger.info(f"ffmpeg or Pillow unavailable; stored metadata only for {relative_path}")
+        return {'thumbnail_path': None, 'preview_path': None, 'metadata': metadata}
+
+    poster_path = os.path.join(upload_folder, _rendition_relative_path(job_id, 'previews', 'poster', relative_path, 'jpg'))
+    os.makedirs(os.path.dirname(poster_path), exist_ok=True)
+
+    # Short clips may not reach the poster offset; fall back to the first frame
+    offset = VIDEO_POSTER_OFFSET_SECONDS if metadata.get('duration_seconds', 0) > VIDEO_POSTER_OFFSET_SECONDS else 0
+    subprocess.run(
+        [ffmpeg, '-v', 'error', '-y', '-ss', str(offset), '-i', source_path, '-frames:v', '1', poster_path],
+        capture_output=True, timeout=FFMPEG_TIMEOUT_SECONDS, check=True
+    )
+    try:
+        renditions, _ = _write_renditions(upload_folder, job_id, poster_path, relative_path, options, prefix='poster')
+    finally:
+        os.remove(poster_path)
+
+    metadata['renditions'] = renditions
+    thumbnail_path, preview_path = _pick_renditions(renditions, options['thumbnail_size'])
+    return {'thumbnail_path': thumbnail_path, 'preview_path': preview_path, 'metadata': metadata}
+
+
+def process_media_file(upload_folder, media_type, job_id, relative_path, options=None):
+    """Pool entry point: dispatch on media type and return the renditions and metadata."""
+    options = {**DEFAULT_RENDITION_OPTIONS, **(options or {})}
+    if media_type == 'photo':
+        return process_photo(upload_folder, job_id, relative_path, options)
+    if media_type == 'video':
+        return process_video(upload_folder, job_id, relative_path, options)
+    raise ValueError(f"Unsupported media type: {media_type}")
@@ -0,0 +1,187 @@
+# backend/services/media_queue.py
+
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from models import db, DoorMedia, MediaTask
+from services.media_processing import process_media_file
+from services.media_store import reuse_renditions
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30
+
+
+def enqueue_media_processing(door_media):
+    """
+    Mark a new upload as pending and queue its post-processing; committed by the caller.
+    Content that was already processed for another record reuses those renditions instead.
+    """
+    if reuse_renditions(door_media):
+        return None
+    door_media.processing_status = 'pending'
+    door_media.processing_error = None
+    task = MediaTask(media_id=door_media.id, task_type='process_media', status='queued')
+    db.session.add(task)
+    return task
+
+
+def claim_tasks(worker_name, limit):
+    """
+    Atomically move up to `limit` due tasks from queued to running for this worker.
+
+    Candidates are flipped with a conditional UPDATE tagged with a one-off claim token, so
+    two workers polling at the same moment never run the same task, on any database.
+    """
+    now = datetime.utcnow()
+    candidate_ids = [task_id for (task_id,) in db.session.query(MediaTask.id).filter(
+        MediaTask.status == 'queued',
+        MediaTask.available_at <= now
+    ).order_by(MediaTask.id).limit(limit)]
+    if not candidate_ids:
+        return []
+
+    claim_token = f"{worker_name}:{uuid.uuid4().hex[:12]}"
+    MediaTask.query.filter(
+        MediaTask.id.in_(candidate_ids),
+        MediaTask.status == 'queued'
+    ).update({
+        MediaTask.status: 'running',
+        MediaTask.locked_by: claim_token,
+        MediaTask.locked_at: now,
+        MediaTask.attempts: MediaTask.attempts + 1,
+        MediaTask.updated_at: now
+    }, synchronize_session=False)
+
+    tasks = MediaTask.query.filter(MediaTask.locked_by == claim_token).all()
+    DoorMedia.query.filter(DoorMedia.id.in_([task.media_id for task in tasks])).update(
+        {DoorMedia.processing_status: 'processing'}, synchronize_session=False
+    )
+    db.session.commit()
+    return tasks
+
+
+def requeue_stale_tasks(timeout_minutes):
+    """Put back tasks whose worker died while running them. Returns the number requeued."""
+    cutoff = datetime.utcnow() - timedelta(minutes=timeout_minutes)
+    requeued = MediaTask.query.filter(
+        MediaTask.status == 'running',
+        MediaTask.locked_at < cutoff
+    ).update({
+        MediaTask.status: 'queued',
+        MediaTask.locked_by: None,
+        MediaTask.locked_at: None,
+        MediaTask.available_at: datetime.utcnow()
+    }, synchronize_session=False)
+    if requeued:
+        logger.warning(f"Requeued {requeued} media tasks that exceeded {timeout_minutes} minutes")
+    db.session.commit()
+    return requeued
+
+
+def complete_task(task, result):
+    """Store the renditions and metadata produced for a task's media."""
+    media = db.session.get(DoorMedia, task.media_id)
+    if media is not None:
+        media.thumbnail_path = result.get('thumbnail_path') or media.thumbnail_path
+        media.preview_path = result.get('preview_path')
+        media.media_metadata = json.dumps(result.get('metadata') or {})
+        media.processing_status = 'ready'
+        media.processing_error = None
+    task.status = 'done'
+    task.last_error = None
+    task.locked_by = None
+    db.session.commit()
+
+
+def fail_task(task, error):
+    """Retry with exponential backoff, or give up after MAX_ATTEMPTS."""
+    media = db.session.get(DoorMedia, task.media_id)
+    task.last_error = str(error)
+    task.locked_by = None
+    if task.attempts < MAX_ATTEMPTS:
+        task.status = 'queued'
+        task.available_at = datetime.utcnow() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (task.attempts - 1))
+        if media is not None:
+            media.processing_status = 'pending'
+    else:
+        task.status = 'failed'
+        if media is not None:
+            media.processing_status = 'failed'
+            media.processing_error = str(error)
+    db.session.commit()
+
+
+def rendition_options(config):
+    """Thumbnail settings from the app config, in the plain form handed to pool processes."""
+    return {
+        'sizes': tuple(config.get('THUMBNAIL_SIZES', (150, 300, 1024))),
+        'thumbnail_size': config.get('MEDIA_THUMBNAIL_SIZE', 300),
+        'format': config.get('THUMBNAIL_FORMAT', 'JPEG'),
+    }
+
+
+def run_pending_tasks(pool, worker_name, upload_folder, limit, options=None):
+    """Claim one round of tasks, run them on the pool and record the outcomes. Returns the count."""
+    tasks = claim_tasks(worker_name, limit)
+    if not tasks:
+        return 0
+
+    media_by_id = {media.id: media for media in DoorMedia.query.filter(
+        DoorMedia.id.in_([task.media_id for task in tasks])
+    )}
+    futures = {}
+    for task in tasks:
+        media = media_by_id.get(task.media_id)
+        if media is None:
+            task.status = 'done'
+            task.last_error = 'Media record no longer exists'
+            continue
+        future = pool.submit(
+            process_media_file, upload_folder, media.media_type, media.job_id, media.file_path, options
+        )
+        futures[future] = task
+    db.session.commit()
+
+    for future in as_completed(futures):
+        task = futures[future]
+        try:
+            complete_task(task, future.result())
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Media task {task.id} for media {task.media_id} failed: {e}")
+            fail_task(task, e)
+    return len(tasks)
+
+
+def run_worker(app, processes=None, poll_seconds=None, once=False):
+    """
+    Poll the media task table and process uploads on a local process pool.
+
+    Image decoding and resizing run in child processes; this loop only claims tasks and
+    writes results, so web workers never do this CPU work. With once=True the loop exits
+    when the queue is empty (useful for cron or tests).
+    """
+    processes = processes or app.config.get('MEDIA_WORKER_PROCESSES') or os.cpu_count() or 1
+    poll_seconds = poll_seconds or app.config.get('MEDIA_WORKER_POLL_SECONDS', 5)
+    timeout_minutes = app.config.get('MEDIA_TASK_TIMEOUT_MINUTES', 10)
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"[:40]
+
+    logger.info(f"Media worker {worker_name} starting with {processes} processes")
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        while True:
+            with app.app_context():
+                requeue_stale_tasks(timeout_minutes)
+                processed = run_pending_tasks(
+                    pool, worker_name, app.config['UPLOAD_FOLDER'], processes * 2, rendition_options(app.config)
+                )
+            if not processed:
+                if once:
+                    break
+                time.sleep(poll_seconds)
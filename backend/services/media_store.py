@@ -0,0 +1,155 @@
+# backend/services/media_store.py
+"""
+Content-addressed storage for door media.
+
+Each distinct file is kept once at blobs/<aa>/<bb>/<sha256>.<ext> under UPLOAD_FOLDER, with
+its renditions beside it. Two levels of 256-way fan-out keep every directory small even with
+hundreds of thousands of files, and a retried upload of the same bytes costs no extra disk.
+"""
+
+import os
+import glob
+import uuid
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import db, MediaBlob, DoorMedia
+from models.door_media import BLOB_SUBFOLDER
+
+logger = logging.getLogger(__name__)
+
+INCOMING_SUBFOLDER = '_incoming'
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def blob_relative_path(sha256, extension):
+    return '/'.join([BLOB_SUBFOLDER, sha256[:2], sha256[2:4], f"{sha256}.{extension}"])
+
+
+def is_blob_path(relative_path):
+    return bool(relative_path) and relative_path.startswith(BLOB_SUBFOLDER + '/')
+
+
+def save_stream(stream, upload_folder):
+    """Write an upload stream to a temporary file while hashing it. Returns (path, sha256, size)."""
+    path = os.path.join(upload_folder, INCOMING_SUBFOLDER, f"{uuid.uuid4().hex}.upload")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, 'wb') as output:
+        while True:
+            block = stream.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            output.write(block)
+            hasher.update(block)
+            size += len(block)
+    return path, hasher.hexdigest(), size
+
+
+def find_duplicate(door_id, job_id, media_type, sha256):
+    """An existing DoorMedia for the same door and job with identical content, if any."""
+    return DoorMedia.query.filter_by(
+        door_id=door_id, job_id=job_id, media_type=media_type, content_hash=sha256
+    ).order_by(DoorMedia.id).first()
+
+
+def ingest_file(upload_folder, source_path, sha256, size, extension):
+    """
+    Move a fully written, hashed file into the store. Returns (MediaBlob, created) where
+    created is True when this call added the blob; if the caller's transaction then fails,
+    discard_blob_file removes the file again.
+
+    When the content is already stored the source file is deleted instead. The blob row is
+    inserted in a savepoint so two requests ingesting the same bytes at once both end up with
+    the one row. References are counted when the DoorMedia pointing at it is flushed.
+    """
+    blob = db.session.get(MediaBlob, sha256)
+    if blob is not None and os.path.exists(os.path.join(upload_folder, blob.relative_path)):
+        os.remove(source_path)
+        blob.updated_at = datetime.utcnow()
+        return blob, False
+
+    relative_path = blob.relative_path if blob is not None else blob_relative_path(sha256, extension)
+    full_path = os.path.join(upload_folder, relative_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    os.replace(source_path, full_path)
+    if blob is not None:
+        logger.warning(f"Restored missing file for media blob {sha256}")
+        return blob, False
+
+    savepoint = db.session.begin_nested()
+    try:
+        blob = MediaBlob(sha256=sha256, relative_path=relative_path, size=size, ref_count=0)
+        db.session.add(blob)
+        savepoint.commit()
+    except IntegrityError:
+        savepoint.rollback()
+        return db.session.get(MediaBlob, sha256), False
+    return blob, True
+
+
+def discard_blob_file(upload_folder, relative_path, sha256):
+    """
+    Remove a file stored by ingest_file after the caller's transaction was rolled back, unless
+    another request has committed a blob row for the same content meanwhile.
+    """
+    if db.session.get(MediaBlob, sha256) is not None:
+        return
+    try:
+        os.remove(os.path.join(upload_folder, relative_path))
+    except OSError as e:
+        logger.error(f"Could not remove media blob file {relative_path}: {e}")
+
+
+def reuse_renditions(door_media):
+    """
+    Copy thumbnails and metadata from another processed DoorMedia with the same content.
+    Returns True when there was one, so no processing task is needed.
+    """
+    if not door_media.content_hash or not is_blob_path(door_media.file_path):
+        return False
+    processed = DoorMedia.query.filter(
+        DoorMedia.content_hash == door_media.content_hash,
+        DoorMedia.file_path == door_media.file_path,
+        DoorMedia.processing_status == 'ready',
+        DoorMedia.id != door_media.id
+    ).first()
+    if processed is None:
+        return False
+    door_media.thumbnail_path = processed.thumbnail_path
+    door_media.preview_path = processed.preview_path
+    door_media.media_metadata = processed.media_metadata
+    door_media.processing_status = 'ready'
+    door_media.processing_error = None
+    return True
+
+
+def collect_garbage(upload_folder, grace_hours):
+    """
+    Delete blobs nobody references any more, together with their renditions.
+
+    Blobs released less than grace_hours ago are kept, so an upload that found the blob just
+    before its last reference went away still gets the file. Returns the number removed.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+    candidates = db.session.query(MediaBlob.sha256, MediaBlob.relative_path).filter(
+        MediaBlob.ref_count <= 0, MediaBlob.updated_at < cutoff
+    ).all()
+    removed = 0
+    for sha256, relative_path in candidates:
+        deleted = MediaBlob.query.filter(
+            MediaBlob.sha256 == sha256, MediaBlob.ref_count <= 0
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if not deleted:
+            continue
+        directory = os.path.dirname(os.path.join(upload_folder, relative_path))
+        for path in glob.glob(os.path.join(directory, f"*{sha256}*")):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.error(f"Could not remove media blob file {path}: {e}")
+        removed += 1
+    return removed
@@ -0,0 +1,414 @@
+# backend/services/mobile_actions.py
+
+import json
+import logging
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from models import db, Job, JobTimeTracking, JobSignature, MobileJobLineItem, LineItem, Door, MobileActionReceipt
+from services import progress_service
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ACTIONS = 200
+
+
+class MobileActionError(Exception):
+    """A mobile action was rejected; carries the HTTP status and the error body to return."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+    def to_dict(self):
+        return {'error': self.message}
+
+
+# Every action below changes the session without committing and returns (body, status_code).
+# The single-action routes commit right after; the batch endpoint commits once for all actions.
+
+def _get_job(job_id):
+    job = db.session.get(Job, job_id) if job_id else None
+    if job is None:
+        raise MobileActionError(f'Job {job_id} not found.', 404)
+    return job
+
+
+def _close_session(job, tracking, status):
+    tracking.end_time = datetime.utcnow()
+    tracking.status = status
+    duration = (tracking.end_time - tracking.start_time).total_seconds()
+    tracking.total_minutes = int(duration / 60)
+    progress_service.record_session_closed(job, tracking.total_minutes)
+
+
+def start_job(job_id, user, data):
+    """Open a time tracking session for the user and capture the optional start signature."""
+    job = _get_job(job_id)
+
+    if user.role == 'field' and hasattr(job, 'truck_assignment') and job.truck_assignment != user.username:
+        raise MobileActionError('Forbidden: You cannot start a job not assigned to you.', 403)
+
+    existing_time_tracking = JobTimeTracking.query.filter_by(
+        job_id=job.id,
+        user_id=user.id,
+        end_time=None
+    ).first()
+
+    if existing_time_tracking:
+        raise MobileActionError('Job is already started by this user. Use resume if paused.')
+
+    time_tracking = JobTimeTracking(
+        job_id=job.id,
+        user_id=user.id,
+        start_time=datetime.utcnow(),
+        status='active'
+    )
+    db.session.add(time_tracking)
+    progress_service.record_session_started(job, time_tracking.start_time)
+
+    signature_data = data.get('signature', '')
+    signer_name = data.get('signer_name', user.get_full_name())
+    signer_title = data.get('signer_title', user.role)
+
+    if signature_data:
+        job_signature = JobSignature(
+            job_id=job.id,
+            user_id=user.id,
+            signature_type='start',
+            signature_data=signature_data,
+            signer_name=signer_name,
+            signer_title=signer_title
+        )
+        db.session.add(job_signature)
+        progress_service.record_job_started(job)
+
+    if job.status == 'scheduled':
+        job.status = 'in_progress'
+
+    if hasattr(job, 'mobile_status') and job.mobile_status not in ['started', 'completed']:
+        job.mobile_status = 'started'
+
+    db.session.flush()
+    return {
+        'success': True,
+        'message': 'Job started successfully',
+        'job_id': job.id,
+        'time_tracking_id': time_tracking.id,
+        'current_mobile_status': job.mobile_status if hasattr(job, 'mobile_status') else None
+    }, 200
+
+
+def pause_job(job_id, user, data):
+    """Close the user's active session on the job as paused."""
+    job = _get_job(job_id)
+
+    active_tracking = JobTimeTracking.query.filter_by(
+        job_id=job.id,
+        user_id=user.id,
+        status='active'
+    ).first()
+
+    if not active_tracking:
+        raise MobileActionError('Job is not currently active for this user. Cannot pause.')
+
+    _close_session(job, active_tracking, 'paused')
+
+    if hasattr(job, 'mobile_status'):
+        job.mobile_status = 'paused'
+
+    if data.get('signature'):
+        job_signature = JobSignature(
+            job_id=job.id,
+            user_id=user.id,
+            signature_type='pause',
+            signature_data=data['signature'],
+            signer_name=data.get('signer_name', user.get_full_name()),
+            signer_title=data.get('signer_title', 'Site Contact')
+        )
+        db.session.add(job_signature)
+
+    logger.info(f"User {user.id} paused job {job.id}.")
+    return {
+        'success': True,
+        'message': 'Job paused successfully.',
+        'job_id': job.id,
+        'current_mobile_status': 'paused'
+    }, 200
+
+
+def resume_job(job_id, user, data):
+    """Open a new session for the user after a pause."""
+    job = _get_job(job_id)
+
+    last_tracking = JobTimeTracking.query.filter_by(
+        job_id=job.id,
+        user_id=user.id,
+    ).order_by(JobTimeTracking.start_time.desc()).first()
+
+    if last_tracking and last_tracking.status == 'active':
+        raise MobileActionError('Job is already active. Cannot resume.')
+
+    new_tracking = JobTimeTracking(
+        job_id=job.id,
+        user_id=user.id,
+        start_time=datetime.utcnow(),
+        status='active'
+    )
+    db.session.add(new_tracking)
+    progress_service.record_session_started(job, new_tracking.start_time)
+
+    if hasattr(job, 'mobile_status'):
+        job.mobile_status = 'started'
+
+    if data.get('signature'):
+        job_signature = JobSignature(
+            job_id=job.id,
+            user_id=user.id,
+            signature_type='resume',
+            signature_data=data['signature'],
+            signer_name=data.get('signer_name', user.get_full_name()),
+            signer_title=data.get('signer_title', 'Site Contact')
+        )
+        db.session.add(job_signature)
+
+    db.session.flush()
+    logger.info(f"User {user.id} resumed job {job.id}.")
+    return {
+        'success': True,
+        'message': 'Job resumed successfully.',
+        'job_id': job.id,
+        'time_tracking_id': new_tracking.id,
+        'current_mobile_status': 'started'
+    }, 200
+
+
+def complete_job(job_id, user, data):
+    """Close the user's active session and mark the job completed."""
+    job = _get_job(job_id)
+
+    active_tracking = JobTimeTracking.query.filter_by(job_id=job.id, user_id=user.id, status='active').first()
+    if active_tracking:
+        _close_session(job, active_tracking, 'completed')
+
+    job.status = 'completed'
+    if hasattr(job, 'mobile_status'):
+        job.mobile_status = 'completed'
+    progress_service.record_job_completed(job)
+
+    if data.get('signature'):
+        job_signature = JobSignature(
+            job_id=job.id,
+            user_id=user.id,
+            signature_type='final_completion',
+            signature_data=data['signature'],
+            signer_name=data.get('signer_name', user.get_full_name()),
+            signer_title=data.get('signer_title', 'Site Contact')
+        )
+        db.session.add(job_signature)
+
+    logger.info(f"User {user.id} completed job {job.id}.")
+    return {
+        'success': True,
+        'message': 'Job completed successfully.',
+        'job_id': job.id
+    }, 200
+
+
+def toggle_line_item(job_id, line_item_id, user, completed=None):
+    """
+    Flip the completion state of a line item on the job, or set it to `completed` when given.
+    Passing the target state makes the action safe to apply more than once.
+    """
+    job = _get_job(job_id)
+    line_item = db.session.get(LineItem, line_item_id) if line_item_id else None
+    if line_item is None:
+        raise MobileActionError(f'Line item {line_item_id} not found.', 404)
+
+    door_bid_id = db.session.query(Door.bid_id).filter(Door.id == line_item.door_id).scalar()
+    if not job.bid_id or door_bid_id != job.bid_id:
+        raise MobileActionError('Line item does not belong to this job or its associated bid doors.')
+
+    mobile_completion = MobileJobLineItem.query.filter_by(
+        job_id=job.id,
+        line_item_id=line_item.id
+    ).first()
+
+    previous_completed = False
+    if mobile_completion:
+        previous_completed = bool(mobile_completion.completed)
+
+    new_completed = (not previous_completed) if completed is None else bool(completed)
+
+    if not mobile_completion:
+        mobile_completion = MobileJobLineItem(
+            job_id=job.id,
+            line_item_id=line_item.id,
+            completed=new_completed,
+            completed_at=datetime.utcnow() if new_completed else None,
+            completed_by=user.id if new_completed else None
+        )
+        db.session.add(mobile_completion)
+    elif new_completed != previous_completed:
+        mobile_completion.completed = new_completed
+        if new_completed:
+            mobile_completion.completed_at = datetime.utcnow()
+            mobile_completion.completed_by = user.id
+        else:
+            mobile_completion.completed_at = None
+            mobile_completion.completed_by = None
+
+    if new_completed != previous_completed:
+        progress_service.record_line_item_toggled(job, new_completed)
+
+    return {
+        'success': True,
+        'line_item_id': line_item.id,
+        'completed': new_completed,
+        'previous_completed': previous_completed
+    }, 200
+
+
+def complete_door(door_id, user, data):
+    """Record the door completion signature for a job (no-op if the door is already complete)."""
+    job_id = data.get('job_id')
+    signature_data = data.get('signature')
+    signer_name = data.get('signer_name', user.get_full_name())
+    signer_title = data.get('signer_title', 'Site Contact')
+
+    if not job_id or not signature_data:
+        raise MobileActionError('job_id and signature are required fields.')
+
+    job = _get_job(job_id)
+    door = db.session.get(Door, door_id) if door_id else None
+    if door is None:
+        raise MobileActionError(f'Door {door_id} not found.', 404)
+
+    if door.bid_id != job.bid_id:
+        raise MobileActionError('This door does not belong to the specified job.')
+
+    existing_signature = JobSignature.query.filter_by(
+        job_id=job.id,
+        door_id=door.id,
+        signature_type='door_complete'
+    ).first()
+
+    if existing_signature:
+        logger.warning(f"Attempted to re-complete door {door.id} for job {job.id}.")
+        return {'success': True, 'message': 'Door was already marked as complete.'}, 200
+
+    new_signature = JobSignature(
+        job_id=job.id,
+        door_id=door.id,
+        user_id=user.id,
+        signature_type='door_complete',
+        signature_data=signature_data,
+        signer_name=signer_name,
+        signer_title=signer_title
+    )
+    db.session.add(new_signature)
+    progress_service.record_door_completed(job)
+    db.session.flush()
+
+    logger.info(f"User {user.username} completed door {door.id} for job {job.id}.")
+    return {
+        'success': True,
+        'message': f'Door {door.id} marked as complete.',
+        'signature_id': new_signature.id
+    }, 201
+
+
+def apply_action(action_type, payload, user):
+    """Dispatch one queued offline action (as stored by MobileWorkerService) to its handler."""
+    if action_type == 'job_start':
+        return start_job(payload.get('job_id'), user, payload)
+    if action_type == 'job_pause':
+        return pause_job(payload.get('job_id'), user, payload)
+    if action_type == 'job_resume':
+        return resume_job(payload.get('job_id'), user, payload)
+    if action_type == 'job_complete':
+        return complete_job(payload.get('job_id'), user, payload)
+    if action_type == 'line_item_toggle':
+        return toggle_line_item(payload.get('job_id'), payload.get('line_item_id'), user, payload.get('completed'))
+    if action_type == 'door_complete':
+        return complete_door(payload.get('door_id'), user, payload)
+    raise MobileActionError(f'Unknown action type: {action_type}')
+
+
+def apply_batch(actions, user):
+    """
+    Apply an ordered list of queued offline actions inside the caller's transaction.
+
+    Each action runs in its own savepoint, so a rejected action is rolled back alone and the
+    rest of the batch still applies. Actions whose idempotency key already has a receipt are
+    not applied again; the stored response is returned with replayed=True. Client errors
+    (4xx) are stored too so a retry gets the same answer; unexpected errors are not, leaving
+    the action retryable. A receipt is written in its action's savepoint, so when a concurrent
+    batch stored the same key first the action is undone and that batch's response is
+    returned, also with replayed=True. Returns one result dict per action, in order.
+    """
+    keys = [action.get('idempotency_key') for action in actions if action.get('idempotency_key')]
+    receipts = {}
+    if keys:
+        receipts = {
+            receipt.idempotency_key: receipt for receipt in MobileActionReceipt.query.filter(
+                MobileActionReceipt.user_id == user.id,
+                MobileActionReceipt.idempotency_key.in_(keys)
+            )
+        }
+
+    results = []
+    for action in actions:
+        key = action.get('idempotency_key')
+        action_type = action.get('type')
+        result = {'idempotency_key': key, 'type': action_type, 'replayed': False}
+
+        if not key:
+            result.update(status=400, body={'error': 'idempotency_key is required.'})
+            results.append(result)
+            continue
+
+        receipt = receipts.get(key)
+        if receipt is not None:
+            result.update(status=receipt.status_code, body=json.loads(receipt.response), replayed=True)
+            results.append(result)
+            continue
+
+        savepoint = db.session.begin_nested()
+        try:
+            try:
+                body, status_code = apply_action(action_type, action.get('payload') or {}, user)
+            except MobileActionError as e:
+                savepoint.rollback()
+                savepoint = db.session.begin_nested()
+                body, status_code = e.to_dict(), e.status_code
+            receipt = MobileActionReceipt(
+                user_id=user.id,
+                idempotency_key=key,
+                action_type=action_type or '',
+                status_code=status_code,
+                response=json.dumps(body)
+            )
+            db.session.add(receipt)
+            # The receipt is flushed with its action: a concurrent batch that stored the same
+            # key first makes this fail, and its outcome is returned instead
+            savepoint.commit()
+        except Exception as e:
+            savepoint.rollback()
+            receipt = None
+            if isinstance(e, IntegrityError):
+                receipt = MobileActionReceipt.query.filter_by(user_id=user.id, idempotency_key=key).first()
+            if receipt is None:
+                logger.error(f"Error applying batched {action_type} action {key} for user {user.id}: {e}", exc_info=True)
+                result.update(status=500, body={'error': f'Failed to apply action: {str(e)}'})
+                results.append(result)
+                continue
+            body, status_code = json.loads(receipt.response), receipt.status_code
+            result.update(replayed=True)
+
+        receipts[key] = receipt
+        result.update(status=status_code, body=body)
+        results.append(result)
+
+    db.session.flush()
+    return results
@@ -3,83 +3,224 @@
 import os
 import logging
 from datetime import datetime
-from models import JobSignature, JobTimeTracking
-from sqlalchemy import func
-
-# It is good practice to install external libraries at the top.
-# Make sure Pillow is installed: pip install Pillow
-try:
-    from PIL import Image, ImageOps
-except ImportError:
-    Image = None
-    ImageOps = None
-    logging.warning("Pillow library not found. Thumbnail generation will be disabled.")
+from models import JobSignature, JobTimeTracking, Door, LineItem, DoorMedia, MobileJobLineItem
+from sqlalchemy import func, case
+from services import thumbnails
 
 
 logger = logging.getLogger(__name__)
 
 def get_job_mobile_status(job):
     """Helper function to determine the mobile status of a job."""
-    # Check if the job is definitively completed
-    final_signature = JobSignature.query.filter_by(job_id=job.id, signature_type='final').first()
-    if final_signature or job.status == 'completed':
-        return "completed"
-
-    # Check if the job has been started
-    start_signature = JobSignature.query.filter_by(job_id=job.id, signature_type='start').first()
-    time_tracking_entry = JobTimeTracking.query.filter_by(job_id=job.id).first()
-    if start_signature or time_tracking_entry:
-        return "started"
-
-    # Otherwise, it's not started
-    return "not_started"
+    return get_jobs_mobile_status([job])[job.id]
 
 def get_job_progress_and_time(job):
     """Helper function to calculate job progress and total time."""
+    return get_jobs_progress_and_time([job])[job.id]
+
+
+def _signature_counts(job_ids, signature_types):
+    """Count signatures per (job, signature type) with a single GROUP BY query."""
     from models import db
-    
-    # Calculate door progress
-    # --- THIS IS THE FIX ---
-    # When using lazy='dynamic', we must use .count() instead of len().
-    total_doors = job.bid.doors.count() if job.bid and job.bid.doors else 0
-    # -----------------------
-
-    completed_doors = 0
-    if total_doors > 0:
-        # This part of your code seems to be using JobSignature for completion tracking.
-        # This is fine, just ensure it's what you intend.
-        completed_doors = JobSignature.query.filter_by(
-            job_id=job.id,
-            signature_type='door_complete'
-        ).count()
-
-    completion_percentage = round((completed_doors / total_doors * 100), 1) if total_doors > 0 else 0
-
-    # Calculate total time worked (This part seems okay)
-    total_minutes = 0
-    
-    completed_minutes = db.session.query(func.sum(JobTimeTracking.total_minutes)).filter(
-        JobTimeTracking.job_id == job.id,
-        JobTimeTracking.status.in_(['completed', 'paused'])
-    ).scalar() or 0
-    total_minutes += completed_minutes
-    
-    active_session = JobTimeTracking.query.filter_by(job_id=job.id, status='active').first()
-    if active_session and active_session.start_time:
-        active_duration = datetime.utcnow() - active_session.start_time
-        total_minutes += int(active_duration.total_seconds() / 60)
-        
-    total_time_hours = round(total_minutes / 60, 2)
-
-    return {
-        'total_doors': total_doors,
-        'completed_doors': completed_doors,
-        'completion_percentage': completion_percentage,
-        'total_time_hours': total_time_hours,
-        'total_minutes': total_minutes
+
+    counts = {}
+    rows = db.session.query(
+        JobSignature.job_id, JobSignature.signature_type, func.count(JobSignature.id)
+    ).filter(
+        JobSignature.job_id.in_(job_ids),
+        JobSignature.signature_type.in_(signature_types)
+    ).group_by(JobSignature.job_id, JobSignature.signature_type).all()
+    for job_id, signature_type, count in rows:
+        counts[(job_id, signature_type)] = count
+    return counts
+
+
+def _time_tracking_summary(job_ids):
+    """
+    Summarize time tracking per job with a single GROUP BY query.
+
+    Returns {job_id: (session_count, closed_minutes, earliest_active_start)}.
+    """
+    from models import db
+
+    closed_minutes = func.sum(case(
+        (JobTimeTracking.status.in_(['completed', 'paused']), JobTimeTracking.total_minutes),
+        else_=0
+    ))
+    active_start = func.min(case(
+        (JobTimeTracking.status == 'active', JobTimeTracking.start_time),
+        else_=None
+    ))
+    rows = db.session.query(
+        JobTimeTracking.job_id, func.count(JobTimeTracking.id), closed_minutes, active_start
+    ).filter(
+        JobTimeTracking.job_id.in_(job_ids)
+    ).group_by(JobTimeTracking.job_id).all()
+    return {job_id: (count, minutes or 0, started) for job_id, count, minutes, started in rows}
+
+
+def get_jobs_mobile_status(jobs):
+    """
+    Batch version of get_job_mobile_status.
+
+    Resolves the mobile status of every job in the list with a constant number of
+    grouped queries and returns a dict keyed by job id.
+    """
+    job_ids = [job.id for job in jobs]
+    if not job_ids:
+        return {}
+
+    signature_counts = _signature_counts(job_ids, ['final', 'start'])
+    time_summary = _time_tracking_summary(job_ids)
+
+    statuses = {}
+    for job in jobs:
+        # Check if the job is definitively completed
+        if signature_counts.get((job.id, 'final')) or job.status == 'completed':
+            statuses[job.id] = "completed"
+        # Check if the job has been started
+        elif signature_counts.get((job.id, 'start')) or job.id in time_summary:
+            statuses[job.id] = "started"
+        # Otherwise, it's not started
+        else:
+            statuses[job.id] = "not_started"
+    return statuses
+
+
+def get_jobs_progress_and_time(jobs):
+    """
+    Batch version of get_job_progress_and_time.
+
+    Door totals, door completions, closed time segments and active sessions are each
+    aggregated for the whole list with one GROUP BY query. Returns a dict keyed by job id.
+    """
+    from models import db
+
+    job_ids = [job.id for job in jobs]
+    if not job_ids:
+        return {}
+
+    bid_ids = {job.bid_id for job in jobs if job.bid_id}
+    door_counts = {}
+    if bid_ids:
+        door_counts = dict(db.session.query(Door.bid_id, func.count(Door.id)).filter(
+            Door.bid_id.in_(bid_ids)
+        ).group_by(Door.bid_id).all())
+
+    signature_counts = _signature_counts(job_ids, ['door_complete'])
+    time_summary = _time_tracking_summary(job_ids)
+    now = datetime.utcnow()
+
+    progress = {}
+    for job in jobs:
+        total_doors = door_counts.get(job.bid_id, 0)
+        completed_doors = signature_counts.get((job.id, 'door_complete'), 0) if total_doors > 0 else 0
+        completion_percentage = round((completed_doors / total_doors * 100), 1) if total_doors > 0 else 0
+
+        _, total_minutes, active_start = time_summary.get(job.id, (0, 0, None))
+        if active_start:
+            total_minutes += int((now - active_start).total_seconds() / 60)
+
+        progress[job.id] = {
+            'total_doors': total_doors,
+            'completed_doors': completed_doors,
+            'completion_percentage': completion_percentage,
+            'total_time_hours': round(total_minutes / 60, 2),
+            'total_minutes': total_minutes
+        }
+    return progress
+
+
+def load_mobile_job_doors(job, only_door_ids=None):
+    """
+    Build the per-door detail list for the mobile job view in a fixed number of queries.
+
+    Doors, line items, line item completions, the latest media per (door, type) and
+    door completion signatures are each fetched with a single grouped query, then the
+    response is assembled in one pass. The query count does not grow with the number
+    of doors or line items on the job.
+
+    only_door_ids restricts the details to those doors (used by the delta sync); door
+    numbering still follows the position of each door on the whole bid.
+    """
+    from models import db
+
+    if not job.bid_id:
+        return []
+
+    doors = Door.query.filter_by(bid_id=job.bid_id).order_by(Door.id).all()
+    positions = {door.id: position for position, door in enumerate(doors, start=1)}
+    if only_door_ids is not None:
+        doors = [door for door in doors if door.id in only_door_ids]
+    if not doors:
+        return []
+    door_ids = [door.id for door in doors]
+
+    # Line items grouped by door
+    line_items_by_door = {door_id: [] for door_id in door_ids}
+    for line_item in LineItem.query.filter(LineItem.door_id.in_(door_ids)).order_by(LineItem.id):
+        line_items_by_door[line_item.door_id].append(line_item)
+
+    # Completion state per line item; the first record wins, as in the per-item lookup
+    completion_rows = db.session.query(
+        MobileJobLineItem.line_item_id, MobileJobLineItem.completed
+    ).filter(
+        MobileJobLineItem.job_id == job.id
+    ).order_by(MobileJobLineItem.id).all()
+    completed_by_line_item = {}
+    for line_item_id, completed in completion_rows:
+        completed_by_line_item.setdefault(line_item_id, bool(completed))
+
+    # Latest upload per (door, media type)
+    latest_media = {}
+    media_rows = db.session.query(
+        DoorMedia.door_id, DoorMedia.media_type, func.max(DoorMedia.uploaded_at)
+    ).filter(
+        DoorMedia.job_id == job.id,
+        DoorMedia.door_id.in_(door_ids),
+        DoorMedia.media_type.in_(['photo', 'video'])
+    ).group_by(DoorMedia.door_id, DoorMedia.media_type).all()
+    for door_id, media_type, latest_uploaded_at in media_rows:
+        latest_media[(door_id, media_type)] = latest_uploaded_at
+
+    # Doors that carry a completion signature for this job
+    completed_door_ids = {
+        door_id for (door_id,) in db.session.query(JobSignature.door_id).filter(
+            JobSignature.job_id == job.id,
+            JobSignature.signature_type == 'door_complete',
+            JobSignature.door_id.in_(door_ids)
+        ).distinct()
     }
-    
-    
+
+    doors_details = []
+    for door_model in doors:
+        door_number = door_model.door_number or positions[door_model.id]
+        is_door_completed = door_model.id in completed_door_ids
+
+        doors_details.append({
+            'id': door_model.id,
+            'door_number': door_number,
+            'location': door_model.location or f'Door #{door_number}',
+            'labor_description': door_model.labor_description or 'Standard door work',
+            'line_items': [
+                {
+                    'id': line_item.id,
+                    'description': line_item.description or f'Work item {line_item.id}',
+                    'part_number': line_item.part_number or '',
+                    'quantity': line_item.quantity or 1,
+                    'completed': completed_by_line_item.get(line_item.id, False)
+                }
+                for line_item in line_items_by_door[door_model.id]
+            ],
+            'completed': is_door_completed,
+            'has_photo': (door_model.id, 'photo') in latest_media,
+            'has_video': (door_model.id, 'video') in latest_media,
+            'has_signature': is_door_completed
+        })
+
+    return doors_details
+
+
 def create_upload_folder(job_id):
     """
     Create upload folder structure for job media.
@@ -121,40 +262,18 @@ def allowed_file(filename, allowed_extensions):
     return extension in allowed_extensions
 
 def generate_thumbnail(original_path, thumbnail_path, size=(300, 300)):
-    """Enhanced thumbnail generation with better error handling."""
-    # Check if Pillow was imported successfully
-    if Image is None or ImageOps is None:
+    """Write a single JPEG thumbnail fitting `size`; returns the path, or None on failure."""
+    if thumbnails.Image is None:
         logger.warning("Pillow not available; cannot generate thumbnail.")
-        return None # Return None to indicate failure
+        return None
 
     try:
-        with Image.open(original_path) as img:
-            # This handles EXIF orientation data to prevent rotated thumbnails
-            img = ImageOps.exif_transpose(img)
-            
-            # Handle transparency by pasting on a white background
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                # Convert palette images to RGBA to handle transparency
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                # Use the alpha channel as a mask for pasting
-                background.paste(img, mask=img.getchannel('A'))
-                img = background
-            # Convert other modes to RGB
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Create the thumbnail while maintaining aspect ratio
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-            
-            # Save the optimized thumbnail
-            img.save(thumbnail_path, 'JPEG', quality=85, optimize=True, progressive=True)
-            
+        box = max(size)
+        thumbnails.write(original_path, {box: thumbnail_path}, 'JPEG')
         logger.info(f"Generated optimized thumbnail: {thumbnail_path}")
         return thumbnail_path
-        
+
     except Exception as e:
         logger.error(f"Error generating thumbnail for {original_path}: {str(e)}")
         # Return None to indicate that thumbnail generation failed
-        return None
\ No newline at end of file
+        return None
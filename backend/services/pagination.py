@@ -0,0 +1,67 @@
+# backend/services/pagination.py
+"""
+Keyset (seek) pagination helpers for list endpoints.
+
+A page is read with WHERE (sort_key, id) < (last_sort_key, last_id) ORDER BY sort_key DESC,
+id DESC LIMIT n+1, so every page costs the same however deep the client scrolls. The last
+row's keys travel back to the client as an opaque cursor.
+"""
+
+import json
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+
+class PageCursorError(ValueError):
+    """Raised when a client sends a cursor this server cannot read."""
+
+
+def encode_page_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = {'dt': sort_value.isoformat()}
+    payload = json.dumps([sort_value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_page_cursor(cursor):
+    """Return (sort_value, row_id) from a cursor produced by encode_page_cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value['dt'])
+        return sort_value, int(row_id)
+    except (ValueError, KeyError, TypeError) as e:
+        raise PageCursorError(f'Invalid page cursor: {e}')
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Clamp a ?limit= argument to 1..MAX_PAGE_SIZE."""
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def seek_descending(query, sort_column, id_column, cursor):
+    """Order newest first and, with a cursor, start after the row it points at."""
+    if cursor:
+        sort_value, row_id = decode_page_cursor(cursor)
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+    return query.order_by(sort_column.desc(), id_column.desc())
+
+
+def split_page(rows, limit, sort_key, id_key):
+    """Trim the extra lookahead row and build the next cursor. Returns (rows, next_cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_page_cursor(sort_key(last), id_key(last))
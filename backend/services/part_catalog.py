@@ -0,0 +1,335 @@
+# backend/services/part_catalog.py
+"""
+Parts catalog behind line item typeahead.
+
+The parts_catalog table holds every part number typed on a line item or imported into the
+price book. New part numbers are added by an after_flush listener, price book imports
+overwrite description and price, and `flask rebuild-part-catalog` recomputes the lot
+(including how often each part is used) from the line items.
+
+Suggestions come from an in-memory PartIndex per worker: a sorted array of lowercase search
+tokens (the part number, its pieces and the description words) searched with bisect, so a
+prefix lookup never touches the database. At most every PART_CATALOG_REFRESH_SECONDS a
+request reloads only the rows whose updated_at moved on and merges them into a new index;
+readers keep using the previous one meanwhile. When the index finds nothing, a substring
+search in the database (trigram indexed on PostgreSQL) is the fallback.
+"""
+
+import re
+import heapq
+import time
+import logging
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, func, or_, select, update, bindparam, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, LineItem, PriceBookEntry, CatalogPart
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+SCAN_LIMIT = 5000  # tokens looked at per query; keeps one-letter queries fast
+FULL_REBUILD_RATIO = 0.1  # above this share of the catalog changed, rebuild the index outright
+INSORT_MERGE_ROWS = 20  # up to this many changed parts, move their keys in place instead of re-sorting
+REFRESH_OVERLAP = timedelta(seconds=60)  # also reread rows stamped before a refresh but committed after it
+REBUILD_BATCH_SIZE = 1000
+
+# session.info key set when this transaction wrote catalog rows (see reload_after_commit)
+CATALOG_CHANGED_KEY = 'part_catalog_changed'
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+_ROW_COLUMNS = (CatalogPart.part_number, CatalogPart.description, CatalogPart.price,
+                CatalogPart.use_count, CatalogPart.updated_at)
+
+
+def _tokens(part_number, description):
+    """Search tokens of a part: its whole number, the pieces of it, and the description words."""
+    number = part_number.lower()
+    tokens = {number}
+    tokens.update(_TOKEN_PATTERN.findall(number))
+    if description:
+        tokens.update(_TOKEN_PATTERN.findall(description.lower()))
+    return tokens
+
+
+class PartIndex:
+    """Immutable snapshot of the catalog for prefix search."""
+
+    def __init__(self, parts, tokens, keys):
+        self.parts = parts  # part_number -> (part_number, description, price, use_count)
+        self.tokens = tokens  # part_number -> frozenset of its search tokens
+        self.keys = keys  # sorted (token, part_number)
+
+    @classmethod
+    def build(cls, rows):
+        parts = {row[0]: tuple(row[:4]) for row in rows}
+        tokens = {part_number: frozenset(_tokens(part_number, part[1])) for part_number, part in parts.items()}
+        keys = sorted((token, part_number) for part_number, words in tokens.items() for token in words)
+        return cls(parts, tokens, keys)
+
+    def merged(self, rows):
+        """A new index with `rows` added or replaced; this one is left untouched for its readers."""
+        parts = dict(self.parts)
+        parts.update((row[0], tuple(row[:4])) for row in rows)
+        if len(rows) > FULL_REBUILD_RATIO * max(len(self.parts), 1):
+            return PartIndex.build(parts.values())
+
+        tokens = dict(self.tokens)
+        changed = {row[0] for row in rows}
+        if len(changed) <= INSORT_MERGE_ROWS:
+            # The usual refresh after a line item save: move a few keys in place
+            keys = list(self.keys)
+            for part_number in changed:
+                for token in tokens.get(part_number, ()):
+                    position = bisect_left(keys, (token, part_number))
+                    if position < len(keys) and keys[position] == (token, part_number):
+                        del keys[position]
+                tokens[part_number] = frozenset(_tokens(part_number, parts[part_number][1]))
+                for token in tokens[part_number]:
+                    insort(keys, (token, part_number))
+            return PartIndex(parts, tokens, keys)
+
+        keys = [key for key in self.keys if key[1] not in changed]
+        for part_number in changed:
+            tokens[part_number] = frozenset(_tokens(part_number, parts[part_number][1]))
+            keys.extend((token, part_number) for token in tokens[part_number])
+        keys.sort()  # one long sorted run plus a short tail: a cheap merge for timsort
+        return PartIndex(parts, tokens, keys)
+
+    def _range(self, word):
+        """Positions in `keys` of the tokens starting with `word`."""
+        return bisect_left(self.keys, (word, '')), bisect_left(self.keys, (word + '\uffff', ''))
+
+    def search(self, query, limit):
+        """
+        Parts having a token starting with every word of `query`. Part numbers that start with
+        the query come first, then the most used parts.
+        """
+        words = set(_TOKEN_PATTERN.findall(query.lower()))
+        if not words:
+            return []
+        whole = query.strip().lower()
+
+        # Start from the narrowest word's slice of the index, then narrow by the other words:
+        # by set intersection while their slices are small, else token by token per part
+        ranges = sorted((self._range(word) + (word,) for word in words), key=lambda bounds: bounds[1] - bounds[0])
+        start, end, _ = ranges[0]
+        candidates = {part_number for _, part_number in self.keys[start:min(end, start + SCAN_LIMIT)]}
+        for start, end, word in ranges[1:]:
+            if end - start <= 10 * SCAN_LIMIT:
+                candidates.intersection_update(part_number for _, part_number in self.keys[start:end])
+            else:
+                candidates = {
+                    part_number for part_number in candidates
+                    if any(token.startswith(word) for token in self.tokens[part_number])
+                }
+        return heapq.nsmallest(limit, (self.parts[part_number] for part_number in candidates),
+                               key=lambda part: (not part[0].lower().startswith(whole), -(part[3] or 0), part[0]))
+
+
+_lock = threading.Lock()
+_state = {'index': None, 'watermark': None, 'checked_at': None}  # checked_at None: reload on next use
+
+
+def current_index():
+    """This worker's index, reloading changed rows when the refresh interval has passed."""
+    interval = current_app.config.get('PART_CATALOG_REFRESH_SECONDS', 10)
+    if _is_fresh(interval):
+        return _state['index']
+    with _lock:
+        if _is_fresh(interval):
+            return _state['index']  # another thread refreshed while we waited
+        _refresh()
+    return _state['index']
+
+
+def _is_fresh(interval):
+    checked_at = _state['checked_at']
+    return _state['index'] is not None and checked_at is not None and time.monotonic() - checked_at < interval
+
+
+def _refresh():
+    started = datetime.utcnow()
+    query = db.session.query(*_ROW_COLUMNS)
+    if _state['index'] is None:
+        rows = query.all()
+        _state['index'] = PartIndex.build(rows)
+        logger.info(f"Loaded {len(rows)} catalog parts into the typeahead index")
+    else:
+        rows = query.filter(CatalogPart.updated_at >= _state['watermark']).all()
+        changed = [row for row in rows if _state['index'].parts.get(row[0]) != tuple(row[:4])]
+        if changed:
+            _state['index'] = _state['index'].merged(changed)
+    _state['watermark'] = started - REFRESH_OVERLAP
+    _state['checked_at'] = time.monotonic()
+
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    """Up to `limit` parts for a typeahead query. Returns (parts, source)."""
+    limit = max(1, min(limit, MAX_LIMIT))
+    parts = current_index().search(query, limit)
+    if parts or len(query.strip()) < 3:
+        return parts, 'index'
+
+    pattern = f"%{query.strip().replace('%', '').replace('_', '')}%"
+    rows = db.session.query(*_ROW_COLUMNS).filter(or_(
+        CatalogPart.part_number.ilike(pattern),
+        CatalogPart.description.ilike(pattern)
+    )).order_by(CatalogPart.use_count.desc(), CatalogPart.part_number).limit(limit).all()
+    return [tuple(row[:4]) for row in rows], 'database'
+
+
+# --- Keeping the table current ---
+
+def _clean_part_number(value):
+    part_number = (value or '').strip()
+    return part_number if 0 < len(part_number) <= 50 else None
+
+
+# INSERT ... ON CONFLICT builders for the dialects the app runs on
+_CONFLICT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def _catalog_insert(connection):
+    """
+    INSERT into parts_catalog that can settle a clash on part_number: two estimators (or an
+    estimator and a price book import) may add the same new part at once, and a typeahead
+    table must never fail the line item save it runs inside.
+    """
+    return _CONFLICT_INSERTS[connection.dialect.name](CatalogPart.__table__)
+
+
+def add_parts(connection, parts):
+    """Insert the part numbers of `parts` ({part_number: (description, price)}) the catalog lacks."""
+    known = {part_number for (part_number,) in connection.execute(
+        select(CatalogPart.part_number).where(CatalogPart.part_number.in_(list(parts)))
+    )}
+    now = datetime.utcnow()
+    rows = [
+        {'part_number': part_number, 'description': description, 'price': price, 'use_count': 1, 'updated_at': now}
+        for part_number, (description, price) in parts.items() if part_number not in known
+    ]
+    if rows:
+        connection.execute(_catalog_insert(connection).on_conflict_do_nothing(index_elements=['part_number']), rows)
+    return len(rows)
+
+
+def upsert_parts(connection, parts, use_counts=None):
+    """
+    Insert or overwrite catalog rows from {part_number: (description, price)}; a None
+    description keeps the one on file. One SELECT, one INSERT and one UPDATE executemany.
+    """
+    known = {part_number for (part_number,) in connection.execute(
+        select(CatalogPart.part_number).where(CatalogPart.part_number.in_(list(parts)))
+    )}
+    now = datetime.utcnow()
+    use_counts = use_counts or {}
+    new_rows = []
+    changed_rows = []
+    for part_number, (description, price) in parts.items():
+        if part_number in known:
+            changed_rows.append({'_part_number': part_number, 'description': description, 'price': price,
+                                 'use_count': use_counts.get(part_number), 'updated_at': now})
+        else:
+            new_rows.append({'part_number': part_number, 'description': description, 'price': price,
+                             'use_count': use_counts.get(part_number, 0), 'updated_at': now})
+    table = CatalogPart.__table__
+    if new_rows:
+        # A part added by another transaction since the SELECT is updated like a known one
+        statement = _catalog_insert(connection)
+        connection.execute(
+            statement.on_conflict_do_update(index_elements=['part_number'], set_={
+                'description': func.coalesce(statement.excluded.description, table.c.description),
+                'price': func.coalesce(statement.excluded.price, table.c.price),
+                'use_count': statement.excluded.use_count if use_counts else table.c.use_count,
+                'updated_at': statement.excluded.updated_at,
+            }),
+            new_rows
+        )
+    if changed_rows:
+        connection.execute(
+            update(table).where(table.c.part_number == bindparam('_part_number')).values(
+                description=func.coalesce(bindparam('description'), table.c.description),
+                price=func.coalesce(bindparam('price'), table.c.price),
+                use_count=func.coalesce(bindparam('use_count'), table.c.use_count),
+                updated_at=bindparam('updated_at')
+            ),
+            changed_rows
+        )
+    return len(new_rows), len(changed_rows)
+
+
+def record_price_book(entries, session=None):
+    """Price book entries are the catalog's description and price for their parts."""
+    session = session or db.session
+    upsert_parts(session.connection(), {
+        part_number: (entry['description'], entry['price']) for part_number, entry in entries.items()
+    })
+    session.info[CATALOG_CHANGED_KEY] = True
+
+
+@event.listens_for(db.session, 'after_flush')
+def catalog_new_part_numbers(session, flush_context):
+    """Add part numbers first seen on line items written by this flush."""
+    parts = {}
+    for obj in session.new:
+        if isinstance(obj, LineItem):
+            part_number = _clean_part_number(obj.part_number)
+            if part_number:
+                parts.setdefault(part_number, (obj.description, obj.price))
+    for obj in session.dirty:
+        if isinstance(obj, LineItem) and session.is_modified(obj, include_collections=False):
+            part_number = _clean_part_number(obj.part_number)
+            if part_number and inspect(obj).attrs.part_number.history.has_changes():
+                parts.setdefault(part_number, (obj.description, obj.price))
+    if parts and add_parts(session.connection(), parts):
+        session.info[CATALOG_CHANGED_KEY] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def reload_after_commit(session):
+    """Let this worker's next suggestion request pick up the parts it just wrote."""
+    if session.info.pop(CATALOG_CHANGED_KEY, None):
+        _state['checked_at'] = None
+
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_catalog_changes(session):
+    session.info.pop(CATALOG_CHANGED_KEY, None)
+
+
+def rebuild_catalog():
+    """
+    Recompute the catalog from all line items (use counts, latest description and price)
+    and the price book, which wins on description and price. Returns the number of parts.
+    """
+    connection = db.session.connection()
+    latest = select(
+        LineItem.part_number, func.count(LineItem.id).label('use_count'), func.max(LineItem.id).label('latest_id')
+    ).where(LineItem.part_number.isnot(None), LineItem.part_number != '').group_by(LineItem.part_number).subquery()
+    rows = connection.execute(
+        select(latest.c.part_number, latest.c.use_count, LineItem.description, LineItem.price)
+        .join(LineItem, LineItem.id == latest.c.latest_id)
+    ).all()
+
+    parts = {}
+    use_counts = {}
+    for part_number, use_count, description, price in rows:
+        cleaned = _clean_part_number(part_number)
+        if cleaned:
+            parts[cleaned] = (description, price)
+            use_counts[cleaned] = use_counts.get(cleaned, 0) + use_count
+    for part_number, description, price in connection.execute(
+        select(PriceBookEntry.part_number, PriceBookEntry.description, PriceBookEntry.price)
+    ):
+        parts[part_number] = (description or parts.get(part_number, (None, None))[0], price)
+
+    items = list(parts.items())
+    for start in range(0, len(items), REBUILD_BATCH_SIZE):
+        batch = dict(items[start:start + REBUILD_BATCH_SIZE])
+        upsert_parts(connection, batch, {part_number: use_counts.get(part_number, 0) for part_number in batch})
+    db.session.info[CATALOG_CHANGED_KEY] = True
+    return len(parts)
@@ -0,0 +1,181 @@
+# backend/services/pdf_cache.py
+"""
+On-disk cache of rendered bid PDFs (report and proposal).
+
+A document is stored under PDF_CACHE_FOLDER/<bid_id>/<kind>-<fingerprint>.pdf, where the
+fingerprint hashes everything the document prints: the bid totals, customer details, doors,
+line items, tax and labor rates, template version and the date printed on it. The same
+fingerprint is the response ETag, so an unchanged bid costs a few narrow SELECTs and either a
+304 or a file read instead of a ReportLab build. The folder is trimmed to PDF_CACHE_MAX_BYTES
+by least recent use, and a bid's files are dropped as soon as a repricing of it commits.
+"""
+
+import os
+import uuid
+import shutil
+import hashlib
+import logging
+from io import BytesIO
+from datetime import date
+from flask import current_app, request, send_file
+from sqlalchemy import event
+from models import db, Bid, Estimate, Customer, Door, LineItem
+from services import pricing
+from services.file_utils import PDF_TEMPLATE_VERSION, render_bid_report, render_bid_proposal
+
+logger = logging.getLogger(__name__)
+
+# kind -> (renderer, as_attachment, download name)
+PDF_KINDS = {
+    'report': (render_bid_report, True, 'bid_report_{}.pdf'),
+    'proposal': (render_bid_proposal, False, 'proposal_{}.pdf'),
+}
+
+
+def bid_fingerprint(bid, kind):
+    """sha256 over the data the `kind` document is rendered from."""
+    digest = hashlib.sha256()
+
+    def feed(*values):
+        digest.update(repr(values).encode('utf-8'))
+
+    feed(kind, PDF_TEMPLATE_VERSION, pricing.TAX_RATE, pricing.LABOR_RATE, date.today().isoformat())
+    feed(*db.session.query(
+        *[getattr(Bid, field) for field in pricing.BID_TOTAL_FIELDS],
+        Customer.name, Customer.address, Customer.contact_name, Customer.phone, Customer.email
+    ).join(Estimate, Bid.estimate_id == Estimate.id).join(Customer, Estimate.customer_id == Customer.id).filter(
+        Bid.id == bid.id
+    ).one())
+
+    unpriced = False
+    for row in db.session.query(
+        Door.id, Door.door_number, Door.parts_cost, Door.labor_cost, Door.hardware_cost
+    ).filter(Door.bid_id == bid.id).order_by(Door.id):
+        unpriced = unpriced or row.parts_cost is None
+        feed(*row)
+
+    # The proposal prints door totals only, unless some door has to be priced from its items
+    if kind == 'report' or unpriced:
+        for row in db.session.query(
+            LineItem.id, LineItem.door_id, LineItem.part_number, LineItem.description,
+            LineItem.quantity, LineItem.price, LineItem.labor_hours, LineItem.hardware
+        ).join(Door, LineItem.door_id == Door.id).filter(Door.bid_id == bid.id).order_by(LineItem.id):
+            feed(*row)
+    return digest.hexdigest()
+
+
+def cache_folder():
+    return current_app.config.get('PDF_CACHE_FOLDER', os.path.join('uploads', '_pdf_cache'))
+
+
+def cached_pdf_path(folder, bid_id, kind, fingerprint):
+    return os.path.join(folder, str(bid_id), f"{kind}-{fingerprint}.pdf")
+
+
+def write_file(path, data):
+    """Write atomically, so a concurrent reader never sees a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temporary_path, 'wb') as output:
+        output.write(data)
+    os.replace(temporary_path, path)
+
+
+def prune_to_limit():
+    prune(cache_folder(), current_app.config.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+
+def prune(folder, max_bytes):
+    """Delete the least recently used PDFs until the folder holds at most max_bytes. Returns the count."""
+    entries = []
+    total = 0
+    try:
+        subfolders = [entry.path for entry in os.scandir(folder) if entry.is_dir()]
+    except FileNotFoundError:
+        return 0
+    for subfolder in subfolders:
+        for entry in os.scandir(subfolder):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _, path, size in sorted(entries):
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+        if total <= max_bytes:
+            break
+    for subfolder in subfolders:
+        try:
+            os.rmdir(subfolder)
+        except OSError:
+            pass  # not empty
+    return removed
+
+
+def invalidate_bid(bid_id, folder=None):
+    """Drop every cached PDF of a bid."""
+    shutil.rmtree(os.path.join(folder or cache_folder(), str(bid_id)), ignore_errors=True)
+
+
+@event.listens_for(db.session, 'after_commit')
+def drop_repriced_pdfs(session):
+    """Cached documents of bids whose line items or doors changed can never be served again."""
+    bid_ids = session.info.pop(pricing.REPRICED_BIDS_KEY, None)
+    if not bid_ids:
+        return
+    folder = cache_folder()
+    for bid_id in bid_ids:
+        invalidate_bid(bid_id, folder)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_repriced_bids(session):
+    session.info.pop(pricing.REPRICED_BIDS_KEY, None)
+
+
+def serve_bid_pdf(bid, kind):
+    """
+    Response for a bid's report or proposal: 304 when the client's copy is current, the cached
+    file when there is one, otherwise a fresh render that is stored for the next request.
+    """
+    render, as_attachment, download_name = PDF_KINDS[kind]
+    fingerprint = bid_fingerprint(bid, kind)
+    folder = cache_folder()
+    path = cached_pdf_path(folder, bid.id, kind, fingerprint)
+
+    if fingerprint in request.if_none_match:
+        source = BytesIO()  # send_file answers 304 without reading it
+    else:
+        try:
+            os.utime(path)  # mark as recently used
+            source = path
+        except FileNotFoundError:
+            data = render(bid)
+            try:
+                write_file(path, data)
+                prune_to_limit()
+            except OSError as e:
+                logger.error(f"Could not cache {kind} PDF for bid {bid.id}: {e}")
+            source = BytesIO(data)
+
+    response = send_file(
+        source,
+        mimetype='application/pdf',
+        as_attachment=as_attachment,
+        download_name=download_name.format(bid.id),
+        etag=fingerprint,
+        conditional=True,
+        max_age=None
+    )
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
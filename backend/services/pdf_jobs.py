@@ -0,0 +1,230 @@
+# backend/services/pdf_jobs.py
+"""
+Background rendering of bid reports and proposals.
+
+A request queues a PdfJob and gets its id back to poll. `flask pdf-worker` claims jobs, reads
+each bid into a plain document snapshot (file_utils.load_document_data) and builds the PDFs on
+a local process pool, so ReportLab never runs in a web worker. Finished PDFs land in the
+fingerprinted PDF cache, where the synchronous endpoints find them too; a batch job also
+gets one ZIP of all its bids, streamed from disk on download.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import zipfile
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from models import db, Bid, Job, PdfJob
+from services import pdf_cache
+from services.file_utils import load_document_data, build_bid_report, build_bid_proposal
+
+logger = logging.getLogger(__name__)
+
+BATCH_SUBFOLDER = 'batches'
+
+PDF_BUILDERS = {
+    'report': build_bid_report,
+    'proposal': build_bid_proposal,
+}
+
+
+def write_bid_pdf(kind, document, path):
+    """Pool entry point: build one document from its snapshot and write it to path."""
+    pdf_cache.write_file(path, PDF_BUILDERS[kind](document))
+    return path
+
+
+def approved_bid_ids(month_start):
+    """Ids of bids approved in the calendar month starting at month_start (approval creates the Job)."""
+    month_end = (month_start + timedelta(days=32)).replace(day=1)
+    return [bid_id for (bid_id,) in db.session.query(Bid.id).join(Job, Job.bid_id == Bid.id).filter(
+        Bid.status == 'approved',
+        Job.created_at >= month_start,
+        Job.created_at < month_end
+    ).distinct().order_by(Bid.id)]
+
+
+def enqueue_pdf_job(kind, bid_ids, batch=False, user_id=None):
+    """
+    Queue a render, or return the identical job already waiting; committed by the caller.
+    A single document that is already cached for the bid's current data is ready at once.
+    """
+    encoded_ids = json.dumps(sorted(bid_ids))
+    pending = PdfJob.query.filter(
+        PdfJob.kind == kind,
+        PdfJob.bid_ids == encoded_ids,
+        PdfJob.batch == batch,
+        PdfJob.status.in_(('queued', 'running'))
+    ).first()
+    if pending is not None:
+        return pending
+
+    job = PdfJob(kind=kind, bid_ids=encoded_ids, batch=batch, status='queued', requested_by=user_id)
+    if not batch:
+        bid = db.session.get(Bid, bid_ids[0])
+        folder = pdf_cache.cache_folder()
+        path = pdf_cache.cached_pdf_path(folder, bid.id, kind, pdf_cache.bid_fingerprint(bid, kind))
+        if os.path.exists(path):
+            job.status = 'ready'
+            job.result_path = os.path.relpath(path, folder)
+            job.completed_at = datetime.utcnow()
+    db.session.add(job)
+    return job
+
+
+def job_status(job):
+    result = {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'batch': job.batch,
+        'bid_count': len(json.loads(job.bid_ids)),
+        'error': job.last_error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+    }
+    if job.status == 'ready':
+        result['download_url'] = f'/api/bids/pdf-jobs/{job.id}/download'
+    return result
+
+
+def job_download(job):
+    """(absolute path, download name) of a ready job's file, or None when it has been evicted."""
+    path = os.path.join(pdf_cache.cache_folder(), job.result_path)
+    if not os.path.exists(path):
+        return None
+    if job.batch:
+        return path, f'{job.kind}s_{job.id}.zip'
+    bid_id = json.loads(job.bid_ids)[0]
+    return path, pdf_cache.PDF_KINDS[job.kind][2].format(bid_id)
+
+
+def claim_jobs(worker_name, limit):
+    """Atomically move up to `limit` queued jobs to running for this worker (see media_queue.claim_tasks)."""
+    candidate_ids = [job_id for (job_id,) in db.session.query(PdfJob.id).filter(
+        PdfJob.status == 'queued'
+    ).order_by(PdfJob.id).limit(limit)]
+    if not candidate_ids:
+        return []
+
+    claim_token = f"{worker_name}:{uuid.uuid4().hex[:12]}"
+    PdfJob.query.filter(PdfJob.id.in_(candidate_ids), PdfJob.status == 'queued').update({
+        PdfJob.status: 'running',
+        PdfJob.locked_by: claim_token,
+        PdfJob.locked_at: datetime.utcnow()
+    }, synchronize_session=False)
+    jobs = PdfJob.query.filter(PdfJob.locked_by == claim_token).order_by(PdfJob.id).all()
+    db.session.commit()
+    return jobs
+
+
+def requeue_stale_jobs(timeout_minutes):
+    """Put back jobs whose worker died while running them. Returns the number requeued."""
+    cutoff = datetime.utcnow() - timedelta(minutes=timeout_minutes)
+    requeued = PdfJob.query.filter(PdfJob.status == 'running', PdfJob.locked_at < cutoff).update({
+        PdfJob.status: 'queued',
+        PdfJob.locked_by: None,
+        PdfJob.locked_at: None
+    }, synchronize_session=False)
+    db.session.commit()
+    if requeued:
+        logger.warning(f"Requeued {requeued} stale PDF jobs")
+    return requeued
+
+
+def _finish_job(job, folder, paths, errors):
+    """Point the job at its PDF, or zip a batch's PDFs, and record the outcome."""
+    if not job.batch:
+        if errors:
+            job.status = 'failed'
+            job.last_error = errors[0]
+        else:
+            job.status = 'ready'
+            job.result_path = os.path.relpath(paths[0][1], folder)
+    elif not paths:
+        job.status = 'failed'
+        job.last_error = '; '.join(errors) or 'No bids to render'
+    else:
+        zip_path = os.path.join(folder, BATCH_SUBFOLDER, f"{job.kind}s-{job.id}.zip")
+        os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+        # PDFs are already compressed; store them as they are
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as archive:
+            for bid_id, path in paths:
+                archive.write(path, pdf_cache.PDF_KINDS[job.kind][2].format(bid_id))
+        job.status = 'ready'
+        job.result_path = os.path.relpath(zip_path, folder)
+        job.last_error = '; '.join(errors) or None
+    job.locked_by = None
+    job.completed_at = datetime.utcnow()
+
+
+def run_pending_jobs(pool, worker_name, folder, limit):
+    """Claim one round of jobs, render every missing PDF on the pool and finish the jobs. Returns the count."""
+    jobs = claim_jobs(worker_name, limit)
+    if not jobs:
+        return 0
+
+    paths = {job.id: [] for job in jobs}
+    errors = {job.id: [] for job in jobs}
+    futures = {}
+    for job in jobs:
+        for bid_id in json.loads(job.bid_ids):
+            bid = db.session.get(Bid, bid_id)
+            if bid is None:
+                errors[job.id].append(f'Bid {bid_id} not found')
+                continue
+            path = pdf_cache.cached_pdf_path(folder, bid.id, job.kind, pdf_cache.bid_fingerprint(bid, job.kind))
+            if os.path.exists(path):
+                paths[job.id].append((bid_id, path))
+                continue
+            document = load_document_data(bid, with_line_items=job.kind == 'report')
+            futures[pool.submit(write_bid_pdf, job.kind, document, path)] = (job.id, bid_id)
+    db.session.rollback()  # release the read transaction while the pool works
+
+    for future in as_completed(futures):
+        job_id, bid_id = futures[future]
+        try:
+            paths[job_id].append((bid_id, future.result()))
+        except Exception as e:
+            logger.error(f"Rendering PDF for bid {bid_id} (job {job_id}) failed: {e}")
+            errors[job_id].append(f'Bid {bid_id}: {e}')
+
+    for job_id in paths:
+        job = db.session.get(PdfJob, job_id)
+        try:
+            _finish_job(job, folder, sorted(paths[job.id]), errors[job.id])
+        except OSError as e:
+            logger.error(f"Finishing PDF job {job.id} failed: {e}")
+            job.status = 'failed'
+            job.last_error = str(e)
+        db.session.commit()
+    pdf_cache.prune_to_limit()
+    return len(jobs)
+
+
+def run_worker(app, processes=None, poll_seconds=None, once=False):
+    """
+    Poll the PDF job table and render on a local process pool.
+
+    This loop only reads bids and records outcomes; building the documents happens in child
+    processes. With once=True the loop exits when the queue is empty.
+    """
+    processes = processes or app.config.get('PDF_WORKER_PROCESSES') or os.cpu_count() or 1
+    poll_seconds = poll_seconds or app.config.get('PDF_WORKER_POLL_SECONDS', 2)
+    timeout_minutes = app.config.get('PDF_JOB_TIMEOUT_MINUTES', 15)
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"[:40]
+
+    logger.info(f"PDF worker {worker_name} starting with {processes} processes")
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        while True:
+            with app.app_context():
+                requeue_stale_jobs(timeout_minutes)
+                processed = run_pending_jobs(pool, worker_name, pdf_cache.cache_folder(), processes)
+            if not processed:
+                if once:
+                    break
+                time.sleep(poll_seconds)
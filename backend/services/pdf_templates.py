@@ -0,0 +1,264 @@
+# backend/services/pdf_templates.py
+"""
+Paragraph styles, table styles and cell formatting for the bid PDFs, built once per process.
+
+ReportLab styles are read-only once created, so the documents in file_utils share these
+instead of calling getSampleStyleSheet() and compiling a TableStyle for every document.
+A report prints one table per door, so door tables are a DoorTable flowable with fixed
+columns that draws a whole table with one text object and one grid, rather than a platypus
+Table that measures, styles and draws every cell separately.
+"""
+
+from itertools import accumulate
+from reportlab.platypus import Flowable, TableStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.lib.utils import simpleSplit
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from services.pricing import line_item_total
+
+_sample_styles = getSampleStyleSheet()
+
+# --- Report ---
+
+TITLE_STYLE = _sample_styles['Heading1']
+HEADING2_STYLE = _sample_styles['Heading2']
+HEADING3_STYLE = _sample_styles['Heading3']
+NORMAL_STYLE = _sample_styles['Normal']
+
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (1, 0), colors.black),
+    ('ALIGN', (0, 0), (1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (1, 0), 12),
+    ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
+    ('FONTNAME', (0, -1), (1, -1), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+DOOR_TABLE_HEADER = ["Part Number", "Description", "Quantity", "Price", "Labor Hours", "Hardware", "Total"]
+DOOR_TABLE_COLUMN_WIDTHS = [64, 116, 44, 58, 58, 58, 58]  # 456pt: a 6.5in frame less its 6pt padding each side
+DOOR_TABLE_FONT_SIZE = 9
+DOOR_TABLE_LEADING = 11
+DOOR_TABLE_HEADER_FONT_SIZE = 8
+DOOR_TABLE_CELL_PADDING = 4
+DOOR_TABLE_HEADER_HEIGHT = 22
+
+_column_edges = list(accumulate([0] + DOOR_TABLE_COLUMN_WIDTHS))
+_cell_x = [edge + DOOR_TABLE_CELL_PADDING for edge in _column_edges[:-1]]
+_header_x = [
+    edge + (width - stringWidth(title, 'Helvetica-Bold', DOOR_TABLE_HEADER_FONT_SIZE)) / 2
+    for edge, width, title in zip(_column_edges, DOOR_TABLE_COLUMN_WIDTHS, DOOR_TABLE_HEADER)
+]
+
+
+def _row_height(row):
+    lines = 1 + max(row[0].count('\n'), row[1].count('\n'))
+    return lines * DOOR_TABLE_LEADING + 2 * DOOR_TABLE_CELL_PADDING
+
+
+class DoorTable(Flowable):
+    """
+    The line item table of one door. At a page break it splits between rows and repeats the
+    header; finding the split point only looks at the rows that fit.
+    """
+
+    def __init__(self, rows, total=None):
+        super().__init__()
+        self.rows = rows  # lists of cell strings from line_item_row
+        self.total = total  # the door total text, on the last part of a split table only
+        self.row_heights = [_row_height(row) for row in rows]
+        self.width = _column_edges[-1]
+        self.height = DOOR_TABLE_HEADER_HEIGHT + sum(self.row_heights) + (
+            DOOR_TABLE_LEADING + 2 * DOOR_TABLE_CELL_PADDING if total is not None else 0
+        )
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        space = availHeight - DOOR_TABLE_HEADER_HEIGHT
+        count = 0
+        for height in self.row_heights:
+            if height > space:
+                break
+            space -= height
+            count += 1
+        if count == 0:
+            return []
+        return [DoorTable(self.rows[:count]), DoorTable(self.rows[count:], self.total)]
+
+    def draw(self):
+        canvas = self.canv
+        row_tops = [self.height, self.height - DOOR_TABLE_HEADER_HEIGHT]
+        for height in self.row_heights:
+            row_tops.append(row_tops[-1] - height)
+        if self.total is not None:
+            row_tops.append(0)
+
+        canvas.saveState()
+        canvas.setFillColor(colors.lightgrey)
+        canvas.rect(0, row_tops[1], self.width, DOOR_TABLE_HEADER_HEIGHT, stroke=0, fill=1)
+        if self.total is not None:
+            canvas.rect(0, 0, self.width, row_tops[-2], stroke=0, fill=1)
+
+        text = canvas.beginText()
+        text.setFillColor(colors.black)
+        text.setFont('Helvetica-Bold', DOOR_TABLE_HEADER_FONT_SIZE)
+        baseline = self.height - DOOR_TABLE_CELL_PADDING - DOOR_TABLE_HEADER_FONT_SIZE
+        for x, title in zip(_header_x, DOOR_TABLE_HEADER):
+            text.setTextOrigin(x, baseline)
+            text.textOut(title)
+
+        text.setFont('Helvetica', DOOR_TABLE_FONT_SIZE, DOOR_TABLE_LEADING)
+        for row, top in zip(self.rows, row_tops[1:]):
+            baseline = top - DOOR_TABLE_CELL_PADDING - DOOR_TABLE_FONT_SIZE
+            for x, cell in zip(_cell_x, row):
+                text.setTextOrigin(x, baseline)
+                if '\n' in cell:
+                    text.textLines(cell)
+                else:
+                    text.textOut(cell)
+
+        if self.total is not None:
+            text.setFont('Helvetica-Bold', DOOR_TABLE_FONT_SIZE, DOOR_TABLE_LEADING)
+            baseline = row_tops[-2] - DOOR_TABLE_CELL_PADDING - DOOR_TABLE_FONT_SIZE
+            text.setTextOrigin(_cell_x[5], baseline)
+            text.textOut('Door Total:')
+            text.setTextOrigin(_cell_x[6], baseline)
+            text.textOut(self.total)
+        canvas.drawText(text)
+
+        canvas.setStrokeColor(colors.black)
+        canvas.setLineWidth(1)
+        canvas.grid(_column_edges, row_tops)
+        canvas.restoreState()
+
+
+# --- Proposal ---
+
+PROPOSAL_TITLE_STYLE = ParagraphStyle(
+    'TitleStyle',
+    parent=_sample_styles['Heading1'],
+    fontSize=24,
+    leading=30,
+    alignment=1,  # Center alignment
+    spaceAfter=24
+)
+
+SECTION_TITLE_STYLE = ParagraphStyle(
+    'SectionTitle',
+    parent=_sample_styles['Heading2'],
+    fontSize=14,
+    leading=18,
+    spaceBefore=12,
+    spaceAfter=6,
+    textColor=colors.darkblue
+)
+
+PROPOSAL_NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_sample_styles['Normal'],
+    fontSize=10,
+    leading=14,
+    spaceAfter=3
+)
+
+BOLD_STYLE = ParagraphStyle(
+    'BoldText',
+    parent=PROPOSAL_NORMAL_STYLE,
+    fontName='Helvetica-Bold'
+)
+
+TERMS_STYLE = ParagraphStyle(
+    'TermsStyle',
+    parent=PROPOSAL_NORMAL_STYLE,
+    leftIndent=10,
+    firstLineIndent=-10
+)
+
+FOOTER_STYLE = ParagraphStyle(
+    'FooterStyle',
+    parent=PROPOSAL_NORMAL_STYLE,
+    alignment=1,  # Center
+    textColor=colors.darkgrey,
+    fontSize=9
+)
+
+HEADER_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+COMPANY_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+])
+
+PRICE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('PADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, 0), 1, colors.darkblue),
+    ('LINEBELOW', (0, 0), (-1, 0), 1, colors.darkblue),
+    ('LINEABOVE', (0, 1), (-1, 1), 1, colors.lightgrey),
+    ('LINEBELOW', (0, -4), (-1, -4), 1, colors.lightgrey),
+    ('ALIGN', (1, 1), (1, -1), 'CENTER'),
+    ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+    ('LINEBELOW', (0, -2), (-1, -2), 1, colors.black),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('TEXTCOLOR', (0, -1), (-1, -1), colors.darkblue),
+])
+
+SIGNATURE_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, 0), 'LEFT'),
+    ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
+    ('LINEBELOW', (0, 1), (0, 1), 1, colors.black),
+    ('LINEBELOW', (1, 1), (1, 1), 1, colors.black),
+    ('TOPPADDING', (0, 1), (1, 1), 36),
+    ('BOTTOMPADDING', (0, 1), (1, 1), 6),
+])
+
+# --- Cells ---
+
+money = '${:.2f}'.format
+
+
+def _text_cell(text, column_width):
+    """The text as is when it surely fits the column, else broken into lines at word boundaries."""
+    width = column_width - 2 * DOOR_TABLE_CELL_PADDING
+    if len(text) * DOOR_TABLE_FONT_SIZE <= width:  # no Helvetica glyph is wider than 1em
+        return text
+    lines = []
+    for line in simpleSplit(text, 'Helvetica', DOOR_TABLE_FONT_SIZE, width):
+        # A single word wider than the column (long part numbers) is broken between characters
+        while len(line) > 1 and stringWidth(line, 'Helvetica', DOOR_TABLE_FONT_SIZE) > width:
+            cut = len(line) - 1
+            while cut > 1 and stringWidth(line[:cut], 'Helvetica', DOOR_TABLE_FONT_SIZE) > width:
+                cut -= 1
+            lines.append(line[:cut])
+            line = line[cut:]
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def line_item_row(item):
+    """One door table row; the same text the report has always printed."""
+    return [
+        _text_cell(item.part_number or 'N/A', DOOR_TABLE_COLUMN_WIDTHS[0]),
+        _text_cell(item.description or 'N/A', DOOR_TABLE_COLUMN_WIDTHS[1]),
+        str(item.quantity),
+        money(item.price or 0),
+        str(item.labor_hours),
+        money(item.hardware or 0),
+        money(line_item_total(item))
+    ]
+
+
+def door_table(line_items, door_total):
+    return DoorTable([line_item_row(item) for item in line_items], money(door_total))
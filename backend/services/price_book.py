@@ -0,0 +1,170 @@
+# backend/services/price_book.py
+"""
+Supplier price book and bulk repricing of open bids.
+
+The price book holds one current price per part number. Repricing finds every line item of
+an open (draft or pending) bid whose part number is in the book at a different price with
+one joined SELECT, which is also the dry-run diff, and rewrites all of them with a single
+UPDATE ... FROM the price book. Door and bid totals, bid versions and the sync log are then
+refreshed for exactly the doors and bids touched, in the same transaction.
+"""
+
+import logging
+from datetime import datetime
+from sqlalchemy import or_, func, update, insert, bindparam
+from models import db, Bid, Door, LineItem, PriceBookEntry
+from models.sync import record_bulk_changes
+from services import pricing, bid_versions, part_catalog
+
+logger = logging.getLogger(__name__)
+
+OPEN_BID_STATUSES = ('draft', 'pending')
+
+ENTRY_FIELDS = ('description', 'price', 'supplier')
+
+
+def _optional_text(value):
+    return (str(value).strip() or None) if value is not None else None
+
+
+def parse_entries(rows):
+    """
+    Validate price list rows (dicts with part_number, price and optionally description and
+    supplier). Returns (entries by part number, errors); a later row for a part wins.
+    """
+    entries = {}
+    errors = []
+    for index, row in enumerate(rows, start=1):
+        part_number = str(row.get('part_number') or '').strip()
+        if not part_number:
+            errors.append(f'Row {index}: missing part_number')
+            continue
+        if len(part_number) > 50:
+            errors.append(f'Row {index}: part_number {part_number!r} is longer than 50 characters')
+            continue
+        try:
+            price = float(row.get('price'))
+        except (TypeError, ValueError):
+            errors.append(f'Row {index}: invalid price {row.get("price")!r} for {part_number}')
+            continue
+        if price < 0:
+            errors.append(f'Row {index}: negative price for {part_number}')
+            continue
+        entries[part_number] = {
+            'part_number': part_number,
+            'description': _optional_text(row.get('description')),
+            'price': price,
+            'supplier': _optional_text(row.get('supplier')),
+        }
+    return entries, errors
+
+
+def upsert_entries(entries):
+    """
+    Write parsed entries: one IN query finds the known part numbers, then one executemany
+    INSERT for new parts and one executemany UPDATE for known ones; the parts catalog takes the
+    same descriptions and prices. Returns (created, updated). Committed by the caller.
+    """
+    if not entries:
+        return 0, 0
+    known = {part_number for (part_number,) in db.session.query(PriceBookEntry.part_number).filter(
+        PriceBookEntry.part_number.in_(list(entries))
+    )}
+    now = datetime.utcnow()
+    new_rows = [{**entry, 'updated_at': now} for part_number, entry in entries.items() if part_number not in known]
+    changed_rows = [
+        {'_part_number': part_number, **{field: entry[field] for field in ENTRY_FIELDS}, 'updated_at': now}
+        for part_number, entry in entries.items() if part_number in known
+    ]
+    table = PriceBookEntry.__table__
+    if new_rows:
+        db.session.execute(insert(table), new_rows)
+    if changed_rows:
+        db.session.execute(
+            update(table).where(table.c.part_number == bindparam('_part_number')).values(
+                price=bindparam('price'),
+                updated_at=bindparam('updated_at'),
+                # A price list without descriptions or suppliers keeps the ones on file
+                description=func.coalesce(bindparam('description'), table.c.description),
+                supplier=func.coalesce(bindparam('supplier'), table.c.supplier)
+            ),
+            changed_rows
+        )
+    part_catalog.record_price_book(entries)
+    return len(new_rows), len(changed_rows)
+
+
+def _stale_conditions(statuses, part_numbers):
+    """Line items of bids in `statuses` priced differently from their price book entry."""
+    conditions = [
+        LineItem.door_id == Door.id,
+        Door.bid_id == Bid.id,
+        LineItem.part_number == PriceBookEntry.part_number,
+        Bid.status.in_(statuses),
+        or_(LineItem.price.is_(None), LineItem.price != PriceBookEntry.price),
+    ]
+    if part_numbers:
+        conditions.append(PriceBookEntry.part_number.in_(part_numbers))
+    return conditions
+
+
+def _diff_report(rows, dry_run):
+    """Group the stale line items by bid, with the projected change of each bid total."""
+    bids = {}
+    for row in rows:
+        bid = bids.setdefault(row.bid_id, {'bid_id': row.bid_id, 'old_total': row.total_cost or 0.0,
+                                           'change': 0.0, 'line_items': []})
+        quantity = row.quantity or 0
+        bid['change'] += (row.new_price - (row.old_price or 0.0)) * quantity * (1 + pricing.TAX_RATE)
+        bid['line_items'].append({
+            'id': row.id,
+            'door_id': row.door_id,
+            'part_number': row.part_number,
+            'quantity': row.quantity,
+            'old_price': row.old_price,
+            'new_price': row.new_price,
+        })
+    for bid in bids.values():
+        bid['new_total'] = bid['old_total'] + bid['change']
+    return {
+        'dry_run': dry_run,
+        'line_item_count': len(rows),
+        'bid_count': len(bids),
+        'total_change': sum(bid['change'] for bid in bids.values()),
+        'bids': sorted(bids.values(), key=lambda bid: bid['bid_id']),
+    }
+
+
+def reprice_open_bids(dry_run=True, part_numbers=None, statuses=OPEN_BID_STATUSES):
+    """
+    Bring the line items of open bids to the price book price.
+
+    Returns the diff report; unless dry_run, the prices are also written and the totals
+    refreshed in the caller's transaction (committed by the caller).
+    """
+    rows = db.session.query(
+        LineItem.id, LineItem.door_id, Door.bid_id, LineItem.part_number, LineItem.quantity,
+        LineItem.price.label('old_price'), PriceBookEntry.price.label('new_price'), Bid.total_cost
+    ).filter(*_stale_conditions(statuses, part_numbers)).order_by(Door.bid_id, LineItem.id).all()
+    report = _diff_report(rows, dry_run)
+    if dry_run or not rows:
+        return report
+
+    # One statement: UPDATE line_items SET price = price_book.price FROM doors, bids, price_book WHERE ...
+    db.session.execute(
+        update(LineItem).where(*_stale_conditions(statuses, part_numbers)).values(price=PriceBookEntry.price),
+        execution_options={'synchronize_session': False}
+    )
+    door_ids = {row.door_id for row in rows}
+    bid_ids = {row.bid_id for row in rows}
+    pricing.refresh_totals(door_ids)
+    bid_versions.bump(bid_ids)
+    record_bulk_changes(db.session, [('line_item', row.id, 'upsert', row.door_id) for row in rows])
+
+    new_totals = dict(db.session.query(Bid.id, Bid.total_cost).filter(Bid.id.in_(bid_ids)))
+    for bid in report['bids']:
+        bid['new_total'] = new_totals[bid['bid_id']]
+        bid['change'] = bid['new_total'] - bid['old_total']
+    report['total_change'] = sum(bid['change'] for bid in report['bids'])
+    logger.info(f"Repriced {len(rows)} line items on {len(bid_ids)} open bids from the price book")
+    return report
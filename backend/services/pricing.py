@@ -0,0 +1,229 @@
+# backend/services/pricing.py
+"""
+The one place bid pricing is defined.
+
+A door's totals are sums over its line items. A bid adds sales tax on parts and hardware
+(labor is not taxed). Both levels are stored (Door.parts_cost/labor_cost/hardware_cost and
+Bid.total_*), and a flush listener refreshes them for just the doors it touched with one
+aggregate query per level. Reading a bid or rendering its PDFs never rescans its line items
+to price them.
+"""
+
+import logging
+from sqlalchemy import event, func, select, update, bindparam, inspect
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm.util import identity_key
+from models import db, Bid, Door, LineItem
+
+logger = logging.getLogger(__name__)
+
+LABOR_RATE = 47.02  # dollars per labor hour
+TAX_RATE = 0.0875  # on parts and hardware
+
+REBUILD_BATCH_SIZE = 500
+
+# Line item columns that change a door's totals
+PRICED_FIELDS = ('door_id', 'price', 'quantity', 'labor_hours', 'hardware')
+DOOR_COST_FIELDS = ('parts_cost', 'labor_cost', 'hardware_cost')
+BID_TOTAL_FIELDS = ('total_parts_cost', 'total_labor_cost', 'total_hardware_cost', 'tax_amount', 'total_cost')
+
+# session.info key collecting the bids repriced in the current transaction (see pdf_cache)
+REPRICED_BIDS_KEY = 'repriced_bid_ids'
+
+
+def line_item_total(item):
+    """Parts cost of one line item (price x quantity), as shown on bids and reports."""
+    return (item.price or 0) * (item.quantity or 0)
+
+
+def door_summary(parts_cost, labor_cost, hardware_cost):
+    return {
+        'parts_cost': parts_cost,
+        'labor_cost': labor_cost,
+        'hardware_cost': hardware_cost,
+        'total': parts_cost + labor_cost + hardware_cost,
+    }
+
+
+def bid_summary(parts_cost, labor_cost, hardware_cost):
+    tax_amount = (parts_cost + hardware_cost) * TAX_RATE
+    return {
+        'total_parts_cost': parts_cost,
+        'total_labor_cost': labor_cost,
+        'total_hardware_cost': hardware_cost,
+        'tax_amount': tax_amount,
+        'total_cost': parts_cost + labor_cost + hardware_cost + tax_amount,
+    }
+
+
+def _door_sums(connection, door_ids):
+    """{door_id: (parts, labor, hardware)} for the doors that have line items, in one query."""
+    rows = connection.execute(
+        select(
+            LineItem.door_id,
+            func.coalesce(func.sum(LineItem.price * LineItem.quantity), 0.0),
+            func.coalesce(func.sum(LineItem.labor_hours), 0.0) * LABOR_RATE,
+            func.coalesce(func.sum(LineItem.hardware), 0.0)
+        ).where(LineItem.door_id.in_(door_ids)).group_by(LineItem.door_id)
+    )
+    return {door_id: (parts, labor, hardware) for door_id, parts, labor, hardware in rows}
+
+
+def _set_loaded(session, model, key, values):
+    """Mirror values written with Core statements onto the instance if it is in the session."""
+    instance = session.identity_map.get(identity_key(model, key)) if session is not None else None
+    if instance is not None:
+        for field, value in values.items():
+            attributes.set_committed_value(instance, field, value)
+
+
+def refresh_totals(door_ids=(), bid_ids=(), session=None):
+    """
+    Recompute the stored totals of the given doors and of their bids (plus `bid_ids`).
+
+    Runs inside the caller's transaction: one aggregate over the doors' line items, one over
+    the bids' doors, and an executemany UPDATE for each level. Doors a bid has never had
+    priced (NULL columns, e.g. rows older than this column) are priced along the way.
+    """
+    session = session or db.session
+    connection = session.connection()
+    door_ids = set(door_ids)
+    bid_ids = set(bid_ids)
+
+    if door_ids:
+        bid_ids.update(bid_id for (bid_id,) in connection.execute(
+            select(Door.bid_id).where(Door.id.in_(door_ids)).distinct()
+        ))
+    bid_ids.discard(None)
+    if bid_ids:
+        door_ids.update(door_id for (door_id,) in connection.execute(
+            select(Door.id).where(Door.bid_id.in_(bid_ids), Door.parts_cost.is_(None))
+        ))
+
+    if door_ids:
+        sums = _door_sums(connection, door_ids)
+        door_rows = []
+        for door_id in door_ids:
+            parts, labor, hardware = sums.get(door_id, (0.0, 0.0, 0.0))
+            door_rows.append({'_id': door_id, 'parts_cost': parts, 'labor_cost': labor, 'hardware_cost': hardware})
+        connection.execute(
+            update(Door.__table__).where(Door.__table__.c.id == bindparam('_id')).values(
+                {field: bindparam(field) for field in DOOR_COST_FIELDS}
+            ),
+            door_rows
+        )
+        for row in door_rows:
+            _set_loaded(session, Door, row['_id'], {field: row[field] for field in DOOR_COST_FIELDS})
+
+    if bid_ids:
+        sums = {bid_id: (parts, labor, hardware) for bid_id, parts, labor, hardware in connection.execute(
+            select(
+                Door.bid_id,
+                func.coalesce(func.sum(Door.parts_cost), 0.0),
+                func.coalesce(func.sum(Door.labor_cost), 0.0),
+                func.coalesce(func.sum(Door.hardware_cost), 0.0)
+            ).where(Door.bid_id.in_(bid_ids)).group_by(Door.bid_id)
+        )}
+        bid_rows = []
+        for bid_id in bid_ids:
+            summary = bid_summary(*sums.get(bid_id, (0.0, 0.0, 0.0)))
+            bid_rows.append({'_id': bid_id, **summary})
+        connection.execute(
+            update(Bid.__table__).where(Bid.__table__.c.id == bindparam('_id')).values(
+                {field: bindparam(field) for field in BID_TOTAL_FIELDS}
+            ),
+            bid_rows
+        )
+        for row in bid_rows:
+            _set_loaded(session, Bid, row['_id'], {field: row[field] for field in BID_TOTAL_FIELDS})
+        session.info.setdefault(REPRICED_BIDS_KEY, set()).update(bid_ids)
+
+
+@event.listens_for(db.session, 'after_flush')
+def refresh_priced_totals(session, flush_context):
+    """Refresh door and bid totals for line items and doors written by this flush."""
+    door_ids = set()
+    bid_ids = set()
+    for obj in session.new:
+        if isinstance(obj, LineItem):
+            door_ids.add(obj.door_id)
+    for obj in session.dirty:
+        if isinstance(obj, LineItem):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in PRICED_FIELDS):
+                door_ids.add(obj.door_id)
+                door_ids.update(state.attrs.door_id.history.deleted)
+        elif isinstance(obj, Door):
+            history = inspect(obj).attrs.bid_id.history
+            if history.has_changes():
+                bid_ids.update(history.added)
+                bid_ids.update(history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, LineItem):
+            door_ids.add(obj.door_id)
+        elif isinstance(obj, Door):
+            bid_ids.add(obj.bid_id)
+
+    door_ids.discard(None)
+    if door_ids or bid_ids:
+        refresh_totals(door_ids, bid_ids, session)
+
+
+def door_totals(doors):
+    """
+    {door_id: door_summary} from the stored columns. Doors never priced yet are summed
+    from their line items with one query, without writing.
+    """
+    unpriced = [door.id for door in doors if door.parts_cost is None]
+    sums = _door_sums(db.session.connection(), unpriced) if unpriced else {}
+    totals = {}
+    for door in doors:
+        if door.parts_cost is None:
+            totals[door.id] = door_summary(*sums.get(door.id, (0.0, 0.0, 0.0)))
+        else:
+            totals[door.id] = door_summary(door.parts_cost, door.labor_cost or 0.0, door.hardware_cost or 0.0)
+    return totals
+
+
+def bid_totals(bid, doors_totals=None):
+    """Stored bid totals, or the sum of `doors_totals` when the bid has never been priced."""
+    if bid.total_parts_cost is not None and bid.tax_amount is not None:
+        return {field: getattr(bid, field) or 0.0 for field in BID_TOTAL_FIELDS}
+    if doors_totals is None:
+        doors_totals = door_totals(Door.query.filter_by(bid_id=bid.id).all())
+    return bid_summary(
+        sum(totals['parts_cost'] for totals in doors_totals.values()),
+        sum(totals['labor_cost'] for totals in doors_totals.values()),
+        sum(totals['hardware_cost'] for totals in doors_totals.values())
+    )
+
+
+def load_priced_bid(bid, with_line_items=True):
+    """
+    Everything needed to show or print a bid: its doors (by id), their line items grouped
+    by door (one IN query), and the door and bid totals.
+    """
+    doors = Door.query.filter_by(bid_id=bid.id).order_by(Door.id).all()
+    line_items = {door.id: [] for door in doors}
+    if with_line_items and doors:
+        for item in LineItem.query.filter(LineItem.door_id.in_(list(line_items))).order_by(LineItem.id):
+            line_items[item.door_id].append(item)
+    totals_by_door = door_totals(doors)
+    return {
+        'doors': doors,
+        'line_items': line_items,
+        'door_totals': totals_by_door,
+        'totals': bid_totals(bid, totals_by_door),
+    }
+
+
+def rebuild_pricing(bid_ids=None):
+    """Recompute stored totals for the given bids (or all bids) in batches. Returns the count."""
+    if bid_ids is None:
+        bid_ids = [bid_id for (bid_id,) in db.session.query(Bid.id).order_by(Bid.id)]
+    bid_ids = list(bid_ids)
+    for start in range(0, len(bid_ids), REBUILD_BATCH_SIZE):
+        batch = bid_ids[start:start + REBUILD_BATCH_SIZE]
+        door_ids = [door_id for (door_id,) in db.session.query(Door.id).filter(Door.bid_id.in_(batch))]
+        refresh_totals(door_ids, batch)
+    return len(bid_ids)
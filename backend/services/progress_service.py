@@ -0,0 +1,239 @@
+# backend/services/progress_service.py
+
+import logging
+from datetime import datetime
+from sqlalchemy import func
+from models import db, Job, JobProgress, JobTimeTracking, MobileJobLineItem, LineItem
+from services.mobile_service import get_jobs_mobile_status, get_jobs_progress_and_time
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 500
+
+
+def _minutes_between(start_time, end_time):
+    """Whole minutes between two timestamps, matching how time segments are recorded."""
+    return int((end_time - start_time).total_seconds() / 60)
+
+
+def _progress_for_update(job):
+    """
+    Return (row, rebuilt) for a job's rollup. When no row exists yet it is built from the
+    source tables, which already include the caller's pending change (the rebuild queries
+    autoflush), so the caller must not apply its delta again.
+    """
+    progress = db.session.get(JobProgress, job.id)
+    if progress is None:
+        return rebuild_job_progress([job.id])[job.id], True
+    return progress, False
+
+
+# The record_* hooks are called by the mobile routes after the source rows were changed,
+# inside the same transaction, so the rollup commits or rolls back together with them.
+
+def record_session_started(job, start_time):
+    """A time tracking session was opened for the job (start or resume)."""
+    progress, rebuilt = _progress_for_update(job)
+    if rebuilt:
+        return
+    if progress.active_since is None or start_time < progress.active_since:
+        progress.active_since = start_time
+    if progress.mobile_status != 'completed':
+        progress.mobile_status = 'started'
+
+
+def record_session_closed(job, minutes):
+    """A time tracking session was closed (pause or complete) after running for `minutes`."""
+    progress, rebuilt = _progress_for_update(job)
+    if rebuilt:
+        return
+    progress.accumulated_minutes = (progress.accumulated_minutes or 0) + (minutes or 0)
+
+    # Other crew members may still have sessions running on the same job
+    db.session.flush()
+    progress.active_since = db.session.query(func.min(JobTimeTracking.start_time)).filter(
+        JobTimeTracking.job_id == job.id,
+        JobTimeTracking.status == 'active'
+    ).scalar()
+
+
+def record_job_started(job):
+    """A start signature was captured for the job."""
+    progress, rebuilt = _progress_for_update(job)
+    if not rebuilt and progress.mobile_status != 'completed':
+        progress.mobile_status = 'started'
+
+
+def record_job_completed(job):
+    """The job was marked complete from the mobile interface."""
+    progress, _ = _progress_for_update(job)
+    progress.mobile_status = 'completed'
+
+
+def record_door_completed(job):
+    """A door completion signature was captured for the job."""
+    progress, rebuilt = _progress_for_update(job)
+    if not rebuilt:
+        progress.completed_doors = (progress.completed_doors or 0) + 1
+
+
+def record_line_item_toggled(job, completed):
+    """A line item was checked off (completed=True) or unchecked on the job."""
+    progress, rebuilt = _progress_for_update(job)
+    if not rebuilt:
+        delta = 1 if completed else -1
+        progress.completed_line_items = max((progress.completed_line_items or 0) + delta, 0)
+
+
+def adjust_total_doors(bid_id, delta):
+    """Doors were added to (positive delta) or removed from a bid; update the job rollup in place."""
+    if not delta:
+        return
+    job_ids = db.session.query(Job.id).filter(Job.bid_id == bid_id)
+    JobProgress.query.filter(JobProgress.job_id.in_(job_ids)).update(
+        {
+            JobProgress.total_doors: JobProgress.total_doors + delta,
+            JobProgress.updated_at: datetime.utcnow()
+        },
+        synchronize_session=False
+    )
+
+
+def rebuild_bid_progress(bid_id):
+    """Rebuild the rollup of any job attached to a bid, e.g. after a door and its history were deleted."""
+    job_ids = [job_id for (job_id,) in db.session.query(Job.id).filter(Job.bid_id == bid_id)]
+    if job_ids:
+        db.session.flush()
+        rebuild_job_progress(job_ids)
+
+
+def _backfill_closed_segment_minutes(job_ids):
+    """Fill in total_minutes on closed time segments recorded before the rollup existed."""
+    sessions = JobTimeTracking.query.filter(
+        JobTimeTracking.job_id.in_(job_ids),
+        JobTimeTracking.status.in_(['completed', 'paused']),
+        JobTimeTracking.total_minutes.is_(None),
+        JobTimeTracking.end_time.isnot(None)
+    ).all()
+    for session in sessions:
+        session.total_minutes = _minutes_between(session.start_time, session.end_time)
+    if sessions:
+        db.session.flush()
+    return len(sessions)
+
+
+def rebuild_job_progress(job_ids=None):
+    """
+    Recompute rollup rows from JobSignature, JobTimeTracking, MobileJobLineItem and Door.
+
+    When job_ids is None every job is reconciled, in batches. Rows are added to the current
+    session; the caller commits. Returns {job_id: JobProgress}.
+    """
+    if job_ids is None:
+        job_ids = [job_id for (job_id,) in db.session.query(Job.id).order_by(Job.id)]
+
+    rebuilt = {}
+    for offset in range(0, len(job_ids), REBUILD_BATCH_SIZE):
+        batch_ids = job_ids[offset:offset + REBUILD_BATCH_SIZE]
+        jobs = Job.query.filter(Job.id.in_(batch_ids)).all()
+        if not jobs:
+            continue
+
+        _backfill_closed_segment_minutes(batch_ids)
+        statuses = get_jobs_mobile_status(jobs)
+        progress_data = get_jobs_progress_and_time(jobs)
+
+        line_item_counts = dict(db.session.query(
+            MobileJobLineItem.job_id, func.count(func.distinct(MobileJobLineItem.line_item_id))
+        ).join(
+            LineItem, LineItem.id == MobileJobLineItem.line_item_id
+        ).filter(
+            MobileJobLineItem.job_id.in_(batch_ids),
+            MobileJobLineItem.completed == True
+        ).group_by(MobileJobLineItem.job_id).all())
+
+        closed_minutes = dict(db.session.query(
+            JobTimeTracking.job_id, func.sum(JobTimeTracking.total_minutes)
+        ).filter(
+            JobTimeTracking.job_id.in_(batch_ids),
+            JobTimeTracking.status.in_(['completed', 'paused'])
+        ).group_by(JobTimeTracking.job_id).all())
+
+        active_since = dict(db.session.query(
+            JobTimeTracking.job_id, func.min(JobTimeTracking.start_time)
+        ).filter(
+            JobTimeTracking.job_id.in_(batch_ids),
+            JobTimeTracking.status == 'active'
+        ).group_by(JobTimeTracking.job_id).all())
+
+        existing = {row.job_id: row for row in JobProgress.query.filter(JobProgress.job_id.in_(batch_ids))}
+        for job in jobs:
+            progress = existing.get(job.id)
+            if progress is None:
+                progress = JobProgress(job_id=job.id)
+                db.session.add(progress)
+            progress.total_doors = progress_data[job.id]['total_doors']
+            progress.completed_doors = progress_data[job.id]['completed_doors']
+            progress.completed_line_items = line_item_counts.get(job.id, 0)
+            progress.accumulated_minutes = closed_minutes.get(job.id) or 0
+            progress.active_since = active_since.get(job.id)
+            progress.mobile_status = statuses[job.id]
+            rebuilt[job.id] = progress
+
+    return rebuilt
+
+
+def _rollup_dict(job, mobile_status, total_doors, completed_doors, completed_line_items, total_minutes):
+    """Shape a rollup the same way get_job_progress_and_time does, plus status and line items."""
+    if job.status == 'completed':
+        mobile_status = 'completed'
+    completed_doors = completed_doors if total_doors > 0 else 0
+    return {
+        'mobile_status': mobile_status,
+        'total_doors': total_doors,
+        'completed_doors': completed_doors,
+        'completion_percentage': round((completed_doors / total_doors * 100), 1) if total_doors > 0 else 0,
+        'completed_line_items': completed_line_items,
+        'total_time_hours': round(total_minutes / 60, 2),
+        'total_minutes': total_minutes
+    }
+
+
+def get_jobs_rollup(jobs):
+    """
+    Read mobile status and progress for a list of jobs from the rollup table in one query.
+
+    Jobs without a rollup row yet fall back to the grouped source-table computation; nothing
+    is written from this read path. Returns a dict keyed by job id.
+    """
+    if not jobs:
+        return {}
+
+    now = datetime.utcnow()
+    rows = {row.job_id: row for row in JobProgress.query.filter(JobProgress.job_id.in_([job.id for job in jobs]))}
+
+    rollups = {}
+    missing = []
+    for job in jobs:
+        row = rows.get(job.id)
+        if row is None:
+            missing.append(job)
+            continue
+        total_minutes = row.accumulated_minutes or 0
+        if row.active_since:
+            total_minutes += _minutes_between(row.active_since, now)
+        rollups[job.id] = _rollup_dict(
+            job, row.mobile_status, row.total_doors or 0, row.completed_doors or 0,
+            row.completed_line_items or 0, total_minutes
+        )
+
+    if missing:
+        statuses = get_jobs_mobile_status(missing)
+        progress_data = get_jobs_progress_and_time(missing)
+        for job in missing:
+            data = progress_data[job.id]
+            rollups[job.id] = _rollup_dict(
+                job, statuses[job.id], data['total_doors'], data['completed_doors'], None, data['total_minutes']
+            )
+
+    return rollups
@@ -0,0 +1,164 @@
+# backend/services/route_optimizer.py
+"""
+Suggested driving order for a truck's jobs.
+
+Works entirely from the coordinates cached on sites (Site.latitude/longitude); nothing is
+geocoded or looked up online. Distances are great-circle (haversine) kilometres, which rank
+routes well enough for a day of local stops. The route is an open path: it starts at the
+depot when one is configured, else at the first stop, and ends at the last stop.
+
+The path is built by nearest neighbour (from every possible start when the first stop is
+free) and then improved with 2-opt (reversing a stretch) and Or-opt (moving a run of one to
+three stops elsewhere, either way round) until neither finds a shorter route. Stops pinned
+first or last, and the depot, never move. Twenty-five stops take a few milliseconds.
+"""
+
+import math
+
+EARTH_RADIUS_KM = 6371.0
+OR_OPT_MAX_SEGMENT = 3
+MAX_IMPROVEMENT_ROUNDS = 100  # safety net; routes converge long before this
+
+
+def parse_point(latitude, longitude):
+    """(latitude, longitude) as floats, or None when both are empty; ValueError when invalid."""
+    if latitude in (None, '') and longitude in (None, ''):
+        return None
+    try:
+        point = (float(latitude), float(longitude))
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid coordinates {latitude!r}, {longitude!r}')
+    if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+        raise ValueError(f'Coordinates out of range: {point[0]}, {point[1]}')
+    return point
+
+
+def haversine_km(a, b):
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def distance_matrix(points):
+    """Symmetric matrix of haversine distances between (latitude, longitude) points."""
+    size = len(points)
+    matrix = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1, size):
+            matrix[i][j] = matrix[j][i] = haversine_km(points[i], points[j])
+    return matrix
+
+
+def path_length(path, matrix):
+    return sum(matrix[a][b] for a, b in zip(path, path[1:]))
+
+
+def _nearest_neighbour(start, nodes, matrix):
+    path = [start]
+    remaining = set(nodes) - {start}
+    while remaining:
+        last = path[-1]
+        nearest = min(remaining, key=lambda node: (matrix[last][node], node))
+        path.append(nearest)
+        remaining.remove(nearest)
+    return path
+
+
+def _two_opt(path, matrix, lo, hi):
+    """One improving reversal of path[i..j] with lo <= i < j <= hi; True if one was made."""
+    last = len(path) - 1
+    for i in range(lo, hi):
+        before = path[i - 1] if i > 0 else None
+        for j in range(i + 1, hi + 1):
+            after = path[j + 1] if j < last else None
+            old = (matrix[before][path[i]] if before is not None else 0.0) + \
+                  (matrix[path[j]][after] if after is not None else 0.0)
+            new = (matrix[before][path[j]] if before is not None else 0.0) + \
+                  (matrix[path[i]][after] if after is not None else 0.0)
+            if new < old - 1e-9:
+                path[i:j + 1] = reversed(path[i:j + 1])
+                return True
+    return False
+
+
+def _or_opt(path, matrix, lo, hi):
+    """One improving move of a run of up to OR_OPT_MAX_SEGMENT stops within path[lo..hi]."""
+    def edge(a, b):
+        return matrix[a][b] if a is not None and b is not None else 0.0
+
+    last = len(path) - 1
+    for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+        for i in range(lo, hi - length + 2):
+            segment = path[i:i + length]
+            before = path[i - 1] if i > 0 else None
+            after = path[i + length] if i + length <= last else None
+            removal_gain = edge(before, segment[0]) + edge(segment[-1], after) - edge(before, after)
+            rest = path[:i] + path[i + length:]
+            # Insert between rest[q - 1] and rest[q], keeping clear of the fixed ends
+            for q in range(lo, hi - length + 2):
+                if q == i:
+                    continue
+                a = rest[q - 1] if q > 0 else None
+                b = rest[q] if q < len(rest) else None
+                for candidate in (segment, segment[::-1]):
+                    cost = edge(a, candidate[0]) + edge(candidate[-1], b) - edge(a, b)
+                    if cost < removal_gain - 1e-9:
+                        path[:] = rest[:q] + candidate + rest[q:]
+                        return True
+    return False
+
+
+def optimize_path(matrix, first=None, last=None, start=None):
+    """
+    Shortest open path found through every node of `matrix`. `first` and `last` pin a node
+    to the ends; `start` (e.g. a depot) is placed before everything, including `first`.
+    Returns the node order.
+    """
+    nodes = list(range(len(matrix)))
+    prefix = [node for node in (start, first) if node is not None]
+    suffix = [last] if last is not None and last not in prefix else []
+    middle = [node for node in nodes if node not in prefix and node not in suffix]
+    if not middle:
+        return prefix + suffix
+
+    if prefix:
+        candidates = [prefix + _nearest_neighbour(prefix[-1], [prefix[-1]] + middle, matrix)[1:] + suffix]
+    else:
+        candidates = [_nearest_neighbour(node, middle, matrix) + suffix for node in middle]
+    path = min(candidates, key=lambda candidate: path_length(candidate, matrix))
+
+    lo = len(prefix)
+    hi = len(path) - len(suffix) - 1
+    for _ in range(MAX_IMPROVEMENT_ROUNDS):
+        if not (_two_opt(path, matrix, lo, hi) or _or_opt(path, matrix, lo, hi)):
+            break
+    return path
+
+
+def optimize_route(stops, first=None, last=None, depot=None):
+    """
+    Order `stops`, a list of (key, (latitude, longitude)), for the shortest drive.
+    `first`/`last` are keys to pin; `depot` is an optional (latitude, longitude) start.
+    Returns (ordered keys, total km) where the total includes the leg from the depot.
+    """
+    keys = [key for key, _ in stops]
+    points = [point for _, point in stops]
+    start = None
+    if depot is not None:
+        points.append(depot)
+        start = len(points) - 1
+    matrix = distance_matrix(points)
+    path = optimize_path(
+        matrix,
+        first=keys.index(first) if first is not None else None,
+        last=keys.index(last) if last is not None else None,
+        start=start
+    )
+    return [keys[node] for node in path if node != start], path_length(path, matrix)
+
+
+def route_km(points, depot=None):
+    """Driving distance of visiting `points` in the given order, from the depot if there is one."""
+    path = ([depot] if depot is not None else []) + list(points)
+    return sum((haversine_km(a, b) for a, b in zip(path, path[1:])), 0.0)
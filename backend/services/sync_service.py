@@ -0,0 +1,127 @@
+# backend/services/sync_service.py
+
+import base64
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from models import db, SyncChange
+
+logger = logging.getLogger(__name__)
+
+CURSOR_VERSION = 1
+
+
+class SyncCursorError(ValueError):
+    """Raised when a client sends a cursor this server cannot read."""
+
+
+def encode_cursor(sequence, issued_at=None):
+    """Pack a sync sequence into the opaque string handed to devices."""
+    issued_at = issued_at or datetime.utcnow()
+    payload = json.dumps({'v': CURSOR_VERSION, 's': sequence, 't': int(issued_at.timestamp())}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (sequence, issued_at) from a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if payload.get('v') != CURSOR_VERSION:
+            raise SyncCursorError('Unsupported sync cursor version')
+        return int(payload['s']), datetime.fromtimestamp(int(payload['t']))
+    except SyncCursorError:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        raise SyncCursorError(f'Invalid sync cursor: {e}')
+
+
+def cursor_expired(issued_at, retention_days):
+    """True when changes the cursor still needs may already have been pruned."""
+    return issued_at < datetime.utcnow() - timedelta(days=retention_days)
+
+
+def current_sequence():
+    """Highest sequence number recorded so far (0 when the log is empty)."""
+    return db.session.query(func.max(SyncChange.id)).scalar() or 0
+
+
+def read_changes(truck, since, limit, recheck_from=None):
+    """
+    Read and collapse the change log for a truck after sequence `since`.
+
+    Sequence numbers are handed out at insert but become visible at commit, so on PostgreSQL
+    a row below `since` can commit after the read that produced the cursor. With
+    `recheck_from` (the previous read's start minus SYNC_CURSOR_OVERLAP_SECONDS) the truck's
+    rows at or below `since` written since then are read again; what they point at is sent
+    again, which devices apply like any other snapshot or tombstone.
+
+    Several changes to the same entity collapse to the last one; a job that was reassigned
+    to the truck is flagged for a full snapshot. Returns (changes, next_sequence, has_more)
+    where changes is a dict with:
+      full_jobs      job ids to send in full (job row plus every door)
+      refresh_jobs   job ids whose job row changed or that own a changed entity
+      doors_by_job   {job_id: {door_id, ...}} doors whose details must be resent
+      media_ids      door media rows to resend in the manifest
+      signature_ids  signatures to resend
+      deleted        {entity_type: {entity_id, ...}} tombstones
+    """
+    truck_changes = SyncChange.query.filter(SyncChange.truck == truck)
+    rows = truck_changes.filter(SyncChange.id > since).order_by(SyncChange.id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_sequence = rows[-1].id if rows else since
+    if recheck_from is not None:
+        rows = truck_changes.filter(
+            SyncChange.id <= since,
+            SyncChange.changed_at >= recheck_from
+        ).order_by(SyncChange.id).all() + rows
+
+    job_state = {}
+    touched_jobs = set()
+    latest = {}
+    for row in rows:
+        if row.entity_type == 'job':
+            if not (job_state.get(row.entity_id) == 'assign' and row.operation == 'upsert'):
+                job_state[row.entity_id] = row.operation
+        else:
+            touched_jobs.add(row.job_id)
+            latest[(row.entity_type, row.entity_id)] = row
+
+    deleted_jobs = {job_id for job_id, operation in job_state.items() if operation == 'delete'}
+    full_jobs = {job_id for job_id, operation in job_state.items() if operation == 'assign'}
+    refresh_jobs = (touched_jobs | set(job_state)) - deleted_jobs - full_jobs
+
+    changes = {
+        'full_jobs': full_jobs,
+        'refresh_jobs': refresh_jobs,
+        'doors_by_job': {},
+        'media_ids': set(),
+        'signature_ids': set(),
+        'deleted': {'jobs': deleted_jobs} if deleted_jobs else {},
+    }
+    for (entity_type, entity_id), row in latest.items():
+        if row.job_id in deleted_jobs or row.job_id in full_jobs:
+            continue
+        if row.operation == 'delete':
+            changes['deleted'].setdefault(f'{entity_type}s', set()).add(entity_id)
+            if entity_type == 'door':
+                continue
+        elif entity_type == 'media':
+            changes['media_ids'].add(entity_id)
+        elif entity_type == 'signature':
+            changes['signature_ids'].add(entity_id)
+        if row.door_id is not None and entity_type != 'time_tracking':
+            changes['doors_by_job'].setdefault(row.job_id, set()).add(row.door_id)
+
+    return changes, next_sequence, has_more
+
+
+def prune_sync_changes(retention_days):
+    """Delete change log rows older than the retention window. Returns the number removed."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    removed = SyncChange.query.filter(SyncChange.changed_at < cutoff).delete(synchronize_session=False)
+    logger.info(f"Pruned {removed} sync changes older than {cutoff.isoformat()}")
+    return removed
@@ -0,0 +1,136 @@
+# backend/services/thumbnails.py
+"""
+Single thumbnail engine for every image rendition in the app.
+
+A photo is decoded once, at the smallest JPEG DCT scale that still covers the largest
+requested size (Image.draft), then EXIF-rotated and flattened to RGB. Each size is resized
+from the previous, larger one, largest first, with reducing_gap so Pillow does a cheap
+integer reduce() before the final LANCZOS pass. A 12MP phone photo therefore never gets
+fully decoded when only screen-sized renditions are needed.
+"""
+
+import io
+import os
+import logging
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+    ImageOps = None
+    features = None
+    logging.warning("Pillow library not found. Thumbnail generation will be disabled.")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (150, 300, 1024)
+DEFAULT_QUALITY = 85
+REDUCING_GAP = 3.0
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+_EXIF_ORIENTATION = 0x0112
+
+
+def webp_supported():
+    return features is not None and features.check('webp')
+
+
+def output_format(requested):
+    """Normalise a format name, falling back to JPEG when WebP support is missing."""
+    fmt = (requested or 'JPEG').upper()
+    if fmt == 'JPG':
+        fmt = 'JPEG'
+    if fmt == 'WEBP' and not webp_supported():
+        logger.warning("Pillow was built without WebP support; writing JPEG thumbnails instead.")
+        fmt = 'JPEG'
+    return fmt
+
+
+def file_extension(fmt):
+    return 'webp' if output_format(fmt) == 'WEBP' else 'jpg'
+
+
+def _fit(width, height, box):
+    """Dimensions of width x height scaled down to fit a box x box square (never upscaled)."""
+    scale = min(box / width, box / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _flatten_to_rgb(img):
+    """Paste transparency onto white and convert anything else to RGB."""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def _decode(img, largest):
+    """Decode at reduced scale when the format supports it, then apply EXIF orientation."""
+    orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+    width, height = img.size
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    target_width, target_height = _fit(width, height, largest)
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        target_width, target_height = target_height, target_width
+
+    if img.format == 'JPEG':
+        # draft only ever picks a scale whose output is at least the requested size
+        img.draft('RGB', (target_width, target_height))
+    return _flatten_to_rgb(ImageOps.exif_transpose(img))
+
+
+def render(source, sizes=DEFAULT_SIZES, fmt='JPEG', quality=DEFAULT_QUALITY):
+    """
+    Decode `source` (path, file object or bytes) once and encode one rendition per size.
+
+    Returns {size: (encoded_bytes, (width, height))} plus the oriented original dimensions
+    under the key 'original'.
+    """
+    if Image is None:
+        raise RuntimeError('Pillow is not installed')
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    fmt = output_format(fmt)
+    sizes = sorted({int(size) for size in sizes}, reverse=True)
+
+    with Image.open(source) as img:
+        orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+        original = img.size[::-1] if orientation in _TRANSPOSED_ORIENTATIONS else img.size
+        current = _decode(img, sizes[0])
+
+        renditions = {'original': original}
+        for size in sizes:
+            # Fit against the full-resolution aspect ratio so drafted rounding doesn't drift
+            target = _fit(original[0], original[1], size)
+            if current.size != target and (current.size[0] > target[0] or current.size[1] > target[1]):
+                current = current.resize(target, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+            output = io.BytesIO()
+            if fmt == 'WEBP':
+                current.save(output, 'WEBP', quality=quality, method=4)
+            else:
+                current.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+            renditions[size] = (output.getvalue(), current.size)
+    return renditions
+
+
+def write(source, targets, fmt='JPEG', quality=DEFAULT_QUALITY):
+    """
+    Render and write several sizes from one decode. `targets` maps size -> output path.
+    Returns {'original': (w, h), size: (w, h), ...}.
+    """
+    renditions = render(source, targets.keys(), fmt, quality)
+    dimensions = {'original': renditions.pop('original')}
+    for size, (data, rendered_size) in renditions.items():
+        path = targets[size]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as output:
+            output.write(data)
+        dimensions[size] = rendered_size
+    return dimensions
@@ -0,0 +1,242 @@
+# backend/services/upload_service.py
+
+import os
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from werkzeug.exceptions import ClientDisconnected
+from models import db, UploadSession, DoorMedia
+from services import media_store
+
+logger = logging.getLogger(__name__)
+
+STAGING_SUBFOLDER = '_staging'
+READ_BLOCK_SIZE = 64 * 1024
+MAX_CACHED_HASHERS = 256
+
+# Running sha256 per open session, so each chunk only hashes its own bytes. The state lives
+# in this process only; after a restart, or when another worker took the previous chunk,
+# the hash is rebuilt from the staging file.
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+class UploadSessionError(Exception):
+    """A request against an upload session was rejected; carries the HTTP status to return."""
+
+    def __init__(self, message, status_code=400, **details):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.details = details
+
+    def to_dict(self):
+        return {'error': self.message, **self.details}
+
+
+def staging_path(upload_folder, session_id):
+    return os.path.join(upload_folder, STAGING_SUBFOLDER, f"{session_id}.part")
+
+
+def _take_hasher(session_id, offset):
+    """Return the cached hasher for a session if it has consumed exactly `offset` bytes."""
+    with _hashers_lock:
+        cached = _hashers.pop(session_id, None)
+    if cached and cached[0] == offset:
+        return cached[1]
+    return None
+
+
+def _store_hasher(session_id, offset, hasher):
+    with _hashers_lock:
+        _hashers[session_id] = (offset, hasher)
+        _hashers.move_to_end(session_id)
+        while len(_hashers) > MAX_CACHED_HASHERS:
+            _hashers.popitem(last=False)
+
+
+def _drop_hasher(session_id):
+    with _hashers_lock:
+        _hashers.pop(session_id, None)
+
+
+def _rehash(path, length):
+    """Hash the first `length` bytes of the staging file."""
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as staged:
+        while remaining > 0:
+            block = staged.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def create_session(user_id, job, door, media_type, file_extension, total_size, upload_folder):
+    """Open a new upload session and its empty staging file."""
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        job_id=job.id,
+        door_id=door.id,
+        media_type=media_type,
+        file_extension=file_extension,
+        total_size=total_size,
+        received_bytes=0,
+        status='open'
+    )
+    path = staging_path(upload_folder, session.id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    db.session.add(session)
+    return session
+
+
+def get_session_for_update(session_id, user_id):
+    """Load a session owned by the user, locking the row so chunks for it are serialized."""
+    session = UploadSession.query.filter_by(id=session_id, user_id=user_id).with_for_update().first()
+    if session is None:
+        raise UploadSessionError('Upload session not found.', 404)
+    return session
+
+
+def append_chunk(session, offset, stream, content_length, upload_folder):
+    """
+    Append a request body to the staging file at `offset`, streaming it in small blocks.
+
+    The offset must equal the bytes already received, otherwise a 409 carrying the current
+    offset is raised so the client can resume from there. If the client disconnects midway,
+    whatever arrived is kept and counted. Returns the number of bytes appended.
+    """
+    if session.status != 'open':
+        raise UploadSessionError(f'Upload session is {session.status}.', 409, offset=session.received_bytes)
+    if offset != session.received_bytes:
+        raise UploadSessionError('Chunk offset does not match the received offset.', 409, offset=session.received_bytes)
+    if content_length is not None and offset + content_length > session.total_size:
+        raise UploadSessionError('Chunk extends past the declared upload size.', 400, offset=session.received_bytes)
+
+    path = staging_path(upload_folder, session.id)
+    hasher = _take_hasher(session.id, offset) or _rehash(path, offset)
+
+    written = 0
+    disconnected = False
+    with open(path, 'r+b') as staged:
+        # Drop bytes past the committed offset left behind by an interrupted request
+        staged.seek(offset)
+        staged.truncate()
+        while True:
+            try:
+                block = stream.read(READ_BLOCK_SIZE)
+            except ClientDisconnected:
+                disconnected = True
+                break
+            if not block:
+                break
+            if offset + written + len(block) > session.total_size:
+                block = block[:session.total_size - offset - written]
+            staged.write(block)
+            hasher.update(block)
+            written += len(block)
+            if offset + written >= session.total_size:
+                break
+
+    session.received_bytes = offset + written
+    session.updated_at = datetime.utcnow()
+    _store_hasher(session.id, session.received_bytes, hasher)
+    if disconnected:
+        logger.info(f"Client disconnected during upload {session.id}; kept {written} bytes at offset {offset}.")
+    return written
+
+
+def finalize_session(session, upload_folder, expected_sha256=None, uploaded_by=None):
+    """
+    Move a fully received staging file into the media store and create its DoorMedia.
+
+    If the door already has media with the same content, that record is attached to the
+    session instead and nothing new is stored. The file is moved before the caller commits;
+    if the commit fails the caller should call rollback_finalize to put the staging file
+    back. Returns (door_media, final_path, created).
+    """
+    if session.status == 'completed':
+        raise UploadSessionError('Upload session is already finalized.', 409, media_id=session.media_id)
+    if session.status != 'open':
+        raise UploadSessionError(f'Upload session is {session.status}.', 409)
+    if session.received_bytes != session.total_size:
+        raise UploadSessionError('Upload is incomplete.', 409, offset=session.received_bytes)
+
+    path = staging_path(upload_folder, session.id)
+    hasher = _take_hasher(session.id, session.received_bytes) or _rehash(path, session.received_bytes)
+    content_hash = hasher.hexdigest()
+    if expected_sha256 and expected_sha256.lower() != content_hash:
+        _store_hasher(session.id, session.received_bytes, hasher)
+        raise UploadSessionError('Checksum mismatch.', 422, sha256=content_hash)
+
+    duplicate = media_store.find_duplicate(session.door_id, session.job_id, session.media_type, content_hash)
+    if duplicate:
+        final_path = os.path.join(upload_folder, duplicate.file_path)
+        os.remove(path)
+        session.status = 'completed'
+        session.media_id = duplicate.id
+        _drop_hasher(session.id)
+        return duplicate, final_path, False
+
+    blob, _ = media_store.ingest_file(upload_folder, path, content_hash, session.total_size, session.file_extension)
+    final_path = os.path.join(upload_folder, blob.relative_path)
+
+    door_media = DoorMedia(
+        door_id=session.door_id,
+        job_id=session.job_id,
+        media_type=session.media_type,
+        file_path=blob.relative_path,
+        file_size=session.total_size,
+        content_hash=content_hash,
+        uploaded_at=datetime.utcnow(),
+        uploaded_by=uploaded_by
+    )
+    db.session.add(door_media)
+    db.session.flush()
+
+    session.status = 'completed'
+    session.media_id = door_media.id
+    _drop_hasher(session.id)
+    return door_media, final_path, True
+
+
+def rollback_finalize(session_id, final_path, upload_folder):
+    """
+    Restore the staging file after a failed finalize commit so the client can retry.
+    The stored file may be shared with other media, so it is copied back rather than moved.
+    """
+    try:
+        path = staging_path(upload_folder, session_id)
+        if final_path and os.path.exists(final_path) and not os.path.exists(path):
+            shutil.copyfile(final_path, path)
+    except OSError as e:
+        logger.error(f"Could not restore staging file for upload {session_id}: {e}")
+
+
+def abort_session(session, upload_folder):
+    """Discard an open session and its staging file."""
+    session.status = 'aborted'
+    _drop_hasher(session.id)
+    path = staging_path(upload_folder, session.id)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def expire_stale_sessions(max_age_hours, upload_folder):
+    """Abort open sessions untouched for max_age_hours. Returns the number expired."""
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    stale = UploadSession.query.filter(
+        UploadSession.status == 'open',
+        UploadSession.updated_at < cutoff
+    ).all()
+    for session in stale:
+        abort_session(session, upload_folder)
+    return len(stale)
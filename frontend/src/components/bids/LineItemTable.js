@@ -3,8 +3,14 @@ import { Table, Button, Form, InputGroup, Alert } from 'react-bootstrap';
 import { FaPlus, FaTrash, FaSave, FaSpinner, FaExclamationTriangle } from 'react-icons/fa';
 import { toast } from 'react-toastify';
 import { addLineItem, updateLineItem, deleteLineItem, saveBidChanges } from '../../services/bidService';
+import { suggestParts } from '../../services/partService';
 import './LineItemTable.css';
 
+const PART_SUGGEST_DELAY_MS = 200;
+
+// Text shown for a catalog part in the description datalist; also how a pick is recognised
+const suggestionValue = (part) => part.description ? `${part.part_number} - ${part.description}` : part.part_number;
+
 const LineItemTable = ({ doorId, door, bidId, onUpdate }) => {
   // Debug props on component mount and when they change
   useEffect(() => {
@@ -37,9 +43,10 @@ const LineItemTable = ({ doorId, door, bidId, onUpdate }) => {
   // Track which items have been modified but not yet saved
   const [modifiedItems, setModifiedItems] = useState(new Set());
   
-  // Simplified line item - removed part_number field
+  // part_number is not typed in; it is filled in when a catalog suggestion is picked
   const [newItem, setNewItem] = useState({
     description: '',
+    part_number: '',
     quantity: 1,
     price: 0,
     labor_hours: 0,
@@ -47,6 +54,8 @@ const LineItemTable = ({ doorId, door, bidId, onUpdate }) => {
   });
   
   const [isAddingItem, setIsAddingItem] = useState(false);
+  // Parts catalog suggestions for the new item's description
+  const [partSuggestions, setPartSuggestions] = useState([]);
   
   // References to input fields for keyboard navigation
   const inputRefs = useRef({});
@@ -211,6 +220,25 @@ const LineItemTable = ({ doorId, door, bidId, onUpdate }) => {
     }
   }, [editingItems, door?.line_items, setHasUnsavedChanges]); 
 
+  // Fetch part suggestions once typing in the new item's description pauses
+  useEffect(() => {
+    const query = newItem.description.trim();
+    if (newItem.part_number || query.length < 2) {
+      setPartSuggestions([]);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      suggestParts(query)
+        .then(parts => { if (!cancelled) setPartSuggestions(parts); })
+        .catch(() => { if (!cancelled) setPartSuggestions([]); });
+    }, PART_SUGGEST_DELAY_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [newItem.description, newItem.part_number]);
+
   // Effect for global save function
   useEffect(() => {
       if (bidId && doorId) {
@@ -259,6 +287,23 @@ const LineItemTable = ({ doorId, door, bidId, onUpdate }) => {
       parsedValue = value === '' ? 0 : parseFloat(value);
     }
     
+    if (name === 'description') {
+      // Picking a suggestion from the datalist sets the description to its exact value
+      const picked = partSuggestions.find(part => suggestionValue(part) === value);
+      if (picked) {
+        setNewItem({
+          ...newItem,
+          description: picked.description || picked.part_number,
+          part_number: picked.part_number,
+          price: picked.price ?? newItem.price
+        });
+        setPartSuggestions([]);
+        return;
+      }
+      setNewItem({ ...newItem, description: value, part_number: '' });
+      return;
+    }
+    
     setNewItem({
       ...newItem,
       [name]: parsedValue
@@ -425,7 +470,7 @@ const LineItemTable = ({ doorId, door, bidId, onUpdate }) => {
     try {
       const addedItem = await addLineItem(doorId, newItem);
       console.log('Item added successfully:', addedItem);
-      setNewItem({ description: '', quantity: 1, price: 0, labor_hours: 0, hardware: 0 });
+      setNewItem({ description: '', part_number: '', quantity: 1, price: 0, labor_hours: 0, hardware: 0 });
       if (onUpdate) onUpdate();
       toast.success('Item added successfully');
       setTimeout(() => {
@@ -643,8 +688,16 @@ const LineItemTable = ({ doorId, door, bidId, onUpdate }) => {
             <td>
               <Form.Control type="text" name="description" value={newItem.description}
                 onChange={handleInputChange} onKeyDown={(e) => handleKeyDown(e, null, 0, null)}
-                onFocus={(e) => handleFocus(e, null, 0)} placeholder="Description" required
-                ref={(el) => inputRefs.current['new-description'] = el} className="description-input" />
+                onFocus={(e) => handleFocus(e, null, 0)} placeholder="Description or part number" required
+                ref={(el) => inputRefs.current['new-description'] = el} className="description-input"
+                list={`part-suggestions-${doorId}`} autoComplete="off" />
+              <datalist id={`part-suggestions-${doorId}`}>
+                {partSuggestions.map(part => (
+                  <option key={part.part_number} value={suggestionValue(part)}>
+                    {part.price != null ? `$${Number(part.price).toFixed(2)}` : ''}
+                  </option>
+                ))}
+              </datalist>
             </td>
             <td>
               <Form.Control type="number" name="quantity" value={newItem.quantity}
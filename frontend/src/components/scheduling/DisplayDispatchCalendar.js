@@ -1,7 +1,7 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { DragDropContext, Droppable, Draggable } from 'react-beautiful-dnd';
 import { Container, Row, Col, Card, Spinner, Alert, Button } from 'react-bootstrap';
-import { FaEye, FaEyeSlash, FaCalendarAlt } from 'react-icons/fa';
+import { FaEye, FaEyeSlash, FaCalendarAlt, FaRoute, FaMagic } from 'react-icons/fa';
 import DatePicker from 'react-datepicker';
 import "react-datepicker/dist/react-datepicker.css";
 import moment from 'moment';
@@ -22,17 +22,49 @@ const getDispatchForDate = async (date) => {
     }
 };
 
-const saveDispatchForDate = async (date, assignments) => {
+const saveDispatchForDate = async (date, assignments, version) => {
     try {
-        // The /api/dispatch endpoint expects the assignments array and the date
+        // The /api/dispatch endpoint expects the assignments array and the date, plus the
+        // version of the board they were made on so a concurrent save is refused (409)
         const response = await api.post('/dispatch', {
             date: moment(date).format('YYYY-MM-DD'),
-            assignments: assignments // Send the correctly formed assignments array
+            assignments: assignments, // Send the correctly formed assignments array
+            version: version
         });
         return response.data; // Axios returns data in .data
     } catch (error) {
         console.error("Error saving dispatch data:", error.response?.data || error.message);
-        throw new Error(error.response?.data?.error || 'Failed to save dispatch data');
+        const saveError = new Error(error.response?.data?.error || 'Failed to save dispatch data');
+        saveError.status = error.response?.status;
+        saveError.data = error.response?.data;
+        throw saveError;
+    }
+};
+
+// Suggested driving order of one truck's jobs (from cached site coordinates); nothing is saved
+const suggestRouteOrder = async (date, truck) => {
+    try {
+        const response = await api.post('/dispatch/optimize-route', {
+            date: moment(date).format('YYYY-MM-DD'),
+            truck: truck
+        });
+        return response.data;
+    } catch (error) {
+        console.error("Error optimizing route:", error.response?.data || error.message);
+        throw new Error(error.response?.data?.error || 'Failed to optimize route');
+    }
+};
+
+// Proposed trucks for the date's unassigned jobs (within each truck's hours); nothing is saved
+const proposeAutoAssign = async (date) => {
+    try {
+        const response = await api.post('/dispatch/auto-assign', {
+            date: moment(date).format('YYYY-MM-DD')
+        });
+        return response.data;
+    } catch (error) {
+        console.error("Error auto-assigning jobs:", error.response?.data || error.message);
+        throw new Error(error.response?.data?.error || 'Failed to auto-assign jobs');
     }
 };
 
@@ -55,6 +87,13 @@ const DailyDispatchCalendar = () => {
     const [saving, setSaving] = useState(false);
     const [error, setError] = useState(null);
     const [fieldUsers, setFieldUsers] = useState([]); // State to store field users
+    // Version of the board on screen, sent with every save and replaced by its response
+    const boardVersion = useRef(null);
+    const [proposal, setProposal] = useState(null); // Auto-assign proposal awaiting accept/discard
+    // Saves run one after another so each one carries the version the previous one returned
+    const saveQueue = useRef(Promise.resolve());
+    // Bumped when a 409 replaces the board; saves queued from the replaced board are dropped
+    const boardGeneration = useRef(0);
 
     // Initialize columns dynamically based on fetched field users
     const initializeColumns = useCallback((data, users) => {
@@ -85,12 +124,15 @@ const DailyDispatchCalendar = () => {
         setLoading(true);
         setError(null);
         try {
+            // Let queued saves finish with the version of the board they were made on
+            await saveQueue.current;
             // 1. Fetch field users first
             const users = await getFieldUsers();
             setFieldUsers(users);
 
             // 2. Fetch dispatch data using the selected date
             const dispatchData = await getDispatchForDate(selectedDate);
+            boardVersion.current = dispatchData.version;
             // Initialize columns using both dispatch data and fetched users
             setColumns(initializeColumns(dispatchData, users));
 
@@ -129,15 +171,27 @@ const DailyDispatchCalendar = () => {
             }
         });
 
-        try {
-            await saveDispatchForDate(selectedDate, assignments);
-            // Re-fetch data to ensure UI reflects saved state, especially if backend has validation
-            // fetchAllInitialData(); // Could cause a flicker; comment out if using optimistic updates
-        } catch (err) {
-            setError(err.message);
-        } finally {
-            setSaving(false);
-        }
+        const generation = boardGeneration.current;
+        const save = async () => {
+            if (generation !== boardGeneration.current) {
+                return; // Made on a board another dispatcher's save has since replaced
+            }
+            try {
+                const result = await saveDispatchForDate(selectedDate, assignments, boardVersion.current);
+                boardVersion.current = result.version;
+            } catch (err) {
+                if (err.status === 409 && err.data?.board) {
+                    // Someone else saved this board first: show theirs instead of overwriting it
+                    boardGeneration.current += 1;
+                    boardVersion.current = err.data.version;
+                    setColumns(initializeColumns(err.data.board, fieldUsers));
+                }
+                setError(err.message);
+            }
+        };
+        saveQueue.current = saveQueue.current.then(save);
+        await saveQueue.current;
+        setSaving(false);
     };
 
     const onDragEnd = (result) => {
@@ -175,6 +229,57 @@ const DailyDispatchCalendar = () => {
         handleSave(newColumns);
     };
 
+    const optimizeRoute = async (columnId) => {
+        try {
+            const suggestion = await suggestRouteOrder(selectedDate, columnId);
+            const position = new Map(suggestion.order.map((jobId, index) => [jobId, index]));
+            const column = columns[columnId];
+            const items = [...column.items].sort(
+                (a, b) => (position.get(a.id) ?? position.size) - (position.get(b.id) ?? position.size)
+            );
+            const newColumns = { ...columns, [columnId]: { ...column, items } };
+            setColumns(newColumns);
+            handleSave(newColumns);
+        } catch (err) {
+            setError(err.message);
+        }
+    };
+
+    const autoAssign = async () => {
+        try {
+            setProposal(await proposeAutoAssign(selectedDate));
+        } catch (err) {
+            setError(err.message);
+        }
+    };
+
+    const acceptProposal = () => {
+        if (proposal.version !== boardVersion.current) {
+            // The board changed after the proposal was made; start again from the current one
+            setProposal(null);
+            fetchAllInitialData();
+            return;
+        }
+        const newColumns = { ...columns };
+        const unassignedItems = [...columns.unassigned.items];
+        proposal.trucks.forEach(({ truck, new_job_ids }) => {
+            if (!newColumns[truck] || new_job_ids.length === 0) return;
+            const items = [...newColumns[truck].items];
+            new_job_ids.forEach((jobId) => {
+                const index = unassignedItems.findIndex((item) => item.id === jobId);
+                if (index === -1) return;
+                const [moved] = unassignedItems.splice(index, 1);
+                moved.is_visible = false; // Same default as dragging out of the unassigned pool
+                items.push(moved);
+            });
+            newColumns[truck] = { ...newColumns[truck], items };
+        });
+        newColumns.unassigned = { ...columns.unassigned, items: unassignedItems };
+        setProposal(null);
+        setColumns(newColumns);
+        handleSave(newColumns);
+    };
+
     const toggleVisibility = (columnId, itemIndex) => {
         const newColumns = { ...columns };
         const column = newColumns[columnId];
@@ -200,11 +305,21 @@ const DailyDispatchCalendar = () => {
                         <FaCalendarAlt className="me-2" />
                         <DatePicker
                             selected={selectedDate}
-                            onChange={(date) => setSelectedDate(date)}
+                            onChange={(date) => { setSelectedDate(date); setProposal(null); }}
                             className="form-control"
                             dateFormat="MM/dd/yyyy"
                             placeholderText="Select date"
                         />
+                        <Button
+                            variant="light"
+                            size="sm"
+                            className="ms-2"
+                            onClick={autoAssign}
+                            disabled={loading || saving || !columns?.unassigned?.items.length}
+                            title="Propose trucks for the unassigned jobs"
+                        >
+                            <FaMagic className="me-1" /> Auto-assign
+                        </Button>
                         {saving && (
                             <div className="ms-3 d-flex align-items-center">
                                 <Spinner animation="border" size="sm" variant="light" className="me-2" />
@@ -233,6 +348,26 @@ const DailyDispatchCalendar = () => {
                             </Button>
                         </Alert>
                     ) : (
+                        <>
+                        {proposal && (
+                            <Alert variant="info" className="mb-3" onClose={() => setProposal(null)} dismissible>
+                                <p className="mb-2">
+                                    {proposal.trucks.reduce((count, truck) => count + truck.new_job_ids.length, 0)} jobs proposed
+                                    {' '}({proposal.trucks.filter((truck) => truck.new_job_ids.length > 0)
+                                        .map((truck) => `${truck.truck}: ${truck.proposed_hours}/${truck.capacity_hours} h`).join(', ')}).
+                                    {proposal.unassigned.length > 0 && (
+                                        ` ${proposal.unassigned.filter((job) => job.reason === 'material_not_ready').length} held for material,`
+                                        + ` ${proposal.unassigned.filter((job) => job.reason === 'over_capacity').length} over capacity.`
+                                    )}
+                                </p>
+                                <Button variant="primary" size="sm" className="me-2" onClick={acceptProposal}>
+                                    Accept
+                                </Button>
+                                <Button variant="outline-secondary" size="sm" onClick={() => setProposal(null)}>
+                                    Discard
+                                </Button>
+                            </Alert>
+                        )}
                         <DragDropContext onDragEnd={onDragEnd}>
                             <div className="dispatch-board">
                                 {columns && Object.entries(columns).map(([columnId, column]) => (
@@ -243,6 +378,15 @@ const DailyDispatchCalendar = () => {
                                                 {column.items.length > 0 && (
                                                     <small className="ms-2 opacity-75">({column.items.length})</small>
                                                 )}
+                                                {columnId !== 'unassigned' && column.items.length > 2 && (
+                                                    <button
+                                                        className="visibility-toggle ms-2"
+                                                        onClick={() => optimizeRoute(columnId)}
+                                                        title="Reorder for the shortest drive"
+                                                    >
+                                                        <FaRoute size={14} />
+                                                    </button>
+                                                )}
                                             </h5>
                                             <Droppable droppableId={columnId}>
                                                 {(provided, snapshot) => (
@@ -342,6 +486,7 @@ const DailyDispatchCalendar = () => {
                                 ))}
                             </div>
                         </DragDropContext>
+                        </>
                     )}
                 </Card.Body>
             </Card>
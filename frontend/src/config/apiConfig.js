@@ -133,6 +133,7 @@ export const API_ENDPOINTS = {
     // Dispatch
     DISPATCH: {
         GET_FOR_DATE: (date) => `/api/dispatch/${date}`,
+        GET_RANGE: '/api/dispatch',  // ?start=&end=[&format=compact]
         SAVE: '/api/dispatch'
     },
     
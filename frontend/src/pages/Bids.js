@@ -1,9 +1,9 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Container, Card, Table, Button, Form, InputGroup, Pagination, Row, Col } from 'react-bootstrap';
 import { useParams, useNavigate, useLocation, Link } from 'react-router-dom';
 import { Search, ChevronLeft, ChevronRight } from 'lucide-react';
 import BidForm from '../components/bids/BidForm';
-import { getBids } from '../services/bidService';
+import { getBidsPage } from '../services/bidService';
 import './Bids.css';
 
 const Bids = () => {
@@ -17,26 +17,50 @@ const Bids = () => {
   const [bids, setBids] = useState([]);
   const [loading, setLoading] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+  // cursors[i] is the cursor that loads page i + 1 (null for the first page)
+  const [cursors, setCursors] = useState([null]);
   const [currentPage, setCurrentPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalItems, setTotalItems] = useState(0);
   const [itemsPerPage] = useState(10); // You can make this configurable
   
+  // Search runs on the server; wait for typing to pause before asking
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      setDebouncedSearch(searchTerm.trim());
+      setCursors([null]);
+      setCurrentPage(1); // Reset to first page when searching
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+  
   useEffect(() => {
     // If there's a bidId or estimateId, we don't need to fetch all bids
     if (!bidId && !estimateId) {
-      fetchBids();
+      fetchBids(cursors[currentPage - 1], currentPage === 1);
     }
-  }, [bidId, estimateId]);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [bidId, estimateId, currentPage, debouncedSearch]);
   
   /**
-   * Fetches all bids from the API and sorts them by most recent
+   * Fetches one page of bids (most recent first) from the API.
+   * The total count is only requested with the first page.
    */
-  const fetchBids = async () => {
+  const fetchBids = async (cursor, includeTotal) => {
     setLoading(true);
     try {
-      const data = await getBids();
-      // Sort bids by created_at in descending order (most recent first)
-      const sortedBids = data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-      setBids(sortedBids);
+      const page = await getBidsPage({
+        limit: itemsPerPage,
+        cursor,
+        q: debouncedSearch,
+        includeTotal
+      });
+      setBids(page.bids);
+      setNextCursor(page.next_cursor);
+      if (includeTotal) {
+        setTotalItems(page.total_count);
+      }
     } catch (error) {
       console.error('Error fetching bids:', error);
     } finally {
@@ -58,121 +82,31 @@ const Bids = () => {
     return new Date(dateString).toLocaleDateString(undefined, options);
   };
   
-  /**
-   * Filters bids based on search term
-   * Searches through customer name, bid ID, and site name
-   */
-  const filteredBids = useMemo(() => {
-    if (!searchTerm.trim()) return bids;
-    
-    const searchLower = searchTerm.toLowerCase();
-    return bids.filter(bid => {
-      const bidId = `BID-${bid.id}`.toLowerCase();
-      const customerName = (bid.customer_name || '').toLowerCase();
-      const siteName = (bid.site_name || '').toLowerCase();
-      
-      return bidId.includes(searchLower) || 
-             customerName.includes(searchLower) ||
-             siteName.includes(searchLower);
-    });
-  }, [bids, searchTerm]);
-  
-  /**
-   * Calculate pagination values
-   */
-  const paginationData = useMemo(() => {
-    const totalItems = filteredBids.length;
-    const totalPages = Math.ceil(totalItems / itemsPerPage);
-    const startIndex = (currentPage - 1) * itemsPerPage;
-    const endIndex = startIndex + itemsPerPage;
-    const currentBids = filteredBids.slice(startIndex, endIndex);
-    
-    return {
-      currentBids,
-      totalPages,
-      totalItems,
-      startIndex,
-      endIndex: Math.min(endIndex, totalItems)
-    };
-  }, [filteredBids, currentPage, itemsPerPage]);
+  const totalPages = Math.max(1, Math.ceil(totalItems / itemsPerPage));
+  const startIndex = (currentPage - 1) * itemsPerPage;
+  const endIndex = startIndex + bids.length;
   
   /**
    * Handle search input changes
    */
   const handleSearchChange = (e) => {
     setSearchTerm(e.target.value);
-    setCurrentPage(1); // Reset to first page when searching
   };
   
   /**
-   * Handle page changes
+   * Move one page forward or back. Pages are keyset-paginated, so only the
+   * neighbouring pages can be reached; visited cursors are kept for going back.
    */
-  const handlePageChange = (pageNumber) => {
-    setCurrentPage(pageNumber);
+  const handleNextPage = () => {
+    if (!nextCursor) return;
+    setCursors(previous => [...previous.slice(0, currentPage), nextCursor]);
+    setCurrentPage(currentPage + 1);
   };
   
-  /**
-   * Generate pagination items for the Pagination component
-   */
-  const generatePaginationItems = () => {
-    const { totalPages } = paginationData;
-    const items = [];
-    const maxVisiblePages = 5;
-    
-    if (totalPages <= maxVisiblePages) {
-      // Show all pages if total pages is small
-      for (let i = 1; i <= totalPages; i++) {
-        items.push(
-          <Pagination.Item
-            key={i}
-            active={i === currentPage}
-            onClick={() => handlePageChange(i)}
-          >
-            {i}
-          </Pagination.Item>
-        );
-      }
-    } else {
-      // Show truncated pagination for large number of pages
-      const startPage = Math.max(1, currentPage - 2);
-      const endPage = Math.min(totalPages, currentPage + 2);
-      
-      if (startPage > 1) {
-        items.push(
-          <Pagination.Item key={1} onClick={() => handlePageChange(1)}>
-            1
-          </Pagination.Item>
-        );
-        if (startPage > 2) {
-          items.push(<Pagination.Ellipsis key="start-ellipsis" />);
-        }
-      }
-      
-      for (let i = startPage; i <= endPage; i++) {
-        items.push(
-          <Pagination.Item
-            key={i}
-            active={i === currentPage}
-            onClick={() => handlePageChange(i)}
-          >
-            {i}
-          </Pagination.Item>
-        );
-      }
-      
-      if (endPage < totalPages) {
-        if (endPage < totalPages - 1) {
-          items.push(<Pagination.Ellipsis key="end-ellipsis" />);
-        }
-        items.push(
-          <Pagination.Item key={totalPages} onClick={() => handlePageChange(totalPages)}>
-            {totalPages}
-          </Pagination.Item>
-        );
-      }
+  const handlePreviousPage = () => {
+    if (currentPage > 1) {
+      setCurrentPage(currentPage - 1);
     }
-    
-    return items;
   };
   
   // If we have a bidId or estimateId, show the BidForm
@@ -208,9 +142,9 @@ const Bids = () => {
           <Row className="align-items-center">
             <Col>
               <span>Bids</span>
-              {paginationData.totalItems > 0 && (
+              {totalItems > 0 && (
                 <small className="text-muted ms-2">
-                  ({paginationData.totalItems} total)
+                  ({totalItems} total)
                 </small>
               )}
             </Col>
@@ -240,7 +174,7 @@ const Bids = () => {
             <div className="flex-center" style={{ minHeight: 120 }}>
               <p>Loading bids...</p>
             </div>
-          ) : paginationData.totalItems === 0 ? (
+          ) : bids.length === 0 ? (
             <div className="flex-center text-muted" style={{ minHeight: 120 }}>
               <p>
                 {searchTerm ? 'No bids found matching your search.' : 'No bids found. Create a new bid from an estimate.'}
@@ -252,7 +186,7 @@ const Bids = () => {
               <Row className="mb-3">
                 <Col>
                   <small className="text-muted">
-                    Showing {paginationData.startIndex + 1}-{paginationData.endIndex} of {paginationData.totalItems} bids
+                    Showing {startIndex + 1}-{endIndex} of {totalItems} bids
                     {searchTerm && ` matching "${searchTerm}"`}
                   </small>
                 </Col>
@@ -275,7 +209,7 @@ const Bids = () => {
                   </tr>
                 </thead>
                 <tbody>
-                  {paginationData.currentBids.map(bid => (
+                  {bids.map(bid => (
                     <tr key={bid.id}>
                       <td data-label="Bid ID" style={{ fontWeight: 600, color: '#24324d' }}>
                         BID-{bid.id}
@@ -304,22 +238,24 @@ const Bids = () => {
               </Table>
               
               {/* Pagination */}
-              {paginationData.totalPages > 1 && (
+              {(currentPage > 1 || nextCursor) && (
                 <Row className="mt-4">
                   <Col className="d-flex justify-content-center">
                     <Pagination className="mb-0">
                       <Pagination.Prev 
                         disabled={currentPage === 1}
-                        onClick={() => handlePageChange(currentPage - 1)}
+                        onClick={handlePreviousPage}
                       >
                         <ChevronLeft size={16} />
                       </Pagination.Prev>
                       
-                      {generatePaginationItems()}
+                      <Pagination.Item active>
+                        {currentPage} / {totalPages}
+                      </Pagination.Item>
                       
                       <Pagination.Next 
-                        disabled={currentPage === paginationData.totalPages}
-                        onClick={() => handlePageChange(currentPage + 1)}
+                        disabled={!nextCursor}
+                        onClick={handleNextPage}
                       >
                         <ChevronRight size={16} />
                       </Pagination.Next>
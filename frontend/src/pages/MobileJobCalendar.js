@@ -13,6 +13,19 @@ import {
   RefreshCw
 } from 'lucide-react';
 
+/**
+ * Expand a compact dispatch range ({ fields, trucks, days: { date: [values, ...] } })
+ * into job objects with their scheduled_date and truck_assignment.
+ */
+const decodeCompactRange = ({ fields, trucks, days }) => (
+  Object.entries(days).flatMap(([date, cards]) => cards.map(values => {
+    const job = Object.fromEntries(fields.map((field, index) => [field, values[index]]));
+    job.scheduled_date = date;
+    job.truck_assignment = job.truck === null ? null : trucks[job.truck];
+    return job;
+  }))
+);
+
 /**
  * Mobile Job Calendar Component
  * Allows mobile workers to view and select scheduled jobs by date
@@ -50,14 +63,14 @@ const MobileJobCalendar = ({ user, onJobSelect }) => {
       const startStr = formatDateForAPI(startDate);
       const endStr = formatDateForAPI(endDate);
 
-      // Build query parameters
+      // One request for the whole view: the dispatch range endpoint, compact encoding
       const params = new URLSearchParams({
-        start_date: startStr,
-        end_date: endStr,
-        include_unscheduled: 'false' // Only show scheduled jobs
+        start: startStr,
+        end: endStr,
+        format: 'compact'
       });
 
-      const response = await fetch(`/api/jobs?${params}`, {
+      const response = await fetch(`/api/dispatch?${params}`, {
         credentials: 'include'
       });
 
@@ -66,7 +79,7 @@ const MobileJobCalendar = ({ user, onJobSelect }) => {
       }
 
       const data = await response.json();
-      setJobs(data);
+      setJobs(decodeCompactRange(data));
     } catch (err) {
       console.error('Error loading jobs:', err);
       setError('Failed to load scheduled jobs. Please try again.');
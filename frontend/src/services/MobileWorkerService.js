@@ -15,9 +15,12 @@ class MobileWorkerService {
       if (!this.isOnline) {
         this.isOnline = true;
         console.log('MobileWorkerService: Connection restored - syncing pending changes');
-        this.syncPendingChanges().then(() => {
+        this.syncPendingChanges()
+          .then(() => this.pullChanges())
+          .catch((error) => console.error('MobileWorkerService: Error pulling changes after reconnect:', error.message))
+          .then(() => {
             window.dispatchEvent(new CustomEvent('connectionRestored'));
-        });
+          });
       }
     };
 
@@ -275,13 +278,66 @@ class MobileWorkerService {
     if (!this.isOnline) {
       throw new Error('Video upload requires an active internet connection.');
     }
-    const endpoint = `/mobile/doors/${doorId}/media/upload`;
-    const formData = new FormData();
-    formData.append('job_id', jobId.toString());
-    formData.append('door_id', doorId.toString());
-    formData.append('media_type', 'video');
-    formData.append('file', videoBlob, `door_${doorId}_video.webm`);
-    return await this.apiRequest('POST', endpoint, formData, null, { headers: { 'Content-Type': 'multipart/form-data' } });
+
+    // Videos go through a resumable upload session: if the connection drops, the next call
+    // for the same door and file asks the server for the received offset and continues.
+    const resumeKey = `upload_session_${jobId}_${doorId}_${videoBlob.size}`;
+    let uploadId = localStorage.getItem(resumeKey);
+    let offset = 0;
+    let chunkSize = 4 * 1024 * 1024;
+
+    if (uploadId) {
+      try {
+        const status = await this.apiRequest('GET', `/mobile/uploads/${uploadId}`);
+        if (status.status === 'completed') {
+          localStorage.removeItem(resumeKey);
+          return { success: true, message: 'Media uploaded successfully.', media_id: status.media_id };
+        }
+        if (status.status === 'open') {
+          offset = status.offset;
+        } else {
+          uploadId = null;
+        }
+      } catch (error) {
+        uploadId = null;
+      }
+    }
+
+    if (!uploadId) {
+      const session = await this.apiRequest('POST', '/mobile/uploads', {
+        job_id: jobId,
+        door_id: doorId,
+        media_type: 'video',
+        filename: `door_${doorId}_video.webm`,
+        total_size: videoBlob.size
+      });
+      uploadId = session.upload_id;
+      chunkSize = session.chunk_size || chunkSize;
+      localStorage.setItem(resumeKey, uploadId);
+    }
+
+    let failures = 0;
+    while (offset < videoBlob.size) {
+      const chunk = videoBlob.slice(offset, offset + chunkSize);
+      try {
+        const result = await this.apiRequest('PUT', `/mobile/uploads/${uploadId}`, chunk, null, {
+          headers: { 'Content-Type': 'application/octet-stream', 'Upload-Offset': offset.toString() }
+        });
+        offset = result.offset;
+        failures = 0;
+      } catch (error) {
+        failures++;
+        if (failures >= 5 || !this.isOnline) {
+          throw error;
+        }
+        const status = await this.apiRequest('GET', `/mobile/uploads/${uploadId}`);
+        offset = status.offset;
+      }
+    }
+
+    const result = await this.apiRequest('POST', `/mobile/uploads/${uploadId}/complete`, {});
+    localStorage.removeItem(resumeKey);
+    return result;
   }
 
   // Use arrow function
@@ -371,6 +427,16 @@ class MobileWorkerService {
     }
   }
 
+  BATCHABLE_CHANGE_TYPES = ['job_start', 'job_pause', 'job_resume', 'job_complete', 'line_item_toggle', 'door_complete'];
+
+  MAX_BATCH_ACTIONS = 200;
+
+  // Use arrow function
+  toBatchPayload = (payload) => {
+    const { jobId, doorId, lineItemId, ...rest } = payload;
+    return { ...rest, job_id: jobId, door_id: doorId, line_item_id: lineItemId };
+  }
+
   // Use arrow function
   syncPendingChanges = async () => {
     if (!this.isOnline) {
@@ -397,7 +463,49 @@ class MobileWorkerService {
     const results = { success: true, synced: 0, errors: [] };
     const remainingChanges = [];
 
-    for (const change of pendingChanges) {
+    // Everything except media uploads is replayed in one batched request; the change id
+    // doubles as the idempotency key, so a batch retried after a dropped response is safe.
+    const batchable = pendingChanges.filter((change) => this.BATCHABLE_CHANGE_TYPES.includes(change.type));
+    const individual = pendingChanges.filter((change) => !this.BATCHABLE_CHANGE_TYPES.includes(change.type));
+
+    for (let start = 0; start < batchable.length; start += this.MAX_BATCH_ACTIONS) {
+      const chunk = batchable.slice(start, start + this.MAX_BATCH_ACTIONS);
+      chunk.forEach((change) => { change.attemptCount = (change.attemptCount || 0) + 1; });
+      try {
+        const response = await this.apiRequest('POST', '/mobile/actions/batch', {
+          actions: chunk.map((change) => ({
+            idempotency_key: change.id,
+            type: change.type,
+            payload: this.toBatchPayload(change.payload)
+          }))
+        });
+        response.results.forEach((result, index) => {
+          const change = chunk[index];
+          if (result.status < 400) {
+            results.synced++;
+            return;
+          }
+          results.success = false;
+          results.errors.push({ changeId: change.id, type: change.type, attempt: change.attemptCount, error: result.body.error });
+          if (result.status >= 500 && change.attemptCount < 5) {
+            remainingChanges.push(change);
+          } else {
+            console.error(`MobileWorkerService: Change ${change.id} (type ${change.type}) rejected by server. Discarding. Error: ${result.body.error}`);
+          }
+        });
+      } catch (error) {
+        console.error('MobileWorkerService: Error replaying batched changes:', error.message);
+        results.success = false;
+        chunk.forEach((change) => {
+          results.errors.push({ changeId: change.id, type: change.type, attempt: change.attemptCount, error: error.message });
+          if (change.attemptCount < 5) {
+            remainingChanges.push(change);
+          }
+        });
+      }
+    }
+
+    for (const change of individual) {
       try {
         change.attemptCount = (change.attemptCount || 0) + 1;
         let syncSuccessful = false;
@@ -463,6 +571,75 @@ class MobileWorkerService {
     return results;
   }
 
+  // Use arrow function
+  pullChanges = async () => {
+    if (!this.isOnline) {
+      return { success: true, applied: 0, message: "Offline, pull skipped." };
+    }
+
+    const cursorKey = 'sync_cursor';
+    let applied = 0;
+    let hasMore = true;
+
+    while (hasMore) {
+      const cursor = localStorage.getItem(cursorKey);
+      const response = await this.apiRequest('GET', '/mobile/sync', null, cursor ? { since: cursor } : null);
+
+      if (response.reset) {
+        console.warn('MobileWorkerService: Sync cursor expired, requesting a full snapshot.');
+        localStorage.removeItem(cursorKey);
+        continue;
+      }
+
+      (response.jobs || []).forEach((job) => {
+        if (job.doors) {
+          this.cacheJobForOffline(job);
+        } else {
+          const cachedJob = this.getCachedJobFromLocalStorage(job.id);
+          this.cacheJobForOffline({ ...job, doors: cachedJob ? cachedJob.doors : [] });
+        }
+        applied++;
+      });
+
+      const deleted = response.deleted || {};
+      const doorUpdates = response.doors || [];
+      const jobIdsWithDoorChanges = new Set(doorUpdates.map((door) => door.job_id));
+      if (deleted.doors) {
+        Object.keys(localStorage)
+          .filter((key) => key.startsWith('offline_job_'))
+          .forEach((key) => jobIdsWithDoorChanges.add(Number(key.replace('offline_job_', ''))));
+      }
+
+      jobIdsWithDoorChanges.forEach((jobId) => {
+        const cachedJob = this.getCachedJobFromLocalStorage(jobId);
+        if (!cachedJob) return;
+        const removedDoorIds = new Set(deleted.doors || []);
+        const doors = (cachedJob.doors || []).filter((door) => !removedDoorIds.has(door.id));
+        doorUpdates.filter((door) => door.job_id === jobId).forEach((door) => {
+          const index = doors.findIndex((cachedDoor) => cachedDoor.id === door.id);
+          if (index >= 0) {
+            doors[index] = door;
+          } else {
+            doors.push(door);
+          }
+          applied++;
+        });
+        this.cacheJobForOffline({ ...cachedJob, doors });
+      });
+
+      (deleted.jobs || []).forEach((jobId) => {
+        localStorage.removeItem(`offline_job_${jobId}`);
+        applied++;
+      });
+
+      localStorage.setItem(cursorKey, response.cursor);
+      hasMore = response.has_more;
+    }
+
+    window.dispatchEvent(new CustomEvent('offlineDataUpdated'));
+    return { success: true, applied };
+  }
+
   // Use arrow function
   blobToDataURL = (blob) => {
     return new Promise((resolve, reject) => {
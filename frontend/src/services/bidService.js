@@ -15,13 +15,48 @@ export const getBids = async () => {
 };
 
 /**
- * Get bid by ID with full details including doors and line items
+ * Get one page of bids, newest first
+ * @param {Object} options - { limit, cursor, q, status, includeTotal }
+ * @returns {Promise} Promise resolving to { bids, next_cursor, total_count? }
+ */
+export const getBidsPage = async ({ limit = 25, cursor = null, q = '', status = '', includeTotal = false } = {}) => {
+  try {
+    const params = { limit };
+    if (cursor) params.cursor = cursor;
+    if (q) params.q = q;
+    if (status) params.status = status;
+    if (includeTotal) params.include_total = 1;
+    const response = await api.get('/bids', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error getting bids page:', error);
+    throw error;
+  }
+};
+
+// Last full response of each bid with its ETag, revalidated with If-None-Match
+const bidDetailCache = new Map();
+
+/**
+ * Get bid by ID with full details including doors and line items.
+ * When the bid is unchanged since the last call the server answers 304 and the
+ * same object is returned again, so callers can skip re-rendering.
  * @param {number} id - The bid ID
  * @returns {Promise} Promise resolving to bid data
  */
 export const getBid = async (id) => {
   try {
-    const response = await api.get(`/bids/${id}`);
+    const cached = bidDetailCache.get(String(id));
+    const response = await api.get(`/bids/${id}`, {
+      headers: cached ? { 'If-None-Match': cached.etag } : {},
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304
+    });
+    if (response.status === 304 && cached) {
+      return cached.data;
+    }
+    if (response.headers.etag) {
+      bidDetailCache.set(String(id), { etag: response.headers.etag, data: response.data });
+    }
     return response.data;
   } catch (error) {
     console.error(`Error getting bid ${id}:`, error);
@@ -457,6 +492,7 @@ export const calculateBidTotals = (doors) => {
 // `exportBid` and `validateBid` were removed because they were not defined.
 const bidService = {
   getBids,
+  getBidsPage,
   getBid,
   createBid,
   addDoor,
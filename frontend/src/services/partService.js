@@ -0,0 +1,12 @@
+import api from './api';
+
+// Typeahead suggestions from the parts catalog for a part number or description fragment
+export const suggestParts = async (query, limit = 10) => {
+  try {
+    const response = await api.get('/parts/suggest', { params: { q: query, limit } });
+    return response.data.parts;
+  } catch (error) {
+    console.error('Error getting part suggestions:', error);
+    throw error;
+  }
+};